@@ -0,0 +1,90 @@
+"""
+Conditional GET helpers
+
+フロントエンドがポーリングするパズル詳細・一覧に ETag を付け、
+If-None-Match が一致した場合はレスポンスを組み立てずに 304 を返します。
+ETag はレコードの updatedAt から計算するため、本文をシリアライズする必要はありません。
+"""
+
+import hashlib
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import Response
+
+from app.api.responses import FastJSONResponse
+
+# ブラウザにキャッシュは許可しつつ、毎回 If-None-Match で再検証させる
+CACHE_CONTROL = "private, no-cache"
+
+
+def _version(item: Dict[str, Any]) -> str:
+    """レコードのバージョン（updatedAtがなければcreatedAt）"""
+    return str(item.get('updatedAt') or item.get('createdAt') or '')
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    任意の値の並びから弱いETagを作成
+
+    表現（圧縮の有無など）が変わっても同じ値を返すため、弱いETag（W/）を使います。
+    """
+    digest = hashlib.sha1(
+        "\x1f".join(str(part) for part in parts).encode('utf-8'),
+        usedforsecurity=False
+    ).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def puzzle_etag(puzzle: Dict[str, Any]) -> str:
+    """パズル1件のETag（puzzleId + updatedAt）"""
+    return make_etag(puzzle.get('puzzleId'), _version(puzzle))
+
+
+def puzzle_list_etag(items: Iterable[Dict[str, Any]], *variant: Any) -> str:
+    """
+    一覧ページのETag
+
+    Args:
+        items: Puzzles on the page
+        variant: Request parameters that change the body (view, order, nextToken ...)
+    """
+    parts = [f"{item.get('puzzleId')}@{_version(item)}" for item in items]
+    return make_etag(*variant, *parts)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match ヘッダーがETagと一致するか（弱い比較）
+
+    "*" やカンマ区切りの複数指定にも対応します。
+    """
+    if not if_none_match:
+        return False
+
+    target = etag.removeprefix('W/')
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/') == target:
+            return True
+    return False
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    """ETagとCache-Controlヘッダー"""
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    """本文なしの304レスポンス"""
+    return Response(status_code=304, headers=cache_headers(etag))
+
+
+def conditional_json(content: Any, etag: str, if_none_match: Optional[str]) -> Response:
+    """
+    If-None-Match が一致すれば304、そうでなければETag付きのJSONレスポンスを返す
+
+    jsonable_encoder を通さずに FastJSONResponse で直接シリアライズします。
+    """
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return FastJSONResponse(content, headers=cache_headers(etag))
@@ -0,0 +1,97 @@
+"""
+FastAPI dependency providers
+
+サービスインスタンスをプロセスごとに1つだけ生成し、Depends経由で各ルートに注入します。
+boto3のクライアントとコネクションプールはリクエスト間で再利用されます。
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from app.core.aws import create_client
+from app.core.cache import create_puzzle_cache
+from app.core.config import settings
+from app.services.async_puzzle_service import AsyncPuzzleService, create_aws_executor
+from app.services.deletion_queue import BackgroundDeletionQueue, DeletionQueue, SqsDeletionQueue
+from app.services.piece_url_signer import PieceUrlSigner
+from app.services.puzzle_service import PuzzleService
+
+
+@lru_cache(maxsize=None)
+def get_puzzle_service() -> PuzzleService:
+    """プロセス共有のPuzzleServiceを返す（初回呼び出し時に生成）"""
+    return PuzzleService(
+        s3_bucket_name=settings.s3_bucket_name,
+        puzzles_table_name=settings.puzzles_table_name,
+        pieces_table_name=settings.pieces_table_name,
+        environment=settings.environment,
+        cache=create_puzzle_cache(settings)
+    )
+
+
+@lru_cache(maxsize=None)
+def get_aws_executor() -> ThreadPoolExecutor:
+    """プロセス共有のAWS呼び出し用スレッドプールを返す"""
+    return create_aws_executor(settings.aws_executor_max_workers)
+
+
+@lru_cache(maxsize=None)
+def get_async_puzzle_service() -> AsyncPuzzleService:
+    """プロセス共有のAsyncPuzzleServiceを返す"""
+    return AsyncPuzzleService(get_puzzle_service(), executor=get_aws_executor())
+
+
+@lru_cache(maxsize=None)
+def get_deletion_queue() -> DeletionQueue:
+    """
+    プロセス共有の削除キューを返す（DELETION_QUEUE_BACKENDで切り替え）
+
+    Lambdaでは応答を返した時点で実行環境が凍結され、ワーカースレッドの削除が
+    完了しないままパズルが "deleting" に残るため、threadバックエンドは使用できません。
+    """
+    backend = settings.deletion_queue_backend
+
+    if backend == 'sqs':
+        return SqsDeletionQueue(
+            create_client('sqs'),
+            queue_url=settings.deletion_queue_url
+        )
+
+    if backend != 'thread':
+        raise ValueError(f"Unsupported DELETION_QUEUE_BACKEND: {backend}")
+
+    if settings.running_on_lambda:
+        raise ValueError("DELETION_QUEUE_BACKEND=thread is not supported on Lambda; use sqs")
+
+    return BackgroundDeletionQueue(
+        get_puzzle_service(),
+        max_attempts=settings.deletion_max_attempts
+    )
+
+
+@lru_cache(maxsize=None)
+def get_piece_url_signer() -> PieceUrlSigner:
+    """プロセス共有のPieceUrlSignerを返す（署名結果のキャッシュも共有）"""
+    return PieceUrlSigner(
+        s3_bucket_name=settings.s3_bucket_name,
+        expires_in=settings.piece_url_expires_in,
+        mode=settings.piece_url_mode,
+        cloudfront_domain=settings.cloudfront_domain,
+        cloudfront_key_pair_id=settings.cloudfront_key_pair_id,
+        cloudfront_private_key=settings.cloudfront_private_key,
+        cache_max_entries=settings.piece_url_cache_max_entries
+    )
+
+
+def reset_services() -> None:
+    """
+    キャッシュ済みのサービスを破棄する
+
+    テストでmotoのモックを切り替えた後など、クライアントを作り直したい場合に使用します。
+    """
+    if get_deletion_queue.cache_info().currsize:
+        get_deletion_queue().shutdown()
+    get_deletion_queue.cache_clear()
+    get_piece_url_signer.cache_clear()
+    get_async_puzzle_service.cache_clear()
+    get_puzzle_service.cache_clear()
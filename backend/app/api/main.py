@@ -5,18 +5,35 @@ This is the main application file that initializes FastAPI and registers routes.
 Run with: uvicorn app.api.main:app --reload
 """
 
-from fastapi import FastAPI
+from typing import Literal, Optional
+
+from botocore.exceptions import ClientError
+from fastapi import Depends, FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from app.core.config import settings
+from app.core.logger import setup_logger
+from app.core.profiling import create_profiling_policy
+from app.api.conditional import conditional_json, puzzle_list_etag
+from app.api.dependencies import get_async_puzzle_service, get_puzzle_service
+from app.api.metrics import RequestMetricsMiddleware
+from app.api.profiling import ProfilingMiddleware
+from app.api.responses import FastJSONResponse
 from app.api.routes import puzzles
+from app.services.async_puzzle_service import AsyncPuzzleService
+from app.services.puzzle_service import PuzzleService
 
+# ロガーの初期化
+logger = setup_logger(__name__)
 
 # FastAPIアプリの初期化
 app = FastAPI(
     title="Jigsaw Puzzle API",
     description="API for managing jigsaw puzzles",
-    version="1.0.0"
+    version="1.0.0",
+    # DynamoDBのDecimalを含むレスポンスを高速エンコーダーでシリアライズ
+    default_response_class=FastJSONResponse
 )
 
 # CORS設定
@@ -28,6 +45,39 @@ app.add_middleware(
     allow_headers=["Content-Type", "Authorization"],
 )
 
+# レスポンス圧縮（RESPONSE_COMPRESSION_MIN_SIZE バイト未満の小さなレスポンスはそのまま返す）
+if settings.response_compression == 'brotli':
+    from brotli_asgi import BrotliMiddleware  # オプション依存のため使用時のみインポート
+
+    # br非対応のクライアントにはgzipで返す
+    app.add_middleware(
+        BrotliMiddleware,
+        minimum_size=settings.response_compression_min_size,
+        gzip_fallback=True
+    )
+elif settings.response_compression == 'gzip':
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=settings.response_compression_min_size,
+        compresslevel=settings.response_compression_level
+    )
+elif settings.response_compression != 'none':
+    raise ValueError(f"Unsupported RESPONSE_COMPRESSION: {settings.response_compression}")
+
+# リクエストごとのレイテンシ・AWS呼び出しの内訳（最後に追加し、圧縮なども含めた全体を計測）
+if settings.request_metrics_enabled:
+    app.add_middleware(RequestMetricsMiddleware)
+
+# 指定されたリクエストだけのサンプリングプロファイラ（無効な場合は登録しない）
+profiling_policy = create_profiling_policy(settings)
+if profiling_policy is not None:
+    app.add_middleware(
+        ProfilingMiddleware,
+        policy=profiling_policy,
+        s3_client_factory=lambda: get_puzzle_service().s3_client,
+        bucket=settings.s3_bucket_name
+    )
+
 # ルーターの登録
 app.include_router(puzzles.router)
 
@@ -44,31 +94,68 @@ def root():
 
 
 # ユーザーのパズル一覧取得エンドポイント
-@app.get("/users/{user_id}/puzzles")
-def get_user_puzzles(user_id: str):
+@app.get("/users/{user_id}/puzzles", responses={
+    304: {"description": "Not modified (If-None-Match matched the ETag)"}
+})
+async def get_user_puzzles(
+    user_id: str,
+    limit: int = Query(PuzzleService.DEFAULT_PAGE_SIZE, ge=1, le=PuzzleService.MAX_PAGE_SIZE),
+    next_token: Optional[str] = Query(None, alias="nextToken"),
+    view: Literal["full", "summary"] = "full",
+    order: Literal["newest", "oldest"] = "newest",
+    if_none_match: Optional[str] = Header(None),
+    puzzle_service: AsyncPuzzleService = Depends(get_async_puzzle_service)
+):
     """
-    Get all puzzles for a specific user
+    Get puzzles for a specific user, newest first, one page at a time
 
     - **user_id**: User ID (path parameter)
+    - **limit**: Page size (1-100, default: 50)
+    - **nextToken**: Continuation token from the previous page
+    - **view**: "summary" returns only list-view attributes
+    - **order**: "newest" (default) or "oldest"
 
-    This is an alias for GET /puzzles?user_id={user_id}
-    Provided for RESTful API design.
+    The ETag covers every puzzle's updatedAt on the page; a matching
+    If-None-Match returns 304 Not Modified.
     """
-    from app.services.puzzle_service import PuzzleService
-
-    puzzle_service = PuzzleService(
-        s3_bucket_name=settings.s3_bucket_name,
-        puzzles_table_name=settings.puzzles_table_name,
-        environment=settings.environment
+    fields = PuzzleService.LIST_VIEW_FIELDS if view == "summary" else None
+
+    try:
+        page = await puzzle_service.list_puzzles_page(
+            user_id=user_id,
+            limit=limit,
+            next_token=next_token,
+            fields=fields,
+            newest_first=(order == "newest")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ClientError as e:
+        logger.error(
+            "Error listing puzzles",
+            extra={
+                "user_id": user_id,
+                "limit": limit,
+                "view": view,
+                "order": order,
+                "error": str(e)
+            }
+        )
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    etag = puzzle_list_etag(page["items"], view, order, limit, next_token, page["nextToken"])
+    # jsonable_encoder を通さずに直接シリアライズ（変更がなければ304）
+    return conditional_json(
+        {
+            "userId": user_id,
+            "count": len(page["items"]),
+            "puzzles": page["items"],
+            "nextToken": page["nextToken"]
+        },
+        etag,
+        if_none_match
     )
 
-    puzzles_list = puzzle_service.list_puzzles(user_id=user_id)
-    return {
-        "userId": user_id,
-        "count": len(puzzles_list),
-        "puzzles": puzzles_list
-    }
-
 
 # デバッグ/開発用エンドポイント
 @app.get("/debug/config")
@@ -86,6 +173,18 @@ def get_config():
     }
 
 
+@app.get("/debug/cache")
+def get_cache_stats():
+    """Get puzzle cache hit/miss statistics (development only)"""
+    if settings.is_production:
+        return {"error": "Cache statistics endpoint is disabled in production"}
+
+    cache = get_puzzle_service().cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
 # ローカル実行用
 if __name__ == "__main__":
     import uvicorn
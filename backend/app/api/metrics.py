@@ -0,0 +1,86 @@
+"""
+Request metrics middleware
+
+リクエストごとに、ルート単位のレイテンシとAWS呼び出し（S3・DynamoDBの操作ごと）の内訳を
+1件の構造化ログ（JSONFormatter の extra）として出力します。
+
+    {"message": "Request metrics", "request_id": "...", "extra": {
+        "method": "GET", "route": "/puzzles/{puzzle_id}", "status": 200,
+        "durationMs": 12.3, "coldStart": false, "awsCalls": 1, "awsMs": 8.1,
+        "aws": {"DynamoDB.GetItem": {"calls": 1, "ms": 8.1}}}}
+
+- route はパスパラメータを含まないテンプレート（マッチしない場合は "unmatched"）
+- coldStart はこのプロセス（Lambdaの実行環境）の最初のリクエストかどうか
+- Lambda（Mangum）経由の場合は request_id にLambdaのリクエストIDを入れる
+"""
+
+from typing import Any, Awaitable, Callable, Dict, MutableMapping
+
+from app.core.logger import setup_logger
+from app.core.request_metrics import RequestMetrics, finish_request, start_request
+
+logger = setup_logger(__name__)
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+# このプロセスでまだリクエストを処理していないか（最初のリクエストをコールドスタートとして記録）
+_cold_start = True
+
+
+def _take_cold_start() -> bool:
+    global _cold_start
+    cold, _cold_start = _cold_start, False
+    return cold
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware that logs one metrics record per HTTP request"""
+
+    def __init__(self, app: Callable[[Scope, Receive, Send], Awaitable[None]]) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        cold_start = _take_cold_start()
+        metrics, token = start_request()
+        # 例外で応答が始まらなかった場合は500として記録
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            finish_request(token)
+            self._log(scope, metrics, status, cold_start)
+
+    @staticmethod
+    def _log(scope: Scope, metrics: RequestMetrics, status: int, cold_start: bool) -> None:
+        route = scope.get('route')
+        record: Dict[str, Any] = {
+            'method': scope['method'],
+            'route': getattr(route, 'path', None) or 'unmatched',
+            'status': status,
+            'durationMs': round(metrics.elapsed_ms(), 2),
+            'coldStart': cold_start,
+            **metrics.aws_summary(),
+        }
+        extra: Dict[str, Any] = {'extra_data': record}
+
+        # Mangumはscopeに "aws.context" としてLambdaのcontextを渡す
+        lambda_context = scope.get('aws.context')
+        request_id = getattr(lambda_context, 'aws_request_id', None)
+        if request_id:
+            extra['request_id'] = request_id
+
+        logger.info("Request metrics", extra=extra)
@@ -0,0 +1,109 @@
+"""
+Request profiling middleware
+
+ProfilingPolicy がプロファイルを取ると判断したリクエストの間だけサンプリングプロファイラを動かし、
+応答後にcollapsed stackをS3（profiles/{puzzle_id}/request-*.collapsed）に保存します。
+保存先のキーは X-Profile-Key レスポンスヘッダーで返します。
+記録するのはリクエストを処理するスレッド（イベントループ）と、bind_metrics で包んでexecutorに委譲した
+処理（AsyncPuzzleService のAWS呼び出しなど）を実行している間のスレッドです。
+
+プロファイリングが無効な場合はこのミドルウェア自体を登録しないため、通常のリクエストには影響しません。
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, MutableMapping, Optional
+
+from app.core.logger import setup_logger
+from app.core.profiling import (
+    PROFILE_HEADER,
+    ProfilingPolicy,
+    activate_profiler,
+    deactivate_profiler,
+    profile_key,
+    store_profile,
+)
+
+logger = setup_logger(__name__)
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+PROFILE_KEY_HEADER = b'x-profile-key'
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles selected requests and stores the result in S3"""
+
+    def __init__(
+        self,
+        app: Callable[[Scope, Receive, Send], Awaitable[None]],
+        policy: ProfilingPolicy,
+        s3_client_factory: Callable[[], Any],
+        bucket: str
+    ) -> None:
+        self.app = app
+        self.policy = policy
+        self.s3_client_factory = s3_client_factory
+        self.bucket = bucket
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or not self.policy.should_profile(_header(scope, PROFILE_HEADER)):
+            await self.app(scope, receive, send)
+            return
+
+        key: Optional[str] = None
+
+        async def send_with_key(message: Message) -> None:
+            nonlocal key
+            if message['type'] == 'http.response.start':
+                # ルーティング後なので path_params からパズルIDが分かる
+                puzzle_id = scope.get('path_params', {}).get('puzzle_id')
+                key = profile_key(puzzle_id, f"request-{scope['method'].lower()}")
+                message['headers'] = [*message.get('headers', []), (PROFILE_KEY_HEADER, key.encode())]
+            await send(message)
+
+        profiler = self.policy.profiler().start()
+        token = activate_profiler(profiler)
+        try:
+            await self.app(scope, receive, send_with_key)
+        finally:
+            deactivate_profiler(token)
+            profiler.stop()
+            if key is not None:
+                await self._store(scope, key, profiler)
+
+    async def _store(self, scope: Scope, key: str, profiler: Any) -> None:
+        route = getattr(scope.get('route'), 'path', None) or 'unmatched'
+        try:
+            # S3への保存でイベントループを塞がないようスレッドプールで実行
+            await asyncio.get_running_loop().run_in_executor(
+                None,
+                lambda: store_profile(
+                    self.s3_client_factory(),
+                    self.bucket,
+                    key,
+                    profiler,
+                    metadata={'method': scope['method'], 'route': route}
+                )
+            )
+            logger.info(
+                "Stored request profile",
+                extra={"extra_data": {"key": key, "route": route, "samples": profiler.samples}}
+            )
+        except Exception as e:
+            # プロファイルの保存に失敗してもリクエストは成功として扱う
+            logger.warning(
+                "Failed to store request profile",
+                extra={"extra_data": {"key": key, "error": str(e)}}
+            )
+
+
+def _header(scope: Scope, name: str) -> Optional[str]:
+    """ASGIのscopeからヘッダーの値を取得（name は小文字）"""
+    encoded = name.encode('latin-1')
+    for header_name, value in scope.get('headers', []):
+        if header_name == encoded:
+            return value.decode('latin-1')
+    return None
@@ -0,0 +1,19 @@
+"""
+Fast JSON response class
+
+jsonable_encoder を経由せず、app.core.serialization の高速エンコーダーで直接シリアライズします。
+DynamoDBのアイテム（Decimalを含む）をそのまま渡せます。
+"""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from app.core.serialization import dumps
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson（未インストール時は標準json）でシリアライズするJSONResponse"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
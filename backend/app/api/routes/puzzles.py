@@ -4,18 +4,43 @@ Puzzle API routes
 パズル関連のAPIエンドポイントを定義します。
 """
 
-from fastapi import APIRouter, HTTPException
+from typing import Any, Dict, Literal, Optional
 
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+
+from app.api.conditional import (
+    cache_headers,
+    conditional_json,
+    etag_matches,
+    make_etag,
+    not_modified,
+    puzzle_etag,
+)
+from app.api.dependencies import get_async_puzzle_service, get_deletion_queue, get_piece_url_signer
+from app.api.responses import FastJSONResponse
 from app.core.config import settings
 from app.core.logger import setup_logger
+from app.core.manifest import decode_manifest_json, encode_manifest
 from app.core.schemas import (
+    BulkDeleteRequest,
+    BulkDeleteResponse,
+    MultipartCompleteRequest,
+    MultipartCompleteResponse,
+    MultipartPartsRequest,
+    MultipartPartsResponse,
+    MultipartUploadRequest,
+    MultipartUploadResponse,
     PuzzleCreateRequest,
     PuzzleCreateResponse,
+    UploadPostResponse,
     UploadUrlRequest,
-    UploadUrlResponse,
     ErrorResponse
 )
-from app.services.puzzle_service import PuzzleService
+from app.services.async_puzzle_service import AsyncPuzzleService
+from app.services.deletion_queue import DeletionQueue
+from app.services.piece_url_signer import PieceUrlSigner
+from app.services.puzzle_service import PuzzleNotFoundError, UploadNotFoundError
 
 # ロガーの初期化
 logger = setup_logger(__name__)
@@ -23,30 +48,26 @@ logger = setup_logger(__name__)
 # ルーターの作成
 router = APIRouter(prefix="/puzzles", tags=["puzzles"])
 
-# サービスの初期化
-puzzle_service = PuzzleService(
-    s3_bucket_name=settings.s3_bucket_name,
-    puzzles_table_name=settings.puzzles_table_name,
-    environment=settings.environment
-)
-
 
 @router.post("", response_model=PuzzleCreateResponse, responses={
     400: {"model": ErrorResponse},
     500: {"model": ErrorResponse}
 })
-def create_puzzle(request: PuzzleCreateRequest):
+async def create_puzzle(
+    request: PuzzleCreateRequest,
+    puzzle_service: AsyncPuzzleService = Depends(get_async_puzzle_service)
+):
     """
     Create a new puzzle (without image)
 
     - **puzzleName**: Name of the puzzle project
-    - **pieceCount**: Number of puzzle pieces (100, 300, 500, 1000, 2000)
+    - **pieceCount**: Number of puzzle pieces (100-2000, adjusted slightly to fit the image aspect ratio)
     - **userId**: User ID (optional, default: anonymous)
 
     After creating the puzzle, use POST /puzzles/{puzzleId}/upload to upload an image.
     """
     try:
-        result = puzzle_service.create_puzzle(
+        result = await puzzle_service.create_puzzle(
             piece_count=request.pieceCount,
             puzzle_name=request.puzzleName,
             user_id=request.userId
@@ -73,35 +94,51 @@ def create_puzzle(request: PuzzleCreateRequest):
             raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@router.post("/{puzzle_id}/upload", response_model=UploadUrlResponse, responses={
+def _upload_error_status(error: ValueError) -> int:
+    """アップロード関連のValueErrorをステータスコードに変換（存在しない→404、制限違反→400）"""
+    return 404 if isinstance(error, (PuzzleNotFoundError, UploadNotFoundError)) else 400
+
+
+# 制限のない署名付きPUTは発行しない（/upload も署名付きPOSTを返す）
+@router.post("/{puzzle_id}/upload", response_model=UploadPostResponse, responses={
     400: {"model": ErrorResponse},
     404: {"model": ErrorResponse},
     500: {"model": ErrorResponse}
 })
-def upload_puzzle_image(puzzle_id: str, request: UploadUrlRequest):
+@router.post("/{puzzle_id}/upload-post", response_model=UploadPostResponse, responses={
+    400: {"model": ErrorResponse},
+    404: {"model": ErrorResponse},
+    500: {"model": ErrorResponse}
+})
+async def upload_puzzle_image_post(
+    puzzle_id: str,
+    request: UploadUrlRequest,
+    puzzle_service: AsyncPuzzleService = Depends(get_async_puzzle_service)
+):
     """
-    Get a pre-signed URL to upload an image for an existing puzzle
+    Get a presigned POST policy to upload an image for an existing puzzle
 
     - **puzzle_id**: Puzzle ID (path parameter)
     - **fileName**: Name of the image file (optional, default: puzzle.jpg)
     - **userId**: User ID (optional, default: anonymous)
 
-    Returns a pre-signed URL that is valid for 15 minutes.
+    Submit the file as multipart/form-data with the returned fields.
+    S3 rejects files larger than maxBytes or with a different Content-Type.
+    Larger images must use POST /puzzles/{puzzleId}/multipart.
     """
     try:
-        result = puzzle_service.generate_upload_url(
+        return await puzzle_service.generate_upload_post(
             puzzle_id=puzzle_id,
             file_name=request.fileName,
             user_id=request.userId
         )
-        return result
 
     except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=_upload_error_status(e), detail=str(e))
 
     except Exception as e:
         logger.error(
-            "Error generating upload URL",
+            "Error generating upload POST policy",
             extra={
                 "puzzle_id": puzzle_id,
                 "file_name": request.fileName,
@@ -116,37 +153,394 @@ def upload_puzzle_image(puzzle_id: str, request: UploadUrlRequest):
             raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@router.get("/{puzzle_id}")
-def get_puzzle(puzzle_id: str, user_id: str = "anonymous"):
+@router.post("/{puzzle_id}/multipart", response_model=MultipartUploadResponse, responses={
+    400: {"model": ErrorResponse},
+    404: {"model": ErrorResponse},
+    500: {"model": ErrorResponse}
+})
+async def initiate_multipart_upload(
+    puzzle_id: str,
+    request: MultipartUploadRequest,
+    puzzle_service: AsyncPuzzleService = Depends(get_async_puzzle_service)
+):
+    """
+    Start a multipart upload for a large image
+
+    - **puzzle_id**: Puzzle ID (path parameter)
+    - **fileName**: Name of the image file (optional, default: puzzle.jpg)
+    - **fileSize**: Size of the image in bytes
+    - **userId**: User ID (optional, default: anonymous)
+
+    Upload each part with PUT (in parallel if desired), keep the ETag response headers,
+    then call POST /puzzles/{puzzleId}/multipart/{uploadId}/complete.
+    """
+    try:
+        return await puzzle_service.initiate_multipart_upload(
+            puzzle_id=puzzle_id,
+            file_size=request.fileSize,
+            file_name=request.fileName,
+            user_id=request.userId
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=_upload_error_status(e), detail=str(e))
+
+    except Exception as e:
+        logger.error(
+            "Error initiating multipart upload",
+            extra={
+                "puzzle_id": puzzle_id,
+                "file_size": request.fileSize,
+                "user_id": request.userId,
+                "error": str(e)
+            }
+        )
+        # 本番環境ではエラー詳細を隠す
+        if settings.is_production:
+            raise HTTPException(status_code=500, detail="Internal server error")
+        else:
+            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/{puzzle_id}/multipart/{upload_id}/parts", response_model=MultipartPartsResponse, responses={
+    404: {"model": ErrorResponse},
+    500: {"model": ErrorResponse}
+})
+async def get_multipart_upload_parts(
+    puzzle_id: str,
+    upload_id: str,
+    request: MultipartPartsRequest,
+    puzzle_service: AsyncPuzzleService = Depends(get_async_puzzle_service)
+):
+    """
+    Resume a multipart upload
+
+    Returns the parts already stored in S3 and fresh URLs for **partNumbers**.
+    """
+    try:
+        return await puzzle_service.get_multipart_upload_parts(
+            puzzle_id=puzzle_id,
+            upload_id=upload_id,
+            part_numbers=request.partNumbers,
+            user_id=request.userId
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=_upload_error_status(e), detail=str(e))
+
+    except Exception as e:
+        logger.error(
+            "Error listing multipart upload parts",
+            extra={
+                "puzzle_id": puzzle_id,
+                "upload_id": upload_id,
+                "user_id": request.userId,
+                "error": str(e)
+            }
+        )
+        # 本番環境ではエラー詳細を隠す
+        if settings.is_production:
+            raise HTTPException(status_code=500, detail="Internal server error")
+        else:
+            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/{puzzle_id}/multipart/{upload_id}/complete", response_model=MultipartCompleteResponse, responses={
+    400: {"model": ErrorResponse},
+    404: {"model": ErrorResponse},
+    500: {"model": ErrorResponse}
+})
+async def complete_multipart_upload(
+    puzzle_id: str,
+    upload_id: str,
+    request: MultipartCompleteRequest,
+    puzzle_service: AsyncPuzzleService = Depends(get_async_puzzle_service)
+):
+    """
+    Complete a multipart upload
+
+    The upload is aborted with 400 if the total size exceeds the upload limit.
+    """
+    try:
+        return await puzzle_service.complete_multipart_upload(
+            puzzle_id=puzzle_id,
+            upload_id=upload_id,
+            parts=[part.model_dump() for part in request.parts],
+            user_id=request.userId
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=_upload_error_status(e), detail=str(e))
+
+    except Exception as e:
+        logger.error(
+            "Error completing multipart upload",
+            extra={
+                "puzzle_id": puzzle_id,
+                "upload_id": upload_id,
+                "user_id": request.userId,
+                "error": str(e)
+            }
+        )
+        # 本番環境ではエラー詳細を隠す
+        if settings.is_production:
+            raise HTTPException(status_code=500, detail="Internal server error")
+        else:
+            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.delete("/{puzzle_id}/multipart/{upload_id}", status_code=204, responses={
+    404: {"model": ErrorResponse},
+    500: {"model": ErrorResponse}
+})
+async def abort_multipart_upload(
+    puzzle_id: str,
+    upload_id: str,
+    user_id: str = "anonymous",
+    puzzle_service: AsyncPuzzleService = Depends(get_async_puzzle_service)
+):
+    """
+    Abort a multipart upload and discard the uploaded parts
+    """
+    try:
+        await puzzle_service.abort_multipart_upload(
+            puzzle_id=puzzle_id,
+            upload_id=upload_id,
+            user_id=user_id
+        )
+        return Response(status_code=204)
+
+    except ValueError as e:
+        raise HTTPException(status_code=_upload_error_status(e), detail=str(e))
+
+    except Exception as e:
+        logger.error(
+            "Error aborting multipart upload",
+            extra={
+                "puzzle_id": puzzle_id,
+                "upload_id": upload_id,
+                "user_id": user_id,
+                "error": str(e)
+            }
+        )
+        # 本番環境ではエラー詳細を隠す
+        if settings.is_production:
+            raise HTTPException(status_code=500, detail="Internal server error")
+        else:
+            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.get("/{puzzle_id}", responses={
+    304: {"description": "Not modified (If-None-Match matched the ETag)"},
+    404: {"model": ErrorResponse}
+})
+async def get_puzzle(
+    puzzle_id: str,
+    user_id: str = "anonymous",
+    if_none_match: Optional[str] = Header(None),
+    puzzle_service: AsyncPuzzleService = Depends(get_async_puzzle_service)
+):
     """
     Get puzzle information by ID
 
     - **puzzle_id**: Puzzle ID
     - **user_id**: User ID (query parameter, default: anonymous)
+
+    The response carries an ETag derived from updatedAt; send it back in
+    If-None-Match to get 304 Not Modified while the puzzle is unchanged.
     """
-    puzzle = puzzle_service.get_puzzle(user_id=user_id, puzzle_id=puzzle_id)
+    puzzle = await puzzle_service.get_puzzle(user_id=user_id, puzzle_id=puzzle_id)
 
     if not puzzle:
         raise HTTPException(status_code=404, detail="Puzzle not found")
 
-    return puzzle
+    # ポーリング時は変更がなければ本文をシリアライズせずに304を返す
+    return conditional_json(puzzle, puzzle_etag(puzzle), if_none_match)
+
+
+@router.get("/{puzzle_id}/manifest", responses={
+    200: {
+        "content": {
+            "application/json": {},
+            "application/msgpack": {},
+            "application/octet-stream": {}
+        },
+        "description": "Columnar piece layout"
+    },
+    304: {"description": "Not modified (If-None-Match matched the ETag)"},
+    400: {"model": ErrorResponse},
+    404: {"model": ErrorResponse},
+    500: {"model": ErrorResponse}
+})
+async def get_piece_manifest(
+    puzzle_id: str,
+    user_id: str = "anonymous",
+    format: Literal["json", "msgpack", "binary"] = "json",
+    if_none_match: Optional[str] = Header(None),
+    puzzle_service: AsyncPuzzleService = Depends(get_async_puzzle_service)
+):
+    """
+    Get the positions, sizes and S3 keys of every piece in one response
+
+    - **puzzle_id**: Puzzle ID
+    - **user_id**: User ID (query parameter, default: anonymous)
+    - **format**: "json" (columnar arrays), "msgpack" or "binary" (packed little-endian arrays)
+
+    S3 keys are keyPrefix + pieceId + keySuffix. Available once the image has been split.
+    """
+    puzzle = await puzzle_service.get_puzzle(user_id=user_id, puzzle_id=puzzle_id)
+    if not puzzle:
+        raise HTTPException(status_code=404, detail="Puzzle not found")
+
+    # マニフェストは分割後に変化しないため、S3を読む前にETagを判定する
+    etag = make_etag(puzzle.get('manifestKey'), puzzle.get('updatedAt'), format)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    try:
+        raw = await puzzle_service.get_piece_manifest(puzzle)
+    except Exception as e:
+        logger.error(
+            "Error reading piece manifest",
+            extra={
+                "puzzle_id": puzzle_id,
+                "user_id": user_id,
+                "error": str(e)
+            }
+        )
+        # 本番環境ではエラー詳細を隠す
+        if settings.is_production:
+            raise HTTPException(status_code=500, detail="Internal server error")
+        else:
+            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+    if raw is None:
+        raise HTTPException(status_code=404, detail="Manifest not available until the image is split")
+
+    if format == "json":
+        # S3に保存済みのJSONをそのまま返す（再エンコード不要）
+        body, media_type = raw, "application/json"
+    else:
+        try:
+            body, media_type = encode_manifest(decode_manifest_json(raw), format)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return Response(content=body, media_type=media_type, headers=cache_headers(etag))
+
+
+@router.get("/{puzzle_id}/piece-urls", responses={
+    404: {"model": ErrorResponse},
+    500: {"model": ErrorResponse}
+})
+async def get_piece_urls(
+    puzzle_id: str,
+    user_id: str = "anonymous",
+    puzzle_service: AsyncPuzzleService = Depends(get_async_puzzle_service),
+    signer: PieceUrlSigner = Depends(get_piece_url_signer)
+):
+    """
+    Sign access to every piece image of a puzzle in one request
+
+    - **puzzle_id**: Puzzle ID
+    - **user_id**: User ID (query parameter, default: anonymous)
+
+    With PIECE_URL_MODE=s3 the response has one presigned URL per piece, in manifest order.
+    With PIECE_URL_MODE=cloudfront it has a single policy for pieces/{puzzle_id}/* as
+    signed cookies and as a query string to append to baseUrl + S3 key.
+    Results are reused until shortly before expiresAt.
+    """
+    puzzle = await puzzle_service.get_puzzle(user_id=user_id, puzzle_id=puzzle_id)
+    if not puzzle:
+        raise HTTPException(status_code=404, detail="Puzzle not found")
+
+    def load_manifest() -> Optional[Dict[str, Any]]:
+        raw = puzzle_service.service.get_piece_manifest(puzzle)
+        return decode_manifest_json(raw) if raw is not None else None
+
+    try:
+        # 署名はCPU処理のため、イベントループを塞がないようスレッドプールで実行
+        # 再分割でピースが置き換わると updatedAt が変わり、古い署名のキャッシュは使われない
+        result = await run_in_threadpool(
+            signer.sign_pieces,
+            puzzle_id,
+            load_manifest,
+            str(puzzle.get('updatedAt', ''))
+        )
+    except Exception as e:
+        logger.error(
+            "Error signing piece URLs",
+            extra={
+                "puzzle_id": puzzle_id,
+                "user_id": user_id,
+                "error": str(e)
+            }
+        )
+        # 本番環境ではエラー詳細を隠す
+        if settings.is_production:
+            raise HTTPException(status_code=500, detail="Internal server error")
+        else:
+            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+    if result is None:
+        raise HTTPException(status_code=404, detail="Manifest not available until the image is split")
+
+    return FastJSONResponse(result)
 
 
 @router.delete("/{puzzle_id}", responses={
+    202: {"description": "Deletion accepted (mode=async)"},
     404: {"model": ErrorResponse},
     500: {"model": ErrorResponse}
 })
-def delete_puzzle(puzzle_id: str, user_id: str = "anonymous"):
+async def delete_puzzle(
+    puzzle_id: str,
+    response: Response,
+    user_id: str = "anonymous",
+    mode: Optional[Literal["sync", "async"]] = None,
+    puzzle_service: AsyncPuzzleService = Depends(get_async_puzzle_service),
+    deletion_queue: DeletionQueue = Depends(get_deletion_queue)
+):
     """
-    Delete a puzzle and its associated image
+    Delete a puzzle and its associated image and pieces
 
     - **puzzle_id**: Puzzle ID (path parameter)
     - **user_id**: User ID (query parameter, default: anonymous)
+    - **mode**: "sync" deletes within the request, "async" marks the puzzle
+      as deleting and removes assets in the background (default: DELETION_MODE)
 
-    Deletes both the DynamoDB record and the S3 image (if exists).
+    In async mode the response is 202 and the record disappears once the worker finishes.
     """
     try:
-        result = puzzle_service.delete_puzzle(
+        if (mode or settings.deletion_mode) == "async":
+            puzzle = await puzzle_service.mark_puzzle_deleting(
+                user_id=user_id,
+                puzzle_id=puzzle_id
+            )
+            try:
+                await run_in_threadpool(deletion_queue.enqueue, user_id, puzzle_id, puzzle.get('s3Key'))
+            except Exception as e:
+                # キューに積めなかった場合、レコードが "deleting" のまま残らないよう同期削除に切り替える
+                logger.warning(
+                    "Failed to enqueue puzzle deletion, deleting synchronously",
+                    extra={
+                        "puzzle_id": puzzle_id,
+                        "user_id": user_id,
+                        "error": str(e)
+                    }
+                )
+                return await puzzle_service.delete_puzzle(
+                    user_id=user_id,
+                    puzzle_id=puzzle_id
+                )
+            response.status_code = 202
+            return {
+                'puzzleId': puzzle_id,
+                'status': 'deleting',
+                'message': 'Puzzle deletion accepted'
+            }
+
+        result = await puzzle_service.delete_puzzle(
             user_id=user_id,
             puzzle_id=puzzle_id
         )
@@ -169,3 +563,44 @@ def delete_puzzle(puzzle_id: str, user_id: str = "anonymous"):
             raise HTTPException(status_code=500, detail="Internal server error")
         else:
             raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/bulk-delete", response_model=BulkDeleteResponse, responses={
+    400: {"model": ErrorResponse},
+    500: {"model": ErrorResponse}
+})
+async def bulk_delete_puzzles(
+    request: BulkDeleteRequest,
+    puzzle_service: AsyncPuzzleService = Depends(get_async_puzzle_service)
+):
+    """
+    Delete multiple puzzles with their images and pieces
+
+    - **puzzleIds**: Puzzle IDs to delete (1-100)
+    - **userId**: User ID (optional, default: anonymous)
+
+    Returns deleted / not found IDs and the number of S3 objects and piece items removed.
+    """
+    try:
+        return await puzzle_service.delete_puzzles(
+            user_id=request.userId,
+            puzzle_ids=request.puzzleIds
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except Exception as e:
+        logger.error(
+            "Error bulk deleting puzzles",
+            extra={
+                "user_id": request.userId,
+                "puzzle_count": len(request.puzzleIds),
+                "error": str(e)
+            }
+        )
+        # 本番環境ではエラー詳細を隠す
+        if settings.is_production:
+            raise HTTPException(status_code=500, detail="Internal server error")
+        else:
+            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -0,0 +1,102 @@
+"""
+Shared AWS client factory
+
+PuzzleService・ImageProcessorなどが使うboto3クライアントを同じ設定で生成します。
+コネクションプールサイズ、リトライモード、タイムアウト、TCP keepaliveはSettingsで調整できます。
+"""
+
+from typing import TYPE_CHECKING, Any, Optional
+
+from app.core.config import settings
+from app.core.request_metrics import instrument_client
+
+if TYPE_CHECKING:
+    from botocore.config import Config
+
+# boto3/botocore のインポートは100ms以上かかるため、Lambdaのコールドスタートを
+# 短くする目的で最初のクライアント生成時まで遅延させる
+
+
+def build_boto_config() -> "Config":
+    """
+    Settingsからbotocoreの共通Configを作成
+
+    - max_pool_connections: デフォルトの10では並列アップロード・削除が接続待ちで詰まる
+    - retries: adaptive モードでスロットリング時にクライアント側でも送信レートを調整
+    - tcp_keepalive: アイドル後の接続断による再接続コストを抑える
+    """
+    from botocore.config import Config
+
+    return Config(
+        max_pool_connections=settings.aws_max_pool_connections,
+        retries={
+            'mode': settings.aws_retry_mode,
+            'max_attempts': settings.aws_max_attempts
+        },
+        connect_timeout=settings.aws_connect_timeout,
+        read_timeout=settings.aws_read_timeout,
+        tcp_keepalive=settings.aws_tcp_keepalive
+    )
+
+
+def create_client(service_name: str, config: Optional["Config"] = None) -> Any:
+    """
+    共通設定でboto3クライアントを作成
+
+    リクエストごとのAWS呼び出しの集計（app.core.request_metrics）のフックも登録します。
+
+    Args:
+        service_name: AWS service name (e.g. 's3', 'sqs')
+        config: Config to merge over the shared defaults
+
+    Returns:
+        boto3 client
+    """
+    import boto3
+
+    return instrument_client(boto3.client(
+        service_name,
+        region_name=settings.aws_region,
+        config=_merge(config)
+    ))
+
+
+def create_resource(service_name: str, config: Optional["Config"] = None) -> Any:
+    """
+    共通設定でboto3リソースを作成
+
+    Args:
+        service_name: AWS service name (e.g. 'dynamodb')
+        config: Config to merge over the shared defaults
+
+    Returns:
+        boto3 service resource
+    """
+    import boto3
+
+    resource = boto3.resource(
+        service_name,
+        region_name=settings.aws_region,
+        config=_merge(config)
+    )
+    instrument_client(resource.meta.client)
+    return resource
+
+
+def get_frozen_credentials() -> Any:
+    """
+    boto3クライアントと同じ認証情報チェーンで解決した認証情報を返す
+
+    Returns:
+        botocore ReadOnlyCredentials (access_key, secret_key, token), or None if not configured
+    """
+    import boto3
+
+    credentials = boto3.Session().get_credentials()
+    return credentials.get_frozen_credentials() if credentials is not None else None
+
+
+def _merge(config: Optional["Config"]) -> "Config":
+    """共通Configに個別の上書き設定をマージ"""
+    base = build_boto_config()
+    return base.merge(config) if config is not None else base
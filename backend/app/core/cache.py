@@ -0,0 +1,248 @@
+"""
+Cache backends for read-through caching
+
+get_puzzle の結果などをキャッシュするためのバックエンドを提供します。
+- TTLCache: プロセス内のTTL + LRUキャッシュ（デフォルト）
+- RedisCache: 複数ワーカー間で共有するためのRedisバックエンド
+ヒット率は stats() で確認できます。
+キャッシュは最適化にすぎないため、Redisの障害は読み込みミス・書き込みスキップとして扱います。
+"""
+
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from app.core.config import Settings
+from app.core.logger import setup_logger
+from app.core.serialization import dumps_str
+
+# ロガーの初期化
+logger = setup_logger(__name__)
+
+
+def puzzle_cache_key(user_id: str, puzzle_id: str) -> str:
+    """パズルレコードのキャッシュキー（APIとワーカーで共通）"""
+    return f"puzzle:{user_id}:{puzzle_id}"
+
+
+class CacheBackend(ABC):
+    """
+    キャッシュバックエンドの共通インターフェース
+
+    ヒット・ミス・無効化・バックエンドエラーの回数はここで集計し、各実装は _get/_set/_delete のみ実装します。
+    """
+
+    def __init__(self) -> None:
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._errors = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """キャッシュから値を取得（存在しない・期限切れの場合はNone）"""
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """値をキャッシュに保存"""
+        self._set(key, value)
+
+    def delete(self, key: str) -> None:
+        """キャッシュから値を削除（書き込み時の無効化）"""
+        self._delete(key)
+        with self._stats_lock:
+            self._invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """ヒット率などの統計情報を返す"""
+        with self._stats_lock:
+            lookups = self._hits + self._misses
+            return {
+                "backend": type(self).__name__,
+                "hits": self._hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+                "errors": self._errors,
+                "hitRate": round(self._hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _record_error(self) -> None:
+        """バックエンドのエラー（接続断・タイムアウトなど）を集計"""
+        with self._stats_lock:
+            self._errors += 1
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _set(self, key: str, value: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class TTLCache(CacheBackend):
+    """プロセス内のTTL + LRUキャッシュ（スレッドセーフ）"""
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """
+        Args:
+            ttl_seconds: Seconds before an entry expires
+            max_entries: Maximum number of entries (least recently used are evicted)
+            clock: Monotonic clock (injectable for tests)
+        """
+        super().__init__()
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            # 呼び出し側での変更がキャッシュに波及しないようコピーを返す
+            return dict(value)
+
+    def _set(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, dict(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class RedisCache(CacheBackend):
+    """
+    Redisを使った共有キャッシュ
+
+    redis-py互換のクライアント（get / set(ex=) / delete）を受け取ります。
+    DynamoDBの数値はDecimalのため、JSON化の際に数値として保存し、読み込み時にDecimalへ戻します。
+    error_types に該当する例外はログに残して握りつぶし、取得はミス、保存・削除は何もしなかった扱いにします。
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        ttl_seconds: float,
+        prefix: str = "jigsaw:",
+        error_types: Tuple[Type[BaseException], ...] = ()
+    ) -> None:
+        """
+        Args:
+            client: redis.Redis compatible client
+            ttl_seconds: Seconds before an entry expires
+            prefix: Key prefix to namespace entries
+            error_types: Client exceptions treated as a cache outage (e.g. redis.exceptions.RedisError)
+        """
+        super().__init__()
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.error_types = error_types
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = self.client.get(self.prefix + key)
+        except self.error_types as e:
+            self._handle_error("get", key, e)
+            return None
+        if raw is None:
+            return None
+        return json.loads(raw, parse_float=Decimal, parse_int=Decimal)
+
+    def _set(self, key: str, value: Dict[str, Any]) -> None:
+        serialized = dumps_str(value)
+        try:
+            self.client.set(
+                self.prefix + key,
+                serialized,
+                ex=max(1, int(self.ttl_seconds))
+            )
+        except self.error_types as e:
+            self._handle_error("set", key, e)
+
+    def _delete(self, key: str) -> None:
+        try:
+            self.client.delete(self.prefix + key)
+        except self.error_types as e:
+            # 無効化に失敗した値はTTLで消える
+            self._handle_error("delete", key, e)
+
+    def _handle_error(self, operation: str, key: str, error: BaseException) -> None:
+        self._record_error()
+        logger.warning(
+            "Redis cache operation failed",
+            extra={
+                "operation": operation,
+                "cache_key": key,
+                "error": str(error)
+            }
+        )
+
+
+def create_puzzle_cache(settings: Settings) -> Optional[CacheBackend]:
+    """
+    Settingsに従ってキャッシュバックエンドを生成
+
+    PUZZLE_CACHE_BACKEND:
+        memory: プロセス内キャッシュ（デフォルト）
+        redis:  REDIS_URL のRedisを共有キャッシュとして使用（redisパッケージが必要）
+        none:   キャッシュ無効
+    """
+    backend = settings.puzzle_cache_backend
+
+    if backend == 'none':
+        return None
+
+    if backend == 'redis':
+        import redis  # オプション依存のため使用時のみインポート
+
+        return RedisCache(
+            redis.Redis.from_url(settings.redis_url),
+            ttl_seconds=settings.puzzle_cache_ttl_seconds,
+            error_types=(redis.exceptions.RedisError,)
+        )
+
+    if backend == 'memory':
+        return TTLCache(
+            ttl_seconds=settings.puzzle_cache_ttl_seconds,
+            max_entries=settings.puzzle_cache_max_entries
+        )
+
+    raise ValueError(f"Unsupported PUZZLE_CACHE_BACKEND: {backend}")
@@ -7,17 +7,19 @@ Configuration management for the application
 import os
 from pathlib import Path
 from typing import List
-from dotenv import load_dotenv
 
 # .env/.env.localファイルを自動読み込み（ローカル開発用）
-# Lambda環境ではこれらのファイルが存在しないため自動的にスキップされる
-base_dir = Path(__file__).parent.parent.parent
-for dotenv_name in (".env.local", ".env"):
-    env_path = base_dir / dotenv_name
-    if env_path.exists():
-        load_dotenv(dotenv_path=env_path, override=True)
-        # ログ設定前なので、ここだけはprintを使用
-        print(f"✅ Loaded environment variables from {env_path}")
+# Lambda環境ではこれらのファイルが存在しないため、ファイルシステムの探索自体を省略する
+if not os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+    from dotenv import load_dotenv
+
+    base_dir = Path(__file__).parent.parent.parent
+    for dotenv_name in (".env.local", ".env"):
+        env_path = base_dir / dotenv_name
+        if env_path.exists():
+            load_dotenv(dotenv_path=env_path, override=True)
+            # ログ設定前なので、ここだけはprintを使用
+            print(f"✅ Loaded environment variables from {env_path}")
 
 
 class Settings:
@@ -37,12 +39,81 @@ class Settings:
 
         # Environment
         self.environment: str = os.environ.get('ENVIRONMENT', 'dev')
+        # Lambdaランタイムが設定する環境変数で判定（ローカル・uvicornではFalse）
+        self.running_on_lambda: bool = bool(os.environ.get('AWS_LAMBDA_FUNCTION_NAME'))
 
         # CORS Configuration
         # デフォルト: Vite開発サーバー(5173)と旧ポート(3000)の両方を許可
         allowed_origins_str = os.environ.get('ALLOWED_ORIGINS', 'http://localhost:3000,http://localhost:5173,http://192.168.100.12:5173')
         self.allowed_origins: List[str] = [origin.strip() for origin in allowed_origins_str.split(',')]
 
+        # Async I/O Configuration
+        # async ルートがboto3呼び出しを委譲する専用スレッドプールのサイズ
+        self.aws_executor_max_workers: int = int(os.environ.get('AWS_EXECUTOR_MAX_WORKERS', '64'))
+        # boto3クライアントのコネクションプールサイズ（デフォルトの10では並列呼び出しが詰まる）
+        self.aws_max_pool_connections: int = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '50'))
+        # リトライ設定（legacy / standard / adaptive）
+        self.aws_retry_mode: str = os.environ.get('AWS_RETRY_MODE', 'adaptive')
+        self.aws_max_attempts: int = int(os.environ.get('AWS_MAX_ATTEMPTS', '5'))
+        # タイムアウト（秒）とTCP keepalive
+        self.aws_connect_timeout: float = float(os.environ.get('AWS_CONNECT_TIMEOUT', '3'))
+        self.aws_read_timeout: float = float(os.environ.get('AWS_READ_TIMEOUT', '10'))
+        self.aws_tcp_keepalive: bool = os.environ.get('AWS_TCP_KEEPALIVE', 'true').lower() == 'true'
+
+        # Cache Configuration
+        # get_puzzle の読み取りキャッシュ（memory / redis / none）
+        self.puzzle_cache_backend: str = os.environ.get('PUZZLE_CACHE_BACKEND', 'memory')
+        self.puzzle_cache_ttl_seconds: float = float(os.environ.get('PUZZLE_CACHE_TTL_SECONDS', '5'))
+        self.puzzle_cache_max_entries: int = int(os.environ.get('PUZZLE_CACHE_MAX_ENTRIES', '1024'))
+        self.redis_url: str = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+
+        # Deletion Configuration
+        # sync: リクエスト内で削除 / async: "deleting" にしてバックグラウンドで削除
+        self.deletion_mode: str = os.environ.get('DELETION_MODE', 'sync')
+        # thread: プロセス内ワーカー（ローカル・uvicorn専用） / sqs: DELETION_QUEUE_URL のSQSへ送信
+        # Lambdaは応答後に実行環境を凍結し、デーモンスレッドも止まるため、Lambda上ではsqsが既定
+        self.deletion_queue_backend: str = os.environ.get(
+            'DELETION_QUEUE_BACKEND', 'sqs' if self.running_on_lambda else 'thread'
+        )
+        self.deletion_queue_url: str = os.environ.get('DELETION_QUEUE_URL', '')
+        self.deletion_max_attempts: int = int(os.environ.get('DELETION_MAX_ATTEMPTS', '3'))
+
+        # Image Validation
+        # 分割する画像の最大ピクセル数（デコンプレッションボム対策。ワーカーのメモリに合わせて調整）
+        self.image_max_pixels: int = int(os.environ.get('IMAGE_MAX_PIXELS', '80000000'))
+
+        # Piece URL Configuration
+        # s3: S3の署名付きURLを一括生成 / cloudfront: プレフィックス単位の署名ポリシー（Cookie・クエリ文字列）
+        self.piece_url_mode: str = os.environ.get('PIECE_URL_MODE', 's3')
+        self.piece_url_expires_in: int = int(os.environ.get('PIECE_URL_EXPIRES_IN', '3600'))
+        # 署名結果をキャッシュするパズル数（s3モードでは1件あたり最大約3MB）
+        self.piece_url_cache_max_entries: int = int(os.environ.get('PIECE_URL_CACHE_MAX_ENTRIES', '16'))
+        self.cloudfront_domain: str = os.environ.get('CLOUDFRONT_DOMAIN', '')
+        self.cloudfront_key_pair_id: str = os.environ.get('CLOUDFRONT_KEY_PAIR_ID', '')
+        # PEM形式のRSA秘密鍵（環境変数では改行を \n と書いてもよい）
+        self.cloudfront_private_key: str = os.environ.get('CLOUDFRONT_PRIVATE_KEY', '').replace('\\n', '\n')
+
+        # Metrics
+        # APIのリクエストごとのレイテンシ・AWS呼び出しの内訳をログ出力するか
+        self.request_metrics_enabled: bool = os.environ.get('REQUEST_METRICS', 'true').lower() == 'true'
+        # ワーカーが分割ジョブごとに出力するEMFメトリクスの名前空間（空文字で出力しない）
+        self.metrics_namespace: str = os.environ.get('METRICS_NAMESPACE', 'JigsawPuzzle')
+
+        # Profiling
+        # サンプリングプロファイラ（調査用、既定ではすべて無効）
+        # PROFILING=true: 常に / PROFILING_SAMPLE_RATE: この割合で / PROFILING_TOKEN: X-Profile ヘッダーが一致したとき
+        self.profiling_always: bool = os.environ.get('PROFILING', 'false').lower() == 'true'
+        self.profiling_sample_rate: float = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+        self.profiling_token: str = os.environ.get('PROFILING_TOKEN', '')
+        self.profiling_interval_ms: float = float(os.environ.get('PROFILING_INTERVAL_MS', '10'))
+
+        # Response Compression
+        # gzip / brotli（brotli-asgiが必要、非対応クライアントにはgzip）/ none
+        self.response_compression: str = os.environ.get('RESPONSE_COMPRESSION', 'gzip')
+        # これより小さいレスポンスは圧縮しない（圧縮のCPUコストに見合わないため）
+        self.response_compression_min_size: int = int(os.environ.get('RESPONSE_COMPRESSION_MIN_SIZE', '1024'))
+        self.response_compression_level: int = int(os.environ.get('RESPONSE_COMPRESSION_LEVEL', '6'))
+
     @property
     def is_production(self) -> bool:
         """Check if running in production environment"""
@@ -0,0 +1,71 @@
+"""
+Puzzle grid solver
+
+ピース数と画像のアスペクト比から、パズルのグリッド（rows x cols）を決めます。
+
+ピースが正方形に近いこと（ピースの縦横比の歪み）と、ピース数が指定値に近いこと（ピース数の誤差）の
+重み付き和が最小になる組み合わせを、理想の行数 sqrt(N / aspect) の周辺だけで探索します。
+同じピース数・同じ縦横比の写真は何度も分割されるため、結果は (ピース数, 量子化した縦横比) ごとにキャッシュします。
+"""
+
+import math
+from functools import lru_cache
+from typing import Tuple
+
+MIN_PIECE_COUNT = 100
+MAX_PIECE_COUNT = 2000
+
+# ピース数の誤差1%を、ピースの縦横比の歪み約10%（log比 0.1）と同等に扱う
+COUNT_ERROR_WEIGHT = 10.0
+# 縦横比の量子化の刻み（log比で1%）
+ASPECT_QUANTUM = 0.01
+
+
+def solve_grid(piece_count: int, image_width: int, image_height: int) -> Tuple[int, int]:
+    """
+    Choose (rows, cols) for a piece count and image size
+
+    Args:
+        piece_count: Requested number of pieces
+        image_width: Image width in pixels (after EXIF orientation)
+        image_height: Image height in pixels (after EXIF orientation)
+
+    Returns:
+        Tuple of (rows, cols)
+
+    Raises:
+        ValueError: If the piece count is out of range or the size is not positive
+    """
+    if not MIN_PIECE_COUNT <= piece_count <= MAX_PIECE_COUNT:
+        raise ValueError(
+            f"Unsupported piece count: {piece_count} "
+            f"(must be between {MIN_PIECE_COUNT} and {MAX_PIECE_COUNT})"
+        )
+    if image_width <= 0 or image_height <= 0:
+        raise ValueError(f"Invalid image size: {image_width}x{image_height}")
+
+    log_aspect = round(math.log(image_width / image_height) / ASPECT_QUANTUM)
+    return _solve(piece_count, log_aspect)
+
+
+@lru_cache(maxsize=4096)
+def _solve(piece_count: int, log_aspect: int) -> Tuple[int, int]:
+    """量子化した縦横比（log比 / ASPECT_QUANTUM）ごとの探索結果"""
+    aspect = math.exp(log_aspect * ASPECT_QUANTUM)
+    ideal_rows = math.sqrt(piece_count / aspect)
+
+    best: Tuple[float, int, int, int] = (math.inf, 0, 0, 0)
+    # 理想の行数の 1/2〜2倍 の範囲だけを探索（最大でも約 2 * sqrt(N * 縦長の比) 回）
+    for rows in range(max(1, math.floor(ideal_rows / 2)), math.ceil(ideal_rows * 2) + 1):
+        for cols in {max(1, piece_count // rows), -(-piece_count // rows)}:
+            # ピースの縦横比は (W / cols) / (H / rows) = aspect * rows / cols（1が正方形）
+            distortion = abs(math.log(aspect * rows / cols))
+            count_error = abs(rows * cols - piece_count)
+            cost = distortion + COUNT_ERROR_WEIGHT * count_error / piece_count
+            # 同点の場合は誤差の小さいもの、次に行数の少ないもの
+            candidate = (cost, count_error, rows, cols)
+            if candidate < best:
+                best = candidate
+
+    return best[2], best[3]
+
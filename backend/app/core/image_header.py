@@ -0,0 +1,232 @@
+"""
+Image header inspection
+
+アップロードされた画像の先頭（ヘッダー）だけを読み、形式と縦横サイズを取得します。
+画像全体をダウンロード・デコードする前に、未対応の形式や
+デコンプレッションボム（ファイルは小さいが展開すると巨大になる画像）を数KBの読み込みで拒否できます。
+
+- PNG:  先頭のIHDRチャンク（33バイト）
+- JPEG: SOFマーカーまでセグメントを順にたどる。EXIF/ICCなどの大きなセグメントは読まずに次の位置へ進む
+        （EXIFはOrientationタグを含む先頭部分だけを読む）
+
+読み込みは read(start, end) 関数（S3のRange GETなど）を通して必要な範囲だけ行います。
+Pillowには依存しないため、APIパッケージからも利用できます。
+"""
+
+import struct
+from typing import Callable, NamedTuple, Tuple
+
+# 1回のRange GETで読むバイト数（通常のJPEGはEXIF込みでもこの範囲にSOFがある）
+HEADER_CHUNK_BYTES = 16 * 1024
+# ヘッダー探索で読む最大バイト数（これを超えてもSOFが見つからなければ不正な画像とみなす）
+MAX_HEADER_BYTES = 1024 * 1024
+# 分割処理で扱う最大ピクセル数の既定値（IMAGE_MAX_PIXELS で変更可能）
+# 48〜50MPのスマートフォン写真を受け付けつつ、1ピクセル最大4バイト（RGBA/CMYK）で展開しても
+# 約320MBに収まる値。Pillowの既定の上限（約89MP、超えると警告）よりも小さい
+MAX_IMAGE_PIXELS = 80_000_000
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# SOFマーカー（DHT=C4, JPG=C8, DAC=CC を除く C0〜CF）
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# 長さを持たない単独マーカー（TEM, RST0〜7）
+_JPEG_STANDALONE_MARKERS = frozenset([0x01, *range(0xD0, 0xD8)])
+_JPEG_APP1 = 0xE1
+# EXIFセグメントのうちOrientationを探す範囲（IFD0はセグメントの先頭にあり、通常200バイト程度）
+_EXIF_READ_BYTES = 1024
+_EXIF_ORIENTATION_TAG = 0x0112
+
+
+class InvalidImageError(ValueError):
+    """画像として受け付けられないファイル（未対応の形式・壊れたヘッダー・大きすぎる画像）"""
+
+
+class ImageHeader(NamedTuple):
+    """ヘッダーから取得した画像情報"""
+    format: str
+    width: int
+    height: int
+    # EXIFのOrientation（1〜8、1は回転なし）
+    orientation: int = 1
+
+    @property
+    def pixels(self) -> int:
+        return self.width * self.height
+
+    @property
+    def display_size(self) -> Tuple[int, int]:
+        """Orientationを適用した表示上の (width, height)（5〜8は縦横が入れ替わる）"""
+        if self.orientation in (5, 6, 7, 8):
+            return self.height, self.width
+        return self.width, self.height
+
+
+class _RangeBuffer:
+    """read(start, end) で取得した範囲を保持し、同じ範囲の再取得を避けるバッファ"""
+
+    def __init__(self, read: Callable[[int, int], bytes], chunk_size: int, max_bytes: int) -> None:
+        self._read = read
+        self._chunk_size = chunk_size
+        self._max_bytes = max_bytes
+        self._start = 0
+        self._data = b''
+
+    def get(self, offset: int, length: int) -> bytes:
+        """offset から length バイトを返す（ファイル末尾を超える場合は短くなる）"""
+        end = offset + length
+        if not (self._start <= offset and end <= self._start + len(self._data)):
+            if offset + length > self._max_bytes:
+                raise InvalidImageError("Image header not found within the inspected range")
+            size = max(length, self._chunk_size)
+            self._data = self._read(offset, offset + size - 1)
+            self._start = offset
+        return self._data[offset - self._start:end - self._start]
+
+
+def _parse_png(buffer: _RangeBuffer) -> ImageHeader:
+    data = buffer.get(0, 24)
+    if len(data) < 24 or data[12:16] != b'IHDR':
+        raise InvalidImageError("Corrupt PNG header")
+    width, height = struct.unpack('>II', data[16:24])
+    return ImageHeader('PNG', width, height)
+
+
+def parse_exif_orientation(exif: bytes) -> int:
+    """
+    EXIFセグメント（"Exif\\0\\0" から始まるAPP1の中身）からOrientationを取得
+
+    見つからない・範囲外・壊れている場合は 1（回転なし）を返します。
+    """
+    if not exif.startswith(b'Exif\x00\x00') or len(exif) < 14:
+        return 1
+
+    tiff = exif[6:]
+    if tiff[:2] == b'II':
+        endian = '<'
+    elif tiff[:2] == b'MM':
+        endian = '>'
+    else:
+        return 1
+
+    (ifd_offset,) = struct.unpack_from(endian + 'I', tiff, 4)
+    if ifd_offset + 2 > len(tiff):
+        return 1
+    (count,) = struct.unpack_from(endian + 'H', tiff, ifd_offset)
+    for index in range(count):
+        entry = ifd_offset + 2 + index * 12
+        if entry + 12 > len(tiff):
+            break
+        tag, _, _, value = struct.unpack_from(endian + 'HHIH', tiff, entry)
+        if tag == _EXIF_ORIENTATION_TAG:
+            return value if 1 <= value <= 8 else 1
+    return 1
+
+
+def _parse_jpeg(buffer: _RangeBuffer) -> ImageHeader:
+    offset = 2  # SOI の直後
+    orientation = 1
+    exif_checked = False
+    while True:
+        marker = buffer.get(offset, 4)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            raise InvalidImageError("Corrupt JPEG header")
+
+        code = marker[1]
+        if code == 0xFF:
+            # フィルバイト
+            offset += 1
+            continue
+        if code in _JPEG_STANDALONE_MARKERS:
+            offset += 2
+            continue
+        if code in (0xD9, 0xDA):
+            # EOI / SOS（画像データ）に到達してもSOFがない
+            raise InvalidImageError("JPEG frame header not found")
+        if len(marker) < 4:
+            raise InvalidImageError("Corrupt JPEG header")
+
+        (segment_length,) = struct.unpack('>H', marker[2:4])
+        if segment_length < 2:
+            raise InvalidImageError("Corrupt JPEG header")
+
+        if code in _JPEG_SOF_MARKERS:
+            # 長さ(2) 精度(1) 高さ(2) 幅(2)
+            frame = buffer.get(offset + 4, 5)
+            if len(frame) < 5:
+                raise InvalidImageError("Corrupt JPEG header")
+            height, width = struct.unpack('>HH', frame[1:5])
+            return ImageHeader('JPEG', width, height, orientation)
+
+        if code == _JPEG_APP1 and not exif_checked:
+            # EXIFは最初のAPP1。Orientationを含む先頭部分だけを読む（サムネイルなどの残りは読み飛ばす）
+            exif = buffer.get(offset + 4, min(segment_length - 2, _EXIF_READ_BYTES))
+            orientation = parse_exif_orientation(exif)
+            exif_checked = True
+
+        # EXIF・ICCプロファイルなどのセグメントは中身を読まずに読み飛ばす
+        offset += 2 + segment_length
+
+
+def read_image_header(
+    read: Callable[[int, int], bytes],
+    chunk_size: int = HEADER_CHUNK_BYTES,
+    max_bytes: int = MAX_HEADER_BYTES
+) -> ImageHeader:
+    """
+    Read the format and dimensions from the start of an image
+
+    Args:
+        read: Returns bytes start..end (inclusive, like an HTTP Range header)
+        chunk_size: Bytes fetched per read
+        max_bytes: Give up when the header is not found within this many bytes
+
+    Returns:
+        ImageHeader with format ("JPEG" or "PNG"), width and height
+
+    Raises:
+        InvalidImageError: If the format is unsupported or the header is corrupt
+    """
+    buffer = _RangeBuffer(read, chunk_size, max_bytes)
+    signature = buffer.get(0, len(_PNG_SIGNATURE))
+
+    if signature.startswith(_PNG_SIGNATURE):
+        return _parse_png(buffer)
+    if signature.startswith(b'\xff\xd8'):
+        return _parse_jpeg(buffer)
+    raise InvalidImageError("Unsupported image format (JPEG or PNG required)")
+
+
+def validate_image_header(
+    header: ImageHeader,
+    max_pixels: int = MAX_IMAGE_PIXELS,
+    min_side: int = 1
+) -> None:
+    """
+    Reject images that cannot be split safely
+
+    Args:
+        header: Result of read_image_header
+        max_pixels: Largest allowed width x height (decompression bomb guard)
+        min_side: Smallest allowed width/height
+
+    Raises:
+        InvalidImageError: If the image is too small or too large
+    """
+    if header.width < min_side or header.height < min_side:
+        raise InvalidImageError(
+            f"Image too small: {header.width}x{header.height} (minimum side is {min_side}px)"
+        )
+    if header.pixels > max_pixels:
+        raise InvalidImageError(
+            f"Image too large: {header.width}x{header.height} exceeds {max_pixels} pixels"
+        )
+
+
+def inspect_image(
+    read: Callable[[int, int], bytes],
+    max_pixels: int = MAX_IMAGE_PIXELS,
+    min_side: int = 1
+) -> ImageHeader:
+    """read_image_header と validate_image_header をまとめて実行"""
+    header = read_image_header(read)
+    validate_image_header(header, max_pixels, min_side)
+    return header
@@ -2,13 +2,38 @@
 Structured logging configuration
 
 CloudWatch Logsで検索しやすいJSON形式のログを出力します。
+extra= で渡したフィールドはすべてトップレベルの項目として出力され、
+LOG_SAMPLING で指定したロガーのDEBUGログは一定の割合に間引かれます。
+
+ログの出力はリクエスト・分割処理のスレッドを止めないよう非同期に行います。
+各ロガーは共有のキューにレコードを積むだけ（QueueHandler）で、整形と書き込みは
+専用スレッド（QueueListener）がまとめて行い、溜まった行を1回の write/flush で出力します。
+LOG_ASYNC=false の場合は従来どおり呼び出し元のスレッドで同期的に出力します。
+
+Lambdaは応答を返すと実行環境が凍結されるため、ハンドラーの最後に flush_logs() を呼んで
+キューに残ったログを書き出してください。
 """
 
-import json
+import atexit
 import logging
 import os
-from datetime import datetime
-from typing import Any, Dict, Optional
+import queue
+import random
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+from app.core.serialization import dumps_str
+
+# 1回の write/flush でまとめて出力する最大行数
+DEFAULT_BATCH_SIZE = 256
+
+# LogRecord が標準で持つ属性（これ以外は extra= で渡されたフィールドとして出力する）
+RESERVED_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord('', logging.NOTSET, '', 0, '', (), None))
+) | {'message', 'asctime', 'taskName'}
 
 
 class JSONFormatter(logging.Formatter):
@@ -20,35 +45,238 @@ class JSONFormatter(logging.Formatter):
     - filter level = "ERROR"
     """
 
+    def __init__(self, environment: Optional[str] = None) -> None:
+        super().__init__()
+        self.environment = environment if environment is not None else os.environ.get("ENVIRONMENT", "dev")
+        # レコードごとに変わらない項目（ロガー名・環境）はロガー名ごとに1度だけ組み立てる
+        self._static: Dict[str, Dict[str, Any]] = {}
+        # タイムスタンプの秒までの部分（同じ秒のレコードでは再利用）
+        # LOG_ASYNC=false では複数スレッドから format が呼ばれるため、(秒, 文字列) を1つのタプルとして読み書きする
+        self._timestamp_cache: Tuple[int, str] = (-1, "")
+
     def format(self, record: logging.LogRecord) -> str:
         """ログレコードをJSON形式に変換"""
 
         log_data: Dict[str, Any] = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": self._timestamp(record.created),
             "level": record.levelname,
-            "logger": record.name,
+            **self._static_fields(record.name),
             "message": record.getMessage(),
         }
 
-        # 追加のコンテキスト情報を含める
-        if hasattr(record, "puzzle_id"):
-            log_data["puzzle_id"] = record.puzzle_id
-
-        if hasattr(record, "user_id"):
-            log_data["user_id"] = record.user_id
-
-        if hasattr(record, "request_id"):
-            log_data["request_id"] = record.request_id
-
         # エラーの場合はスタックトレースを追加
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
 
-        # 追加の任意フィールド（extra= で渡された値）
-        if hasattr(record, "extra_data"):
-            log_data["extra"] = record.extra_data
+        # extra= で渡されたフィールド（puzzle_id, rows, s3_key など）をすべてトップレベルに含める
+        # 標準の項目と同じ名前のものは上書きしない
+        for key, value in record.__dict__.items():
+            if key in RESERVED_RECORD_ATTRS or key in log_data:
+                continue
+            if key == "extra_data":
+                # まとめて渡す任意の値は "extra" の下に出力
+                log_data["extra"] = value
+            else:
+                log_data[key] = value
+
+        # APIレスポンスと同じ高速エンコーダー（Decimalも数値として出力、その他は文字列化）
+        return dumps_str(log_data, fallback=str)
+
+    def _static_fields(self, name: str) -> Dict[str, Any]:
+        fields = self._static.get(name)
+        if fields is None:
+            fields = {"logger": name, "environment": self.environment}
+            self._static[name] = fields
+        return fields
+
+    def _timestamp(self, created: float) -> str:
+        """レコードの作成時刻（UTC、ISO 8601・マイクロ秒）"""
+        second = int(created)
+        cached_second, prefix = self._timestamp_cache
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._timestamp_cache = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1_000_000):06d}Z"
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Logger filter that keeps only a fraction of low-level records
+
+    Records at or below `level` pass with probability `rate`; higher levels always pass.
+    Kept records carry a `sample_rate` field so counts can be scaled back up in queries.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        level: int = logging.DEBUG,
+        rng: Callable[[], float] = random.random
+    ) -> None:
+        super().__init__()
+        self.rate = rate
+        self.level = level
+        self._rng = rng
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.level:
+            return True
+        if self._rng() >= self.rate:
+            return False
+        record.sample_rate = self.rate
+        return True
+
+
+def parse_log_sampling(value: str) -> Dict[str, float]:
+    """
+    LOG_SAMPLING の値を {ロガー名: 割合} に変換
+
+    例: "app.services.image_processor=0.01,app.api=0.1"（不正な項目は無視）
+    """
+    rates: Dict[str, float] = {}
+    for item in value.split(","):
+        name, sep, rate = item.strip().partition("=")
+        if not sep or not name.strip():
+            continue
+        try:
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+def _sampling_rate(name: str, rates: Dict[str, float]) -> Optional[float]:
+    """ロガー名に最も長く一致する設定の割合（"app.services" は "app.services.*" にも適用）"""
+    while name:
+        if name in rates:
+            return rates[name]
+        name = name.rpartition(".")[0]
+    return None
+
+
+class BatchingStreamHandler(logging.StreamHandler):
+    """
+    Stream handler that buffers formatted lines and writes them in batches
+
+    QueueListener のスレッドから呼ばれる前提で、キューが空になったとき
+    （またはバッファが batch_size 行に達したとき）に溜まった行を1回の write/flush で出力します。
+    """
+
+    def __init__(
+        self,
+        record_queue: "queue.Queue[logging.LogRecord]",
+        stream: Optional[TextIO] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> None:
+        super().__init__(stream)
+        self.record_queue = record_queue
+        self.batch_size = batch_size
+        self._buffer: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._buffer.append(self.format(record))
+            if len(self._buffer) >= self.batch_size or self.record_queue.empty():
+                self.flush()
+        except Exception:
+            # 書き込みの失敗でリスナーのスレッドが止まらないようにする
+            self.handleError(record)
 
-        return json.dumps(log_data, ensure_ascii=False)
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if self._buffer:
+                lines, self._buffer = self._buffer, []
+                self.stream.write(self.terminator.join(lines) + self.terminator)
+            if self.stream and hasattr(self.stream, "flush"):
+                self.stream.flush()
+        finally:
+            self.release()
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """JSONエンコードと例外の整形を QueueListener のスレッドに任せる QueueHandler"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # args（dict・listなど）がログ呼び出し後に変更されても呼び出し時点の値が出力されるよう、
+        # 安価な getMessage() だけはここで済ませる
+        # 標準の prepare はJSONエンコードや例外の整形まで呼び出し元のスレッドで行ってしまうため使わない
+        # （同一プロセス内のキューなので pickle できる必要はない）
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class _AsyncLogging:
+    """プロセスで共有するキュー・QueueHandler・QueueListener"""
+
+    def __init__(self, formatter: logging.Formatter, stream: Optional[TextIO] = None) -> None:
+        self.queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+        self.handler = _DeferredQueueHandler(self.queue)
+        self.output = BatchingStreamHandler(self.queue, stream)
+        self.output.setFormatter(formatter)
+        self.listener = QueueListener(self.queue, self.output)
+        self.listener.start()
+        self.running = True
+
+    def flush(self) -> None:
+        # QueueListener は1件処理するごとに task_done を呼び、キューが空になった時点で
+        # 出力側も書き出すので、join で書き出し完了まで待てる
+        if self.running:
+            self.queue.join()
+
+    def stop(self) -> None:
+        # 残りを書き出してからスレッドを止める
+        if self.running:
+            self.running = False
+            self.listener.stop()
+            try:
+                self.output.flush()
+            except (OSError, ValueError):
+                # 終了時に出力先が既に閉じられている場合（logging.shutdown と同じ扱い）
+                pass
+
+
+_async_logging: Optional[_AsyncLogging] = None
+_async_logging_lock = threading.Lock()
+
+
+def _create_formatter() -> logging.Formatter:
+    # 環境に応じてフォーマッターを選択
+    environment = os.environ.get("ENVIRONMENT", "dev")
+
+    if environment == "prod":
+        # 本番環境: JSON形式
+        return JSONFormatter(environment)
+
+    # 開発環境: 人間が読みやすい形式
+    # ただし、構造化情報も含める
+    return logging.Formatter(
+        "%(asctime)s [%(levelname)s] %(name)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S"
+    )
+
+
+def _shared_queue_handler() -> logging.Handler:
+    """全ロガーで共有するQueueHandler（最初の呼び出しでリスナーのスレッドを起動）"""
+    global _async_logging
+    with _async_logging_lock:
+        if _async_logging is None:
+            _async_logging = _AsyncLogging(_create_formatter(), sys.stderr)
+            atexit.register(_async_logging.stop)
+        return _async_logging.handler
+
+
+def flush_logs() -> None:
+    """
+    Block until every queued log record has been written
+
+    Lambda handlers call this before returning, because the execution environment
+    is frozen right after the response and the listener thread would stop with it.
+    Does nothing when asynchronous logging is disabled.
+    """
+    if _async_logging is not None:
+        _async_logging.flush()
 
 
 def setup_logger(name: Optional[str] = None) -> logging.Logger:
@@ -64,6 +292,8 @@ def setup_logger(name: Optional[str] = None) -> logging.Logger:
     環境変数:
         LOG_LEVEL: ログレベル（DEBUG, INFO, WARNING, ERROR）デフォルト: INFO
         ENVIRONMENT: 環境名（dev: 詳細ログ, prod: 簡潔ログ）
+        LOG_ASYNC: false にするとキューを使わず同期的に出力 デフォルト: true
+        LOG_SAMPLING: ロガーごとのDEBUGログの間引き率（例: app.services.image_processor=0.01）
     """
     logger = logging.getLogger(name or __name__)
 
@@ -75,26 +305,22 @@ def setup_logger(name: Optional[str] = None) -> logging.Logger:
     log_level = os.environ.get("LOG_LEVEL", "INFO").upper()
     logger.setLevel(getattr(logging, log_level, logging.INFO))
 
-    # ハンドラーの作成
-    handler = logging.StreamHandler()
-
-    # 環境に応じてフォーマッターを選択
-    environment = os.environ.get("ENVIRONMENT", "dev")
-
-    if environment == "prod":
-        # 本番環境: JSON形式
-        handler.setFormatter(JSONFormatter())
+    handler: logging.Handler
+    if os.environ.get("LOG_ASYNC", "true").lower() == "true":
+        # 非同期: 共有キューに積むだけ（整形・出力はリスナーのスレッド）
+        handler = _shared_queue_handler()
     else:
-        # 開発環境: 人間が読みやすい形式
-        # ただし、構造化情報も含める
-        formatter = logging.Formatter(
-            "%(asctime)s [%(levelname)s] %(name)s - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S"
-        )
-        handler.setFormatter(formatter)
+        # 同期: 呼び出し元のスレッドで整形して出力
+        handler = logging.StreamHandler()
+        handler.setFormatter(_create_formatter())
 
     logger.addHandler(handler)
 
+    # 大量に出るDEBUGログはロガー単位で間引く（キューに積む前に捨てる）
+    rate = _sampling_rate(logger.name, parse_log_sampling(os.environ.get("LOG_SAMPLING", "")))
+    if rate is not None:
+        logger.addFilter(SamplingFilter(rate))
+
     # 親ロガーへの伝播を防止（重複ログ防止）
     logger.propagate = False
 
@@ -0,0 +1,231 @@
+"""
+Columnar piece manifest
+
+パズル1つ分のピース配置（位置・サイズ・S3キー）を列指向でまとめたマニフェストです。
+DynamoDBのピースアイテムをJSONオブジェクトの配列で返すと、2000ピースでは
+correctRow / createdAt などのキー名が2000回繰り返されるため、列ごとの配列に詰め替えます。
+
+- json:    列指向のJSON（既定、S3にはこの形式で保存）
+- msgpack: 同じ構造をMessagePackで（msgpackパッケージが必要）
+- binary:  固定長の数値配列に詰めたバイナリ（1ピースあたり36バイト）
+
+S3キーは keyPrefix + pieceId + keySuffix で復元できるため、列には含めません。
+"""
+
+import json
+import struct
+import sys
+import uuid
+from array import array
+from typing import Any, Dict, Iterable, List, Tuple
+
+from app.core.serialization import dumps
+
+MANIFEST_VERSION = 1
+MANIFEST_FORMATS = ('json', 'msgpack', 'binary')
+MEDIA_TYPES = {
+    'json': 'application/json',
+    'msgpack': 'application/msgpack',
+    'binary': 'application/octet-stream',
+}
+
+# 列名と binary 形式での型（array の型コード: H=uint16, I=uint32）
+INTEGER_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ('row', 'H'),
+    ('col', 'H'),
+    ('x', 'I'),
+    ('y', 'I'),
+    ('width', 'I'),
+    ('height', 'I'),
+)
+
+# binary 形式のヘッダー: magic, version, rows, cols, count, imageWidth, imageHeight（リトルエンディアン）
+_BINARY_MAGIC = b'JPMF'
+_BINARY_HEADER = struct.Struct('<4sHHHIII')
+_STRING_LENGTH = struct.Struct('<H')
+
+
+def manifest_key(puzzle_id: str) -> str:
+    """
+    マニフェストのS3キー
+
+    ピース画像と同じプレフィックスに置くため、ピース削除時に一緒に削除されます。
+    """
+    return f"pieces/{puzzle_id}/manifest.json"
+
+
+def build_manifest(
+    puzzle_id: str,
+    rows: int,
+    cols: int,
+    image_width: int,
+    image_height: int,
+    pieces: Iterable[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    ピース情報から列指向のマニフェストを作成
+
+    Args:
+        puzzle_id: Puzzle ID
+        rows: Grid rows
+        cols: Grid columns
+        image_width: Source image width in pixels
+        image_height: Source image height in pixels
+        pieces: Pieces with pieceId, row, col, x, y, width and height
+
+    Returns:
+        Manifest dictionary (JSON serializable)
+    """
+    columns: Dict[str, List[Any]] = {'pieceId': []}
+    for name, _ in INTEGER_COLUMNS:
+        columns[name] = []
+
+    for piece in pieces:
+        columns['pieceId'].append(piece['pieceId'])
+        for name, _ in INTEGER_COLUMNS:
+            columns[name].append(int(piece[name]))
+
+    return {
+        'version': MANIFEST_VERSION,
+        'puzzleId': puzzle_id,
+        'rows': rows,
+        'cols': cols,
+        'count': len(columns['pieceId']),
+        'imageWidth': image_width,
+        'imageHeight': image_height,
+        'keyPrefix': f"pieces/{puzzle_id}/",
+        'keySuffix': '.jpg',
+        'columns': columns,
+    }
+
+
+def piece_keys(manifest: Dict[str, Any]) -> List[str]:
+    """マニフェストから各ピースのS3キーを復元"""
+    prefix, suffix = manifest['keyPrefix'], manifest['keySuffix']
+    return [f"{prefix}{piece_id}{suffix}" for piece_id in manifest['columns']['pieceId']]
+
+
+def encode_manifest(manifest: Dict[str, Any], fmt: str = 'json') -> Tuple[bytes, str]:
+    """
+    マニフェストを指定形式にエンコード
+
+    Args:
+        manifest: Manifest created by build_manifest
+        fmt: "json", "msgpack" or "binary"
+
+    Returns:
+        Tuple of (encoded bytes, media type)
+
+    Raises:
+        ValueError: If the format is unknown or its encoder is not installed
+    """
+    if fmt == 'json':
+        return dumps(manifest), MEDIA_TYPES[fmt]
+
+    if fmt == 'msgpack':
+        try:
+            import msgpack  # オプション依存のため使用時のみインポート
+        except ImportError:
+            raise ValueError("msgpack format is not available on this server")
+        return msgpack.packb(manifest), MEDIA_TYPES[fmt]
+
+    if fmt == 'binary':
+        return _encode_binary(manifest), MEDIA_TYPES[fmt]
+
+    raise ValueError(f"Unsupported manifest format: {fmt}")
+
+
+def decode_manifest_json(data: bytes) -> Dict[str, Any]:
+    """S3に保存したJSONマニフェストを読み込む"""
+    return json.loads(data)
+
+
+def _pack_string(value: str) -> bytes:
+    encoded = value.encode('utf-8')
+    return _STRING_LENGTH.pack(len(encoded)) + encoded
+
+
+def _unpack_string(data: bytes, offset: int) -> Tuple[str, int]:
+    (length,) = _STRING_LENGTH.unpack_from(data, offset)
+    start = offset + _STRING_LENGTH.size
+    return data[start:start + length].decode('utf-8'), start + length
+
+
+def _little_endian(values: array) -> bytes:
+    """array をリトルエンディアンのバイト列に変換"""
+    if sys.byteorder == 'big':  # pragma: no cover - 実行環境はリトルエンディアン
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _encode_binary(manifest: Dict[str, Any]) -> bytes:
+    """
+    binary 形式:
+        header (22 bytes) | puzzleId | keyPrefix | keySuffix   （文字列は uint16 長さ + UTF-8）
+        pieceId: count x 16 bytes (UUID)
+        row, col: count x uint16 / x, y, width, height: count x uint32
+    """
+    columns = manifest['columns']
+    parts = [
+        _BINARY_HEADER.pack(
+            _BINARY_MAGIC,
+            manifest['version'],
+            manifest['rows'],
+            manifest['cols'],
+            manifest['count'],
+            manifest['imageWidth'],
+            manifest['imageHeight']
+        ),
+        _pack_string(manifest['puzzleId']),
+        _pack_string(manifest['keyPrefix']),
+        _pack_string(manifest['keySuffix']),
+        b''.join(uuid.UUID(piece_id).bytes for piece_id in columns['pieceId']),
+    ]
+    for name, typecode in INTEGER_COLUMNS:
+        parts.append(_little_endian(array(typecode, columns[name])))
+    return b''.join(parts)
+
+
+def decode_binary_manifest(data: bytes) -> Dict[str, Any]:
+    """
+    binary 形式のマニフェストを辞書に戻す（クライアント実装の参照用）
+
+    Raises:
+        ValueError: If the data is not a binary manifest
+    """
+    magic, version, rows, cols, count, image_width, image_height = _BINARY_HEADER.unpack_from(data, 0)
+    if magic != _BINARY_MAGIC:
+        raise ValueError("Not a binary piece manifest")
+
+    offset = _BINARY_HEADER.size
+    puzzle_id, offset = _unpack_string(data, offset)
+    key_prefix, offset = _unpack_string(data, offset)
+    key_suffix, offset = _unpack_string(data, offset)
+
+    columns: Dict[str, List[Any]] = {
+        'pieceId': [str(uuid.UUID(bytes=data[offset + i * 16:offset + (i + 1) * 16])) for i in range(count)]
+    }
+    offset += count * 16
+
+    for name, typecode in INTEGER_COLUMNS:
+        values = array(typecode)
+        size = values.itemsize * count
+        values.frombytes(data[offset:offset + size])
+        if sys.byteorder == 'big':  # pragma: no cover
+            values.byteswap()
+        columns[name] = values.tolist()
+        offset += size
+
+    return {
+        'version': version,
+        'puzzleId': puzzle_id,
+        'rows': rows,
+        'cols': cols,
+        'count': count,
+        'imageWidth': image_width,
+        'imageHeight': image_height,
+        'keyPrefix': key_prefix,
+        'keySuffix': key_suffix,
+        'columns': columns,
+    }
@@ -0,0 +1,242 @@
+"""
+On-demand sampling profiler
+
+本番で特定のリクエストや分割ジョブだけが遅い場合の調査用に、スタックを一定間隔でサンプリングし、
+collapsed stack 形式（flamegraph.pl / speedscope でそのまま読める）でS3に保存します。
+
+    profiles/{puzzle_id}/{kind}-{時刻}.collapsed
+
+プロファイルを取るかどうかは ProfilingPolicy で決めます。
+- PROFILING=true:           すべてのリクエスト・ジョブ
+- PROFILING_SAMPLE_RATE:    この割合（0〜1）でランダムに
+- PROFILING_TOKEN:          X-Profile ヘッダーにこの値を付けたリクエスト、"profile": true の分割ジョブ
+いずれも無効なら create_profiling_policy は None を返し、呼び出し側は None かどうかの1回の判定だけで済みます。
+"""
+
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar, Token
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_INTERVAL_SECONDS = 0.01
+# 1サンプルで辿るフレーム数の上限（深い再帰でサンプリングが遅くならないように）
+MAX_STACK_DEPTH = 128
+
+PROFILE_HEADER = 'x-profile'
+PROFILE_CONTENT_TYPE = 'text/plain; charset=utf-8'
+
+# 計測中のリクエストのプロファイラ（bind_metrics がexecutorのスレッドに引き継ぐ）
+_active: ContextVar[Optional['SamplingProfiler']] = ContextVar('active_profiler', default=None)
+
+
+class SamplingProfiler:
+    """
+    別スレッドから sys._current_frames() で対象スレッドのスタックを定期的に記録
+
+    対象は start() を呼んだスレッド（thread_id で指定も可）と、add_thread で登録されている間の
+    スレッド（リクエストの処理を委譲したexecutorのスレッド）だけで、同時に処理中の別リクエストや
+    ログ出力スレッドのスタックは含めません。
+    計測対象のコードには何も差し込まないため、オーバーヘッドはサンプリング間隔だけで決まります
+    （10ms間隔で1サンプル数十マイクロ秒程度）。
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL_SECONDS, thread_id: Optional[int] = None) -> None:
+        self.interval = interval
+        self.thread_id = thread_id
+        # add_thread で登録中のスレッド → 登録数（入れ子で同じスレッドが登録されることもある）
+        self._threads: Counter = Counter()
+        self._threads_lock = threading.Lock()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        # コードオブジェクト → フレーム名（同じ関数を毎回整形しない）
+        self._labels: Dict[Any, str] = {}
+
+    def start(self) -> 'SamplingProfiler':
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self._started
+
+    def add_thread(self, ident: int) -> None:
+        """remove_thread を呼ぶまで、このスレッドもサンプリング対象にする"""
+        with self._threads_lock:
+            self._threads[ident] += 1
+
+    def remove_thread(self, ident: int) -> None:
+        with self._threads_lock:
+            self._threads[ident] -= 1
+            if self._threads[ident] <= 0:
+                del self._threads[ident]
+
+    def __enter__(self) -> 'SamplingProfiler':
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        own_thread = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(own_thread)
+
+    def sample(self, skip_thread: Optional[int] = None) -> None:
+        """
+        スタックを1回記録
+
+        thread_id が決まっていればそのスレッドと登録中のスレッドだけ、未定（start() 前）なら
+        全スレッドを記録します（skip_thread は自分自身のスレッド）。
+        """
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        frames = sys._current_frames()
+        if self.thread_id is not None:
+            with self._threads_lock:
+                targets = {self.thread_id, *self._threads}
+            frames = {ident: frames[ident] for ident in targets if ident in frames}
+        for ident, frame in frames.items():
+            if ident == skip_thread:
+                continue
+            stack: List[str] = []
+            current: Any = frame
+            while current is not None and len(stack) < MAX_STACK_DEPTH:
+                stack.append(self._label(current.f_code))
+                current = current.f_back
+            # スレッド名も区切り文字の空白を含められない（例: "Thread-1 (_monitor)"）
+            stack.append(names.get(ident, f"thread-{ident}").replace(' ', '_'))
+            stack.reverse()
+            self.stacks[';'.join(stack)] += 1
+        self.samples += 1
+
+    def _label(self, code: Any) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            # 区切り文字（; と空白）を含まない「関数名@ディレクトリ/ファイル:行」
+            path = code.co_filename.replace(os.sep, '/').rsplit('/', 2)
+            label = f"{code.co_qualname}@{'/'.join(path[-2:])}:{code.co_firstlineno}".replace(' ', '_')
+            self._labels[code] = label
+        return label
+
+    def collapsed(self) -> str:
+        """collapsed stack 形式（"frame;frame;frame 回数" を1行ずつ、多い順）"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfilingPolicy:
+    """リクエスト・ジョブごとにプロファイルを取るかどうかを決める"""
+
+    def __init__(
+        self,
+        always: bool = False,
+        sample_rate: float = 0.0,
+        token: str = '',
+        interval: float = DEFAULT_INTERVAL_SECONDS,
+        rng: Callable[[], float] = random.random
+    ) -> None:
+        self.always = always
+        self.sample_rate = sample_rate
+        self.token = token
+        self.interval = interval
+        self._rng = rng
+
+    def should_profile(self, header_value: Optional[str] = None, requested: bool = False) -> bool:
+        """
+        Decide whether to profile one request or job
+
+        Args:
+            header_value: X-Profile header of the request (must match PROFILING_TOKEN)
+            requested: Job explicitly asked for a profile (honored when PROFILING_TOKEN is set)
+
+        Returns:
+            True if a profile should be recorded
+        """
+        if self.always:
+            return True
+        if self.token:
+            if requested:
+                return True
+            if header_value and hmac.compare_digest(header_value.encode(), self.token.encode()):
+                return True
+        return self.sample_rate > 0 and self._rng() < self.sample_rate
+
+    def profiler(self) -> SamplingProfiler:
+        """呼び出し元のスレッドで start() するプロファイラ"""
+        return SamplingProfiler(self.interval)
+
+
+def activate_profiler(profiler: SamplingProfiler) -> Token:
+    """リクエストの処理中のプロファイラを設定（戻り値のTokenを deactivate_profiler に渡す）"""
+    return _active.set(profiler)
+
+
+def deactivate_profiler(token: Token) -> None:
+    _active.reset(token)
+
+
+def current_profiler() -> Optional[SamplingProfiler]:
+    return _active.get()
+
+
+def create_profiling_policy(settings: Any) -> Optional[ProfilingPolicy]:
+    """設定からProfilingPolicyを作成（どの方法でも有効にされていなければNone）"""
+    if not (settings.profiling_always or settings.profiling_sample_rate > 0 or settings.profiling_token):
+        return None
+    return ProfilingPolicy(
+        always=settings.profiling_always,
+        sample_rate=settings.profiling_sample_rate,
+        token=settings.profiling_token,
+        interval=settings.profiling_interval_ms / 1000
+    )
+
+
+def profile_prefix(puzzle_id: str) -> str:
+    """パズルのプロファイルを置くS3プレフィックス（パズル削除時にまとめて削除）"""
+    return f"profiles/{puzzle_id}/"
+
+
+def profile_key(puzzle_id: Optional[str], kind: str) -> str:
+    """
+    プロファイルのS3キー
+
+    パズルに関係するものは profiles/{puzzle_id}/、それ以外は profiles/requests/ に置きます。
+    """
+    timestamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+    return f"{profile_prefix(puzzle_id or 'requests')}{kind}-{timestamp}.collapsed"
+
+
+def store_profile(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    profiler: SamplingProfiler,
+    metadata: Optional[Dict[str, str]] = None
+) -> None:
+    """プロファイルをcollapsed stack形式でS3に保存（サンプル数・時間はメタデータに記録）"""
+    s3_client.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=profiler.collapsed().encode('utf-8'),
+        ContentType=PROFILE_CONTENT_TYPE,
+        Metadata={
+            'samples': str(profiler.samples),
+            'duration-ms': f"{profiler.duration * 1000:.1f}",
+            'interval-ms': f"{profiler.interval * 1000:g}",
+            **(metadata or {}),
+        }
+    )
@@ -0,0 +1,138 @@
+"""
+Per-request AWS call metrics
+
+1リクエストの間に行われたAWS呼び出し（S3・DynamoDBの操作ごとの回数と時間）を集計します。
+botocoreの before-call / after-call イベントにフックし、集計先のリクエストはcontextvarで受け渡します。
+
+- 集計中のリクエストがない呼び出し（ワーカー・起動処理など）では、フックは何もしません
+- AWS呼び出し用のスレッドプールで実行する処理は bind_metrics で包むと、同じリクエストに集計されます
+  （プロファイル中のリクエストなら、そのスレッドも実行中はプロファイラのサンプリング対象になります）
+- 時間はリトライを含む1回のAPI呼び出し全体。並列の呼び出しは重なった時間も合計します
+"""
+
+import threading
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from app.core.profiling import current_profiler
+
+T = TypeVar('T')
+
+_current: ContextVar[Optional['RequestMetrics']] = ContextVar('request_metrics', default=None)
+
+# botocoreのリクエストコンテキストに保存するキー（before-call → after-call の受け渡し）
+_STARTED_KEY = 'request_metrics_started'
+_OPERATION_KEY = 'request_metrics_operation'
+
+
+class RequestMetrics:
+    """1リクエスト分のAWS呼び出しの集計（操作名 → [回数, 秒]）"""
+
+    __slots__ = ('started', 'operations', '_lock')
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.operations: Dict[str, list] = {}
+        # 並列のAWS呼び出しから同時に記録されるため
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.operations.get(operation)
+            if entry is None:
+                self.operations[operation] = [1, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def aws_summary(self) -> Dict[str, Any]:
+        """ログ出力用の要約（awsCalls, awsMs, 操作ごとの内訳）"""
+        with self._lock:
+            operations = {name: tuple(entry) for name, entry in self.operations.items()}
+        return {
+            'awsCalls': sum(calls for calls, _ in operations.values()),
+            'awsMs': round(sum(seconds for _, seconds in operations.values()) * 1000, 2),
+            'aws': {
+                name: {'calls': calls, 'ms': round(seconds * 1000, 2)}
+                for name, (calls, seconds) in operations.items()
+            },
+        }
+
+
+def start_request() -> Tuple[RequestMetrics, Token]:
+    """リクエストの集計を開始（戻り値のTokenを finish_request に渡す）"""
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def finish_request(token: Token) -> None:
+    _current.reset(token)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+def bind_metrics(func: Callable[..., T]) -> Callable[..., T]:
+    """
+    現在のリクエストの集計先とプロファイラを、別スレッドで実行される関数に引き継ぐ
+
+    run_in_executor や ThreadPoolExecutor はcontextvarを引き継がないため、
+    投入する前に呼び出し元のスレッドで包みます。プロファイラは実行中のスレッドを対象に加え、
+    終わったら外します。集計中でもプロファイル中でもなければ func をそのまま返します。
+    """
+    metrics = _current.get()
+    profiler = current_profiler()
+    if metrics is None and profiler is None:
+        return func
+
+    def bound(*args: Any, **kwargs: Any) -> T:
+        token = _current.set(metrics)
+        ident = threading.get_ident()
+        if profiler is not None:
+            profiler.add_thread(ident)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.remove_thread(ident)
+            _current.reset(token)
+
+    return bound
+
+
+def instrument_client(client: Any) -> Any:
+    """
+    boto3クライアントにAWS呼び出しの計測フックを登録
+
+    Args:
+        client: boto3 client (for a resource, pass resource.meta.client)
+
+    Returns:
+        The same client
+    """
+    events = client.meta.events
+    events.register('before-call', _before_call, unique_id='request-metrics-before-call')
+    events.register('after-call', _after_call, unique_id='request-metrics-after-call')
+    events.register('after-call-error', _after_call, unique_id='request-metrics-after-call-error')
+    return client
+
+
+def _before_call(model: Any = None, context: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+    if context is None or _current.get() is None:
+        return
+    context[_OPERATION_KEY] = f"{model.service_model.service_id}.{model.name}"
+    context[_STARTED_KEY] = time.perf_counter()
+
+
+def _after_call(context: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+    if context is None or _STARTED_KEY not in context:
+        return
+    metrics = _current.get()
+    started = context.pop(_STARTED_KEY)
+    if metrics is not None:
+        metrics.record(context.pop(_OPERATION_KEY), time.perf_counter() - started)
@@ -6,9 +6,11 @@ FastAPIとLambda関数の両方から使用されます。
 """
 
 import re
-from typing import Optional, Literal
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field, field_validator
 
+from app.core.grid import MAX_PIECE_COUNT, MIN_PIECE_COUNT
+
 
 # パズル作成リクエスト
 class PuzzleCreateRequest(BaseModel):
@@ -20,9 +22,11 @@ class PuzzleCreateRequest(BaseModel):
         max_length=100,
         json_schema_extra={"example": "富士山の風景"}
     )
-    pieceCount: Literal[100, 300, 500, 1000, 2000] = Field(
+    pieceCount: int = Field(
         ...,
-        description="パズルのピース数（100, 300, 500, 1000, 2000のいずれか）",
+        description=f"パズルのピース数（{MIN_PIECE_COUNT}〜{MAX_PIECE_COUNT}。画像の縦横比に合わせて数%増減します）",
+        ge=MIN_PIECE_COUNT,
+        le=MAX_PIECE_COUNT,
         json_schema_extra={"example": 300}
     )
     userId: str = Field(
@@ -102,15 +106,141 @@ class UploadUrlRequest(BaseModel):
         return v
 
 
-# 画像アップロードURLレスポンス
-class UploadUrlResponse(BaseModel):
-    """画像アップロード用のPre-signed URLレスポンス"""
+# 署名付きPOSTレスポンス
+class UploadPostResponse(BaseModel):
+    """署名付きPOST（サイズ・形式の制限付き）レスポンス"""
     puzzleId: str
     uploadUrl: str
+    fields: Dict[str, str]
+    maxBytes: int
     expiresIn: int
     message: str
 
 
+# マルチパートアップロード開始リクエスト
+class MultipartUploadRequest(UploadUrlRequest):
+    """マルチパートアップロード開始リクエスト"""
+    fileSize: int = Field(
+        ...,
+        description="画像ファイルのサイズ（バイト）",
+        gt=0,
+        json_schema_extra={"example": 25 * 1024 * 1024}
+    )
+
+
+# パートのアップロードURL
+class UploadPartUrl(BaseModel):
+    """パート1つ分のアップロードURL"""
+    partNumber: int
+    url: str
+
+
+# アップロード済みのパート
+class CompletedPart(BaseModel):
+    """アップロード済みのパート（PUTレスポンスのETagヘッダー）"""
+    partNumber: int = Field(..., ge=1, le=10000)
+    etag: str = Field(..., min_length=1, max_length=200)
+
+
+# アップロード済みのパート（サイズ付き）
+class UploadedPart(CompletedPart):
+    """S3に保存済みのパート"""
+    size: int
+
+
+# マルチパートアップロード開始レスポンス
+class MultipartUploadResponse(BaseModel):
+    """マルチパートアップロード開始レスポンス"""
+    puzzleId: str
+    uploadId: str
+    partSize: int
+    parts: List[UploadPartUrl]
+    expiresIn: int
+
+
+# パートURL再発行リクエスト
+class MultipartPartsRequest(BaseModel):
+    """パートURLの再発行リクエスト（中断したアップロードの再開用）"""
+    partNumbers: List[int] = Field(
+        default_factory=list,
+        description="URLを再発行するパート番号",
+        max_length=10000
+    )
+    userId: str = Field(
+        default="anonymous",
+        description="ユーザーID",
+        max_length=50,
+        json_schema_extra={"example": "user-123"}
+    )
+
+    @field_validator('partNumbers')
+    @classmethod
+    def validate_part_numbers(cls, v: List[int]) -> List[int]:
+        """パート番号は1〜10000"""
+        if any(n < 1 or n > 10000 for n in v):
+            raise ValueError('Part numbers must be between 1 and 10000')
+        return v
+
+
+# パートURL再発行レスポンス
+class MultipartPartsResponse(BaseModel):
+    """パートURLの再発行レスポンス"""
+    puzzleId: str
+    uploadId: str
+    uploadedParts: List[UploadedPart]
+    parts: List[UploadPartUrl]
+    expiresIn: int
+
+
+# マルチパートアップロード完了リクエスト
+class MultipartCompleteRequest(BaseModel):
+    """マルチパートアップロード完了リクエスト"""
+    parts: List[CompletedPart] = Field(..., min_length=1, max_length=10000)
+    userId: str = Field(
+        default="anonymous",
+        description="ユーザーID",
+        max_length=50,
+        json_schema_extra={"example": "user-123"}
+    )
+
+
+# マルチパートアップロード完了レスポンス
+class MultipartCompleteResponse(BaseModel):
+    """マルチパートアップロード完了レスポンス"""
+    puzzleId: str
+    size: int
+    message: str
+
+
+# パズル一括削除リクエスト
+class BulkDeleteRequest(BaseModel):
+    """パズル一括削除リクエスト"""
+    puzzleIds: List[str] = Field(
+        ...,
+        description="削除するパズルIDの一覧（最大100件）",
+        min_length=1,
+        max_length=100,
+        json_schema_extra={"example": ["550e8400-e29b-41d4-a716-446655440000"]}
+    )
+    userId: str = Field(
+        default="anonymous",
+        description="ユーザーID",
+        max_length=50,
+        json_schema_extra={"example": "user-123"}
+    )
+
+
+# パズル一括削除レスポンス
+class BulkDeleteResponse(BaseModel):
+    """パズル一括削除レスポンス"""
+    deleted: List[str]
+    notFound: List[str]
+    # レコードは削除済みだが、ピースの削除に失敗したパズル（ログを参照）
+    purgeFailed: List[str] = Field(default_factory=list)
+    deletedObjects: int
+    deletedItems: int
+
+
 # エラーレスポンス
 class ErrorResponse(BaseModel):
     """エラーレスポンス"""
@@ -0,0 +1,76 @@
+"""
+Fast JSON serialization
+
+APIレスポンスとログ出力で共通に使うJSONエンコーダーです。
+orjson がインストールされていればそれを使い、なければ標準ライブラリの json にフォールバックします。
+DynamoDBから返る Decimal は整数なら int、それ以外は float としてJSON数値に変換します。
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson はオプション依存
+    orjson = None  # type: ignore[assignment]
+
+
+def decimal_default(value: Any) -> Any:
+    """
+    標準のJSONで表せない値の変換（json.dumps / orjson.dumps の default）
+
+    Raises:
+        TypeError: If the value cannot be converted
+    """
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (set, frozenset)):
+        # DynamoDBの文字列セット・数値セット
+        return list(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _with_fallback(fallback: Optional[Callable[[Any], Any]]) -> Callable[[Any], Any]:
+    """decimal_default で変換できない値を fallback に渡す default を作成"""
+    if fallback is None:
+        return decimal_default
+
+    def default(value: Any) -> Any:
+        try:
+            return decimal_default(value)
+        except TypeError:
+            return fallback(value)
+
+    return default
+
+
+def dumps(obj: Any, fallback: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    オブジェクトをUTF-8のJSONバイト列に変換
+
+    Args:
+        obj: Object to serialize
+        fallback: Converter for values that are not JSON serializable
+            (e.g. str for logs); TypeError is raised when omitted
+
+    Returns:
+        Compact UTF-8 encoded JSON
+    """
+    default = _with_fallback(fallback)
+    if orjson is not None:
+        return orjson.dumps(obj, default=default)
+    return json.dumps(
+        obj,
+        default=default,
+        ensure_ascii=False,
+        separators=(',', ':')
+    ).encode('utf-8')
+
+
+def dumps_str(obj: Any, fallback: Optional[Callable[[Any], Any]] = None) -> str:
+    """dumps の文字列版（ログ出力やRedisへの保存用）"""
+    return dumps(obj, fallback).decode('utf-8')
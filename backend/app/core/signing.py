@@ -0,0 +1,204 @@
+"""
+Batch URL signing helpers
+
+ピース画像の署名付きURLをまとめて作成するための署名処理です。
+
+- SigV4QueryPresigner: S3の署名付きGET URLを一括生成
+  boto3の generate_presigned_url は1件ごとに署名キーの導出（HMAC 4回）と
+  リクエストの組み立てを行うため、2000件では1秒近くかかります。
+  ここでは botocore が生成した1件のURLをテンプレートとして、
+  署名キーとクエリ文字列を使い回し、キーごとの HMAC 1回だけで署名します。
+- CloudFront: プレフィックス単位のカスタムポリシーを1回だけRSA署名し、
+  署名付きCookie / クエリ文字列として全ピースで共有します。
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, quote, urlsplit
+
+_ALGORITHM = 'AWS4-HMAC-SHA256'
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode('utf-8'), hashlib.sha256).digest()
+
+
+def _uri_encode(value: str) -> str:
+    """SigV4のクエリ文字列用エンコード"""
+    return quote(value, safe='-_.~')
+
+
+class SigV4QueryPresigner:
+    """
+    S3の署名付きGET URLを一括生成する署名器
+
+    from_template で botocore が生成したURLから、エンドポイント・日時・スコープを引き継ぎます。
+    同じ日時・有効期限のURLをキーだけ変えて作るため、正規化クエリ文字列と署名キーは全件で共通です。
+    """
+
+    def __init__(
+        self,
+        scheme: str,
+        host: str,
+        base_path: str,
+        amz_date: str,
+        scope: str,
+        query: Dict[str, str],
+        secret_key: str
+    ) -> None:
+        """
+        Args:
+            scheme: URL scheme (https)
+            host: Host header value
+            base_path: Path before the object key (includes the bucket for path-style URLs)
+            amz_date: X-Amz-Date shared by every URL
+            scope: Credential scope (date/region/service/aws4_request)
+            query: X-Amz-* parameters except X-Amz-Signature
+            secret_key: Secret access key of the credentials in X-Amz-Credential
+        """
+        self.scheme = scheme
+        self.host = host
+        self.base_path = base_path
+        self.amz_date = amz_date
+        self.scope = scope
+
+        # 正規化クエリ文字列（キー順にソート）は全URLで共通
+        self._query = '&'.join(
+            f"{_uri_encode(name)}={_uri_encode(value)}" for name, value in sorted(query.items())
+        )
+
+        # 署名キーの導出は1回だけ
+        date, region, service, _ = scope.split('/')
+        key = _hmac(f"AWS4{secret_key}".encode('utf-8'), date)
+        key = _hmac(key, region)
+        key = _hmac(key, service)
+        self._signing_key = _hmac(key, 'aws4_request')
+
+    @classmethod
+    def from_template(
+        cls,
+        template_url: str,
+        template_key: str,
+        secret_key: str
+    ) -> Optional["SigV4QueryPresigner"]:
+        """
+        botocore の generate_presigned_url が返したURLから署名器を作成
+
+        Args:
+            template_url: Presigned GET URL for template_key
+            template_key: Object key used to create template_url
+            secret_key: Secret access key used by the S3 client
+
+        Returns:
+            Presigner, or None if the URL does not have the expected SigV4 query form
+        """
+        parts = urlsplit(template_url)
+        query = dict(parse_qsl(parts.query, keep_blank_values=True))
+        quoted_key = quote(template_key, safe='/~')
+
+        if (
+            query.get('X-Amz-Algorithm') != _ALGORITHM
+            or query.get('X-Amz-SignedHeaders') != 'host'
+            or 'X-Amz-Signature' not in query
+            or not parts.path.endswith(quoted_key)
+        ):
+            return None
+
+        query.pop('X-Amz-Signature')
+        scope = query['X-Amz-Credential'].split('/', 1)[1]
+        return cls(
+            scheme=parts.scheme,
+            host=parts.netloc,
+            base_path=parts.path[:-len(quoted_key)],
+            amz_date=query['X-Amz-Date'],
+            scope=scope,
+            query=query,
+            secret_key=secret_key
+        )
+
+    def signature(self, key: str) -> str:
+        """オブジェクトキー1件分の署名"""
+        path = self.base_path + quote(key, safe='/~')
+        canonical_request = (
+            f"GET\n{path}\n{self._query}\nhost:{self.host}\n\nhost\nUNSIGNED-PAYLOAD"
+        )
+        string_to_sign = (
+            f"{_ALGORITHM}\n{self.amz_date}\n{self.scope}\n"
+            f"{hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()}"
+        )
+        return hmac.new(
+            self._signing_key, string_to_sign.encode('utf-8'), hashlib.sha256
+        ).hexdigest()
+
+    def presign(self, key: str) -> str:
+        """オブジェクトキー1件分の署名付きURL"""
+        path = self.base_path + quote(key, safe='/~')
+        return f"{self.scheme}://{self.host}{path}?{self._query}&X-Amz-Signature={self.signature(key)}"
+
+    def presign_all(self, keys: List[str]) -> List[str]:
+        """複数キーの署名付きURL（入力と同じ順序）"""
+        return [self.presign(key) for key in keys]
+
+
+def template_signature(template_url: str) -> Optional[str]:
+    """botocore が生成したURLの署名（署名器の検証用）"""
+    return dict(parse_qsl(urlsplit(template_url).query)).get('X-Amz-Signature')
+
+
+# ===================================================================
+# CloudFront
+# ===================================================================
+
+def _cloudfront_b64(data: bytes) -> str:
+    """CloudFront用のURLセーフBase64（+ → -, = → _, / → ~）"""
+    return base64.b64encode(data).decode('ascii').translate(str.maketrans('+=/', '-_~'))
+
+
+def cloudfront_policy(resource: str, expires_at: int) -> str:
+    """
+    プレフィックス単位のカスタムポリシー
+
+    Args:
+        resource: Resource URL, may end with * (e.g. https://d123.cloudfront.net/pieces/{id}/*)
+        expires_at: Expiry as Unix epoch seconds
+    """
+    policy = {
+        'Statement': [{
+            'Resource': resource,
+            'Condition': {'DateLessThan': {'AWS:EpochTime': expires_at}}
+        }]
+    }
+    # CloudFrontは空白なしのJSONを想定
+    return json.dumps(policy, separators=(',', ':'))
+
+
+def sign_cloudfront_policy(policy: str, private_key_pem: str, key_pair_id: str) -> Dict[str, str]:
+    """
+    カスタムポリシーをRSA-SHA1で署名
+
+    Args:
+        policy: Policy JSON from cloudfront_policy
+        private_key_pem: PEM encoded RSA private key of the CloudFront public key
+        key_pair_id: CloudFront public key ID
+
+    Returns:
+        Policy, Signature and Key-Pair-Id (CloudFront-safe Base64)
+    """
+    # cryptography はCloudFrontモードでのみ必要なオプション依存
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+    private_key = serialization.load_pem_private_key(private_key_pem.encode('utf-8'), password=None)
+    if not isinstance(private_key, rsa.RSAPrivateKey):
+        raise ValueError("CloudFront signing requires an RSA private key")
+
+    encoded_policy = policy.encode('utf-8')
+    signature = private_key.sign(encoded_policy, padding.PKCS1v15(), hashes.SHA1())
+    return {
+        'Policy': _cloudfront_b64(encoded_policy),
+        'Signature': _cloudfront_b64(signature),
+        'Key-Pair-Id': key_pair_id
+    }
@@ -0,0 +1,148 @@
+"""
+Cold start import profiler
+
+Lambdaのコールドスタートで、どのモジュールのインポートに時間がかかっているかを計測します。
+COLD_START_PROFILE=true のときだけ sys.meta_path にフックを挿入し、
+モジュールごとのインポート時間（配下のインポートを含む）をログに出力します。
+
+このモジュール自体は計測対象のインポートより先に読み込まれるため、標準ライブラリのみに依存します。
+"""
+
+import importlib.abc
+import os
+import sys
+import time
+from contextlib import contextmanager
+from importlib.machinery import ModuleSpec
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+def profiling_enabled() -> bool:
+    """COLD_START_PROFILE 環境変数で計測が有効化されているか"""
+    return os.environ.get('COLD_START_PROFILE', 'false').lower() == 'true'
+
+
+class _TimingLoader(importlib.abc.Loader):
+    """元のローダーに処理を委譲し、exec_module の所要時間を記録するラッパー"""
+
+    def __init__(self, loader: Any, profiler: "ImportProfiler") -> None:
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec: ModuleSpec) -> Optional[ModuleType]:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: ModuleType) -> None:
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.record(module.__name__, time.perf_counter() - start)
+            # 読み込み後は元のローダーに戻す（importlib.resources などが参照するため）
+            module.__loader__ = self._loader
+            if module.__spec__ is not None:
+                module.__spec__.loader = self._loader
+
+    def __getattr__(self, name: str) -> Any:
+        # get_resource_reader など、その他の属性は元のローダーに委譲
+        return getattr(self._loader, name)
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """
+    sys.meta_path に挿入してインポート時間を計測するファインダー
+
+    実際のモジュール探索は後続のファインダーに任せ、見つかったspecのローダーだけを差し替えます。
+    """
+
+    def __init__(self) -> None:
+        self.timings: Dict[str, float] = {}
+        self._started_at = time.perf_counter()
+        self._finished_at: Optional[float] = None
+
+    def find_spec(
+        self,
+        fullname: str,
+        path: Optional[Sequence[str]],
+        target: Optional[ModuleType] = None
+    ) -> Optional[ModuleSpec]:
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            # 名前空間パッケージなど exec_module を持たないローダーはそのまま
+            if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                spec.loader = _TimingLoader(spec.loader, self)
+            return spec
+        return None
+
+    def record(self, module_name: str, seconds: float) -> None:
+        """モジュール1件分のインポート時間を記録"""
+        self.timings[module_name] = seconds
+
+    def stop(self) -> None:
+        """計測を終了"""
+        if self._finished_at is None:
+            self._finished_at = time.perf_counter()
+
+    @property
+    def total_ms(self) -> float:
+        """計測開始から終了までの経過時間（ミリ秒）"""
+        end = self._finished_at if self._finished_at is not None else time.perf_counter()
+        return round((end - self._started_at) * 1000, 2)
+
+    def top(self, limit: int = 20) -> List[Tuple[str, float]]:
+        """インポート時間の長い順にモジュール名とミリ秒を返す（配下のインポートを含む）"""
+        ranked = sorted(self.timings.items(), key=lambda item: item[1], reverse=True)
+        return [(name, round(seconds * 1000, 2)) for name, seconds in ranked[:limit]]
+
+    def summary(self, limit: int = 20) -> Dict[str, Any]:
+        """ログ出力用のサマリー"""
+        return {
+            "totalMs": self.total_ms,
+            "moduleCount": len(self.timings),
+            "slowest": [{"module": name, "ms": ms} for name, ms in self.top(limit)]
+        }
+
+
+@contextmanager
+def profile_imports(enabled: Optional[bool] = None) -> Iterator[Optional[ImportProfiler]]:
+    """
+    with ブロック内のインポート時間を計測
+
+    Args:
+        enabled: Force profiling on/off (defaults to COLD_START_PROFILE)
+
+    Yields:
+        ImportProfiler while profiling, otherwise None
+    """
+    if enabled is None:
+        enabled = profiling_enabled()
+
+    if not enabled:
+        yield None
+        return
+
+    profiler = ImportProfiler()
+    sys.meta_path.insert(0, profiler)
+    try:
+        yield profiler
+    finally:
+        sys.meta_path.remove(profiler)
+        profiler.stop()
+
+
+def log_import_profile(profiler: Optional[ImportProfiler], limit: int = 20) -> None:
+    """計測結果をログに出力（計測していない場合は何もしない）"""
+    if profiler is None:
+        return
+
+    from app.core.logger import setup_logger
+
+    setup_logger(__name__).info(
+        "Cold start import profile",
+        extra={"extra_data": profiler.summary(limit)}
+    )
@@ -0,0 +1,189 @@
+"""
+Job timing and CloudWatch Embedded Metric Format
+
+ジョブ内の処理時間を段階（span）ごとに集計し、ジョブ終了時に1回だけメトリクスとして出力します。
+
+- ダウンロード・デコードなど1回だけの段階も、ピースごとに繰り返す段階も同じ Histogram に記録
+- ピースごとの時間は個別にログ出力せず、対数バケットのヒストグラムに集約（2000ピースでもメモリは一定）
+- 出力はCloudWatch Embedded Metric Format（EMF）のJSON 1行。Lambdaの標準出力に書くだけで
+  CloudWatchメトリクスとして取り込まれ、ログとしても Logs Insights で検索できます
+"""
+
+import math
+import sys
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, TextIO
+
+from app.core.serialization import dumps_str
+
+# バケットの幅（2^(1/4) 倍ごと、代表値の誤差は約±9%）
+BUCKET_BASE = 2 ** 0.25
+_LOG_BASE = math.log(BUCKET_BASE)
+
+# EMFの1ディレクティブあたりのメトリクス数の上限
+MAX_EMF_METRICS = 100
+
+
+class Histogram:
+    """ミリ秒の値を対数バケットで数えるヒストグラム（件数・合計・最小・最大は正確な値）"""
+
+    __slots__ = ('count', 'total', 'minimum', 'maximum', 'buckets')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = 0.0
+        # バケット番号 → 件数
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, value_ms: float) -> None:
+        self.count += 1
+        self.total += value_ms
+        if value_ms < self.minimum:
+            self.minimum = value_ms
+        if value_ms > self.maximum:
+            self.maximum = value_ms
+        index = math.floor(math.log(value_ms) / _LOG_BASE) if value_ms > 0 else -10_000
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def percentile(self, q: float) -> float:
+        """q パーセンタイルを含むバケットの代表値（最小・最大の範囲に丸める）"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(max(bucket_value(index), self.minimum), self.maximum)
+        return self.maximum
+
+    def to_dict(self) -> Dict[str, Any]:
+        """ログ出力用の要約（バケットは代表値 → 件数）"""
+        return {
+            'count': self.count,
+            'sumMs': round(self.total, 3),
+            'minMs': round(self.minimum, 3) if self.count else 0.0,
+            'maxMs': round(self.maximum, 3),
+            'p50Ms': round(self.percentile(50), 3),
+            'p95Ms': round(self.percentile(95), 3),
+            'buckets': {
+                f"{bucket_value(index):.3g}": count for index, count in sorted(self.buckets.items())
+            },
+        }
+
+
+def bucket_value(index: int) -> float:
+    """バケットの代表値（バケット範囲の幾何平均）"""
+    return float(BUCKET_BASE ** (index + 0.5))
+
+
+class _Span:
+    """JobTimer.span の戻り値（with を抜けたときに経過時間を記録）"""
+
+    __slots__ = ('_timer', '_name', '_started')
+
+    def __init__(self, timer: 'JobTimer', name: str) -> None:
+        self._timer = timer
+        self._name = name
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        self._started = self._timer.clock()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._timer.record(self._name, self._timer.clock() - self._started)
+
+
+class JobTimer:
+    """
+    1ジョブ分の段階ごとの処理時間
+
+    with timer.span('download'): ... のように囲むと、その段階のヒストグラムに経過時間を追加します。
+    span は入れ子にしても構いませんが、外側の時間には内側の時間も含まれます。
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self.clock = clock
+        self.started = clock()
+        # 最初に記録した順（出力の並び順）
+        self.histograms: Dict[str, Histogram] = {}
+
+    def span(self, name: str) -> _Span:
+        return _Span(self, name)
+
+    def record(self, name: str, seconds: float) -> None:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.add(seconds * 1000)
+
+    def elapsed_ms(self) -> float:
+        """ジョブ開始からの経過時間（ミリ秒）"""
+        return (self.clock() - self.started) * 1000
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """段階ごとの要約（ログ出力用）"""
+        return {name: histogram.to_dict() for name, histogram in self.histograms.items()}
+
+
+def build_emf(
+    namespace: str,
+    timer: JobTimer,
+    dimensions: Mapping[str, str],
+    properties: Optional[Mapping[str, Any]] = None,
+    timestamp_ms: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Build one CloudWatch Embedded Metric Format record for a job
+
+    Every stage becomes a "<stage>_ms" metric with the total time spent in it.
+    Stages recorded more than once (per piece) also get p50/p95/max metrics.
+    The full histograms are attached as the "timings" property for Logs Insights.
+
+    Args:
+        namespace: CloudWatch namespace
+        timer: Timer of the finished job
+        dimensions: Dimension name -> value (metrics are also published without dimensions)
+        properties: Extra fields to log with the record (e.g. puzzle_id)
+        timestamp_ms: Epoch milliseconds (default: now)
+
+    Returns:
+        EMF record (JSON serializable)
+    """
+    values: Dict[str, float] = {'total_ms': round(timer.elapsed_ms(), 3)}
+    for name, histogram in timer.histograms.items():
+        values[f"{name}_ms"] = round(histogram.total, 3)
+        if histogram.count > 1:
+            values[f"{name}_p50_ms"] = round(histogram.percentile(50), 3)
+            values[f"{name}_p95_ms"] = round(histogram.percentile(95), 3)
+            values[f"{name}_max_ms"] = round(histogram.maximum, 3)
+
+    metric_names: List[str] = list(values)[:MAX_EMF_METRICS]
+    record: Dict[str, Any] = {
+        '_aws': {
+            'Timestamp': timestamp_ms if timestamp_ms is not None else int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': namespace,
+                'Dimensions': [[], list(dimensions)] if dimensions else [[]],
+                'Metrics': [{'Name': name, 'Unit': 'Milliseconds'} for name in metric_names],
+            }],
+        },
+        **dimensions,
+        **(properties or {}),
+        'timings': timer.summary(),
+    }
+    record.update(values)
+    return record
+
+
+def emit_emf(record: Mapping[str, Any], stream: Optional[TextIO] = None) -> None:
+    """
+    EMFレコードを1行で出力
+
+    ロガーのフォーマットを通すとJSONが包まれてEMFとして解釈されないため、標準出力に直接書きます。
+    """
+    output = stream or sys.stdout
+    output.write(dumps_str(record) + '\n')
+    output.flush()
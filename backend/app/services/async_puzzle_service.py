@@ -0,0 +1,184 @@
+"""
+Async adapter for PuzzleService
+
+PuzzleServiceのブロッキングなboto3呼び出しを専用のスレッドプールで実行し、
+async def ルートからイベントループを塞がずに利用できるようにします。
+ビジネスロジックはPuzzleServiceと共有し、このクラスは実行場所だけを切り替えます。
+"""
+
+import asyncio
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence, TypeVar
+
+from app.core.request_metrics import bind_metrics
+from app.services.puzzle_service import PuzzleService
+
+T = TypeVar("T")
+
+
+class AsyncPuzzleService:
+    """Executor-backed async facade with the same interface as PuzzleService"""
+
+    def __init__(self, service: PuzzleService, executor: Optional[Executor] = None):
+        """
+        Initialize AsyncPuzzleService
+
+        Args:
+            service: Underlying synchronous PuzzleService
+            executor: Executor to run blocking AWS calls on
+                      (default: the event loop's default executor)
+        """
+        self.service = service
+        self._executor = executor
+
+    async def _run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """ブロッキング関数をexecutor上で実行して結果を待つ"""
+        loop = asyncio.get_running_loop()
+        # run_in_executor はcontextvarを引き継がないため、リクエストのAWS呼び出し集計を明示的に渡す
+        return await loop.run_in_executor(
+            self._executor,
+            bind_metrics(functools.partial(func, *args, **kwargs))
+        )
+
+    async def create_puzzle(
+        self,
+        piece_count: int,
+        puzzle_name: str,
+        user_id: str = 'anonymous'
+    ) -> Dict[str, Any]:
+        """Async version of PuzzleService.create_puzzle"""
+        return await self._run(
+            self.service.create_puzzle,
+            piece_count=piece_count,
+            puzzle_name=puzzle_name,
+            user_id=user_id
+        )
+
+    async def generate_upload_post(
+        self,
+        puzzle_id: str,
+        file_name: str = 'puzzle.jpg',
+        user_id: str = 'anonymous'
+    ) -> Dict[str, Any]:
+        """Async version of PuzzleService.generate_upload_post"""
+        return await self._run(
+            self.service.generate_upload_post,
+            puzzle_id=puzzle_id,
+            file_name=file_name,
+            user_id=user_id
+        )
+
+    async def initiate_multipart_upload(
+        self,
+        puzzle_id: str,
+        file_size: int,
+        file_name: str = 'puzzle.jpg',
+        user_id: str = 'anonymous'
+    ) -> Dict[str, Any]:
+        """Async version of PuzzleService.initiate_multipart_upload"""
+        return await self._run(
+            self.service.initiate_multipart_upload,
+            puzzle_id=puzzle_id,
+            file_size=file_size,
+            file_name=file_name,
+            user_id=user_id
+        )
+
+    async def get_multipart_upload_parts(
+        self,
+        puzzle_id: str,
+        upload_id: str,
+        part_numbers: Sequence[int],
+        user_id: str = 'anonymous'
+    ) -> Dict[str, Any]:
+        """Async version of PuzzleService.get_multipart_upload_parts"""
+        return await self._run(
+            self.service.get_multipart_upload_parts,
+            puzzle_id=puzzle_id,
+            upload_id=upload_id,
+            part_numbers=part_numbers,
+            user_id=user_id
+        )
+
+    async def complete_multipart_upload(
+        self,
+        puzzle_id: str,
+        upload_id: str,
+        parts: Sequence[Dict[str, Any]],
+        user_id: str = 'anonymous'
+    ) -> Dict[str, Any]:
+        """Async version of PuzzleService.complete_multipart_upload"""
+        return await self._run(
+            self.service.complete_multipart_upload,
+            puzzle_id=puzzle_id,
+            upload_id=upload_id,
+            parts=parts,
+            user_id=user_id
+        )
+
+    async def abort_multipart_upload(
+        self,
+        puzzle_id: str,
+        upload_id: str,
+        user_id: str = 'anonymous'
+    ) -> None:
+        """Async version of PuzzleService.abort_multipart_upload"""
+        await self._run(
+            self.service.abort_multipart_upload,
+            puzzle_id=puzzle_id,
+            upload_id=upload_id,
+            user_id=user_id
+        )
+
+    async def get_puzzle(self, user_id: str, puzzle_id: str) -> Optional[Dict[str, Any]]:
+        """Async version of PuzzleService.get_puzzle"""
+        return await self._run(self.service.get_puzzle, user_id, puzzle_id)
+
+    async def list_puzzles(self, user_id: str) -> list:
+        """Async version of PuzzleService.list_puzzles"""
+        return await self._run(self.service.list_puzzles, user_id)
+
+    async def list_puzzles_page(
+        self,
+        user_id: str,
+        limit: int = PuzzleService.DEFAULT_PAGE_SIZE,
+        next_token: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        newest_first: bool = True
+    ) -> Dict[str, Any]:
+        """Async version of PuzzleService.list_puzzles_page"""
+        return await self._run(
+            self.service.list_puzzles_page,
+            user_id,
+            limit=limit,
+            next_token=next_token,
+            fields=fields,
+            newest_first=newest_first
+        )
+
+    async def get_piece_manifest(self, puzzle: Dict[str, Any]) -> Optional[bytes]:
+        """Async version of PuzzleService.get_piece_manifest"""
+        return await self._run(self.service.get_piece_manifest, puzzle)
+
+    async def delete_puzzle(self, user_id: str, puzzle_id: str) -> Dict[str, Any]:
+        """Async version of PuzzleService.delete_puzzle"""
+        return await self._run(self.service.delete_puzzle, user_id, puzzle_id)
+
+    async def mark_puzzle_deleting(self, user_id: str, puzzle_id: str) -> Dict[str, Any]:
+        """Async version of PuzzleService.mark_puzzle_deleting"""
+        return await self._run(self.service.mark_puzzle_deleting, user_id, puzzle_id)
+
+    async def delete_puzzles(self, user_id: str, puzzle_ids: Sequence[str]) -> Dict[str, Any]:
+        """Async version of PuzzleService.delete_puzzles"""
+        return await self._run(self.service.delete_puzzles, user_id, puzzle_ids)
+
+
+def create_aws_executor(max_workers: int) -> ThreadPoolExecutor:
+    """
+    AWS呼び出し専用のスレッドプールを作成
+
+    Starletteのデフォルトスレッドプール（40スロット）とは独立しているため、
+    AWSの待ち時間が他の同期処理のスロットを奪いません。
+    """
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aws-io")
@@ -0,0 +1,190 @@
+"""
+Background deletion queue
+
+大きなパズルの画像・ピース削除をAPIリクエストから切り離して実行します。
+APIはパズルを "deleting" にしてキューへ積むだけなので、ピース数に関係なく一定時間で応答します。
+
+- BackgroundDeletionQueue: プロセス内のキュー + ワーカースレッド（ローカル開発・テスト用）
+- SqsDeletionQueue: SQSへ送信し、ワーカーLambda（app.worker.handler）が run_deletion_job で処理
+"""
+
+import json
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from botocore.exceptions import ClientError
+
+from app.core.logger import setup_logger
+from app.services.puzzle_service import PuzzleService
+
+# ロガーの初期化
+logger = setup_logger(__name__)
+
+
+def build_deletion_job(user_id: str, puzzle_id: str, s3_key: Optional[str]) -> Dict[str, Any]:
+    """キューに積む削除ジョブを作成"""
+    return {
+        'userId': user_id,
+        'puzzleId': puzzle_id,
+        's3Key': s3_key,
+        'attempt': 1
+    }
+
+
+def run_deletion_job(service: PuzzleService, job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    削除ジョブを1回実行
+
+    finish_puzzle_deletion は冪等なので、途中で失敗したジョブをそのまま再実行できます。
+    """
+    return service.finish_puzzle_deletion(
+        user_id=job['userId'],
+        puzzle_id=job['puzzleId'],
+        s3_key=job.get('s3Key')
+    )
+
+
+class DeletionQueue(ABC):
+    """削除キューの共通インターフェース"""
+
+    @abstractmethod
+    def enqueue(self, user_id: str, puzzle_id: str, s3_key: Optional[str]) -> None:
+        """削除ジョブをキューに積む"""
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        """ワーカーを停止する（必要な実装のみ）"""
+
+
+class BackgroundDeletionQueue(DeletionQueue):
+    """
+    プロセス内のキューとワーカースレッドによる削除キュー
+
+    失敗したジョブは指数バックオフで max_attempts 回まで再試行します。
+    最終的に失敗した場合、レコードは "deleting" のまま残るため、再度DELETEすれば再実行されます。
+    """
+
+    def __init__(
+        self,
+        service: PuzzleService,
+        max_attempts: int = 3,
+        retry_base_delay: float = 0.5
+    ) -> None:
+        """
+        Args:
+            service: PuzzleService used to purge assets and remove the record
+            max_attempts: Maximum attempts per job
+            retry_base_delay: Base delay in seconds for exponential backoff
+        """
+        self.service = service
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, user_id: str, puzzle_id: str, s3_key: Optional[str]) -> None:
+        self._ensure_worker()
+        self._queue.put(build_deletion_job(user_id, puzzle_id, s3_key))
+
+    def join(self) -> None:
+        """キューに積まれたジョブがすべて完了するまで待つ"""
+        self._queue.join()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._worker is None:
+                return
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def _ensure_worker(self) -> None:
+        """初回のenqueue時にワーカースレッドを起動"""
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run,
+                    name="puzzle-deletion-worker",
+                    daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self._process(job)
+            finally:
+                self._queue.task_done()
+
+    def _process(self, job: Dict[str, Any]) -> None:
+        """ジョブを実行し、失敗時はバックオフしながら再試行"""
+        while True:
+            try:
+                run_deletion_job(self.service, job)
+                return
+            except Exception as e:
+                if job['attempt'] >= self.max_attempts:
+                    logger.error(
+                        "Puzzle deletion failed permanently",
+                        extra={
+                            "puzzle_id": job['puzzleId'],
+                            "user_id": job['userId'],
+                            "attempt": job['attempt'],
+                            "error": str(e)
+                        }
+                    )
+                    return
+
+                logger.warning(
+                    "Puzzle deletion failed, retrying",
+                    extra={
+                        "puzzle_id": job['puzzleId'],
+                        "user_id": job['userId'],
+                        "attempt": job['attempt'],
+                        "error": str(e)
+                    }
+                )
+                time.sleep(self.retry_base_delay * (2 ** (job['attempt'] - 1)))
+                job['attempt'] += 1
+
+
+class SqsDeletionQueue(DeletionQueue):
+    """
+    SQSを使った削除キュー
+
+    再試行はSQSの可視性タイムアウトとDLQ（maxReceiveCount）に任せます。
+    """
+
+    def __init__(self, sqs_client: Any, queue_url: str) -> None:
+        """
+        Args:
+            sqs_client: boto3 SQS client
+            queue_url: URL of the deletion queue
+        """
+        self.sqs_client = sqs_client
+        self.queue_url = queue_url
+
+    def enqueue(self, user_id: str, puzzle_id: str, s3_key: Optional[str]) -> None:
+        try:
+            self.sqs_client.send_message(
+                QueueUrl=self.queue_url,
+                MessageBody=json.dumps(build_deletion_job(user_id, puzzle_id, s3_key))
+            )
+        except ClientError as e:
+            logger.error(
+                "Failed to enqueue puzzle deletion",
+                extra={
+                    "puzzle_id": puzzle_id,
+                    "user_id": user_id,
+                    "error": str(e)
+                }
+            )
+            raise
+
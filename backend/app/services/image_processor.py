@@ -5,31 +5,108 @@ This module handles image splitting into puzzle pieces using Pillow.
 """
 
 import io
+import logging
 import uuid
 from datetime import datetime
-from typing import Dict, Any, List, Tuple
-from PIL import Image
-import boto3
+from functools import cached_property, lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 from botocore.exceptions import ClientError
 
+from app.core.aws import create_client, create_resource
+from app.core.cache import CacheBackend, puzzle_cache_key
+from app.core.grid import solve_grid
+from app.core.image_header import MAX_IMAGE_PIXELS, ImageHeader, InvalidImageError, inspect_image
+from app.core.manifest import build_manifest, encode_manifest, manifest_key
 from app.core.logger import setup_logger
+from app.core.profiling import ProfilingPolicy, profile_key, store_profile
+from app.core.timing import JobTimer, build_emf, emit_emf
+from app.services.puzzle_service import PuzzleNotFoundError
 
 logger = setup_logger(__name__)
 
+# EXIF Orientation → 表示の向きにするための Image.Transpose（ImageOps.exif_transpose と同じ対応）
+ORIENTATION_TRANSPOSE = {
+    2: 'FLIP_LEFT_RIGHT',
+    3: 'ROTATE_180',
+    4: 'FLIP_TOP_BOTTOM',
+    5: 'TRANSPOSE',
+    6: 'ROTATE_270',
+    7: 'TRANSVERSE',
+    8: 'ROTATE_90'
+}
+
+
+def source_box(
+    box: Tuple[int, int, int, int],
+    orientation: int,
+    source_size: Tuple[int, int]
+) -> Tuple[int, int, int, int]:
+    """
+    表示上（Orientation適用後）の矩形を、回転前の画像上の矩形に変換
+
+    画像全体を回転したコピーを作らずに、元画像から切り出したピースだけを回転するために使います。
+
+    Args:
+        box: (left, top, right, bottom) in display coordinates
+        orientation: EXIF orientation (1-8)
+        source_size: (width, height) of the image as stored
+
+    Returns:
+        (left, top, right, bottom) in source coordinates
+    """
+    left, top, right, bottom = box
+    width, height = source_size
+    if orientation == 2:
+        return width - right, top, width - left, bottom
+    if orientation == 3:
+        return width - right, height - bottom, width - left, height - top
+    if orientation == 4:
+        return left, height - bottom, right, height - top
+    if orientation == 5:
+        return top, left, bottom, right
+    if orientation == 6:
+        return top, height - right, bottom, height - left
+    if orientation == 7:
+        return width - bottom, height - right, width - top, height - left
+    if orientation == 8:
+        return width - bottom, left, width - top, right
+    return box
+
+
+@lru_cache(maxsize=8)
+def _srgb_transform(icc_profile: bytes, mode: str) -> Any:
+    """埋め込みICCプロファイルからsRGBへの変換（同じプロファイルの写真が続くためキャッシュ）"""
+    from PIL import ImageCms
+
+    source = ImageCms.ImageCmsProfile(io.BytesIO(icc_profile))
+    if mode == 'RGB' and 'srgb' in ImageCms.getProfileDescription(source).lower().replace(' ', ''):
+        # すでにsRGBなら変換不要
+        return None
+    return ImageCms.buildTransform(source, ImageCms.createProfile('sRGB'), mode, 'RGB')
+
 
 class ImageProcessor:
     """Service class for image processing and puzzle piece generation"""
 
-    # ピース数に対応する推奨グリッド（rows x cols）
-    PIECE_GRIDS = {
-        100: (10, 10),
-        300: (15, 20),
-        500: (20, 25),
-        1000: (25, 40),
-        2000: (40, 50)
-    }
+    # 分割する画像の最大サイズ（PuzzleService.MAX_UPLOAD_BYTES と同じ上限）
+    MAX_IMAGE_BYTES = 50 * 1024 * 1024
+
+    # delete_objects の1リクエストあたりの上限
+    S3_DELETE_BATCH_SIZE = 1000
 
-    def __init__(self, s3_bucket_name: str, pieces_table_name: str, puzzles_table_name: str):
+    # メトリクスのディメンションに使うピース数の区分（フロントエンドの選択肢）
+    METRICS_PIECE_CLASSES = (100, 300, 500, 1000, 2000)
+
+    def __init__(
+        self,
+        s3_bucket_name: str,
+        pieces_table_name: str,
+        puzzles_table_name: str,
+        cache: Optional[CacheBackend] = None,
+        metrics_namespace: Optional[str] = None,
+        profiling: Optional[ProfilingPolicy] = None,
+        max_pixels: int = MAX_IMAGE_PIXELS
+    ):
         """
         Initialize ImageProcessor
 
@@ -37,21 +114,44 @@ class ImageProcessor:
             s3_bucket_name: Name of the S3 bucket for images
             pieces_table_name: Name of the DynamoDB table for pieces
             puzzles_table_name: Name of the DynamoDB table for puzzles
+            cache: Shared puzzle cache to invalidate on status updates
+            metrics_namespace: CloudWatch namespace for per-job EMF metrics (None: don't emit)
+            profiling: Policy for sampling-profiling split jobs (None: never profile)
+            max_pixels: Largest image (width x height) accepted for splitting
         """
         self.s3_bucket_name = s3_bucket_name
         self.pieces_table_name = pieces_table_name
         self.puzzles_table_name = puzzles_table_name
+        self.cache = cache
+        self.metrics_namespace = metrics_namespace
+        self.profiling = profiling
+        self.max_pixels = max_pixels
+
+    # AWSクライアントは初回アクセス時に生成（PuzzleServiceと同じ共通設定）
+
+    @cached_property
+    def s3_client(self) -> Any:
+        return create_client('s3')
+
+    @cached_property
+    def dynamodb(self) -> Any:
+        return create_resource('dynamodb')
+
+    @cached_property
+    def pieces_table(self) -> Any:
+        return self.dynamodb.Table(self.pieces_table_name)
 
-        # AWSクライアントの初期化
-        self.s3_client = boto3.client('s3')
-        self.dynamodb = boto3.resource('dynamodb')
-        self.pieces_table = self.dynamodb.Table(pieces_table_name)
-        self.puzzles_table = self.dynamodb.Table(puzzles_table_name)
+    @cached_property
+    def puzzles_table(self) -> Any:
+        return self.dynamodb.Table(self.puzzles_table_name)
 
     def calculate_grid(self, piece_count: int, image_width: int, image_height: int) -> Tuple[int, int]:
         """
         Calculate optimal grid dimensions based on piece count and image aspect ratio
 
+        ピースが正方形に近く、ピース数が指定値に近い組み合わせを選びます（app.core.grid）。
+        ピース数は指定値から数%ずれることがあるため、実際の数は totalPieces を参照してください。
+
         Args:
             piece_count: Number of puzzle pieces
             image_width: Original image width in pixels
@@ -63,38 +163,7 @@ class ImageProcessor:
         Raises:
             ValueError: If piece_count is not supported
         """
-        if piece_count not in self.PIECE_GRIDS:
-            raise ValueError(f"Unsupported piece count: {piece_count}")
-
-        base_rows, base_cols = self.PIECE_GRIDS[piece_count]
-
-        # 画像のアスペクト比を計算
-        aspect_ratio = image_width / image_height
-
-        # アスペクト比が極端に異なる場合は調整
-        # 横長の画像（aspect_ratio > 1.5）の場合、列を増やす
-        # 縦長の画像（aspect_ratio < 0.67）の場合、行を増やす
-        if aspect_ratio > 1.5:
-            # 横長: 列を増やして行を減らす
-            adjustment_factor = min(aspect_ratio / 1.2, 1.5)
-            cols = int(base_cols * adjustment_factor)
-            rows = piece_count // cols
-            # 端数調整
-            while rows * cols < piece_count:
-                cols += 1
-                rows = piece_count // cols
-        elif aspect_ratio < 0.67:
-            # 縦長: 行を増やして列を減らす
-            adjustment_factor = min(1.2 / aspect_ratio, 1.5)
-            rows = int(base_rows * adjustment_factor)
-            cols = piece_count // rows
-            # 端数調整
-            while rows * cols < piece_count:
-                rows += 1
-                cols = piece_count // rows
-        else:
-            # 通常のアスペクト比
-            rows, cols = base_rows, base_cols
+        rows, cols = solve_grid(piece_count, image_width, image_height)
 
         logger.info(
             f"Calculated grid dimensions",
@@ -102,7 +171,7 @@ class ImageProcessor:
                 "piece_count": piece_count,
                 "image_width": image_width,
                 "image_height": image_height,
-                "aspect_ratio": round(aspect_ratio, 2),
+                "aspect_ratio": round(image_width / image_height, 2),
                 "rows": rows,
                 "cols": cols
             }
@@ -110,12 +179,34 @@ class ImageProcessor:
 
         return rows, cols
 
+    def read_image_header(self, s3_key: str) -> ImageHeader:
+        """
+        Read the format and dimensions of an uploaded image with ranged GETs
+
+        画像全体はダウンロードせず、先頭の数KB（JPEGでEXIFが大きい場合は数回のRange GET）だけを読みます。
+
+        Args:
+            s3_key: S3 key of the original image
+
+        Returns:
+            ImageHeader (format, width, height)
+
+        Raises:
+            InvalidImageError: If the image is unsupported, corrupt or too large
+            ClientError: If AWS operation fails
+        """
+        return inspect_image(
+            lambda start, end: self._read_range(s3_key, start, end),
+            max_pixels=self.max_pixels
+        )
+
     def split_image(
         self,
         puzzle_id: str,
         user_id: str,
         s3_key: str,
-        piece_count: int
+        piece_count: int,
+        profile: bool = False
     ) -> Dict[str, Any]:
         """
         Split image into puzzle pieces and save to S3/DynamoDB
@@ -125,6 +216,7 @@ class ImageProcessor:
             user_id: User ID
             s3_key: S3 key of the original image
             piece_count: Number of pieces to create
+            profile: Record a sampling profile of this job (honored when profiling is configured)
 
         Returns:
             Dictionary containing processing results
@@ -133,9 +225,75 @@ class ImageProcessor:
             ClientError: If AWS operation fails
             ValueError: If image processing fails
         """
+        if self.profiling is None:
+            return self._split_image(puzzle_id, user_id, s3_key, piece_count)
+        if not self.profiling.should_profile(requested=profile):
+            return self._split_image(puzzle_id, user_id, s3_key, piece_count)
+
+        profiler = self.profiling.profiler().start()
+        try:
+            return self._split_image(puzzle_id, user_id, s3_key, piece_count)
+        finally:
+            profiler.stop()
+            self._store_split_profile(profiler, puzzle_id, piece_count)
+
+    def _store_split_profile(self, profiler: Any, puzzle_id: str, piece_count: int) -> None:
+        """分割ジョブのプロファイルをパズルと同じプレフィックスに保存（失敗してもジョブには影響させない）"""
+        key = profile_key(puzzle_id, 'split')
+        try:
+            store_profile(
+                self.s3_client,
+                self.s3_bucket_name,
+                key,
+                profiler,
+                metadata={'piece-count': str(piece_count)}
+            )
+            logger.info(
+                "Stored split profile",
+                extra={"puzzle_id": puzzle_id, "extra_data": {"key": key, "samples": profiler.samples}}
+            )
+        except Exception as e:
+            logger.warning(
+                "Failed to store split profile",
+                extra={"puzzle_id": puzzle_id, "error": str(e)}
+            )
+
+    def _split_image(
+        self,
+        puzzle_id: str,
+        user_id: str,
+        s3_key: str,
+        piece_count: int
+    ) -> Dict[str, Any]:
+        """split_image の本体（プロファイルの有無にかかわらず同じ処理）"""
+        # Pillowは重いため、分割処理を実行するときだけ読み込む
+        from PIL import Image
+
+        # 段階ごとの処理時間（ピースごとの段階はヒストグラムに集約し、ジョブ終了時に1回だけ出力）
+        timer = JobTimer()
+        status = 'failed'
+        total_pieces = 0
+        pieces_info: List[Dict[str, Any]] = []
+
         try:
-            # パズルのステータスを "processing" に更新
-            self._update_puzzle_status(user_id, puzzle_id, 'processing')
+            # 全体をダウンロードする前にヘッダーだけで検証し、不正な画像は即座に失敗させる
+            with timer.span('header'):
+                header = self.read_image_header(s3_key)
+
+            # グリッドサイズはヘッダーの縦横サイズ（EXIFの回転を適用した向き）から計算（デコード不要）
+            display_width, display_height = header.display_size
+            with timer.span('grid'):
+                rows, cols = self.calculate_grid(piece_count, display_width, display_height)
+            if display_width < cols or display_height < rows:
+                raise InvalidImageError(
+                    f"Image too small for {piece_count} pieces: {display_width}x{display_height}"
+                )
+
+            # パズルのステータスを "processing" に更新（画像情報も記録）
+            with timer.span('status_update'):
+                self._update_puzzle_status(
+                    user_id, puzzle_id, 'processing', **self._image_attributes(header)
+                )
 
             # S3から画像を取得
             logger.info(
@@ -143,15 +301,41 @@ class ImageProcessor:
                 extra={"puzzle_id": puzzle_id, "s3_key": s3_key}
             )
 
-            response = self.s3_client.get_object(
-                Bucket=self.s3_bucket_name,
-                Key=s3_key
+            with timer.span('download'):
+                response = self.s3_client.get_object(
+                    Bucket=self.s3_bucket_name,
+                    Key=s3_key
+                )
+                # 署名付きPUTなどで上限を超える画像が置かれた場合は読み込まずに失敗させる
+                content_length = response.get('ContentLength', 0)
+                if content_length > self.MAX_IMAGE_BYTES:
+                    response['Body'].close()
+                    raise ValueError(
+                        f"Image too large: {content_length} bytes (maximum is {self.MAX_IMAGE_BYTES})"
+                    )
+                image_data = response['Body'].read()
+
+            # Pillowで画像を開いてデコード（最初の切り出しでも同じ1回のデコードが行われるため、
+            # 時間を分けて計測できるようここで明示的に行う）
+            with timer.span('decode'):
+                image = Image.open(io.BytesIO(image_data))
+                image.load()
+
+            # 回転・色変換は画像全体ではなくピースごとに行い、フル解像度のコピーを作らない
+            orientation = image.getexif().get(0x0112, 1)
+            if orientation not in ORIENTATION_TRANSPOSE:
+                orientation = 1
+            transpose = (
+                getattr(Image.Transpose, ORIENTATION_TRANSPOSE[orientation]) if orientation != 1 else None
             )
-            image_data = response['Body'].read()
+            color_transform = self._color_transform(image, puzzle_id)
 
-            # Pillowで画像を開く
-            image = Image.open(io.BytesIO(image_data))
             image_width, image_height = image.size
+            if orientation in (5, 6, 7, 8):
+                image_width, image_height = image_height, image_width
+            if (image_width, image_height) != (display_width, display_height):
+                # ヘッダーの解析結果と食い違う場合はデコード結果を優先
+                rows, cols = self.calculate_grid(piece_count, image_width, image_height)
 
             logger.info(
                 f"Image loaded successfully",
@@ -159,19 +343,19 @@ class ImageProcessor:
                     "puzzle_id": puzzle_id,
                     "width": image_width,
                     "height": image_height,
-                    "format": image.format
+                    "format": image.format,
+                    "orientation": orientation,
+                    "color_converted": color_transform is not None
                 }
             )
 
-            # グリッドサイズを計算
-            rows, cols = self.calculate_grid(piece_count, image_width, image_height)
-
             # ピースサイズを計算
             piece_width = image_width // cols
             piece_height = image_height // rows
 
             # 画像を分割してS3に保存
-            pieces_info = []
+            # ピースごとのデバッグログは無効なら extra の組み立てごと省く
+            log_pieces = logger.isEnabledFor(logging.DEBUG)
 
             for row in range(rows):
                 for col in range(cols):
@@ -183,21 +367,29 @@ class ImageProcessor:
                     right = left + piece_width if col < cols - 1 else image_width
                     bottom = top + piece_height if row < rows - 1 else image_height
 
-                    piece_image = image.crop((left, top, right, bottom))
+                    with timer.span('crop'):
+                        piece_image = self._extract_piece(
+                            image,
+                            source_box((left, top, right, bottom), orientation, image.size),
+                            transpose,
+                            color_transform
+                        )
 
                     # ピース画像をバイトストリームに変換
-                    piece_buffer = io.BytesIO()
-                    piece_image.save(piece_buffer, format='JPEG', quality=85)
-                    piece_buffer.seek(0)
+                    with timer.span('encode'):
+                        piece_buffer = io.BytesIO()
+                        piece_image.save(piece_buffer, format='JPEG', quality=85)
+                        piece_buffer.seek(0)
 
                     # S3に保存
                     piece_s3_key = f"pieces/{puzzle_id}/{piece_id}.jpg"
-                    self.s3_client.put_object(
-                        Bucket=self.s3_bucket_name,
-                        Key=piece_s3_key,
-                        Body=piece_buffer,
-                        ContentType='image/jpeg'
-                    )
+                    with timer.span('upload'):
+                        self.s3_client.put_object(
+                            Bucket=self.s3_bucket_name,
+                            Key=piece_s3_key,
+                            Body=piece_buffer,
+                            ContentType='image/jpeg'
+                        )
 
                     # ピース情報を記録
                     current_time = datetime.utcnow().isoformat()
@@ -217,28 +409,47 @@ class ImageProcessor:
                     }
 
                     # DynamoDBに保存
-                    self.pieces_table.put_item(Item=piece_info)
-                    pieces_info.append(piece_info)
-
-                    logger.debug(
-                        f"Piece created",
-                        extra={
-                            "puzzle_id": puzzle_id,
-                            "piece_id": piece_id,
-                            "row": row,
-                            "col": col
-                        }
-                    )
+                    with timer.span('db_write'):
+                        self.pieces_table.put_item(Item=piece_info)
+                    pieces_info.append({**piece_info, 'x': left, 'y': top})
+
+                    if log_pieces:
+                        logger.debug(
+                            f"Piece created",
+                            extra={
+                                "puzzle_id": puzzle_id,
+                                "piece_id": piece_id,
+                                "row": row,
+                                "col": col
+                            }
+                        )
+
+            # 全ピースの配置を列指向のマニフェストとして保存（GET /puzzles/{id}/manifest で配信）
+            with timer.span('manifest'):
+                manifest = build_manifest(
+                    puzzle_id, rows, cols, image_width, image_height, pieces_info
+                )
+                manifest_body, manifest_media_type = encode_manifest(manifest)
+                self.s3_client.put_object(
+                    Bucket=self.s3_bucket_name,
+                    Key=manifest_key(puzzle_id),
+                    Body=manifest_body,
+                    ContentType=manifest_media_type
+                )
 
             # パズルのステータスを "completed" に更新
-            self._update_puzzle_status(
-                user_id,
-                puzzle_id,
-                'completed',
-                rows=rows,
-                cols=cols,
-                total_pieces=len(pieces_info)
-            )
+            with timer.span('status_update'):
+                self._update_puzzle_status(
+                    user_id,
+                    puzzle_id,
+                    'completed',
+                    rows=rows,
+                    cols=cols,
+                    total_pieces=len(pieces_info),
+                    manifestKey=manifest_key(puzzle_id)
+                )
+            status = 'completed'
+            total_pieces = len(pieces_info)
 
             logger.info(
                 f"Image split completed successfully",
@@ -246,7 +457,8 @@ class ImageProcessor:
                     "puzzle_id": puzzle_id,
                     "total_pieces": len(pieces_info),
                     "rows": rows,
-                    "cols": cols
+                    "cols": cols,
+                    "duration_ms": round(timer.elapsed_ms(), 1)
                 }
             )
 
@@ -258,6 +470,16 @@ class ImageProcessor:
                 'status': 'completed'
             }
 
+        except PuzzleNotFoundError:
+            # 分割中にパズルが削除された場合は、作成済みのピースを片付けてジョブを終了する
+            status = 'dropped'
+            logger.info(
+                "Puzzle deleted during split, dropping job",
+                extra={"puzzle_id": puzzle_id, "pieces_written": len(pieces_info)}
+            )
+            self._discard_pieces(puzzle_id, pieces_info)
+            raise
+
         except ClientError as e:
             logger.error(
                 f"AWS error during image processing",
@@ -282,6 +504,67 @@ class ImageProcessor:
             self._update_puzzle_status(user_id, puzzle_id, 'failed', error=str(e))
             raise ValueError(f"Image processing failed: {str(e)}")
 
+        finally:
+            self._emit_split_metrics(timer, puzzle_id, piece_count, status, total_pieces)
+
+    def _emit_split_metrics(
+        self,
+        timer: JobTimer,
+        puzzle_id: str,
+        piece_count: int,
+        status: str,
+        total_pieces: int
+    ) -> None:
+        """分割ジョブ1件分の段階別の処理時間をEMFで出力（metrics_namespace 未設定なら何もしない）"""
+        if not self.metrics_namespace:
+            return
+        # ピース数は任意の値を取りうるため、ディメンションは区分に丸めて種類を抑える
+        piece_class = next(
+            (size for size in self.METRICS_PIECE_CLASSES if piece_count <= size),
+            self.METRICS_PIECE_CLASSES[-1]
+        )
+        try:
+            emit_emf(build_emf(
+                self.metrics_namespace,
+                timer,
+                dimensions={'Operation': 'split', 'PieceClass': str(piece_class)},
+                properties={
+                    'puzzle_id': puzzle_id,
+                    'piece_count': piece_count,
+                    'total_pieces': total_pieces,
+                    'status': status
+                }
+            ))
+        except Exception as e:
+            # メトリクスの出力失敗でジョブ自体を失敗させない
+            logger.warning(
+                "Failed to emit split metrics",
+                extra={"puzzle_id": puzzle_id, "error": str(e)}
+            )
+
+    def _discard_pieces(self, puzzle_id: str, pieces_info: List[Dict[str, Any]]) -> None:
+        """削除済みのパズルのために作成したピースとマニフェストを削除（失敗してもログのみ）"""
+        if not pieces_info:
+            return
+        keys = [piece['s3Key'] for piece in pieces_info] + [manifest_key(puzzle_id)]
+        try:
+            for start in range(0, len(keys), self.S3_DELETE_BATCH_SIZE):
+                self.s3_client.delete_objects(
+                    Bucket=self.s3_bucket_name,
+                    Delete={
+                        'Objects': [{'Key': key} for key in keys[start:start + self.S3_DELETE_BATCH_SIZE]],
+                        'Quiet': True
+                    }
+                )
+            with self.pieces_table.batch_writer() as batch:
+                for piece in pieces_info:
+                    batch.delete_item(Key={'puzzleId': puzzle_id, 'pieceId': piece['pieceId']})
+        except ClientError as e:
+            logger.warning(
+                "Failed to discard pieces of deleted puzzle",
+                extra={"puzzle_id": puzzle_id, "error": str(e)}
+            )
+
     def _update_puzzle_status(
         self,
         user_id: str,
@@ -298,30 +581,8 @@ class ImageProcessor:
             status: New status (processing, completed, failed)
             **kwargs: Additional attributes to update
         """
-        current_time = datetime.utcnow().isoformat()
-
-        update_expression = "SET #status = :status, updatedAt = :updated"
-        expression_attribute_names = {'#status': 'status'}
-        expression_attribute_values = {
-            ':status': status,
-            ':updated': current_time
-        }
-
-        # 追加の属性を更新式に追加
-        for key, value in kwargs.items():
-            update_expression += f", {key} = :{key}"
-            expression_attribute_values[f":{key}"] = value
-
         try:
-            self.puzzles_table.update_item(
-                Key={
-                    'userId': user_id,
-                    'puzzleId': puzzle_id
-                },
-                UpdateExpression=update_expression,
-                ExpressionAttributeNames=expression_attribute_names,
-                ExpressionAttributeValues=expression_attribute_values
-            )
+            self._update_puzzle(user_id, puzzle_id, {'status': status, **kwargs})
 
             logger.info(
                 f"Puzzle status updated",
@@ -342,3 +603,111 @@ class ImageProcessor:
                 }
             )
             raise
+
+    def _update_puzzle(self, user_id: str, puzzle_id: str, attributes: Dict[str, Any]) -> None:
+        """
+        パズルの属性を更新（updatedAtも更新し、APIのキャッシュを無効化）
+
+        削除済みのパズルに対してステータスだけのレコードを作り直さないよう、存在を条件にします。
+        非同期削除中（status='deleting'）のパズルも更新せず、削除済みと同じ扱いにします
+        （'completed' で上書きすると、削除ワーカーの後に書いたピースが残るため）。
+
+        Raises:
+            PuzzleNotFoundError: If the puzzle was deleted or is being deleted
+            ClientError: If AWS operation fails
+        """
+        update_expression = "SET updatedAt = :updated"
+        expression_attribute_names: Dict[str, str] = {'#status': 'status'}
+        expression_attribute_values: Dict[str, Any] = {
+            ':updated': datetime.utcnow().isoformat(),
+            ':deleting': 'deleting'
+        }
+
+        # rows, error, status などの予約語を避けるため名前もプレースホルダー化
+        for key, value in attributes.items():
+            update_expression += f", #{key} = :{key}"
+            expression_attribute_names[f"#{key}"] = key
+            expression_attribute_values[f":{key}"] = value
+
+        try:
+            self.puzzles_table.update_item(
+                Key={
+                    'userId': user_id,
+                    'puzzleId': puzzle_id
+                },
+                UpdateExpression=update_expression,
+                ConditionExpression='attribute_exists(puzzleId) AND #status <> :deleting',
+                ExpressionAttributeNames=expression_attribute_names,
+                ExpressionAttributeValues=expression_attribute_values
+            )
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                raise PuzzleNotFoundError(f"Puzzle not found or being deleted: {puzzle_id}")
+            raise
+
+        # APIのget_puzzleキャッシュに古いステータスが残らないよう無効化
+        if self.cache is not None:
+            self.cache.delete(puzzle_cache_key(user_id, puzzle_id))
+
+    def _color_transform(self, image: Any, puzzle_id: str) -> Any:
+        """
+        埋め込みICCプロファイルからsRGBへの変換を返す（不要・作成できない場合はNone）
+
+        プロファイルが壊れていても分割は続行し、色変換だけを省略します。
+        """
+        icc_profile = image.info.get('icc_profile')
+        if not icc_profile or image.mode not in ('RGB', 'CMYK'):
+            return None
+        try:
+            return _srgb_transform(icc_profile, image.mode)
+        except Exception as e:
+            logger.warning(
+                "Ignoring unusable ICC profile",
+                extra={"puzzle_id": puzzle_id, "error": str(e)}
+            )
+            return None
+
+    @staticmethod
+    def _extract_piece(
+        image: Any,
+        box: Tuple[int, int, int, int],
+        transpose: Any,
+        color_transform: Any
+    ) -> Any:
+        """元画像からピースを切り出し、sRGB変換・回転をピースの大きさで適用"""
+        piece = image.crop(box)
+        if color_transform is not None:
+            from PIL import ImageCms
+
+            piece = ImageCms.applyTransform(piece, color_transform)
+        elif piece.mode not in ('RGB', 'L'):
+            # JPEGで保存できない形式（RGBA, P, CMYK など）
+            piece = piece.convert('RGB')
+        if transpose is not None:
+            piece = piece.transpose(transpose)
+        return piece
+
+    def _read_range(self, s3_key: str, start: int, end: int) -> bytes:
+        """S3オブジェクトの start〜end バイト目を取得（範囲外なら空）"""
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.s3_bucket_name,
+                Key=s3_key,
+                Range=f"bytes={start}-{end}"
+            )
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'InvalidRange':
+                return b''
+            raise
+        return response['Body'].read()
+
+    @staticmethod
+    def _image_attributes(header: ImageHeader) -> Dict[str, Any]:
+        """パズルに記録する画像情報"""
+        display_width, display_height = header.display_size
+        return {
+            'imageFormat': header.format,
+            'imageWidth': display_width,
+            'imageHeight': display_height,
+            'imageOrientation': header.orientation
+        }
@@ -0,0 +1,196 @@
+"""
+Piece URL signer
+
+パズル1つ分の全ピース画像にアクセスするための署名をまとめて作成します。
+
+- s3:         全ピースのS3署名付きURLを一括生成（SigV4の署名キーを使い回す）
+- cloudfront: pieces/{puzzle_id}/* を対象とするカスタムポリシーを1回だけ署名し、
+              署名付きCookieまたはクエリ文字列として全ピースで共有
+
+結果はURLの有効期限より少し短い期間キャッシュし、ポーリングのたびに再署名しないようにします。
+キャッシュキーにはパズルの版（updatedAt）を含め、再分割後に古いピースの署名を返さないようにします。
+"""
+
+import time
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.aws import create_client, get_frozen_credentials
+from app.core.cache import CacheBackend, TTLCache
+from app.core.logger import setup_logger
+from app.core.manifest import piece_keys
+from app.core.signing import (
+    SigV4QueryPresigner,
+    cloudfront_policy,
+    sign_cloudfront_policy,
+    template_signature,
+)
+
+# ロガーの初期化
+logger = setup_logger(__name__)
+
+PIECE_URL_MODES = ('s3', 'cloudfront')
+
+
+class PieceUrlSigner:
+    """ピース画像の署名付きURL・CloudFront署名をまとめて作成するサービス"""
+
+    # キャッシュした署名は有効期限のこの秒数前に作り直す（クライアントが期限切れのURLを受け取らないように）
+    CACHE_MARGIN_SECONDS = 60
+    # s3モードの1エントリは最大2000ピース × 約1.5KBのURL ≈ 3MB になるため、件数は少なめにする
+    CACHE_MAX_ENTRIES = 16
+
+    def __init__(
+        self,
+        s3_bucket_name: str,
+        expires_in: int = 3600,
+        mode: str = 's3',
+        cloudfront_domain: str = '',
+        cloudfront_key_pair_id: str = '',
+        cloudfront_private_key: str = '',
+        cache: Optional[CacheBackend] = None,
+        cache_max_entries: int = CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time
+    ) -> None:
+        """
+        Args:
+            s3_bucket_name: Bucket holding the piece images
+            expires_in: Lifetime of the URLs/policy in seconds
+            mode: "s3" or "cloudfront"
+            cloudfront_domain: Distribution domain (e.g. d123.cloudfront.net)
+            cloudfront_key_pair_id: CloudFront public key ID
+            cloudfront_private_key: PEM encoded RSA private key
+            cache: Cache for signed results (defaults to an in-process TTL cache)
+            cache_max_entries: Size of the default cache in puzzles. In s3 mode an entry holds
+                up to 2000 URLs (about 3 MB), so 16 entries budget roughly 50 MB of memory
+            clock: Wall clock returning Unix epoch seconds (injectable for tests)
+
+        Raises:
+            ValueError: If the mode is unknown or CloudFront settings are missing
+        """
+        if mode not in PIECE_URL_MODES:
+            raise ValueError(f"Unsupported PIECE_URL_MODE: {mode}")
+        if mode == 'cloudfront' and not (
+            cloudfront_domain and cloudfront_key_pair_id and cloudfront_private_key
+        ):
+            raise ValueError(
+                "CLOUDFRONT_DOMAIN, CLOUDFRONT_KEY_PAIR_ID and CLOUDFRONT_PRIVATE_KEY are required"
+            )
+
+        self.s3_bucket_name = s3_bucket_name
+        self.expires_in = expires_in
+        self.mode = mode
+        self.cloudfront_domain = cloudfront_domain
+        self.cloudfront_key_pair_id = cloudfront_key_pair_id
+        self.cloudfront_private_key = cloudfront_private_key
+        self.cache = cache if cache is not None else TTLCache(
+            ttl_seconds=max(1, expires_in - self.CACHE_MARGIN_SECONDS),
+            max_entries=cache_max_entries
+        )
+        self._clock = clock
+
+    @cached_property
+    def s3_client(self) -> Any:
+        # 一括署名はSigV4のURLをテンプレートにするため、署名バージョンを明示する
+        from botocore.config import Config
+
+        return create_client('s3', config=Config(signature_version='s3v4'))
+
+    def sign_pieces(
+        self,
+        puzzle_id: str,
+        load_manifest: Callable[[], Optional[Dict[str, Any]]],
+        version: str = ''
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Sign access to every piece of a puzzle
+
+        Args:
+            puzzle_id: Puzzle ID
+            load_manifest: Returns the piece manifest (only called in s3 mode on a cache miss)
+            version: Puzzle version (updatedAt); a new version bypasses previously cached results
+
+        Returns:
+            Signed URLs (s3) or a shared policy (cloudfront), or None if the puzzle has no manifest
+        """
+        cache_key = f"piece-urls:{self.mode}:{puzzle_id}:{version}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if self.mode == 'cloudfront':
+            result = self._sign_cloudfront(puzzle_id)
+        else:
+            manifest = load_manifest()
+            if manifest is None:
+                return None
+            result = self._sign_s3(puzzle_id, manifest)
+
+        self.cache.set(cache_key, result)
+        return result
+
+    def _sign_s3(self, puzzle_id: str, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        """全ピースのS3署名付きURLを作成"""
+        keys = piece_keys(manifest)
+        expires_at = int(self._clock()) + self.expires_in
+        return {
+            'puzzleId': puzzle_id,
+            'mode': 's3',
+            'expiresAt': expires_at,
+            'pieceIds': list(manifest['columns']['pieceId']),
+            'urls': self._presign_all(keys)
+        }
+
+    def _presign_all(self, keys: List[str]) -> List[str]:
+        """
+        S3署名付きURLを一括生成
+
+        1件目だけ botocore で署名し、同じ署名を再現できることを確認してから残りを一括署名します。
+        再現できない場合（SigV4以外の設定など）は botocore で1件ずつ署名します。
+        """
+        if not keys:
+            return []
+
+        template = self._presign_with_botocore(keys[0])
+        credentials = get_frozen_credentials()
+        presigner = None
+        if credentials is not None:
+            presigner = SigV4QueryPresigner.from_template(template, keys[0], credentials.secret_key)
+
+        if presigner is None or presigner.signature(keys[0]) != template_signature(template):
+            logger.warning(
+                "Batch presigning unavailable, falling back to per-object signing",
+                extra={"count": len(keys)}
+            )
+            return [template] + [self._presign_with_botocore(key) for key in keys[1:]]
+
+        return [template] + presigner.presign_all(keys[1:])
+
+    def _presign_with_botocore(self, key: str) -> str:
+        return self.s3_client.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': self.s3_bucket_name, 'Key': key},
+            ExpiresIn=self.expires_in
+        )
+
+    def _sign_cloudfront(self, puzzle_id: str) -> Dict[str, Any]:
+        """pieces/{puzzle_id}/* を対象とするポリシーを1回だけ署名"""
+        expires_at = int(self._clock()) + self.expires_in
+        base_url = f"https://{self.cloudfront_domain}/"
+        resource = f"{base_url}pieces/{puzzle_id}/*"
+        signed = sign_cloudfront_policy(
+            cloudfront_policy(resource, expires_at),
+            self.cloudfront_private_key,
+            self.cloudfront_key_pair_id
+        )
+        return {
+            'puzzleId': puzzle_id,
+            'mode': 'cloudfront',
+            'expiresAt': expires_at,
+            'baseUrl': base_url,
+            'resource': resource,
+            # ピースURL（baseUrl + S3キー）の末尾に付けるクエリ文字列
+            'queryString': '&'.join(f"{name}={value}" for name, value in signed.items()),
+            # 署名付きCookieとして設定する場合の値
+            'cookies': {f"CloudFront-{name}": value for name, value in signed.items()}
+        }
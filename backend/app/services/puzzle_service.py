@@ -5,23 +5,79 @@ This module contains the core business logic for puzzle registration.
 It can be used by both FastAPI (local development) and AWS Lambda (production).
 """
 
-import os
+import base64
+import binascii
+import json
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional
-import boto3
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
 from botocore.exceptions import ClientError
 
+from app.core.aws import create_client, create_resource
+from app.core.cache import CacheBackend, puzzle_cache_key
+from app.core.grid import MAX_PIECE_COUNT, MIN_PIECE_COUNT
 from app.core.logger import setup_logger
+from app.core.profiling import profile_prefix
+from app.core.request_metrics import bind_metrics
+
+if TYPE_CHECKING:
+    from botocore.config import Config
 
 # ロガーの初期化
 logger = setup_logger(__name__)
 
 
+class PuzzleNotFoundError(ValueError):
+    """Raised when the puzzle does not exist (or does not belong to the user)"""
+
+
+class UploadNotFoundError(ValueError):
+    """Raised when a multipart upload does not exist or was already completed/aborted"""
+
+
 class PuzzleService:
     """Service class for puzzle operations"""
 
-    def __init__(self, s3_bucket_name: str, puzzles_table_name: str, environment: str = 'dev'):
+    # 作成日時でソートするためのGSI（terraform/modules/dynamodb で定義）
+    CREATED_AT_INDEX = 'CreatedAtIndex'
+
+    # 一覧取得のページサイズ
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 100
+
+    # 一覧表示用に返す属性（ProjectionExpressionで取得量を削減）
+    LIST_VIEW_FIELDS = ('puzzleId', 'puzzleName', 'pieceCount', 'status', 'createdAt', 'updatedAt')
+
+    # 一括削除のバッチサイズ（AWS APIの上限）
+    S3_DELETE_BATCH_SIZE = 1000  # delete_objects
+    DYNAMODB_GET_BATCH_SIZE = 100  # batch_get_item
+    MAX_BULK_DELETE = 100
+
+    # 削除処理を並列実行するスレッド数
+    DELETE_WORKERS = 8
+
+    # アップロードの制限
+    UPLOAD_URL_EXPIRES_IN = 900  # 15分
+    MAX_UPLOAD_BYTES = 50 * 1024 * 1024  # マルチパートを含む上限（これを超える画像は分割処理に渡さない）
+    MULTIPART_THRESHOLD_BYTES = 10 * 1024 * 1024  # これを超える画像はマルチパートでアップロード
+    MULTIPART_PART_SIZE = 8 * 1024 * 1024  # S3の最小パートサイズ（5MiB）以上
+    UPLOAD_CONTENT_TYPES = {
+        'jpg': 'image/jpeg',
+        'jpeg': 'image/jpeg',
+        'png': 'image/png'
+    }
+
+    def __init__(
+        self,
+        s3_bucket_name: str,
+        puzzles_table_name: str,
+        environment: str = 'dev',
+        boto_config: Optional["Config"] = None,
+        cache: Optional[CacheBackend] = None,
+        pieces_table_name: Optional[str] = None
+    ):
         """
         Initialize PuzzleService
 
@@ -29,18 +85,36 @@ class PuzzleService:
             s3_bucket_name: Name of the S3 bucket for images
             puzzles_table_name: Name of the DynamoDB table for puzzles
             environment: Environment name (dev/staging/prod)
+            boto_config: botocore Config merged over the shared client settings
+            cache: Read-through cache for get_puzzle (None disables caching)
+            pieces_table_name: Name of the DynamoDB table for pieces
+                               (None skips piece item cleanup on delete)
         """
         self.s3_bucket_name = s3_bucket_name
         self.puzzles_table_name = puzzles_table_name
+        self.pieces_table_name = pieces_table_name
         self.environment = environment
+        self.cache = cache
+        self._boto_config = boto_config
+
+    # AWSクライアントは初回アクセス時に生成（コールドスタート時の初期化コストを後回しにする）
+    # リージョン・プール・リトライは共通ファクトリで設定
 
-        # AWSリージョンを環境変数から取得（CI/CD環境やLambda環境で必要）
-        aws_region = os.environ.get('AWS_REGION', 'ap-northeast-1')
+    @cached_property
+    def s3_client(self) -> Any:
+        return create_client('s3', config=self._boto_config)
 
-        # AWSクライアントの初期化（region_nameを明示的に指定）
-        self.s3_client = boto3.client('s3', region_name=aws_region)
-        self.dynamodb = boto3.resource('dynamodb', region_name=aws_region)
-        self.puzzles_table = self.dynamodb.Table(puzzles_table_name)
+    @cached_property
+    def dynamodb(self) -> Any:
+        return create_resource('dynamodb', config=self._boto_config)
+
+    @cached_property
+    def puzzles_table(self) -> Any:
+        return self.dynamodb.Table(self.puzzles_table_name)
+
+    @cached_property
+    def pieces_table(self) -> Any:
+        return self.dynamodb.Table(self.pieces_table_name) if self.pieces_table_name else None
 
     def create_puzzle(
         self,
@@ -52,7 +126,7 @@ class PuzzleService:
         Create a new puzzle without image
 
         Args:
-            piece_count: Number of puzzle pieces (100, 300, 500, 1000, 2000)
+            piece_count: Number of puzzle pieces (100-2000)
             puzzle_name: User-defined puzzle name (e.g., "Mt. Fuji Landscape")
             user_id: User ID (default: 'anonymous')
 
@@ -64,10 +138,9 @@ class PuzzleService:
             ClientError: If AWS operation fails
         """
         # ピース数を検証
-        valid_piece_counts = [100, 300, 500, 1000, 2000]
-        if piece_count not in valid_piece_counts:
+        if not MIN_PIECE_COUNT <= piece_count <= MAX_PIECE_COUNT:
             raise ValueError(
-                f"pieceCount must be one of: {', '.join(map(str, valid_piece_counts))}"
+                f"pieceCount must be between {MIN_PIECE_COUNT} and {MAX_PIECE_COUNT}"
             )
 
         # パズルIDを生成
@@ -88,6 +161,7 @@ class PuzzleService:
 
         try:
             self.puzzles_table.put_item(Item=puzzle_item)
+            self._invalidate_puzzle(user_id, puzzle_id)
         except ClientError as e:
             logger.error(
                 "Failed to save puzzle to DynamoDB",
@@ -118,14 +192,18 @@ class PuzzleService:
             'message': 'Puzzle created successfully. You can now upload an image.'
         }
 
-    def generate_upload_url(
+    def generate_upload_post(
         self,
         puzzle_id: str,
         file_name: str = 'puzzle.jpg',
         user_id: str = 'anonymous'
     ) -> Dict[str, Any]:
         """
-        Generate a pre-signed URL for uploading an image to an existing puzzle
+        Generate a presigned POST policy for uploading an image
+
+        S3がポリシーの条件（Content-Type・content-length-range）を検証するため、
+        サイズ超過や別形式のファイルはアップロード時点で拒否されます。
+        MULTIPART_THRESHOLD_BYTES を超える画像はマルチパートアップロードを使用してください。
 
         Args:
             puzzle_id: Puzzle ID
@@ -133,43 +211,91 @@ class PuzzleService:
             user_id: User ID (default: 'anonymous')
 
         Returns:
-            Dictionary containing upload URL and expiration time
+            Dictionary containing the form URL, form fields and size limit
 
         Raises:
-            ValueError: If puzzle not found
+            PuzzleNotFoundError: If puzzle not found
             ClientError: If AWS operation fails
         """
-        # パズルの存在を確認
-        puzzle = self.get_puzzle(user_id, puzzle_id)
-        if not puzzle:
-            raise ValueError(f"Puzzle not found: {puzzle_id}")
+        s3_key, content_type = self._upload_target(puzzle_id, file_name)
+        max_bytes = min(self.MULTIPART_THRESHOLD_BYTES, self.MAX_UPLOAD_BYTES)
 
-        # S3キーを生成
-        file_extension = file_name.split('.')[-1].lower() if '.' in file_name else 'jpg'
-        s3_key = f"puzzles/{puzzle_id}.{file_extension}"
+        try:
+            post = self.s3_client.generate_presigned_post(
+                Bucket=self.s3_bucket_name,
+                Key=s3_key,
+                Fields={'Content-Type': content_type},
+                Conditions=[
+                    {'Content-Type': content_type},
+                    ['content-length-range', 1, max_bytes]
+                ],
+                ExpiresIn=self.UPLOAD_URL_EXPIRES_IN
+            )
+        except ClientError as e:
+            logger.error(
+                "Failed to generate presigned POST",
+                extra={
+                    "puzzle_id": puzzle_id,
+                    "user_id": user_id,
+                    "s3_key": s3_key,
+                    "error": str(e)
+                }
+            )
+            raise
 
-        # 拡張子から正しいMIME typeを取得
-        mime_type_map = {
-            'jpg': 'image/jpeg',
-            'jpeg': 'image/jpeg',
-            'png': 'image/png'
+        self._record_upload(user_id, puzzle_id, file_name, s3_key)
+
+        return {
+            'puzzleId': puzzle_id,
+            'uploadUrl': post['url'],
+            'fields': post['fields'],
+            'maxBytes': max_bytes,
+            'expiresIn': self.UPLOAD_URL_EXPIRES_IN,
+            'message': 'Submit the image as multipart/form-data with these fields within 15 minutes.'
         }
-        content_type = mime_type_map.get(file_extension, 'image/jpeg')
 
-        # アップロード用のpre-signed URLを生成
+    def initiate_multipart_upload(
+        self,
+        puzzle_id: str,
+        file_size: int,
+        file_name: str = 'puzzle.jpg',
+        user_id: str = 'anonymous'
+    ) -> Dict[str, Any]:
+        """
+        Start a multipart upload and presign a URL for every part
+
+        パートごとに並列・再試行でアップロードできるため、不安定なモバイル回線でも再開できます。
+
+        Args:
+            puzzle_id: Puzzle ID
+            file_size: Size of the image in bytes
+            file_name: Name of the puzzle image file
+            user_id: User ID (default: 'anonymous')
+
+        Returns:
+            Dictionary containing uploadId, partSize and presigned part URLs
+
+        Raises:
+            ValueError: If the file is too large or the puzzle is not found
+            ClientError: If AWS operation fails
+        """
+        if file_size > self.MAX_UPLOAD_BYTES:
+            raise ValueError(f"File too large: maximum is {self.MAX_UPLOAD_BYTES} bytes")
+
+        s3_key, content_type = self._upload_target(puzzle_id, file_name)
+
+        # 先にレコードを更新し、存在しないパズルのアップロードを開始しない
+        self._record_upload(user_id, puzzle_id, file_name, s3_key)
+
         try:
-            presigned_url = self.s3_client.generate_presigned_url(
-                'put_object',
-                Params={
-                    'Bucket': self.s3_bucket_name,
-                    'Key': s3_key,
-                    'ContentType': content_type
-                },
-                ExpiresIn=900  # 15分（セキュリティ向上のため短縮）
-            )
+            upload_id = self.s3_client.create_multipart_upload(
+                Bucket=self.s3_bucket_name,
+                Key=s3_key,
+                ContentType=content_type
+            )['UploadId']
         except ClientError as e:
             logger.error(
-                "Failed to generate pre-signed URL",
+                "Failed to create multipart upload",
                 extra={
                     "puzzle_id": puzzle_id,
                     "user_id": user_id,
@@ -177,9 +303,171 @@ class PuzzleService:
                     "error": str(e)
                 }
             )
-            raise  # 元のエラーをそのまま再raise
+            raise
+
+        part_count = max(1, -(-file_size // self.MULTIPART_PART_SIZE))
+
+        logger.info(
+            "Multipart upload initiated",
+            extra={
+                "puzzle_id": puzzle_id,
+                "user_id": user_id,
+                "upload_id": upload_id,
+                "part_count": part_count
+            }
+        )
+
+        return {
+            'puzzleId': puzzle_id,
+            'uploadId': upload_id,
+            'partSize': self.MULTIPART_PART_SIZE,
+            'parts': self._presign_parts(s3_key, upload_id, range(1, part_count + 1)),
+            'expiresIn': self.UPLOAD_URL_EXPIRES_IN
+        }
+
+    def get_multipart_upload_parts(
+        self,
+        puzzle_id: str,
+        upload_id: str,
+        part_numbers: Sequence[int],
+        user_id: str = 'anonymous'
+    ) -> Dict[str, Any]:
+        """
+        Re-sign part URLs and report parts already uploaded (resume)
+
+        Args:
+            puzzle_id: Puzzle ID
+            upload_id: Multipart upload ID
+            part_numbers: Parts that still need to be uploaded
+            user_id: User ID (default: 'anonymous')
+
+        Returns:
+            Dictionary containing fresh part URLs and the uploaded parts (partNumber, etag, size)
+
+        Raises:
+            ValueError: If the puzzle or upload is not found
+            ClientError: If AWS operation fails
+        """
+        s3_key = self._uploaded_key(user_id, puzzle_id)
+        uploaded = self._list_uploaded_parts(s3_key, upload_id)
+
+        return {
+            'puzzleId': puzzle_id,
+            'uploadId': upload_id,
+            'uploadedParts': [
+                {'partNumber': part['PartNumber'], 'etag': part['ETag'], 'size': part['Size']}
+                for part in uploaded
+            ],
+            'parts': self._presign_parts(s3_key, upload_id, part_numbers),
+            'expiresIn': self.UPLOAD_URL_EXPIRES_IN
+        }
+
+    def complete_multipart_upload(
+        self,
+        puzzle_id: str,
+        upload_id: str,
+        parts: Sequence[Dict[str, Any]],
+        user_id: str = 'anonymous'
+    ) -> Dict[str, Any]:
+        """
+        Complete a multipart upload after checking the total size
+
+        マルチパートはPOSTポリシーのようにサイズ条件を付けられないため、
+        結合前にアップロード済みパートの合計を確認し、上限を超えていれば中止します。
+
+        Args:
+            puzzle_id: Puzzle ID
+            upload_id: Multipart upload ID
+            parts: Uploaded parts as {'partNumber', 'etag'}
+            user_id: User ID (default: 'anonymous')
 
-        # ファイル情報でパズルレコードを更新
+        Returns:
+            Dictionary containing the puzzle ID and uploaded size
+
+        Raises:
+            ValueError: If the puzzle/upload is not found or the image is too large
+            ClientError: If AWS operation fails
+        """
+        s3_key = self._uploaded_key(user_id, puzzle_id)
+        uploaded = self._list_uploaded_parts(s3_key, upload_id)
+        total_size = sum(part['Size'] for part in uploaded)
+
+        if total_size > self.MAX_UPLOAD_BYTES:
+            self.abort_multipart_upload(puzzle_id, upload_id, user_id)
+            raise ValueError(f"File too large: maximum is {self.MAX_UPLOAD_BYTES} bytes")
+
+        try:
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.s3_bucket_name,
+                Key=s3_key,
+                UploadId=upload_id,
+                MultipartUpload={
+                    'Parts': [
+                        {'PartNumber': int(part['partNumber']), 'ETag': part['etag']}
+                        for part in sorted(parts, key=lambda p: int(p['partNumber']))
+                    ]
+                }
+            )
+        except ClientError as e:
+            if self._is_invalid_upload(e):
+                raise ValueError(f"Invalid multipart upload: {e.response['Error'].get('Message', '')}")
+            logger.error(
+                "Failed to complete multipart upload",
+                extra={
+                    "puzzle_id": puzzle_id,
+                    "user_id": user_id,
+                    "upload_id": upload_id,
+                    "error": str(e)
+                }
+            )
+            raise
+
+        return {
+            'puzzleId': puzzle_id,
+            'size': total_size,
+            'message': 'Image uploaded successfully'
+        }
+
+    def abort_multipart_upload(
+        self,
+        puzzle_id: str,
+        upload_id: str,
+        user_id: str = 'anonymous'
+    ) -> None:
+        """
+        Abort a multipart upload and discard its parts
+
+        Raises:
+            ValueError: If the puzzle or upload is not found
+            ClientError: If AWS operation fails
+        """
+        s3_key = self._uploaded_key(user_id, puzzle_id)
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.s3_bucket_name,
+                Key=s3_key,
+                UploadId=upload_id
+            )
+        except ClientError as e:
+            if self._is_invalid_upload(e):
+                raise UploadNotFoundError(f"Upload not found: {upload_id}")
+            raise
+
+    def _upload_target(self, puzzle_id: str, file_name: str) -> Tuple[str, str]:
+        """ファイル名からS3キーとContent-Typeを決める"""
+        file_extension = file_name.split('.')[-1].lower() if '.' in file_name else 'jpg'
+        s3_key = f"puzzles/{puzzle_id}.{file_extension}"
+        # 拡張子から正しいMIME typeを取得
+        return s3_key, self.UPLOAD_CONTENT_TYPES.get(file_extension, 'image/jpeg')
+
+    def _record_upload(self, user_id: str, puzzle_id: str, file_name: str, s3_key: str) -> None:
+        """
+        ファイル情報でパズルレコードを更新
+
+        Raises:
+            PuzzleNotFoundError: If puzzle not found
+        """
+        # 存在確認は条件式で行い、確認と更新を1リクエストにまとめる（get_itemとの競合もなくす）
         current_time = datetime.utcnow().isoformat()
 
         try:
@@ -189,6 +477,7 @@ class PuzzleService:
                     'puzzleId': puzzle_id
                 },
                 UpdateExpression='SET fileName = :fn, s3Key = :s3k, #status = :st, updatedAt = :ua',
+                ConditionExpression='attribute_exists(puzzleId)',
                 ExpressionAttributeNames={
                     '#status': 'status'
                 },
@@ -199,7 +488,10 @@ class PuzzleService:
                     ':ua': current_time
                 }
             )
+            self._invalidate_puzzle(user_id, puzzle_id)
         except ClientError as e:
+            if self._is_condition_failed(e):
+                raise PuzzleNotFoundError(f"Puzzle not found: {puzzle_id}")
             logger.error(
                 "Failed to update puzzle in DynamoDB",
                 extra={
@@ -210,23 +502,51 @@ class PuzzleService:
             )
             raise  # 元のエラーをそのまま再raise
 
-        logger.info(
-            "Generated upload URL successfully",
-            extra={
-                "puzzle_id": puzzle_id,
-                "user_id": user_id,
-                "file_name": file_name,
-                "s3_key": s3_key
+    def _uploaded_key(self, user_id: str, puzzle_id: str) -> str:
+        """アップロード先として記録済みのS3キー（所有者の確認を兼ねる）"""
+        puzzle = self.get_puzzle(user_id, puzzle_id)
+        if not puzzle or not puzzle.get('s3Key'):
+            raise PuzzleNotFoundError(f"Puzzle not found: {puzzle_id}")
+        return puzzle['s3Key']
+
+    def _list_uploaded_parts(self, s3_key: str, upload_id: str) -> List[Dict[str, Any]]:
+        """アップロード済みのパートをすべて取得"""
+        parts: List[Dict[str, Any]] = []
+        try:
+            paginator = self.s3_client.get_paginator('list_parts')
+            for page in paginator.paginate(Bucket=self.s3_bucket_name, Key=s3_key, UploadId=upload_id):
+                parts.extend(page.get('Parts', []))
+        except ClientError as e:
+            if self._is_invalid_upload(e):
+                raise UploadNotFoundError(f"Upload not found: {upload_id}")
+            raise
+        return parts
+
+    def _presign_parts(self, s3_key: str, upload_id: str, part_numbers: Iterable[int]) -> List[Dict[str, Any]]:
+        """パートごとのアップロードURLを作成"""
+        return [
+            {
+                'partNumber': part_number,
+                'url': self.s3_client.generate_presigned_url(
+                    'upload_part',
+                    Params={
+                        'Bucket': self.s3_bucket_name,
+                        'Key': s3_key,
+                        'UploadId': upload_id,
+                        'PartNumber': part_number
+                    },
+                    ExpiresIn=self.UPLOAD_URL_EXPIRES_IN
+                )
             }
-        )
+            for part_number in part_numbers
+        ]
 
-        # 成功レスポンスを返す
-        return {
-            'puzzleId': puzzle_id,
-            'uploadUrl': presigned_url,
-            'expiresIn': 900,
-            'message': 'Pre-signed URL generated successfully. Upload your image to this URL within 15 minutes.'
-        }
+    @staticmethod
+    def _is_invalid_upload(error: ClientError) -> bool:
+        """存在しない・完了済みのアップロードや不正なパート指定か"""
+        return error.response.get('Error', {}).get('Code') in (
+            'NoSuchUpload', 'InvalidPart', 'InvalidPartOrder', 'EntityTooSmall'
+        )
 
     def get_puzzle(self, user_id: str, puzzle_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -238,7 +558,15 @@ class PuzzleService:
 
         Returns:
             Puzzle information or None if not found
+
+        キャッシュが有効な場合はTTL内の結果を再利用します（見つからない結果はキャッシュしない）。
         """
+        cache_key = puzzle_cache_key(user_id, puzzle_id)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
             response = self.puzzles_table.get_item(
                 Key={
@@ -246,7 +574,10 @@ class PuzzleService:
                     'puzzleId': puzzle_id
                 }
             )
-            return response.get('Item')
+            item = response.get('Item')
+            if item is not None and self.cache is not None:
+                self.cache.set(cache_key, item)
+            return item
         except ClientError as e:
             logger.error(
                 "Error getting puzzle",
@@ -262,20 +593,31 @@ class PuzzleService:
         """
         List all puzzles for a user
 
+        LastEvaluatedKey を辿って全ページを取得します（1MB上限で切り捨てない）。
+
         Args:
             user_id: User ID
 
         Returns:
             List of puzzles
         """
+        items: List[Dict[str, Any]] = []
+        query_kwargs: Dict[str, Any] = {
+            'KeyConditionExpression': 'userId = :uid',
+            'ExpressionAttributeValues': {
+                ':uid': user_id
+            }
+        }
+
         try:
-            response = self.puzzles_table.query(
-                KeyConditionExpression='userId = :uid',
-                ExpressionAttributeValues={
-                    ':uid': user_id
-                }
-            )
-            return response.get('Items', [])
+            while True:
+                response = self.puzzles_table.query(**query_kwargs)
+                items.extend(response.get('Items', []))
+
+                last_key = response.get('LastEvaluatedKey')
+                if not last_key:
+                    return items
+                query_kwargs['ExclusiveStartKey'] = last_key
         except ClientError as e:
             logger.error(
                 "Error listing puzzles",
@@ -286,6 +628,130 @@ class PuzzleService:
             )
             return []
 
+    def list_puzzles_page(
+        self,
+        user_id: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        next_token: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        newest_first: bool = True
+    ) -> Dict[str, Any]:
+        """
+        List one page of a user's puzzles ordered by creation time
+
+        CreatedAtIndex (userId, createdAt) をクエリし、続きは不透明な
+        継続トークン（nextToken）で取得します。
+
+        Args:
+            user_id: User ID
+            limit: Page size (1 - MAX_PAGE_SIZE)
+            next_token: Continuation token returned by the previous page
+            fields: Attributes to return (default: all attributes)
+            newest_first: Sort by createdAt descending if True
+
+        Returns:
+            Dictionary containing 'items' and 'nextToken' (None on the last page)
+
+        Raises:
+            ValueError: If limit, next_token or fields is invalid
+            ClientError: If AWS operation fails
+        """
+        if not 1 <= limit <= self.MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {self.MAX_PAGE_SIZE}")
+
+        query_kwargs: Dict[str, Any] = {
+            'IndexName': self.CREATED_AT_INDEX,
+            'KeyConditionExpression': 'userId = :uid',
+            'ExpressionAttributeValues': {
+                ':uid': user_id
+            },
+            'ScanIndexForward': not newest_first,
+            'Limit': limit
+        }
+
+        if next_token:
+            query_kwargs['ExclusiveStartKey'] = self._decode_page_token(next_token, user_id)
+
+        if fields:
+            unknown = set(fields) - set(self.LIST_VIEW_FIELDS)
+            if unknown:
+                raise ValueError(f"Unsupported fields: {', '.join(sorted(unknown))}")
+            # status等の予約語を避けるため、属性名はすべてプレースホルダー経由で指定
+            names = {f"#f{i}": field for i, field in enumerate(fields)}
+            query_kwargs['ProjectionExpression'] = ', '.join(names)
+            query_kwargs['ExpressionAttributeNames'] = names
+
+        try:
+            response = self.puzzles_table.query(**query_kwargs)
+        except ClientError as e:
+            logger.error(
+                "Error listing puzzles page",
+                extra={
+                    "user_id": user_id,
+                    "error": str(e)
+                }
+            )
+            raise
+
+        last_key = response.get('LastEvaluatedKey')
+        return {
+            'items': response.get('Items', []),
+            'nextToken': self._encode_page_token(last_key) if last_key else None
+        }
+
+    @staticmethod
+    def _encode_page_token(last_evaluated_key: Dict[str, Any]) -> str:
+        """LastEvaluatedKeyを不透明なURLセーフ文字列に変換"""
+        raw = json.dumps(last_evaluated_key, separators=(',', ':'), default=str)
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def _decode_page_token(token: str, user_id: str) -> Dict[str, Any]:
+        """継続トークンをExclusiveStartKeyに戻す（他ユーザーのキーは拒否）"""
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        except (binascii.Error, UnicodeError, ValueError):
+            raise ValueError("Invalid nextToken")
+
+        if not isinstance(key, dict) or key.get('userId') != user_id:
+            raise ValueError("Invalid nextToken")
+        return key
+
+    def get_piece_manifest(self, puzzle: Dict[str, Any]) -> Optional[bytes]:
+        """
+        Get the columnar piece manifest written at split time
+
+        Args:
+            puzzle: Puzzle record returned by get_puzzle
+
+        Returns:
+            Manifest as stored in S3 (JSON bytes), or None if the puzzle has not been split
+
+        Raises:
+            ClientError: If the S3 read fails for a reason other than a missing object
+        """
+        key = puzzle.get('manifestKey')
+        if not key:
+            return None
+
+        try:
+            response = self.s3_client.get_object(Bucket=self.s3_bucket_name, Key=key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+                return None
+            logger.error(
+                "Failed to read piece manifest",
+                extra={
+                    "puzzle_id": puzzle.get('puzzleId'),
+                    "s3_key": key,
+                    "error": str(e)
+                }
+            )
+            raise
+
+        return response['Body'].read()
+
     def delete_puzzle(self, user_id: str, puzzle_id: str) -> Dict[str, Any]:
         """
         Delete a puzzle and its associated S3 image
@@ -298,16 +764,36 @@ class PuzzleService:
             Dictionary containing deletion confirmation
 
         Raises:
-            ValueError: If puzzle not found
+            PuzzleNotFoundError: If puzzle not found
             ClientError: If AWS operation fails
         """
-        # パズルの存在を確認
-        puzzle = self.get_puzzle(user_id, puzzle_id)
-        if not puzzle:
-            raise ValueError(f"Puzzle not found: {puzzle_id}")
+        # DynamoDBからパズルレコードを削除
+        # 存在確認は条件式で行い、削除前の属性（s3Key）もこの1リクエストで受け取る
+        try:
+            response = self.puzzles_table.delete_item(
+                Key={
+                    'userId': user_id,
+                    'puzzleId': puzzle_id
+                },
+                ConditionExpression='attribute_exists(puzzleId)',
+                ReturnValues='ALL_OLD'
+            )
+            self._invalidate_puzzle(user_id, puzzle_id)
+        except ClientError as e:
+            if self._is_condition_failed(e):
+                raise PuzzleNotFoundError(f"Puzzle not found: {puzzle_id}")
+            logger.error(
+                "Failed to delete puzzle from DynamoDB",
+                extra={
+                    "puzzle_id": puzzle_id,
+                    "user_id": user_id,
+                    "error": str(e)
+                }
+            )
+            raise
 
         # S3から画像を削除（存在する場合）
-        s3_key = puzzle.get('s3Key')
+        s3_key = response.get('Attributes', {}).get('s3Key')
         if s3_key:
             try:
                 self.s3_client.delete_object(
@@ -332,19 +818,66 @@ class PuzzleService:
                         "error": str(e)
                     }
                 )
-                # S3削除失敗はエラーとせず継続（DynamoDBレコードは削除）
+                # S3削除失敗はエラーとせず継続（DynamoDBレコードは削除済み）
 
-        # DynamoDBからパズルレコードを削除
+        # 分割済みピース（S3オブジェクトとDynamoDBアイテム）を削除
+        # 失敗してもレコードは削除済みのため、ログを残して継続
+        purged = self._purge_piece_assets_logged(puzzle_id) or {'deletedObjects': 0, 'deletedItems': 0}
+
+        logger.info(
+            "Deleted puzzle successfully",
+            extra={
+                "puzzle_id": puzzle_id,
+                "user_id": user_id,
+                "had_image": bool(s3_key),
+                **purged
+            }
+        )
+
+        return {
+            'puzzleId': puzzle_id,
+            'message': 'Puzzle deleted successfully',
+            **purged
+        }
+
+    def mark_puzzle_deleting(self, user_id: str, puzzle_id: str) -> Dict[str, Any]:
+        """
+        Mark a puzzle as 'deleting' before its assets are removed in the background
+
+        Args:
+            user_id: User ID
+            puzzle_id: Puzzle ID
+
+        Returns:
+            The updated puzzle record (contains s3Key if an image was uploaded)
+
+        Raises:
+            PuzzleNotFoundError: If puzzle not found
+            ClientError: If AWS operation fails
+        """
         try:
-            self.puzzles_table.delete_item(
+            response = self.puzzles_table.update_item(
                 Key={
                     'userId': user_id,
                     'puzzleId': puzzle_id
-                }
+                },
+                UpdateExpression='SET #status = :st, updatedAt = :ua',
+                ConditionExpression='attribute_exists(puzzleId)',
+                ExpressionAttributeNames={
+                    '#status': 'status'
+                },
+                ExpressionAttributeValues={
+                    ':st': 'deleting',
+                    ':ua': datetime.utcnow().isoformat()
+                },
+                ReturnValues='ALL_NEW'
             )
+            self._invalidate_puzzle(user_id, puzzle_id)
         except ClientError as e:
+            if self._is_condition_failed(e):
+                raise PuzzleNotFoundError(f"Puzzle not found: {puzzle_id}")
             logger.error(
-                "Failed to delete puzzle from DynamoDB",
+                "Failed to mark puzzle as deleting",
                 extra={
                     "puzzle_id": puzzle_id,
                     "user_id": user_id,
@@ -353,16 +886,309 @@ class PuzzleService:
             )
             raise
 
+        return response.get('Attributes', {})
+
+    def finish_puzzle_deletion(
+        self,
+        user_id: str,
+        puzzle_id: str,
+        s3_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Remove all assets of a 'deleting' puzzle, then the record itself
+
+        バックグラウンドワーカーから呼ばれます。各ステップは冪等で、
+        失敗時は例外を送出するため、呼び出し側でそのまま再試行できます。
+
+        Args:
+            user_id: User ID
+            puzzle_id: Puzzle ID
+            s3_key: S3 key of the source image (if uploaded)
+
+        Returns:
+            Dictionary containing removed object/item counts
+
+        Raises:
+            ClientError: If AWS operation fails
+        """
+        purged = self.purge_piece_assets(puzzle_id)
+
+        if s3_key:
+            # delete_objectは存在しないキーでも成功するため再試行しても安全
+            self.s3_client.delete_object(Bucket=self.s3_bucket_name, Key=s3_key)
+            purged['deletedObjects'] += 1
+
+        # 最後にレコードを削除（ここまで成功した場合のみ "deleting" が消える）
+        self.puzzles_table.delete_item(
+            Key={
+                'userId': user_id,
+                'puzzleId': puzzle_id
+            }
+        )
+        self._invalidate_puzzle(user_id, puzzle_id)
+
         logger.info(
-            "Deleted puzzle successfully",
+            "Finished background puzzle deletion",
             extra={
                 "puzzle_id": puzzle_id,
                 "user_id": user_id,
-                "had_image": bool(s3_key)
+                **purged
+            }
+        )
+
+        return {'puzzleId': puzzle_id, **purged}
+
+    def delete_puzzles(self, user_id: str, puzzle_ids: Sequence[str]) -> Dict[str, Any]:
+        """
+        Delete multiple puzzles and all of their assets in batches
+
+        レコードは batch_get_item / BatchWriteItem でまとめて削除し、
+        画像とピースの削除はパズルごとに並列実行します。
+        レコードの削除後にピースの削除に失敗したパズルは、ログに残して purgeFailed で返します。
+
+        Args:
+            user_id: User ID
+            puzzle_ids: Puzzle IDs to delete (up to MAX_BULK_DELETE)
+
+        Returns:
+            Dictionary containing deleted / not found / purge-failed IDs and removed object/item counts
+
+        Raises:
+            ValueError: If too many IDs are given
+            ClientError: If AWS operation on puzzle records fails
+        """
+        unique_ids = list(dict.fromkeys(puzzle_ids))
+        if len(unique_ids) > self.MAX_BULK_DELETE:
+            raise ValueError(f"Cannot delete more than {self.MAX_BULK_DELETE} puzzles at once")
+
+        # 存在するレコードと元画像のキーを一括取得
+        found: Dict[str, Optional[str]] = {}
+        for chunk in _chunks(unique_ids, self.DYNAMODB_GET_BATCH_SIZE):
+            for item in self._batch_get_puzzles(user_id, chunk):
+                found[item['puzzleId']] = item.get('s3Key')
+
+        # レコードを一括削除（BatchWriteItemは25件ずつ、未処理分はbatch_writerが再送）
+        try:
+            with self.puzzles_table.batch_writer() as batch:
+                for puzzle_id in found:
+                    batch.delete_item(Key={'userId': user_id, 'puzzleId': puzzle_id})
+        except ClientError as e:
+            logger.error(
+                "Failed to batch delete puzzles from DynamoDB",
+                extra={
+                    "user_id": user_id,
+                    "puzzle_count": len(found),
+                    "error": str(e)
+                }
+            )
+            raise
+
+        for puzzle_id in found:
+            self._invalidate_puzzle(user_id, puzzle_id)
+
+        # 元画像とピースをパズル単位で並列削除
+        deleted_objects = 0
+        deleted_items = 0
+        with ThreadPoolExecutor(max_workers=self.DELETE_WORKERS) as executor:
+            source_keys = [key for key in found.values() if key]
+            results = list(executor.map(bind_metrics(self._purge_piece_assets_logged), found))
+            deleted_objects += self._delete_s3_keys(source_keys, executor)
+
+        purge_failed: List[str] = []
+        for puzzle_id, result in zip(found, results):
+            if result is None:
+                purge_failed.append(puzzle_id)
+                continue
+            deleted_objects += result['deletedObjects']
+            deleted_items += result['deletedItems']
+
+        not_found = [puzzle_id for puzzle_id in unique_ids if puzzle_id not in found]
+
+        logger.info(
+            "Bulk deleted puzzles",
+            extra={
+                "user_id": user_id,
+                "deleted": len(found),
+                "not_found": len(not_found),
+                "purge_failed": len(purge_failed),
+                "deleted_objects": deleted_objects,
+                "deleted_items": deleted_items
             }
         )
 
         return {
-            'puzzleId': puzzle_id,
-            'message': 'Puzzle deleted successfully'
+            'deleted': list(found),
+            'notFound': not_found,
+            'purgeFailed': purge_failed,
+            'deletedObjects': deleted_objects,
+            'deletedItems': deleted_items
+        }
+
+    def purge_piece_assets(self, puzzle_id: str) -> Dict[str, int]:
+        """
+        Delete all piece objects (pieces/{puzzle_id}/), profiles (profiles/{puzzle_id}/)
+        and piece items of a puzzle
+
+        S3とDynamoDBの削除は並列に実行します。何度実行しても安全です（冪等）。
+
+        Args:
+            puzzle_id: Puzzle ID
+
+        Returns:
+            Dictionary containing 'deletedObjects' and 'deletedItems' counts
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            objects_future = executor.submit(bind_metrics(self._delete_piece_objects), puzzle_id)
+            items_future = executor.submit(bind_metrics(self._delete_piece_items), puzzle_id)
+            return {
+                'deletedObjects': objects_future.result(),
+                'deletedItems': items_future.result()
+            }
+
+    def _purge_piece_assets_logged(self, puzzle_id: str) -> Optional[Dict[str, int]]:
+        """purge_piece_assets を実行し、失敗したらログに残してNoneを返す（レコードの削除後に呼ぶため）"""
+        try:
+            return self.purge_piece_assets(puzzle_id)
+        except ClientError as e:
+            logger.error(
+                "Failed to purge piece assets",
+                extra={
+                    "puzzle_id": puzzle_id,
+                    "error": str(e)
+                }
+            )
+            return None
+
+    def _batch_get_puzzles(self, user_id: str, puzzle_ids: Sequence[str]) -> List[Dict[str, Any]]:
+        """batch_get_itemでパズルレコード（puzzleId, s3Key のみ）を取得"""
+        request: Dict[str, Any] = {
+            self.puzzles_table_name: {
+                'Keys': [{'userId': user_id, 'puzzleId': puzzle_id} for puzzle_id in puzzle_ids],
+                'ProjectionExpression': 'puzzleId, s3Key'
+            }
         }
+        items: List[Dict[str, Any]] = []
+
+        try:
+            while request:
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+                items.extend(response.get('Responses', {}).get(self.puzzles_table_name, []))
+                request = response.get('UnprocessedKeys') or {}
+        except ClientError as e:
+            logger.error(
+                "Failed to batch get puzzles",
+                extra={
+                    "user_id": user_id,
+                    "error": str(e)
+                }
+            )
+            raise
+
+        return items
+
+    def _delete_piece_objects(self, puzzle_id: str) -> int:
+        """pieces/{puzzle_id}/ と profiles/{puzzle_id}/ 配下のS3オブジェクトを1000件ずつ削除"""
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        keys = [
+            obj['Key']
+            for prefix in (f"pieces/{puzzle_id}/", profile_prefix(puzzle_id))
+            for page in paginator.paginate(Bucket=self.s3_bucket_name, Prefix=prefix)
+            for obj in page.get('Contents', [])
+        ]
+        return self._delete_s3_keys(keys)
+
+    def _delete_s3_keys(self, keys: Sequence[str], executor: Optional[ThreadPoolExecutor] = None) -> int:
+        """
+        S3オブジェクトをdelete_objectsで一括削除
+
+        Returns:
+            Number of objects actually deleted (errors are logged and skipped)
+        """
+        chunks = list(_chunks(keys, self.S3_DELETE_BATCH_SIZE))
+        if executor is not None and len(chunks) > 1:
+            return sum(executor.map(bind_metrics(self._delete_s3_chunk), chunks))
+        return sum(self._delete_s3_chunk(chunk) for chunk in chunks)
+
+    def _delete_s3_chunk(self, keys: Sequence[str]) -> int:
+        """1000件以下のキーを1リクエストで削除"""
+        try:
+            response = self.s3_client.delete_objects(
+                Bucket=self.s3_bucket_name,
+                Delete={
+                    'Objects': [{'Key': key} for key in keys],
+                    'Quiet': True
+                }
+            )
+        except ClientError as e:
+            logger.error(
+                "Failed to delete S3 objects",
+                extra={
+                    "object_count": len(keys),
+                    "error": str(e)
+                }
+            )
+            return 0
+
+        errors = response.get('Errors', [])
+        if errors:
+            logger.error(
+                "Some S3 objects could not be deleted",
+                extra={
+                    "error_count": len(errors),
+                    "first_error": errors[0]
+                }
+            )
+        return len(keys) - len(errors)
+
+    def _delete_piece_items(self, puzzle_id: str) -> int:
+        """ピーステーブルから該当パズルのアイテムをBatchWriteItemで削除"""
+        if self.pieces_table is None:
+            return 0
+
+        query_kwargs: Dict[str, Any] = {
+            'KeyConditionExpression': 'puzzleId = :pid',
+            'ExpressionAttributeValues': {':pid': puzzle_id},
+            'ProjectionExpression': 'pieceId'
+        }
+        deleted = 0
+
+        try:
+            with self.pieces_table.batch_writer() as batch:
+                while True:
+                    response = self.pieces_table.query(**query_kwargs)
+                    for item in response.get('Items', []):
+                        batch.delete_item(Key={'puzzleId': puzzle_id, 'pieceId': item['pieceId']})
+                        deleted += 1
+
+                    last_key = response.get('LastEvaluatedKey')
+                    if not last_key:
+                        break
+                    query_kwargs['ExclusiveStartKey'] = last_key
+        except ClientError as e:
+            logger.error(
+                "Failed to delete piece items",
+                extra={
+                    "puzzle_id": puzzle_id,
+                    "deleted": deleted,
+                    "error": str(e)
+                }
+            )
+            raise
+
+        return deleted
+
+    def _invalidate_puzzle(self, user_id: str, puzzle_id: str) -> None:
+        """書き込み後にget_puzzleのキャッシュを無効化"""
+        if self.cache is not None:
+            self.cache.delete(puzzle_cache_key(user_id, puzzle_id))
+
+    @staticmethod
+    def _is_condition_failed(error: ClientError) -> bool:
+        """ConditionExpressionを満たさなかった（= レコードが存在しない）エラーか判定"""
+        return error.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException'
+
+
+def _chunks(values: Sequence[str], size: int) -> Iterator[Sequence[str]]:
+    """シーケンスをsize件ずつに分割"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
@@ -0,0 +1,165 @@
+"""
+Image worker Lambda handler
+
+画像分割・削除などの重い処理を担当するワーカーLambdaのエントリーポイントです。
+APIパッケージとは別にデプロイされ、Pillowを含むのはこちらのパッケージだけです。
+FastAPI（app.api）には依存しないため、ワーカーのコールドスタートにAPIの初期化コストは含まれません。
+
+受け付けるイベント:
+- SQSイベント: 各メッセージの "type" で振り分け（"split" / "delete"、省略時は削除ジョブ）
+- 直接呼び出し: {"type": "split", "userId", "puzzleId", "s3Key", "pieceCount"}（"profile": true でプロファイルを保存）
+"""
+
+import json
+from functools import lru_cache
+from typing import Any, Dict, List
+
+from app.core.cache import create_puzzle_cache
+from app.core.config import settings
+from app.core.logger import flush_logs, setup_logger
+from app.core.profiling import create_profiling_policy
+from app.services.deletion_queue import run_deletion_job
+from app.services.image_processor import ImageProcessor
+from app.services.puzzle_service import PuzzleNotFoundError, PuzzleService
+
+# ロガーの初期化
+logger = setup_logger(__name__)
+
+
+def build_split_job(
+    user_id: str,
+    puzzle_id: str,
+    s3_key: str,
+    piece_count: int,
+    profile: bool = False
+) -> Dict[str, Any]:
+    """ワーカーに送る画像分割ジョブを作成（profile=True でプロファイルを保存、PROFILING_TOKEN の設定が必要）"""
+    job: Dict[str, Any] = {
+        'type': 'split',
+        'userId': user_id,
+        'puzzleId': puzzle_id,
+        's3Key': s3_key,
+        'pieceCount': piece_count
+    }
+    if profile:
+        job['profile'] = True
+    return job
+
+
+@lru_cache(maxsize=None)
+def get_image_processor() -> ImageProcessor:
+    """
+    プロセス共有のImageProcessorを返す（ウォームスタート時は再利用）
+
+    ワーカーでの無効化がAPIに届くのは共有キャッシュ（redis）の場合だけです。
+    プロセス内キャッシュを作っても自分自身しか無効化できないため、それ以外ではキャッシュを渡しません。
+    """
+    return ImageProcessor(
+        s3_bucket_name=settings.s3_bucket_name,
+        pieces_table_name=settings.pieces_table_name,
+        puzzles_table_name=settings.puzzles_table_name,
+        cache=create_puzzle_cache(settings) if settings.puzzle_cache_backend == 'redis' else None,
+        metrics_namespace=settings.metrics_namespace or None,
+        profiling=create_profiling_policy(settings),
+        max_pixels=settings.image_max_pixels
+    )
+
+
+@lru_cache(maxsize=None)
+def get_puzzle_service() -> PuzzleService:
+    """プロセス共有のPuzzleServiceを返す（削除ジョブ用）"""
+    return PuzzleService(
+        s3_bucket_name=settings.s3_bucket_name,
+        puzzles_table_name=settings.puzzles_table_name,
+        pieces_table_name=settings.pieces_table_name,
+        environment=settings.environment
+    )
+
+
+def reset_workers() -> None:
+    """キャッシュ済みのサービスを破棄する（テスト用）"""
+    get_image_processor.cache_clear()
+    get_puzzle_service.cache_clear()
+
+
+def run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    ジョブ1件を種類に応じて実行
+
+    Args:
+        job: Job payload ("type" is "split" or "delete")
+
+    Returns:
+        Result of the underlying service call
+
+    Raises:
+        ValueError: If the job type is unknown
+    """
+    try:
+        return _run_job(job)
+    except PuzzleNotFoundError:
+        # 処理中・処理前にパズルが削除された場合は再試行しても意味がないため、成功扱いで破棄する
+        logger.info(
+            "Puzzle no longer exists, dropping job",
+            extra={
+                "puzzle_id": job.get('puzzleId'),
+                "user_id": job.get('userId'),
+                "job_type": job.get('type', 'delete')
+            }
+        )
+        return {'puzzleId': job.get('puzzleId'), 'status': 'dropped'}
+
+
+def _run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    job_type = job.get('type', 'delete')
+
+    if job_type == 'split':
+        return get_image_processor().split_image(
+            puzzle_id=job['puzzleId'],
+            user_id=job['userId'],
+            s3_key=job['s3Key'],
+            piece_count=int(job['pieceCount']),
+            profile=bool(job.get('profile', False))
+        )
+
+    if job_type == 'delete':
+        return run_deletion_job(get_puzzle_service(), job)
+
+    raise ValueError(f"Unsupported job type: {job_type}")
+
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Lambdaハンドラー
+
+    SQSイベントでは失敗したメッセージだけを batchItemFailures で返し、
+    成功したメッセージが再配信されないようにします（ReportBatchItemFailures が必要）。
+    """
+    try:
+        return _handle(event)
+    finally:
+        # 応答を返すと実行環境が凍結されるため、キューに残ったログをここで書き出す
+        flush_logs()
+
+
+def _handle(event: Dict[str, Any]) -> Dict[str, Any]:
+    records = event.get('Records')
+    if records is None:
+        return run_job(event)
+
+    failures: List[Dict[str, str]] = []
+    for record in records:
+        message_id = record.get('messageId', '')
+        try:
+            run_job(json.loads(record['body']))
+        except Exception as e:
+            logger.error(
+                "Worker job failed",
+                extra={
+                    "message_id": message_id,
+                    "error": str(e)
+                }
+            )
+            failures.append({'itemIdentifier': message_id})
+
+    return {'batchItemFailures': failures}
@@ -0,0 +1,10 @@
+"""
+Performance benchmarks
+
+ローカル（moto上のS3/DynamoDB）で実行する性能計測スクリプトです。
+結果はJSONで保存し、ブランチ間の比較（compare）で性能の劣化を検出します。
+
+    cd backend
+    python -m benchmarks.split_pipeline run --output results/split-main.json
+    python -m benchmarks.load_test run --output results/load-main.json
+"""
@@ -0,0 +1,239 @@
+"""
+Benchmark helpers
+
+ベンチマーク共通の処理です。
+- moto上にテストと同じS3バケット・DynamoDBテーブルを作成
+- 合成画像の生成
+- ピークRSS・実行環境の取得
+- 結果JSONの保存と比較（劣化の検出）
+"""
+
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+BUCKET_NAME = 'bench-bucket'
+PUZZLES_TABLE_NAME = 'bench-puzzles'
+PIECES_TABLE_NAME = 'bench-pieces'
+REGION = 'ap-northeast-1'
+
+RESULT_VERSION = 1
+
+
+def configure_environment() -> None:
+    """moto用の認証情報とリソース名を環境変数に設定（app.core.config のインポート前に呼ぶ）"""
+    os.environ.update({
+        'AWS_ACCESS_KEY_ID': 'testing',
+        'AWS_SECRET_ACCESS_KEY': 'testing',
+        'AWS_DEFAULT_REGION': REGION,
+        'AWS_REGION': REGION,
+        'ENVIRONMENT': 'test',
+        'LOG_LEVEL': os.environ.get('LOG_LEVEL', 'WARNING'),
+        'S3_BUCKET_NAME': BUCKET_NAME,
+        'PUZZLES_TABLE_NAME': PUZZLES_TABLE_NAME,
+        'PIECES_TABLE_NAME': PIECES_TABLE_NAME,
+    })
+
+
+def create_resources() -> None:
+    """moto上にバケットとテーブルを作成（本番と同じキー・GSI構成）"""
+    import boto3
+
+    dynamodb = boto3.resource('dynamodb', region_name=REGION)
+    dynamodb.create_table(
+        TableName=PUZZLES_TABLE_NAME,
+        KeySchema=[
+            {'AttributeName': 'userId', 'KeyType': 'HASH'},
+            {'AttributeName': 'puzzleId', 'KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'userId', 'AttributeType': 'S'},
+            {'AttributeName': 'puzzleId', 'AttributeType': 'S'},
+            {'AttributeName': 'createdAt', 'AttributeType': 'S'}
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                'IndexName': 'CreatedAtIndex',
+                'KeySchema': [
+                    {'AttributeName': 'userId', 'KeyType': 'HASH'},
+                    {'AttributeName': 'createdAt', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'}
+            }
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    dynamodb.create_table(
+        TableName=PIECES_TABLE_NAME,
+        KeySchema=[
+            {'AttributeName': 'puzzleId', 'KeyType': 'HASH'},
+            {'AttributeName': 'pieceId', 'KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'puzzleId', 'AttributeType': 'S'},
+            {'AttributeName': 'pieceId', 'AttributeType': 'S'}
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    boto3.client('s3', region_name=REGION).create_bucket(
+        Bucket=BUCKET_NAME,
+        CreateBucketConfiguration={'LocationConstraint': REGION}
+    )
+
+
+@contextmanager
+def mocked_aws() -> Iterator[None]:
+    """motoを有効にしてリソースを作成"""
+    from moto import mock_aws
+
+    configure_environment()
+    with mock_aws():
+        create_resources()
+        yield
+
+
+def synthetic_jpeg(width: int, height: int, quality: int = 90) -> bytes:
+    """
+    写真に近い圧縮率になる合成画像（グラデーション + ノイズ）
+
+    単色画像はJPEGのデコード・エンコードが極端に速く、実際の写真の計測にならないため。
+    """
+    from PIL import Image
+
+    horizontal = Image.linear_gradient('L').rotate(90).resize((width, height))
+    vertical = Image.linear_gradient('L').resize((width, height))
+    noise = Image.effect_noise((width, height), 48)
+    image = Image.merge('RGB', (horizontal, vertical, noise))
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def parse_resolution(value: str) -> Tuple[int, int]:
+    """"4032x3024" → (4032, 3024)"""
+    width, _, height = value.lower().partition('x')
+    return int(width), int(height)
+
+
+def peak_rss_mb() -> float:
+    """このプロセスのピークRSS（MB）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linuxはキロバイト、macOSはバイト単位
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+
+def environment_info() -> Dict[str, Any]:
+    """結果の比較時に確認する実行環境"""
+    info: Dict[str, Any] = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpuCount': os.cpu_count(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+    }
+    try:
+        import PIL
+
+        info['pillow'] = PIL.__version__
+    except ImportError:  # pragma: no cover - ロードテストではPillowは不要
+        pass
+    try:
+        info['gitCommit'] = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        info['gitCommit'] = None
+    return info
+
+
+def write_results(path: str, benchmark: str, cases: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """結果をJSONで保存（path が "-" なら標準出力）"""
+    payload = {
+        'version': RESULT_VERSION,
+        'benchmark': benchmark,
+        'environment': environment_info(),
+        'cases': cases,
+    }
+    text = json.dumps(payload, indent=2, ensure_ascii=False)
+    if path == '-':
+        print(text)
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    return payload
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(
+    base: Dict[str, Any],
+    head: Dict[str, Any],
+    key_fields: Sequence[str],
+    metrics: Dict[str, bool],
+    threshold: float
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Compare two result files case by case
+
+    Args:
+        base: Results of the baseline branch
+        head: Results of the branch under test
+        key_fields: Fields identifying a case (e.g. resolution, pieces)
+        metrics: Metric name -> True if lower is better (time, memory), False if higher is better
+        threshold: Relative change treated as a regression (0.1 = 10%)
+
+    Returns:
+        Tuple of (rows with base/head/change per metric, whether any metric regressed)
+    """
+    def key(case: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(case.get(field) for field in key_fields)
+
+    base_cases = {key(case): case for case in base['cases']}
+    rows: List[Dict[str, Any]] = []
+    regressed = False
+
+    for case in head['cases']:
+        previous = base_cases.get(key(case))
+        if previous is None:
+            continue
+        for metric, lower_is_better in metrics.items():
+            old, new = previous.get(metric), case.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change > threshold if lower_is_better else change < -threshold
+            regressed = regressed or worse
+            rows.append({
+                'case': dict(zip(key_fields, key(case))),
+                'metric': metric,
+                'base': old,
+                'head': new,
+                'change': round(change, 4),
+                'regression': worse,
+            })
+
+    return rows, regressed
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> None:
+    """比較結果を表形式で出力"""
+    for row in rows:
+        case = ' '.join(f"{name}={value}" for name, value in row['case'].items())
+        mark = '  REGRESSION' if row['regression'] else ''
+        print(
+            f"{case:<40} {row['metric']:<16} {row['base']:>12} -> {row['head']:>12} "
+            f"({row['change']:+.1%}){mark}"
+        )
@@ -0,0 +1,532 @@
+"""
+API load test
+
+FastAPIアプリ（app/api/main.py, app/api/routes/puzzles.py）のエンドポイントに並列でリクエストを送り、
+エンドポイントごとのレイテンシ（p50/p95/p99）とスループット（requests/sec）を計測します。
+S3/DynamoDBはmotoを使うため、デプロイやAWSの認証情報は不要です。
+
+サーバーは2種類:
+- uvicorn: スレッドで起動したuvicornにHTTP（keep-alive）で並列リクエスト
+- mangum:  lambda/puzzle-register/index.py の handler にAPI Gateway（REST API）のイベントを直接渡す
+           （Lambdaと同じく1コンテナ1リクエストずつ、逐次実行）
+
+各サーバーは別プロセスで起動し、次の順に計測します。
+- cold: アプリのインポート時間（import）と、起動直後の各エンドポイントの最初の1リクエスト
+        （サービス・boto3クライアントの生成やキャッシュの初回ミスを含む）
+- warm: ウォームアップ後、--requests 件を --concurrency 並列で送信
+
+motoがboto3を先にインポートするため、import の時間にはboto3のインポートは含まれません。
+キャッシュ設定の比較には --env で子プロセスの環境変数を指定してください。
+
+使い方（backend ディレクトリで実行）:
+    python -m benchmarks.load_test run --output results/load.json
+    python -m benchmarks.load_test run --servers mangum --requests 200 --env PUZZLE_CACHE_BACKEND=none --output -
+    python -m benchmarks.load_test compare results/main.json results/branch.json --threshold 0.1
+"""
+
+import argparse
+import http.client
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+from benchmarks.common import (
+    compare_results,
+    load_results,
+    mocked_aws,
+    print_comparison,
+    write_results,
+)
+
+SERVERS = ['uvicorn', 'mangum']
+ENDPOINTS = ['health', 'list', 'get', 'manifest', 'piece-urls', 'create', 'upload-url']
+
+DEFAULT_REQUESTS = 500
+DEFAULT_CONCURRENCY = 8
+DEFAULT_WARMUP = 20
+# 一覧に表示するパズル数と、マニフェストを持つパズルのピース数
+SEED_PUZZLES = 50
+SEED_GRID = (20, 25)
+
+USER_ID = 'load-user'
+
+# compare で劣化とみなす指標（True: 小さいほど良い）
+COMPARE_METRICS = {
+    'p50Ms': True,
+    'p95Ms': True,
+    'p99Ms': True,
+    'rps': False,
+}
+
+LAMBDA_HANDLER_PATH = os.path.join(
+    os.path.dirname(__file__), '..', '..', 'lambda', 'puzzle-register', 'index.py'
+)
+
+
+class Request(NamedTuple):
+    """送信するリクエスト（path はクエリ文字列を含まない）"""
+    method: str
+    path: str
+    query: Dict[str, str]
+    body: Optional[Dict[str, Any]]
+
+
+# (ステータスコード, 経過時間[秒])
+Sender = Callable[[Request], Tuple[int, float]]
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """最近傍順位法のパーセンタイル（sorted_values は昇順）"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: Optional[float]) -> Dict[str, Any]:
+    """
+    Summarize latencies of one endpoint
+
+    Args:
+        latencies: Request latencies in seconds
+        errors: Requests with an unexpected status code
+        elapsed: Wall-clock seconds for all requests (None for cold requests)
+
+    Returns:
+        Dictionary with requests, errors, p50/p95/p99/mean/max in ms and requests/sec
+    """
+    ordered = sorted(latencies)
+    ms = [value * 1000 for value in ordered]
+    return {
+        'requests': len(ms),
+        'errors': errors,
+        'p50Ms': round(percentile(ms, 50), 2),
+        'p95Ms': round(percentile(ms, 95), 2),
+        'p99Ms': round(percentile(ms, 99), 2),
+        'meanMs': round(sum(ms) / len(ms), 2) if ms else 0.0,
+        'maxMs': round(ms[-1], 2) if ms else 0.0,
+        'rps': round(len(ms) / elapsed, 1) if elapsed else None,
+    }
+
+
+def seed_data() -> Dict[str, str]:
+    """
+    一覧・取得・マニフェスト用のパズルを作成
+
+    ピース画像は作らず、分割済みのパズルレコードとマニフェストだけを書き込みます（Pillow不要）。
+    """
+    import boto3
+
+    from app.core.config import settings
+    from app.core.manifest import build_manifest, encode_manifest, manifest_key
+
+    table = boto3.resource('dynamodb', region_name=settings.aws_region).Table(settings.puzzles_table_name)
+    s3_client = boto3.client('s3', region_name=settings.aws_region)
+    rows, cols = SEED_GRID
+
+    puzzle_ids = []
+    with table.batch_writer() as batch:
+        for index in range(SEED_PUZZLES):
+            puzzle_id = str(uuid.uuid4())
+            created_at = f"2026-01-01T00:00:{index:02d}"
+            batch.put_item(Item={
+                'userId': USER_ID,
+                'puzzleId': puzzle_id,
+                'puzzleName': f"load test {index}",
+                'pieceCount': rows * cols,
+                'status': 'completed',
+                'rows': rows,
+                'cols': cols,
+                'totalPieces': rows * cols,
+                'manifestKey': manifest_key(puzzle_id),
+                'createdAt': created_at,
+                'updatedAt': created_at,
+            })
+            puzzle_ids.append(puzzle_id)
+
+    completed_id = puzzle_ids[0]
+    pieces = [
+        {'pieceId': str(uuid.uuid4()), 'row': row, 'col': col,
+         'x': col * 100, 'y': row * 100, 'width': 100, 'height': 100}
+        for row in range(rows)
+        for col in range(cols)
+    ]
+    body, media_type = encode_manifest(
+        build_manifest(completed_id, rows, cols, cols * 100, rows * 100, pieces)
+    )
+    s3_client.put_object(
+        Bucket=settings.s3_bucket_name,
+        Key=manifest_key(completed_id),
+        Body=body,
+        ContentType=media_type
+    )
+
+    # アップロードURLの発行でステータスが変わるため、別のパズルを使う
+    pending_id = str(uuid.uuid4())
+    table.put_item(Item={
+        'userId': USER_ID,
+        'puzzleId': pending_id,
+        'puzzleName': 'load test upload',
+        'pieceCount': 300,
+        'status': 'pending',
+        'createdAt': '2026-01-01T00:01:00',
+        'updatedAt': '2026-01-01T00:01:00',
+    })
+
+    return {'completed': completed_id, 'pending': pending_id}
+
+
+def build_requests(seeded: Dict[str, str]) -> Dict[str, Request]:
+    """エンドポイント名ごとのリクエスト"""
+    completed, pending = seeded['completed'], seeded['pending']
+    owner = {'user_id': USER_ID}
+    return {
+        'health': Request('GET', '/', {}, None),
+        'list': Request('GET', f"/users/{USER_ID}/puzzles", {'view': 'summary'}, None),
+        'get': Request('GET', f"/puzzles/{completed}", owner, None),
+        'manifest': Request('GET', f"/puzzles/{completed}/manifest", owner, None),
+        'piece-urls': Request('GET', f"/puzzles/{completed}/piece-urls", owner, None),
+        'create': Request('POST', '/puzzles', {}, {'puzzleName': 'load test', 'pieceCount': 300}),
+        'upload-url': Request(
+            'POST', f"/puzzles/{pending}/upload", {}, {'fileName': 'photo.jpg', 'userId': USER_ID}
+        ),
+    }
+
+
+class UvicornTarget:
+    """スレッドで起動したuvicornにHTTPで送信（スレッドごとにkeep-alive接続を1本）"""
+
+    def __init__(self, app: Any) -> None:
+        import uvicorn
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(('127.0.0.1', 0))
+        self.port = self._socket.getsockname()[1]
+        self._server = uvicorn.Server(uvicorn.Config(app, log_level='warning', access_log=False))
+        self._thread = threading.Thread(
+            target=self._server.run, kwargs={'sockets': [self._socket]}, daemon=True
+        )
+        self._local = threading.local()
+
+    def start(self) -> None:
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+    def send(self, request: Request) -> Tuple[int, float]:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = http.client.HTTPConnection('127.0.0.1', self.port)
+            self._local.connection = connection
+
+        url = request.path + (f"?{urlencode(request.query)}" if request.query else '')
+        body = json.dumps(request.body) if request.body is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+
+        started = time.perf_counter()
+        connection.request(request.method, url, body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        return response.status, time.perf_counter() - started
+
+
+class MangumTarget:
+    """Lambdaのhandlerを直接呼び出す（API Gateway REST APIのプロキシ統合イベント）"""
+
+    def __init__(self, handler: Callable[[Dict[str, Any], Any], Dict[str, Any]]) -> None:
+        self._handler = handler
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def send(self, request: Request) -> Tuple[int, float]:
+        event = api_gateway_event(request)
+        context = SimpleNamespace(
+            function_name='puzzle-register',
+            aws_request_id=event['requestContext']['requestId'],
+            get_remaining_time_in_millis=lambda: 30000
+        )
+        started = time.perf_counter()
+        response = self._handler(event, context)
+        return response['statusCode'], time.perf_counter() - started
+
+
+def api_gateway_event(request: Request) -> Dict[str, Any]:
+    """API Gateway（REST API, プロキシ統合）からLambdaに渡されるイベント"""
+    headers = {'Host': 'api.example.com', 'Accept': 'application/json'}
+    if request.body is not None:
+        headers['Content-Type'] = 'application/json'
+    return {
+        'resource': '/{proxy+}',
+        'path': request.path,
+        'httpMethod': request.method,
+        'headers': headers,
+        'multiValueHeaders': {name: [value] for name, value in headers.items()},
+        'queryStringParameters': request.query or None,
+        'multiValueQueryStringParameters': {name: [value] for name, value in request.query.items()} or None,
+        'pathParameters': {'proxy': request.path.lstrip('/')},
+        'stageVariables': None,
+        'requestContext': {
+            'resourcePath': '/{proxy+}',
+            'httpMethod': request.method,
+            'path': f"/prod{request.path}",
+            'stage': 'prod',
+            'requestId': str(uuid.uuid4()),
+            'identity': {'sourceIp': '127.0.0.1'},
+        },
+        'body': json.dumps(request.body) if request.body is not None else None,
+        'isBase64Encoded': False,
+    }
+
+
+def load_target(server: str) -> Tuple[Any, float]:
+    """
+    Import the application the way the given server does
+
+    Returns:
+        Tuple of (target, import time in seconds)
+    """
+    started = time.perf_counter()
+    if server == 'mangum':
+        spec = importlib.util.spec_from_file_location('puzzle_register_handler', LAMBDA_HANDLER_PATH)
+        if spec is None or spec.loader is None:
+            raise FileNotFoundError(LAMBDA_HANDLER_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        target: Any = MangumTarget(module.handler)
+    elif server == 'uvicorn':
+        from app.api.main import app
+
+        target = UvicornTarget(app)
+    else:
+        raise ValueError(f"Unsupported server: {server}")
+    return target, time.perf_counter() - started
+
+
+def is_expected(status: int) -> bool:
+    return 200 <= status < 400
+
+
+def measure_warm(
+    send: Sender,
+    request: Request,
+    requests: int,
+    concurrency: int
+) -> Dict[str, Any]:
+    """requests 件を concurrency 並列で送信して集計"""
+    def worker(count: int) -> Tuple[List[float], int]:
+        latencies, errors = [], 0
+        for _ in range(count):
+            status, elapsed = send(request)
+            latencies.append(elapsed)
+            errors += 0 if is_expected(status) else 1
+        return latencies, errors
+
+    started = time.perf_counter()
+    if concurrency == 1:
+        # Mangumはスレッドのイベントループを使うため、呼び出し元のスレッドで実行
+        results = [worker(requests)]
+    else:
+        # 各ワーカーに均等に割り振る
+        shares = [
+            requests // concurrency + (1 if index < requests % concurrency else 0)
+            for index in range(concurrency)
+        ]
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(worker, [share for share in shares if share]))
+    elapsed = time.perf_counter() - started
+
+    latencies = [value for worker_latencies, _ in results for value in worker_latencies]
+    return summarize(latencies, sum(errors for _, errors in results), elapsed)
+
+
+def run_server(
+    server: str,
+    endpoints: Sequence[str],
+    requests: int,
+    concurrency: int,
+    warmup: int
+) -> List[Dict[str, Any]]:
+    """
+    Measure one server in this process (moto must already be active)
+
+    Args:
+        server: "uvicorn" or "mangum"
+        endpoints: Endpoint names from ENDPOINTS
+        requests: Warm requests per endpoint
+        concurrency: Parallel clients (mangum always runs one at a time, like a Lambda container)
+        warmup: Requests per endpoint sent before the warm measurement
+
+    Returns:
+        Cases for the import, every cold endpoint and every warm endpoint
+    """
+    target, import_seconds = load_target(server)
+    seeded = seed_data()
+    scenario = build_requests(seeded)
+    if server == 'mangum':
+        concurrency = 1
+
+    cases = [{'server': server, 'endpoint': 'import', 'phase': 'cold', **summarize([import_seconds], 0, None)}]
+    target.start()
+    try:
+        for endpoint in endpoints:
+            status, elapsed = target.send(scenario[endpoint])
+            cases.append({
+                'server': server, 'endpoint': endpoint, 'phase': 'cold', 'status': status,
+                **summarize([elapsed], 0 if is_expected(status) else 1, None)
+            })
+
+        for endpoint in endpoints:
+            for _ in range(warmup):
+                target.send(scenario[endpoint])
+            cases.append({
+                'server': server, 'endpoint': endpoint, 'phase': 'warm', 'concurrency': concurrency,
+                **measure_warm(target.send, scenario[endpoint], requests, concurrency)
+            })
+    finally:
+        target.stop()
+
+    return cases
+
+
+def run_isolated_server(
+    server: str,
+    endpoints: Sequence[str],
+    requests: int,
+    concurrency: int,
+    warmup: int
+) -> List[Dict[str, Any]]:
+    """1サーバーをmoto環境で計測（server サブコマンドから子プロセスとして呼ばれる）"""
+    with mocked_aws():
+        return run_server(server, endpoints, requests, concurrency, warmup)
+
+
+def run_matrix(
+    servers: Sequence[str],
+    endpoints: Sequence[str],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    env: Dict[str, str]
+) -> List[Dict[str, Any]]:
+    """サーバーごとに別プロセスで計測（cold の計測にインポート済みモジュールを持ち込まない）"""
+    cases: List[Dict[str, Any]] = []
+    for server in servers:
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.load_test', 'server', server,
+             '--endpoints', ','.join(endpoints),
+             '--requests', str(requests),
+             '--concurrency', str(concurrency),
+             '--warmup', str(warmup)],
+            # エラー時に原因が見えるよう、標準エラーはそのまま出力
+            stdout=subprocess.PIPE,
+            text=True,
+            check=True,
+            env={**os.environ, **env}
+        )
+        server_cases = json.loads(completed.stdout.strip().splitlines()[-1])
+        for case in server_cases:
+            print(
+                f"{case['server']:>8} {case['phase']:>4} {case['endpoint']:<11} "
+                f"p50 {case['p50Ms']:>8.2f} ms  p95 {case['p95Ms']:>8.2f} ms  p99 {case['p99Ms']:>8.2f} ms"
+                + (f"  {case['rps']:>8.1f} req/s" if case['rps'] else '')
+                + (f"  errors {case['errors']}" if case['errors'] else ''),
+                file=sys.stderr
+            )
+        cases.extend(server_cases)
+    return cases
+
+
+def _parse_env(values: Sequence[str]) -> Dict[str, str]:
+    env = {}
+    for value in values:
+        name, separator, setting = value.partition('=')
+        if not separator:
+            raise argparse.ArgumentTypeError(f"--env must be NAME=VALUE: {value}")
+        env[name] = setting
+    return env
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def add_load_options(command: argparse.ArgumentParser) -> None:
+        command.add_argument('--endpoints', default=','.join(ENDPOINTS))
+        command.add_argument('--requests', type=int, default=DEFAULT_REQUESTS, help='Warm requests per endpoint')
+        command.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+        command.add_argument(
+            '--warmup', type=int, default=DEFAULT_WARMUP, help='Requests per endpoint before measuring'
+        )
+
+    run = commands.add_parser('run', help='Measure each server in its own subprocess')
+    run.add_argument('--servers', default=','.join(SERVERS))
+    run.add_argument('--env', action='append', default=[], help='NAME=VALUE for the server processes')
+    run.add_argument('--output', default='-', help='Result JSON path ("-" for stdout)')
+    add_load_options(run)
+
+    server = commands.add_parser('server', help='Measure one server in this process')
+    server.add_argument('server', choices=SERVERS)
+    add_load_options(server)
+
+    compare = commands.add_parser('compare', help='Compare two result files')
+    compare.add_argument('base')
+    compare.add_argument('head')
+    compare.add_argument('--threshold', type=float, default=0.1, help='Relative change treated as a regression')
+
+    args = parser.parse_args(argv)
+
+    if args.command in ('run', 'server'):
+        endpoints = [value for value in args.endpoints.split(',') if value]
+        unknown = set(endpoints) - set(ENDPOINTS)
+        if unknown:
+            parser.error(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+    if args.command == 'server':
+        cases = run_isolated_server(args.server, endpoints, args.requests, args.concurrency, args.warmup)
+        print(json.dumps(cases))
+        return 0
+
+    if args.command == 'run':
+        cases = run_matrix(
+            [value for value in args.servers.split(',') if value],
+            endpoints,
+            args.requests,
+            args.concurrency,
+            args.warmup,
+            _parse_env(args.env)
+        )
+        write_results(args.output, 'load_test', cases)
+        return 0
+
+    rows, regressed = compare_results(
+        load_results(args.base),
+        load_results(args.head),
+        key_fields=('server', 'phase', 'endpoint'),
+        metrics=COMPARE_METRICS,
+        threshold=args.threshold
+    )
+    print_comparison(rows)
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Image splitting pipeline benchmark
+
+ImageProcessor.split_image を合成画像で実行し、段階ごとの時間を計測します。
+
+- header:   Range GETによるヘッダー検証
+- download: 画像全体の取得
+- decode:   JPEGのデコード
+- crop:     ピースの切り出し
+- normalize: 回転・色変換・RGB変換
+- encode:   ピースのJPEGエンコード
+- upload:   ピース・マニフェストのS3保存
+- db_write: DynamoDBへの書き込み（ピース・ステータス）
+- other:    上記以外（UUID生成・ログなど）
+
+各段階は入れ子を除いた自己時間です（最初の切り出しで発生するデコードは crop ではなく decode に計上）。
+S3/DynamoDBはmotoのため、upload / db_write は実環境の通信時間ではなく、
+呼び出し回数に比例するクライアント側のコストの比較に使ってください。
+
+ピークRSSを正しく測るため、各ケースは別プロセスで実行します。
+
+使い方（backend ディレクトリで実行）:
+    python -m benchmarks.split_pipeline run --output results/split.json
+    python -m benchmarks.split_pipeline run --resolutions 1024x768 --pieces 100,300 --output -
+    python -m benchmarks.split_pipeline compare results/main.json results/branch.json --threshold 0.1
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from unittest.mock import patch
+
+from benchmarks.common import (
+    BUCKET_NAME,
+    compare_results,
+    load_results,
+    mocked_aws,
+    parse_resolution,
+    peak_rss_mb,
+    print_comparison,
+    synthetic_jpeg,
+    write_results,
+)
+
+# フロントエンドで選択できるピース数
+DEFAULT_PIECE_COUNTS = [100, 300, 500, 1000, 2000]
+# 小さめの画像・一般的なスマートフォン（12MP）・高解像度（約24MP）
+DEFAULT_RESOLUTIONS = ['1600x1200', '4032x3024', '6000x4000']
+
+STAGES = ['header', 'download', 'decode', 'crop', 'normalize', 'encode', 'upload', 'db_write']
+
+# compare で劣化とみなす指標（True: 小さいほど良い）
+COMPARE_METRICS = {
+    'totalMs': True,
+    'piecesPerSec': False,
+    'peakRssMb': True,
+}
+
+
+class StageTimer:
+    """段階ごとの自己時間（入れ子になった段階の時間を除く）を集計"""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self.totals: Dict[str, float] = {stage: 0.0 for stage in STAGES}
+        self.counts: Dict[str, int] = {stage: 0 for stage in STAGES}
+        self._clock = clock
+        # 実行中の段階ごとの [開始時刻, 子の合計時間]
+        self._stack: List[List[float]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        frame = [self._clock(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = self._clock() - frame[0]
+            self.totals[name] += elapsed - frame[1]
+            self.counts[name] += 1
+            if self._stack:
+                self._stack[-1][1] += elapsed
+
+    def wrap(self, name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """関数呼び出しを段階として計測するラッパー"""
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with self.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+class _ReadBody:
+    """読み込み済みのレスポンス本文（download の時間に本文の受信を含めるため）"""
+
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+
+    def read(self, *args: Any) -> bytes:
+        return self._data
+
+    def close(self) -> None:
+        pass
+
+
+def _instrument(stack: ExitStack, processor: Any, timer: StageTimer) -> None:
+    """ImageProcessor と Pillow の各処理に計測用のラッパーを差し込む"""
+    from PIL import Image, ImageCms, ImageFile
+
+    s3_client = processor.s3_client
+    get_object = s3_client.get_object
+
+    def timed_get_object(**kwargs: Any) -> Dict[str, Any]:
+        # Range指定はヘッダー検証、指定なしは画像全体の取得
+        with timer.stage('header' if 'Range' in kwargs else 'download'):
+            response = get_object(**kwargs)
+            response['Body'] = _ReadBody(response['Body'].read())
+            return response
+
+    stack.enter_context(patch.object(s3_client, 'get_object', timed_get_object))
+    stack.enter_context(patch.object(s3_client, 'put_object', timer.wrap('upload', s3_client.put_object)))
+    stack.enter_context(patch.object(
+        processor.pieces_table, 'put_item', timer.wrap('db_write', processor.pieces_table.put_item)
+    ))
+    stack.enter_context(patch.object(
+        processor.puzzles_table, 'update_item', timer.wrap('db_write', processor.puzzles_table.update_item)
+    ))
+
+    # Pillowのメソッドはクラス側を差し替える（self は引数として渡る）
+    for owner, attribute, stage in (
+        (ImageFile.ImageFile, 'load', 'decode'),
+        (Image.Image, 'crop', 'crop'),
+        (Image.Image, 'transpose', 'normalize'),
+        (Image.Image, 'convert', 'normalize'),
+        (Image.Image, 'save', 'encode'),
+        (ImageCms, 'applyTransform', 'normalize'),
+    ):
+        stack.enter_context(patch.object(owner, attribute, timer.wrap(stage, getattr(owner, attribute))))
+
+
+def run_case(processor: Any, image_bytes: bytes, piece_count: int) -> Dict[str, Any]:
+    """
+    Run one split with stage timing
+
+    Args:
+        processor: ImageProcessor bound to existing (mocked) resources
+        image_bytes: JPEG to split
+        piece_count: Requested piece count
+
+    Returns:
+        Case result (stages in ms, pieces/sec, RSS)
+    """
+    from app.core.image_header import read_image_header
+
+    header = read_image_header(lambda start, end: image_bytes[start:end + 1])
+    width, height = header.display_size
+    user_id = 'bench-user'
+    puzzle_id = f"bench-{width}x{height}-{piece_count}"
+    s3_key = f"puzzles/{puzzle_id}.jpg"
+
+    processor.s3_client.put_object(Bucket=processor.s3_bucket_name, Key=s3_key, Body=image_bytes)
+    processor.puzzles_table.put_item(Item={'userId': user_id, 'puzzleId': puzzle_id, 'status': 'uploaded'})
+
+    rss_before = peak_rss_mb()
+    timer = StageTimer()
+    with ExitStack() as stack:
+        _instrument(stack, processor, timer)
+        started = time.perf_counter()
+        result = processor.split_image(puzzle_id, user_id, s3_key, piece_count)
+        total = time.perf_counter() - started
+
+    stages = {stage: round(seconds * 1000, 2) for stage, seconds in timer.totals.items()}
+    stages['other'] = round(max(0.0, total * 1000 - sum(stages.values())), 2)
+
+    return {
+        'resolution': f"{width}x{height}",
+        'pieces': piece_count,
+        'totalPieces': result['totalPieces'],
+        'grid': f"{result['rows']}x{result['cols']}",
+        'imageBytes': len(image_bytes),
+        'totalMs': round(total * 1000, 2),
+        'stagesMs': stages,
+        'calls': dict(timer.counts),
+        'piecesPerSec': round(result['totalPieces'] / total, 1),
+        'rssBeforeMb': rss_before,
+        'peakRssMb': peak_rss_mb(),
+    }
+
+
+def run_isolated_case(image_path: str, piece_count: int) -> Dict[str, Any]:
+    """1ケースをmoto環境で実行（case サブコマンドから子プロセスとして呼ばれる）"""
+    with open(image_path, 'rb') as f:
+        image_bytes = f.read()
+
+    with mocked_aws():
+        from app.services.image_processor import ImageProcessor
+        from benchmarks.common import PIECES_TABLE_NAME, PUZZLES_TABLE_NAME
+
+        processor = ImageProcessor(
+            s3_bucket_name=BUCKET_NAME,
+            pieces_table_name=PIECES_TABLE_NAME,
+            puzzles_table_name=PUZZLES_TABLE_NAME
+        )
+        return run_case(processor, image_bytes, piece_count)
+
+
+def run_matrix(resolutions: List[str], piece_counts: List[int], repeat: int = 1) -> List[Dict[str, Any]]:
+    """
+    全ケースを別プロセスで実行
+
+    合成画像は親プロセスで作成してファイル経由で渡し、子プロセスのピークRSSに画像生成を含めません。
+    """
+    cases = []
+    with tempfile.TemporaryDirectory() as workdir:
+        images = {}
+        for resolution in resolutions:
+            images[resolution] = os.path.join(workdir, f"{resolution}.jpg")
+            with open(images[resolution], 'wb') as f:
+                f.write(synthetic_jpeg(*parse_resolution(resolution)))
+
+        for resolution in resolutions:
+            for piece_count in piece_counts:
+                for iteration in range(repeat):
+                    cases.append(_run_subprocess(images[resolution], piece_count, iteration))
+    return cases
+
+
+def _run_subprocess(image_path: str, piece_count: int, iteration: int) -> Dict[str, Any]:
+    completed = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.split_pipeline', 'case',
+         '--image', image_path, '--pieces', str(piece_count)],
+        # エラー時に原因が見えるよう、標準エラーはそのまま出力
+        stdout=subprocess.PIPE,
+        text=True,
+        check=True
+    )
+    case: Dict[str, Any] = json.loads(completed.stdout.strip().splitlines()[-1])
+    case['iteration'] = iteration
+    print(
+        f"{case['resolution']:>10} {case['pieces']:>5} pieces: "
+        f"{case['totalMs']:>9.1f} ms  {case['piecesPerSec']:>7.1f} pieces/s  "
+        f"peak {case['peakRssMb']:.0f} MB",
+        file=sys.stderr
+    )
+    return case
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='Run the benchmark matrix (one subprocess per case)')
+    run.add_argument('--resolutions', default=','.join(DEFAULT_RESOLUTIONS))
+    run.add_argument('--pieces', default=','.join(map(str, DEFAULT_PIECE_COUNTS)))
+    run.add_argument('--repeat', type=int, default=1)
+    run.add_argument('--output', default='-', help='Result JSON path ("-" for stdout)')
+
+    case = commands.add_parser('case', help='Run a single case in this process')
+    case.add_argument('--image', required=True, help='JPEG file to split')
+    case.add_argument('--pieces', type=int, required=True)
+
+    compare = commands.add_parser('compare', help='Compare two result files')
+    compare.add_argument('base')
+    compare.add_argument('head')
+    compare.add_argument('--threshold', type=float, default=0.1, help='Relative change treated as a regression')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'case':
+        print(json.dumps(run_isolated_case(args.image, args.pieces)))
+        return 0
+
+    if args.command == 'run':
+        cases = run_matrix(
+            [value for value in args.resolutions.split(',') if value],
+            [int(value) for value in args.pieces.split(',') if value],
+            args.repeat
+        )
+        write_results(args.output, 'split_pipeline', cases)
+        return 0
+
+    rows, regressed = compare_results(
+        load_results(args.base),
+        load_results(args.head),
+        key_fields=('resolution', 'pieces', 'iteration'),
+        metrics=COMPARE_METRICS,
+        threshold=args.threshold
+    )
+    print_comparison(rows)
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -61,7 +61,32 @@ def aws_credentials_mock() -> Generator[None, None, None]:
             ],
             AttributeDefinitions=[
                 {'AttributeName': 'userId', 'AttributeType': 'S'},
-                {'AttributeName': 'puzzleId', 'AttributeType': 'S'}
+                {'AttributeName': 'puzzleId', 'AttributeType': 'S'},
+                {'AttributeName': 'createdAt', 'AttributeType': 'S'}
+            ],
+            # 本番と同じGSI（terraform/modules/dynamodb/main.tf）
+            GlobalSecondaryIndexes=[
+                {
+                    'IndexName': 'CreatedAtIndex',
+                    'KeySchema': [
+                        {'AttributeName': 'userId', 'KeyType': 'HASH'},
+                        {'AttributeName': 'createdAt', 'KeyType': 'RANGE'}
+                    ],
+                    'Projection': {'ProjectionType': 'ALL'}
+                }
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+
+        dynamodb.create_table(
+            TableName='test-pieces',
+            KeySchema=[
+                {'AttributeName': 'puzzleId', 'KeyType': 'HASH'},
+                {'AttributeName': 'pieceId', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'puzzleId', 'AttributeType': 'S'},
+                {'AttributeName': 'pieceId', 'AttributeType': 'S'}
             ],
             BillingMode='PAY_PER_REQUEST'
         )
@@ -73,17 +98,20 @@ def aws_credentials_mock() -> Generator[None, None, None]:
             CreateBucketConfiguration={'LocationConstraint': 'ap-northeast-1'}
         )
 
-        # puzzle_serviceを再初期化（motoがアクティブな状態で）
-        from app.services.puzzle_service import PuzzleService
-        from app.api.routes import puzzles
+        # 共有サービスを破棄し、motoがアクティブな状態で再生成させる
+        # settingsはインポート時に確定するため、テスト用のリソース名を明示的に設定
+        from app.api.dependencies import reset_services
+        from app.core.config import settings
 
-        puzzles.puzzle_service = PuzzleService(
-            s3_bucket_name='test-bucket',
-            puzzles_table_name='test-puzzles',
-            environment='test'
-        )
+        reset_services()
+
+        with patch.object(settings, 's3_bucket_name', 'test-bucket'), \
+             patch.object(settings, 'puzzles_table_name', 'test-puzzles'), \
+             patch.object(settings, 'pieces_table_name', 'test-pieces'):
+            yield  # テスト実行中はmotoがアクティブ
 
-        yield  # テスト実行中はmotoがアクティブ
+        # モック終了後に古いクライアントが残らないよう破棄
+        reset_services()
 
 
 # ===== テストデータフィクスチャ =====
@@ -78,7 +78,7 @@ class TestRequestValidation:
         """無効なpieceCountでバリデーションエラーが返ること"""
         payload = {
             "userId": "anonymous",
-            "pieceCount": 999,  # 許可されていない値
+            "pieceCount": 5000,  # 範囲外の値
             "puzzleName": "Test Puzzle",
         }
 
@@ -207,6 +207,16 @@ class TestDeletePuzzle:
         assert "detail" in data
         assert "not found" in data["detail"].lower()
 
+    def test_upload_url_for_missing_puzzle_returns_404(self, client):
+        """存在しないパズルへのアップロードURL発行は条件付き更新で404になること"""
+        response = client.post(
+            "/puzzles/nonexistent-id/upload",
+            json={"fileName": "puzzle.jpg", "userId": "anonymous"},
+        )
+
+        assert response.status_code == 404
+        assert "not found" in response.json()["detail"].lower()
+
     def test_delete_puzzle_success(self, client):
         """パズルが正しく削除されること（作成→削除の流れ）"""
         # 1. パズルを作成
@@ -234,3 +244,554 @@ class TestDeletePuzzle:
         # 4. 削除後、パズルが存在しないことを確認
         get_after_delete_response = client.get(f"/puzzles/{puzzle_id}?user_id=test-user")
         assert get_after_delete_response.status_code == 404
+
+
+class TestListUserPuzzles:
+    """ユーザーのパズル一覧（ページング）のテスト"""
+
+    def _create(self, client, user_id, name):
+        response = client.post(
+            "/puzzles",
+            json={"userId": user_id, "pieceCount": 100, "puzzleName": name},
+        )
+        assert response.status_code == 200
+        return response.json()["puzzleId"]
+
+    def test_pagination_walks_all_pages(self, client):
+        """nextTokenを辿ると全件が重複なく取得できること"""
+        created = {self._create(client, "page-user", f"Puzzle {i}") for i in range(5)}
+
+        seen = []
+        token = None
+        while True:
+            params = {"limit": 2}
+            if token:
+                params["nextToken"] = token
+            response = client.get("/users/page-user/puzzles", params=params)
+            assert response.status_code == 200
+            data = response.json()
+            assert data["count"] <= 2
+            seen.extend(p["puzzleId"] for p in data["puzzles"])
+            token = data["nextToken"]
+            if not token:
+                break
+
+        assert len(seen) == len(created)
+        assert set(seen) == created
+
+    def test_summary_view_limits_attributes(self, client):
+        """view=summary では一覧用の属性のみ返ること"""
+        self._create(client, "summary-user", "Summary")
+
+        response = client.get("/users/summary-user/puzzles", params={"view": "summary"})
+
+        assert response.status_code == 200
+        puzzle = response.json()["puzzles"][0]
+        assert "puzzleName" in puzzle
+        assert "userId" not in puzzle
+
+    def test_invalid_token_returns_400(self, client):
+        """不正なnextTokenで400が返ること"""
+        response = client.get("/users/anonymous/puzzles", params={"nextToken": "garbage"})
+
+        assert response.status_code == 400
+
+    def test_limit_out_of_range_returns_422(self, client):
+        """範囲外のlimitで422が返ること"""
+        response = client.get("/users/anonymous/puzzles", params={"limit": 1000})
+
+        assert response.status_code == 422
+
+    def test_aws_error_is_logged(self, client):
+        """DynamoDBのエラーは500を返し、原因をログに残すこと"""
+        from unittest.mock import AsyncMock, MagicMock, patch
+
+        from botocore.exceptions import ClientError
+
+        from app.api import main
+        from app.api.dependencies import get_async_puzzle_service
+
+        service = MagicMock()
+        service.list_puzzles_page = AsyncMock(side_effect=ClientError(
+            {'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': 'slow down'}},
+            'Query'
+        ))
+        app.dependency_overrides[get_async_puzzle_service] = lambda: service
+        try:
+            with patch.object(main.logger, 'error') as log_error:
+                response = client.get("/users/broken-user/puzzles")
+        finally:
+            app.dependency_overrides.pop(get_async_puzzle_service)
+
+        assert response.status_code == 500
+        log_error.assert_called_once()
+        assert log_error.call_args.kwargs['extra']['user_id'] == 'broken-user'
+
+
+class TestCacheStats:
+    """キャッシュ統計エンドポイントのテスト"""
+
+    def test_cache_hit_rate_observable(self, client):
+        """繰り返しの取得がヒットとして集計されること"""
+        create_response = client.post(
+            "/puzzles",
+            json={"userId": "cache-user", "pieceCount": 100, "puzzleName": "Cached"},
+        )
+        puzzle_id = create_response.json()["puzzleId"]
+
+        for _ in range(3):
+            response = client.get(f"/puzzles/{puzzle_id}?user_id=cache-user")
+            assert response.status_code == 200
+
+        stats = client.get("/debug/cache").json()
+        assert stats["enabled"] is True
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+
+
+class TestBulkDelete:
+    """一括削除エンドポイントのテスト"""
+
+    def test_bulk_delete(self, client):
+        """複数パズルを1リクエストで削除できること"""
+        ids = []
+        for i in range(3):
+            response = client.post(
+                "/puzzles",
+                json={"userId": "bulk-user", "pieceCount": 100, "puzzleName": f"Bulk {i}"},
+            )
+            ids.append(response.json()["puzzleId"])
+
+        response = client.post(
+            "/puzzles/bulk-delete",
+            json={"userId": "bulk-user", "puzzleIds": ids + ["missing"]},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert sorted(data["deleted"]) == sorted(ids)
+        assert data["notFound"] == ["missing"]
+
+        for puzzle_id in ids:
+            assert client.get(f"/puzzles/{puzzle_id}?user_id=bulk-user").status_code == 404
+
+    def test_bulk_delete_requires_ids(self, client):
+        """空のID一覧は422になること"""
+        response = client.post("/puzzles/bulk-delete", json={"puzzleIds": []})
+
+        assert response.status_code == 422
+
+
+class TestAsyncDelete:
+    """バックグラウンド削除モードのテスト"""
+
+    def test_async_delete_returns_202_and_completes(self, client):
+        """mode=asyncでは202を即座に返し、ワーカー完了後にレコードが消えること"""
+        from app.api.dependencies import get_deletion_queue
+
+        create_response = client.post(
+            "/puzzles",
+            json={"userId": "async-user", "pieceCount": 100, "puzzleName": "Async"},
+        )
+        puzzle_id = create_response.json()["puzzleId"]
+
+        response = client.delete(f"/puzzles/{puzzle_id}?user_id=async-user&mode=async")
+
+        assert response.status_code == 202
+        assert response.json()["status"] == "deleting"
+
+        get_deletion_queue().join()
+        assert client.get(f"/puzzles/{puzzle_id}?user_id=async-user").status_code == 404
+
+    def test_async_delete_falls_back_when_enqueue_fails(self, client):
+        """キューに積めない場合は同期削除し、"deleting" のレコードを残さないこと"""
+        from unittest.mock import MagicMock
+
+        from app.api.dependencies import get_deletion_queue
+
+        failing_queue = MagicMock()
+        failing_queue.enqueue.side_effect = RuntimeError("queue unavailable")
+
+        create_response = client.post(
+            "/puzzles",
+            json={"userId": "async-user", "pieceCount": 100, "puzzleName": "Fallback"},
+        )
+        puzzle_id = create_response.json()["puzzleId"]
+
+        app.dependency_overrides[get_deletion_queue] = lambda: failing_queue
+        try:
+            response = client.delete(f"/puzzles/{puzzle_id}?user_id=async-user&mode=async")
+        finally:
+            app.dependency_overrides.pop(get_deletion_queue)
+
+        assert response.status_code == 200
+        assert response.json()["message"] == "Puzzle deleted successfully"
+        failing_queue.enqueue.assert_called_once()
+        assert client.get(f"/puzzles/{puzzle_id}?user_id=async-user").status_code == 404
+
+    def test_async_delete_missing_puzzle(self, client):
+        """存在しないパズルはasyncモードでも404"""
+        response = client.delete("/puzzles/missing?user_id=async-user&mode=async")
+
+        assert response.status_code == 404
+
+
+class TestConditionalGet:
+    """ETag / If-None-Match（条件付きGET）のテスト"""
+
+    def _create(self, client, user_id, name="Conditional"):
+        response = client.post(
+            "/puzzles",
+            json={"userId": user_id, "pieceCount": 100, "puzzleName": name},
+        )
+        return response.json()["puzzleId"]
+
+    def test_get_puzzle_returns_etag(self, client):
+        """パズル詳細にETagとCache-Controlが付くこと"""
+        puzzle_id = self._create(client, "etag-user")
+
+        response = client.get(f"/puzzles/{puzzle_id}", params={"user_id": "etag-user"})
+
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('W/"')
+        assert response.headers["cache-control"] == "private, no-cache"
+
+    def test_get_puzzle_not_modified(self, client):
+        """If-None-Match が一致すれば本文なしの304になること"""
+        puzzle_id = self._create(client, "etag-user")
+        url = f"/puzzles/{puzzle_id}"
+        etag = client.get(url, params={"user_id": "etag-user"}).headers["etag"]
+
+        response = client.get(url, params={"user_id": "etag-user"}, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_get_puzzle_modified_after_update(self, client):
+        """updatedAt が変わるとETagも変わり200が返ること"""
+        puzzle_id = self._create(client, "etag-user")
+        url = f"/puzzles/{puzzle_id}"
+        etag = client.get(url, params={"user_id": "etag-user"}).headers["etag"]
+
+        client.post(f"{url}/upload", json={"fileName": "photo.jpg", "userId": "etag-user"})
+        response = client.get(url, params={"user_id": "etag-user"}, headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_list_not_modified_until_new_puzzle(self, client):
+        """一覧は変更がなければ304、パズルが増えると200になること"""
+        self._create(client, "etag-list-user")
+        url = "/users/etag-list-user/puzzles"
+        etag = client.get(url).headers["etag"]
+
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+        self._create(client, "etag-list-user", "Second")
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.json()["count"] == 2
+
+    def test_list_etag_depends_on_view(self, client):
+        """view が異なれば本文も異なるためETagも異なること"""
+        self._create(client, "etag-list-user")
+        url = "/users/etag-list-user/puzzles"
+
+        full = client.get(url).headers["etag"]
+        summary = client.get(url, params={"view": "summary"}).headers["etag"]
+
+        assert full != summary
+
+
+class TestCompression:
+    """レスポンス圧縮のテスト"""
+
+    def test_large_list_is_gzipped(self, client):
+        """しきい値を超える一覧はgzipで返ること"""
+        for i in range(10):
+            client.post(
+                "/puzzles",
+                json={"userId": "gzip-user", "pieceCount": 100, "puzzleName": f"Puzzle {i}"},
+            )
+
+        response = client.get("/users/gzip-user/puzzles", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json()["count"] == 10
+
+    def test_small_response_not_compressed(self, client):
+        """しきい値未満のレスポンスは圧縮されないこと"""
+        response = client.get("/", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+
+
+class TestPieceManifest:
+    """GET /puzzles/{id}/manifest のテスト"""
+
+    def _create_split_puzzle(self, client, user_id):
+        """画像をアップロードして分割済みのパズルを作成"""
+        Image = pytest.importorskip("PIL.Image")
+        import io
+
+        from app.api.dependencies import get_puzzle_service
+        from app.services.image_processor import ImageProcessor
+
+        puzzle_id = client.post(
+            "/puzzles",
+            json={"userId": user_id, "pieceCount": 100, "puzzleName": "Manifest"},
+        ).json()["puzzleId"]
+        client.post(f"/puzzles/{puzzle_id}/upload", json={"fileName": "photo.jpg", "userId": user_id})
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (200, 200), color='blue').save(buffer, format='JPEG')
+        service = get_puzzle_service()
+        s3_key = f"puzzles/{puzzle_id}.jpg"
+        service.s3_client.put_object(Bucket='test-bucket', Key=s3_key, Body=buffer.getvalue())
+
+        ImageProcessor('test-bucket', 'test-pieces', 'test-puzzles', cache=service.cache).split_image(
+            puzzle_id=puzzle_id, user_id=user_id, s3_key=s3_key, piece_count=100
+        )
+        return puzzle_id
+
+    def test_json_manifest(self, client):
+        """分割後は全ピースの配置が列指向で返ること"""
+        puzzle_id = self._create_split_puzzle(client, "manifest-user")
+
+        response = client.get(f"/puzzles/{puzzle_id}/manifest", params={"user_id": "manifest-user"})
+
+        assert response.status_code == 200
+        manifest = response.json()
+        assert manifest["count"] == 100
+        assert manifest["rows"] * manifest["cols"] == 100
+        assert len(manifest["columns"]["x"]) == 100
+        assert response.headers["etag"].startswith('W/"')
+
+    def test_binary_manifest(self, client):
+        """format=binary はデコードするとJSONと同じ内容になること"""
+        from app.core.manifest import decode_binary_manifest
+
+        puzzle_id = self._create_split_puzzle(client, "manifest-user")
+        url = f"/puzzles/{puzzle_id}/manifest"
+
+        as_json = client.get(url, params={"user_id": "manifest-user"}).json()
+        response = client.get(url, params={"user_id": "manifest-user", "format": "binary"})
+
+        assert response.headers["content-type"] == "application/octet-stream"
+        assert decode_binary_manifest(response.content) == as_json
+
+    def test_manifest_not_modified(self, client):
+        """ETagが一致すれば304になること"""
+        puzzle_id = self._create_split_puzzle(client, "manifest-user")
+        url = f"/puzzles/{puzzle_id}/manifest"
+        etag = client.get(url, params={"user_id": "manifest-user"}).headers["etag"]
+
+        response = client.get(url, params={"user_id": "manifest-user"}, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+
+    def test_manifest_before_split(self, client):
+        """分割前のパズルは404"""
+        puzzle_id = client.post(
+            "/puzzles",
+            json={"userId": "manifest-user", "pieceCount": 100, "puzzleName": "Pending"},
+        ).json()["puzzleId"]
+
+        response = client.get(f"/puzzles/{puzzle_id}/manifest", params={"user_id": "manifest-user"})
+
+        assert response.status_code == 404
+
+    def test_manifest_unknown_puzzle(self, client):
+        response = client.get("/puzzles/missing/manifest", params={"user_id": "manifest-user"})
+
+        assert response.status_code == 404
+
+    def test_manifest_invalid_format(self, client):
+        response = client.get("/puzzles/missing/manifest", params={"format": "xml"})
+
+        assert response.status_code == 422
+
+
+class TestPieceUrls:
+    """GET /puzzles/{id}/piece-urls のテスト"""
+
+    def _create_with_manifest(self, client, user_id, count=3):
+        """マニフェストを持つパズルを作成（画像分割の代わりに直接保存）"""
+        puzzle_id = client.post(
+            "/puzzles",
+            json={"userId": user_id, "pieceCount": 100, "puzzleName": "Urls"},
+        ).json()["puzzleId"]
+        return puzzle_id, self._write_manifest(user_id, puzzle_id, count)
+
+    def _write_manifest(self, user_id, puzzle_id, count, updated_at=None):
+        """ピースを作り直してマニフェストを保存し、ピースIDを返す（分割・再分割の代わり）"""
+        import uuid
+
+        from app.api.dependencies import get_puzzle_service
+        from app.core.manifest import build_manifest, encode_manifest, manifest_key
+
+        pieces = [
+            {'pieceId': str(uuid.uuid4()), 'row': 0, 'col': i, 'x': i, 'y': 0, 'width': 1, 'height': 1}
+            for i in range(count)
+        ]
+        service = get_puzzle_service()
+        service.s3_client.put_object(
+            Bucket='test-bucket',
+            Key=manifest_key(puzzle_id),
+            Body=encode_manifest(build_manifest(puzzle_id, 1, count, count, 1, pieces))[0]
+        )
+        update_expression = 'SET manifestKey = :k'
+        values = {':k': manifest_key(puzzle_id)}
+        if updated_at is not None:
+            update_expression += ', updatedAt = :ua'
+            values[':ua'] = updated_at
+        service.puzzles_table.update_item(
+            Key={'userId': user_id, 'puzzleId': puzzle_id},
+            UpdateExpression=update_expression,
+            ExpressionAttributeValues=values
+        )
+        service.cache.delete(f"puzzle:{user_id}:{puzzle_id}")
+        return [p['pieceId'] for p in pieces]
+
+    def test_signs_all_pieces(self, client):
+        """1回のリクエストで全ピースの署名付きURLが返ること"""
+        puzzle_id, piece_ids = self._create_with_manifest(client, "url-user")
+
+        response = client.get(f"/puzzles/{puzzle_id}/piece-urls", params={"user_id": "url-user"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["pieceIds"] == piece_ids
+        assert len(data["urls"]) == 3
+
+    def test_resplit_returns_new_urls(self, client):
+        """再分割でピースが置き換わったら、キャッシュ済みの古い署名を返さないこと"""
+        puzzle_id, old_piece_ids = self._create_with_manifest(client, "url-user")
+        first = client.get(f"/puzzles/{puzzle_id}/piece-urls", params={"user_id": "url-user"}).json()
+
+        new_piece_ids = self._write_manifest("url-user", puzzle_id, 4, updated_at="2099-01-01T00:00:00")
+        second = client.get(f"/puzzles/{puzzle_id}/piece-urls", params={"user_id": "url-user"}).json()
+
+        assert first["pieceIds"] == old_piece_ids
+        assert second["pieceIds"] == new_piece_ids
+        assert set(second["urls"]).isdisjoint(first["urls"])
+
+    def test_before_split(self, client):
+        puzzle_id = client.post(
+            "/puzzles",
+            json={"userId": "url-user", "pieceCount": 100, "puzzleName": "Pending"},
+        ).json()["puzzleId"]
+
+        response = client.get(f"/puzzles/{puzzle_id}/piece-urls", params={"user_id": "url-user"})
+
+        assert response.status_code == 404
+
+    def test_unknown_puzzle(self, client):
+        response = client.get("/puzzles/missing/piece-urls", params={"user_id": "url-user"})
+
+        assert response.status_code == 404
+
+
+class TestUploadLimits:
+    """署名付きPOST・マルチパートアップロードのエンドポイント"""
+
+    def _create(self, client, user_id="upload-user"):
+        return client.post(
+            "/puzzles",
+            json={"userId": user_id, "pieceCount": 100, "puzzleName": "Upload"},
+        ).json()["puzzleId"]
+
+    @pytest.mark.parametrize("path", ["upload-post", "upload"])
+    def test_upload_post(self, client, path):
+        """フォームのフィールドとサイズ上限が返ること（/upload も制限のないPUT URLを返さない）"""
+        puzzle_id = self._create(client)
+
+        response = client.post(
+            f"/puzzles/{puzzle_id}/{path}",
+            json={"userId": "upload-user", "fileName": "photo.jpg"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["fields"]["Content-Type"] == "image/jpeg"
+        assert data["maxBytes"] > 0
+        assert "Signature=" not in data["uploadUrl"] and "X-Amz-Signature=" not in data["uploadUrl"]
+
+    def test_upload_post_missing_puzzle(self, client):
+        response = client.post("/puzzles/missing/upload-post", json={"userId": "upload-user"})
+
+        assert response.status_code == 404
+
+    def test_multipart_flow(self, client):
+        """開始 → パートのアップロード → 完了"""
+        from app.api.dependencies import get_puzzle_service
+
+        puzzle_id = self._create(client)
+        started = client.post(
+            f"/puzzles/{puzzle_id}/multipart",
+            json={"userId": "upload-user", "fileName": "big.jpg", "fileSize": 1024},
+        )
+        assert started.status_code == 200
+        upload_id = started.json()["uploadId"]
+
+        etag = get_puzzle_service().s3_client.upload_part(
+            Bucket='test-bucket', Key=f"puzzles/{puzzle_id}.jpg",
+            UploadId=upload_id, PartNumber=1, Body=b'x' * 1024
+        )['ETag']
+
+        resumed = client.post(
+            f"/puzzles/{puzzle_id}/multipart/{upload_id}/parts",
+            json={"userId": "upload-user", "partNumbers": []},
+        )
+        assert resumed.json()["uploadedParts"][0]["etag"] == etag
+
+        completed = client.post(
+            f"/puzzles/{puzzle_id}/multipart/{upload_id}/complete",
+            json={"userId": "upload-user", "parts": [{"partNumber": 1, "etag": etag}]},
+        )
+        assert completed.status_code == 200
+        assert completed.json()["size"] == 1024
+
+    def test_multipart_rejects_oversized_file(self, client):
+        puzzle_id = self._create(client)
+
+        response = client.post(
+            f"/puzzles/{puzzle_id}/multipart",
+            json={"userId": "upload-user", "fileName": "big.jpg", "fileSize": 10 ** 12},
+        )
+
+        assert response.status_code == 400
+
+    def test_status_follows_exception_type(self, client):
+        """404/400 はメッセージではなく例外の型で決まること"""
+        from unittest.mock import AsyncMock, MagicMock
+
+        from app.api.dependencies import get_async_puzzle_service
+
+        service = MagicMock()
+        service.complete_multipart_upload = AsyncMock(
+            side_effect=ValueError("Invalid multipart upload: part 1 could not be found")
+        )
+        app.dependency_overrides[get_async_puzzle_service] = lambda: service
+        try:
+            response = client.post(
+                "/puzzles/p-1/multipart/u-1/complete",
+                json={"userId": "upload-user", "parts": [{"partNumber": 1, "etag": '"x"'}]},
+            )
+        finally:
+            app.dependency_overrides.pop(get_async_puzzle_service)
+
+        assert response.status_code == 400
+
+    def test_abort_unknown_upload(self, client):
+        puzzle_id = self._create(client)
+        client.post(f"/puzzles/{puzzle_id}/upload", json={"userId": "upload-user"})
+
+        response = client.delete(
+            f"/puzzles/{puzzle_id}/multipart/no-such-upload", params={"user_id": "upload-user"}
+        )
+
+        assert response.status_code == 404
@@ -0,0 +1,109 @@
+"""
+AsyncPuzzleServiceの単体テスト
+
+同期版PuzzleServiceへの委譲が正しく行われ、
+ブロッキング処理がイベントループ外（executor）で実行されることを検証します。
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.async_puzzle_service import AsyncPuzzleService, create_aws_executor
+
+
+@pytest.fixture
+def sync_service():
+    """PuzzleServiceのモック（インターフェースのみ利用）"""
+    return MagicMock()
+
+
+@pytest.fixture
+def executor():
+    """テスト用の専用executor"""
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="test-aws-io")
+    yield pool
+    pool.shutdown(wait=True)
+
+
+class TestAsyncPuzzleService:
+    """非同期アダプターのテスト"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_create_puzzle_delegates(self, sync_service, executor):
+        """create_puzzle が同期サービスに同じ引数で委譲されること"""
+        sync_service.create_puzzle.return_value = {'puzzleId': 'p-1'}
+        service = AsyncPuzzleService(sync_service, executor=executor)
+
+        result = await service.create_puzzle(
+            piece_count=300,
+            puzzle_name="Test",
+            user_id="user-1"
+        )
+
+        assert result == {'puzzleId': 'p-1'}
+        sync_service.create_puzzle.assert_called_once_with(
+            piece_count=300,
+            puzzle_name="Test",
+            user_id="user-1"
+        )
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_blocking_call_runs_on_executor(self, sync_service, executor):
+        """ブロッキング処理がイベントループのスレッドではなくexecutor上で動くこと"""
+        called_threads = []
+
+        def fake_get_puzzle(user_id, puzzle_id):
+            called_threads.append(threading.current_thread().name)
+            return {'puzzleId': puzzle_id}
+
+        sync_service.get_puzzle.side_effect = fake_get_puzzle
+        service = AsyncPuzzleService(sync_service, executor=executor)
+
+        result = await service.get_puzzle("user-1", "p-1")
+
+        assert result == {'puzzleId': 'p-1'}
+        assert called_threads[0].startswith("test-aws-io")
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_exceptions_propagate(self, sync_service, executor):
+        """同期サービスの例外（ValueError等）がそのまま伝播すること"""
+        sync_service.delete_puzzle.side_effect = ValueError("Puzzle not found: p-1")
+        service = AsyncPuzzleService(sync_service, executor=executor)
+
+        with pytest.raises(ValueError, match="Puzzle not found"):
+            await service.delete_puzzle("user-1", "p-1")
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_default_executor(self, sync_service):
+        """executor未指定時はイベントループのデフォルトexecutorを使うこと"""
+        sync_service.list_puzzles.return_value = []
+        service = AsyncPuzzleService(sync_service)
+
+        assert await service.list_puzzles("user-1") == []
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_generate_upload_post_delegates(self, sync_service, executor):
+        """generate_upload_post が委譲されること"""
+        sync_service.generate_upload_post.return_value = {'uploadUrl': 'https://example'}
+        service = AsyncPuzzleService(sync_service, executor=executor)
+
+        result = await service.generate_upload_post("p-1", "a.png", "user-1")
+
+        assert result['uploadUrl'] == 'https://example'
+
+    @pytest.mark.unit
+    def test_create_aws_executor(self):
+        """専用スレッドプールが指定サイズで作られること"""
+        pool = create_aws_executor(4)
+        try:
+            assert pool._max_workers == 4
+        finally:
+            pool.shutdown(wait=True)
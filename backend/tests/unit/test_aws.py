@@ -0,0 +1,68 @@
+"""
+AWSクライアントファクトリの単体テスト
+
+Settingsの値がbotocoreのConfigに反映されることを検証します。
+"""
+
+from unittest.mock import patch
+
+import pytest
+from botocore.config import Config
+
+from app.core.aws import build_boto_config, create_client, create_resource
+from app.core.config import settings
+
+
+class TestBuildBotoConfig:
+    """共通Configのテスト"""
+
+    @pytest.mark.unit
+    def test_defaults(self):
+        """デフォルトでadaptiveリトライ・keepalive・拡張プールが設定されること"""
+        config = build_boto_config()
+
+        assert config.max_pool_connections == settings.aws_max_pool_connections
+        assert config.retries == {'mode': 'adaptive', 'max_attempts': settings.aws_max_attempts}
+        assert config.tcp_keepalive is True
+        assert config.connect_timeout == settings.aws_connect_timeout
+        assert config.read_timeout == settings.aws_read_timeout
+
+    @pytest.mark.unit
+    def test_settings_override(self):
+        """Settingsの変更が反映されること"""
+        with patch.object(settings, 'aws_max_pool_connections', 128), \
+             patch.object(settings, 'aws_retry_mode', 'standard'), \
+             patch.object(settings, 'aws_tcp_keepalive', False):
+            config = build_boto_config()
+
+        assert config.max_pool_connections == 128
+        assert config.retries['mode'] == 'standard'
+        assert config.tcp_keepalive is False
+
+
+class TestFactories:
+    """クライアント・リソース生成のテスト"""
+
+    @pytest.mark.unit
+    def test_client_uses_shared_config(self):
+        """クライアントに共通Configとリージョンが適用されること"""
+        client = create_client('s3')
+
+        assert client.meta.region_name == settings.aws_region
+        assert client.meta.config.max_pool_connections == settings.aws_max_pool_connections
+        assert client.meta.config.retries['mode'] == settings.aws_retry_mode
+
+    @pytest.mark.unit
+    def test_override_is_merged(self):
+        """個別Configは共通設定にマージされること"""
+        client = create_client('s3', config=Config(read_timeout=99))
+
+        assert client.meta.config.read_timeout == 99
+        assert client.meta.config.max_pool_connections == settings.aws_max_pool_connections
+
+    @pytest.mark.unit
+    def test_resource_uses_shared_config(self):
+        """リソースのクライアントにも共通Configが適用されること"""
+        dynamodb = create_resource('dynamodb')
+
+        assert dynamodb.meta.client.meta.config.tcp_keepalive == settings.aws_tcp_keepalive
@@ -0,0 +1,137 @@
+"""
+ベンチマーク補助処理の単体テスト
+
+段階ごとの自己時間の集計、結果の比較（劣化の検出）、1ケースの実行を検証します。
+"""
+
+import pytest
+
+from benchmarks.common import compare_results, parse_resolution
+from benchmarks.split_pipeline import COMPARE_METRICS, STAGES, StageTimer, run_case
+
+
+class FakeClock:
+    """呼び出しのたびに指定した時刻を返す時計"""
+
+    def __init__(self, *times):
+        self._times = list(times)
+
+    def __call__(self):
+        return self._times.pop(0)
+
+
+class TestStageTimer:
+    """StageTimer のテスト"""
+
+    @pytest.mark.unit
+    def test_nested_stage_time_is_excluded_from_parent(self):
+        # crop: 0〜10、その中の decode: 2〜8
+        timer = StageTimer(clock=FakeClock(0.0, 2.0, 8.0, 10.0))
+
+        with timer.stage('crop'):
+            with timer.stage('decode'):
+                pass
+
+        assert timer.totals['decode'] == 6.0
+        assert timer.totals['crop'] == 4.0
+        assert timer.counts['crop'] == timer.counts['decode'] == 1
+
+    @pytest.mark.unit
+    def test_wrap_records_stage_and_returns_value(self):
+        timer = StageTimer(clock=FakeClock(1.0, 3.5))
+
+        result = timer.wrap('encode', lambda x: x * 2)(21)
+
+        assert result == 42
+        assert timer.totals['encode'] == 2.5
+
+
+class TestCompareResults:
+    """compare_results のテスト"""
+
+    @staticmethod
+    def _results(total_ms, pieces_per_sec, peak_rss_mb):
+        return {'cases': [{
+            'resolution': '1600x1200',
+            'pieces': 100,
+            'iteration': 0,
+            'totalMs': total_ms,
+            'piecesPerSec': pieces_per_sec,
+            'peakRssMb': peak_rss_mb,
+        }]}
+
+    @staticmethod
+    def _compare(base, head, threshold=0.1):
+        return compare_results(
+            base, head,
+            key_fields=('resolution', 'pieces', 'iteration'),
+            metrics=COMPARE_METRICS,
+            threshold=threshold
+        )
+
+    @pytest.mark.unit
+    def test_no_regression_within_threshold(self):
+        rows, regressed = self._compare(self._results(100, 50, 100), self._results(105, 48, 104))
+
+        assert regressed is False
+        assert len(rows) == 3
+
+    @pytest.mark.unit
+    def test_slower_run_is_regression(self):
+        rows, regressed = self._compare(self._results(100, 50, 100), self._results(130, 50, 100))
+
+        assert regressed is True
+        flagged = [row['metric'] for row in rows if row['regression']]
+        assert flagged == ['totalMs']
+
+    @pytest.mark.unit
+    def test_lower_throughput_is_regression(self):
+        _, regressed = self._compare(self._results(100, 50, 100), self._results(100, 40, 100))
+        assert regressed is True
+
+    @pytest.mark.unit
+    def test_improvement_is_not_regression(self):
+        _, regressed = self._compare(self._results(100, 50, 100), self._results(50, 100, 80))
+        assert regressed is False
+
+    @pytest.mark.unit
+    def test_cases_missing_from_base_are_skipped(self):
+        head = self._results(100, 50, 100)
+        head['cases'][0]['pieces'] = 300
+
+        rows, regressed = self._compare(self._results(100, 50, 100), head)
+
+        assert rows == []
+        assert regressed is False
+
+
+class TestRunCase:
+    """run_case のテスト（テスト用のmotoリソースで実行）"""
+
+    @pytest.mark.unit
+    def test_parse_resolution(self):
+        assert parse_resolution('4032x3024') == (4032, 3024)
+
+    @pytest.mark.unit
+    def test_run_case_reports_stages(self):
+        pytest.importorskip('PIL')
+        from app.services.image_processor import ImageProcessor
+        from benchmarks.common import synthetic_jpeg
+
+        processor = ImageProcessor(
+            s3_bucket_name='test-bucket',
+            pieces_table_name='test-pieces',
+            puzzles_table_name='test-puzzles'
+        )
+
+        result = run_case(processor, synthetic_jpeg(320, 240), 100)
+
+        assert result['resolution'] == '320x240'
+        assert result['pieces'] == 100
+        assert result['totalPieces'] > 0
+        assert set(result['stagesMs']) == set(STAGES) | {'other'}
+        assert result['calls']['encode'] == result['totalPieces']
+        assert result['calls']['decode'] >= 1
+        assert result['calls']['header'] >= 1
+        assert result['calls']['download'] == 1
+        assert result['piecesPerSec'] > 0
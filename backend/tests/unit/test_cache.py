@@ -0,0 +1,237 @@
+"""
+キャッシュバックエンドの単体テスト
+
+TTL・LRUの挙動、Redisバックエンドのシリアライズ、統計情報を検証します。
+Redisは辞書ベースのスタンドインで代用します。
+"""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from app.core.cache import (
+    RedisCache,
+    TTLCache,
+    create_puzzle_cache,
+    puzzle_cache_key,
+)
+from app.core.config import Settings
+
+
+class FakeClock:
+    """テスト用の手動で進める時計"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    """redis-py互換の最小スタンドイン（get / set(ex=) / delete）"""
+
+    def __init__(self) -> None:
+        self.store: dict = {}
+        self.expirations: dict = {}
+
+    def get(self, name):
+        return self.store.get(name)
+
+    def set(self, name, value, ex=None):
+        self.store[name] = value.encode('utf-8')
+        self.expirations[name] = ex
+
+    def delete(self, name):
+        self.store.pop(name, None)
+
+
+class FakeRedisError(Exception):
+    """redis.exceptions.RedisError の代わりに使う例外"""
+
+
+class BrokenRedis:
+    """すべての操作で接続エラーになるスタンドイン"""
+
+    def get(self, name):
+        raise FakeRedisError("connection refused")
+
+    def set(self, name, value, ex=None):
+        raise FakeRedisError("connection refused")
+
+    def delete(self, name):
+        raise FakeRedisError("timeout")
+
+
+class TestTTLCache:
+    """プロセス内TTL + LRUキャッシュのテスト"""
+
+    @pytest.mark.unit
+    def test_get_after_set(self):
+        """保存した値が取得できること"""
+        cache = TTLCache(ttl_seconds=5, max_entries=10)
+        cache.set("k", {"status": "pending"})
+
+        assert cache.get("k") == {"status": "pending"}
+
+    @pytest.mark.unit
+    def test_entry_expires(self):
+        """TTLを過ぎたエントリはミスになること"""
+        clock = FakeClock()
+        cache = TTLCache(ttl_seconds=5, max_entries=10, clock=clock)
+        cache.set("k", {"status": "pending"})
+
+        clock.now = 4.9
+        assert cache.get("k") is not None
+
+        clock.now = 5.0
+        assert cache.get("k") is None
+        assert len(cache) == 0
+
+    @pytest.mark.unit
+    def test_lru_eviction(self):
+        """上限を超えると最も使われていないエントリが追い出されること"""
+        cache = TTLCache(ttl_seconds=60, max_entries=2)
+        cache.set("a", {"v": 1})
+        cache.set("b", {"v": 2})
+
+        # aにアクセスしてbを最も古い状態にする
+        cache.get("a")
+        cache.set("c", {"v": 3})
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {"v": 1}
+        assert cache.get("c") == {"v": 3}
+
+    @pytest.mark.unit
+    def test_returned_value_is_a_copy(self):
+        """取得した辞書を変更してもキャッシュに影響しないこと"""
+        cache = TTLCache(ttl_seconds=60, max_entries=2)
+        cache.set("k", {"status": "pending"})
+
+        cache.get("k")["status"] = "mutated"
+
+        assert cache.get("k") == {"status": "pending"}
+
+    @pytest.mark.unit
+    def test_stats(self):
+        """ヒット・ミス・無効化が集計されること"""
+        cache = TTLCache(ttl_seconds=60, max_entries=10)
+        cache.get("k")
+        cache.set("k", {"v": 1})
+        cache.get("k")
+        cache.get("k")
+        cache.delete("k")
+
+        stats = cache.stats()
+        assert stats["backend"] == "TTLCache"
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["invalidations"] == 1
+        assert stats["hitRate"] == pytest.approx(2 / 3, abs=1e-4)
+
+    @pytest.mark.unit
+    def test_stats_without_lookups(self):
+        """参照がない場合のヒット率は0"""
+        assert TTLCache(ttl_seconds=1, max_entries=1).stats()["hitRate"] == 0.0
+
+
+class TestRedisCache:
+    """共有キャッシュ（Redisスタンドイン）のテスト"""
+
+    @pytest.mark.unit
+    def test_round_trip_preserves_decimals(self):
+        """DynamoDBのDecimalが往復で保持されること"""
+        redis = FakeRedis()
+        cache = RedisCache(redis, ttl_seconds=30)
+        item = {"puzzleId": "p-1", "pieceCount": Decimal("300"), "ratio": Decimal("1.5")}
+
+        cache.set("k", item)
+
+        assert redis.expirations["jigsaw:k"] == 30
+        assert cache.get("k") == item
+        assert isinstance(cache.get("k")["pieceCount"], Decimal)
+
+    @pytest.mark.unit
+    def test_shared_between_instances(self):
+        """同じRedisを使う別インスタンス（別ワーカー）間で共有・無効化されること"""
+        redis = FakeRedis()
+        api_worker = RedisCache(redis, ttl_seconds=30)
+        split_worker = RedisCache(redis, ttl_seconds=30)
+
+        api_worker.set("k", {"status": "processing"})
+        assert split_worker.get("k") == {"status": "processing"}
+
+        split_worker.delete("k")
+        assert api_worker.get("k") is None
+
+    @pytest.mark.unit
+    def test_unserializable_value(self):
+        """JSON化できない値はTypeError"""
+        cache = RedisCache(FakeRedis(), ttl_seconds=30)
+
+        with pytest.raises(TypeError):
+            cache.set("k", {"bad": object()})
+
+
+    @pytest.mark.unit
+    def test_outage_is_a_miss_and_noop(self):
+        """Redis障害時は取得がミス、保存・削除が何もしない扱いになり、errorsに集計されること"""
+        cache = RedisCache(BrokenRedis(), ttl_seconds=30, error_types=(FakeRedisError,))
+
+        assert cache.get("k") is None
+        cache.set("k", {"status": "pending"})
+        cache.delete("k")
+
+        stats = cache.stats()
+        assert stats["misses"] == 1
+        assert stats["errors"] == 3
+
+    @pytest.mark.unit
+    def test_unlisted_errors_propagate(self):
+        """error_types 以外の例外は握りつぶさないこと"""
+        cache = RedisCache(BrokenRedis(), ttl_seconds=30)
+
+        with pytest.raises(FakeRedisError):
+            cache.get("k")
+
+
+class TestCreatePuzzleCache:
+    """Settingsからのキャッシュ生成のテスト"""
+
+    @pytest.mark.unit
+    def test_memory_backend(self):
+        settings = Settings()
+        with patch.object(settings, 'puzzle_cache_backend', 'memory'):
+            cache = create_puzzle_cache(settings)
+
+        assert isinstance(cache, TTLCache)
+        assert cache.ttl_seconds == settings.puzzle_cache_ttl_seconds
+
+    @pytest.mark.unit
+    def test_redis_backend_catches_redis_errors(self):
+        redis = pytest.importorskip("redis")
+        settings = Settings()
+        with patch.object(settings, 'puzzle_cache_backend', 'redis'):
+            cache = create_puzzle_cache(settings)
+
+        assert isinstance(cache, RedisCache)
+        assert cache.error_types == (redis.exceptions.RedisError,)
+
+    @pytest.mark.unit
+    def test_none_backend(self):
+        settings = Settings()
+        with patch.object(settings, 'puzzle_cache_backend', 'none'):
+            assert create_puzzle_cache(settings) is None
+
+    @pytest.mark.unit
+    def test_unknown_backend(self):
+        settings = Settings()
+        with patch.object(settings, 'puzzle_cache_backend', 'memcached'):
+            with pytest.raises(ValueError):
+                create_puzzle_cache(settings)
+
+    @pytest.mark.unit
+    def test_puzzle_cache_key(self):
+        assert puzzle_cache_key("u", "p") == "puzzle:u:p"
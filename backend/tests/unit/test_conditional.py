@@ -0,0 +1,53 @@
+"""
+条件付きGET（ETag）ヘルパーの単体テスト
+"""
+
+import pytest
+
+from app.api.conditional import etag_matches, make_etag, puzzle_etag, puzzle_list_etag
+
+
+class TestEtag:
+    """ETagの生成と比較のテスト"""
+
+    @pytest.mark.unit
+    def test_puzzle_etag_follows_updated_at(self):
+        """updatedAtが変わるとETagが変わり、他の属性には影響されないこと"""
+        puzzle = {"puzzleId": "p-1", "updatedAt": "2026-01-01T00:00:00", "status": "pending"}
+
+        same = puzzle_etag({**puzzle, "status": "ignored"})
+        changed = puzzle_etag({**puzzle, "updatedAt": "2026-01-01T00:00:01"})
+
+        assert puzzle_etag(puzzle) == same
+        assert puzzle_etag(puzzle) != changed
+
+    @pytest.mark.unit
+    def test_falls_back_to_created_at(self):
+        """updatedAtがない古いレコードはcreatedAtを使うこと"""
+        assert puzzle_etag({"puzzleId": "p", "createdAt": "a"}) != puzzle_etag({"puzzleId": "p", "createdAt": "b"})
+
+    @pytest.mark.unit
+    def test_list_etag_depends_on_order_and_variant(self):
+        """一覧のETagは並び順とリクエストパラメータで変わること"""
+        a = {"puzzleId": "a", "updatedAt": "1"}
+        b = {"puzzleId": "b", "updatedAt": "1"}
+
+        assert puzzle_list_etag([a, b], "full") != puzzle_list_etag([b, a], "full")
+        assert puzzle_list_etag([a, b], "full") != puzzle_list_etag([a, b], "summary")
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("header, expected", [
+        (None, False),
+        ("", False),
+        ("*", True),
+        ('W/"other", W/"abc"', True),
+        ('"abc"', True),
+        ('W/"abcd"', False),
+    ])
+    def test_etag_matches(self, header, expected):
+        """If-None-Matchの弱い比較・複数指定・ワイルドカード"""
+        assert etag_matches(header, 'W/"abc"') is expected
+
+    @pytest.mark.unit
+    def test_make_etag_is_weak(self):
+        assert make_etag("x").startswith('W/"')
@@ -0,0 +1,161 @@
+"""
+バックグラウンド削除キューの単体テスト
+
+ワーカースレッドでの実行、冪等な再試行、SQSバックエンドの送受信を検証します。
+"""
+
+import json
+from unittest.mock import MagicMock
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+
+from app.services.deletion_queue import (
+    BackgroundDeletionQueue,
+    SqsDeletionQueue,
+    build_deletion_job,
+    run_deletion_job,
+)
+from app.services.puzzle_service import PuzzleService
+
+
+def _client_error(operation):
+    return ClientError(
+        {'Error': {'Code': 'InternalError', 'Message': 'Temporary failure'}},
+        operation
+    )
+
+
+@pytest.fixture
+def mock_service():
+    """PuzzleServiceのモック"""
+    service = MagicMock()
+    service.finish_puzzle_deletion.return_value = {'deletedObjects': 0, 'deletedItems': 0}
+    return service
+
+
+class TestBackgroundDeletionQueue:
+    """プロセス内キューのテスト"""
+
+    @pytest.mark.unit
+    def test_job_runs_in_background(self, mock_service):
+        """enqueueしたジョブがワーカーで実行されること"""
+        deletion_queue = BackgroundDeletionQueue(mock_service, retry_base_delay=0)
+
+        deletion_queue.enqueue("user-1", "p-1", "puzzles/p-1.jpg")
+        deletion_queue.join()
+        deletion_queue.shutdown()
+
+        mock_service.finish_puzzle_deletion.assert_called_once_with(
+            user_id="user-1",
+            puzzle_id="p-1",
+            s3_key="puzzles/p-1.jpg"
+        )
+
+    @pytest.mark.unit
+    def test_retries_until_success(self, mock_service):
+        """一時的な失敗は再試行されること"""
+        mock_service.finish_puzzle_deletion.side_effect = [
+            _client_error('delete_objects'),
+            {'deletedObjects': 3, 'deletedItems': 2}
+        ]
+        deletion_queue = BackgroundDeletionQueue(mock_service, retry_base_delay=0)
+
+        deletion_queue.enqueue("user-1", "p-1", None)
+        deletion_queue.join()
+        deletion_queue.shutdown()
+
+        assert mock_service.finish_puzzle_deletion.call_count == 2
+
+    @pytest.mark.unit
+    def test_gives_up_after_max_attempts(self, mock_service):
+        """max_attempts回失敗したら諦め、ワーカーは次のジョブを処理できること"""
+        mock_service.finish_puzzle_deletion.side_effect = _client_error('delete_item')
+        deletion_queue = BackgroundDeletionQueue(mock_service, max_attempts=3, retry_base_delay=0)
+
+        deletion_queue.enqueue("user-1", "p-1", None)
+        deletion_queue.join()
+
+        assert mock_service.finish_puzzle_deletion.call_count == 3
+
+        mock_service.finish_puzzle_deletion.side_effect = None
+        deletion_queue.enqueue("user-1", "p-2", None)
+        deletion_queue.join()
+        deletion_queue.shutdown()
+
+        assert mock_service.finish_puzzle_deletion.call_count == 4
+
+    @pytest.mark.unit
+    def test_shutdown_without_worker(self, mock_service):
+        """ワーカー未起動でもshutdownできること"""
+        BackgroundDeletionQueue(mock_service).shutdown()
+
+
+class TestSqsDeletionQueue:
+    """SQSバックエンドのテスト（moto）"""
+
+    @pytest.mark.unit
+    def test_enqueue_and_process(self, mock_service):
+        """送信したメッセージをワーカー側で処理できること"""
+        sqs = boto3.client('sqs', region_name='ap-northeast-1')
+        queue_url = sqs.create_queue(QueueName='test-deletions')['QueueUrl']
+        deletion_queue = SqsDeletionQueue(sqs, queue_url)
+
+        deletion_queue.enqueue("user-1", "p-1", "puzzles/p-1.png")
+
+        messages = sqs.receive_message(QueueUrl=queue_url)['Messages']
+        assert json.loads(messages[0]['Body']) == build_deletion_job("user-1", "p-1", "puzzles/p-1.png")
+
+        run_deletion_job(mock_service, json.loads(messages[0]['Body']))
+        mock_service.finish_puzzle_deletion.assert_called_once_with(
+            user_id="user-1",
+            puzzle_id="p-1",
+            s3_key="puzzles/p-1.png"
+        )
+
+    @pytest.mark.unit
+    def test_enqueue_error(self):
+        """送信失敗はClientErrorとして送出されること"""
+        sqs = MagicMock()
+        sqs.send_message.side_effect = _client_error('send_message')
+
+        with pytest.raises(ClientError):
+            SqsDeletionQueue(sqs, 'https://queue').enqueue("user-1", "p-1", None)
+
+
+class TestFinishPuzzleDeletion:
+    """PuzzleService側の削除ステップのテスト（moto）"""
+
+    @pytest.fixture
+    def service(self):
+        return PuzzleService(
+            s3_bucket_name='test-bucket',
+            puzzles_table_name='test-puzzles',
+            pieces_table_name='test-pieces',
+            environment='test'
+        )
+
+    @pytest.mark.unit
+    def test_mark_then_finish(self, service):
+        """deletingに更新後、資産とレコードが削除されること（再実行しても安全）"""
+        puzzle_id = service.create_puzzle(piece_count=100, puzzle_name="Del", user_id="u")['puzzleId']
+        service.generate_upload_post(puzzle_id, 'a.jpg', 'u')
+        service.s3_client.put_object(Bucket='test-bucket', Key=f"pieces/{puzzle_id}/x.jpg", Body=b'x')
+
+        marked = service.mark_puzzle_deleting("u", puzzle_id)
+        assert marked['status'] == 'deleting'
+        assert service.get_puzzle("u", puzzle_id)['status'] == 'deleting'
+
+        result = service.finish_puzzle_deletion("u", puzzle_id, marked['s3Key'])
+        assert result['deletedObjects'] == 2
+        assert service.get_puzzle("u", puzzle_id) is None
+
+        # 冪等: 2回目も例外にならない
+        service.finish_puzzle_deletion("u", puzzle_id, marked['s3Key'])
+
+    @pytest.mark.unit
+    def test_mark_missing_puzzle(self, service):
+        """存在しないパズルはValueError"""
+        with pytest.raises(ValueError, match="Puzzle not found"):
+            service.mark_puzzle_deleting("u", "missing")
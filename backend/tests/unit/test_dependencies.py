@@ -0,0 +1,109 @@
+"""
+サービスレジストリ（FastAPI Depends）の単体テスト
+
+サービスとboto3クライアントがプロセス内で1回だけ生成され、
+リクエスト間で再利用されることを検証します。
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.api.dependencies import (
+    get_async_puzzle_service,
+    get_aws_executor,
+    get_deletion_queue,
+    get_piece_url_signer,
+    get_puzzle_service,
+    reset_services,
+)
+from app.core.config import Settings, settings
+
+
+class TestServiceRegistry:
+    """共有サービスのテスト"""
+
+    @pytest.mark.unit
+    def test_puzzle_service_is_singleton(self):
+        """同じPuzzleServiceインスタンスが返ること"""
+        assert get_puzzle_service() is get_puzzle_service()
+
+    @pytest.mark.unit
+    def test_async_service_wraps_shared_service(self):
+        """AsyncPuzzleServiceが共有PuzzleServiceと共有executorを使うこと"""
+        async_service = get_async_puzzle_service()
+
+        assert async_service.service is get_puzzle_service()
+        assert async_service._executor is get_aws_executor()
+
+    @pytest.mark.unit
+    def test_clients_created_once(self):
+        """複数回取得してもboto3クライアントは1回しか生成されないこと"""
+        reset_services()
+        with patch('boto3.client') as mock_client, patch('boto3.resource') as mock_resource:
+            for _ in range(3):
+                service = get_puzzle_service()
+                service.s3_client
+                service.puzzles_table
+
+        assert mock_client.call_count == 1
+        assert mock_resource.call_count == 1
+        reset_services()
+
+    @pytest.mark.unit
+    def test_clients_created_lazily(self):
+        """サービス生成時点ではboto3クライアントを作らないこと（コールドスタート短縮）"""
+        reset_services()
+        with patch('boto3.client') as mock_client, patch('boto3.resource') as mock_resource:
+            get_puzzle_service()
+
+        mock_client.assert_not_called()
+        mock_resource.assert_not_called()
+        reset_services()
+
+    @pytest.mark.unit
+    def test_pool_size_from_settings(self):
+        """コネクションプールサイズがSettingsから設定されること"""
+        reset_services()
+        with patch.object(settings, 'aws_max_pool_connections', 77):
+            # クライアントは初回アクセス時に生成されるため、パッチ中に参照する
+            config = get_puzzle_service().s3_client.meta.config
+
+        assert config.max_pool_connections == 77
+        reset_services()
+
+    @pytest.mark.unit
+    def test_thread_deletion_queue_refused_on_lambda(self):
+        """Lambda上ではプロセス内スレッドの削除キューを生成しないこと"""
+        reset_services()
+        with patch.object(settings, 'deletion_queue_backend', 'thread'), \
+                patch.object(settings, 'running_on_lambda', True):
+            with pytest.raises(ValueError, match="not supported on Lambda"):
+                get_deletion_queue()
+        reset_services()
+
+    @pytest.mark.unit
+    def test_deletion_queue_defaults_to_sqs_on_lambda(self, monkeypatch):
+        """AWS_LAMBDA_FUNCTION_NAME があればDELETION_QUEUE_BACKENDの既定がsqsになること"""
+        monkeypatch.delenv('DELETION_QUEUE_BACKEND', raising=False)
+        monkeypatch.setenv('AWS_LAMBDA_FUNCTION_NAME', 'jigsaw-puzzle-api')
+        assert Settings().deletion_queue_backend == 'sqs'
+
+        monkeypatch.delenv('AWS_LAMBDA_FUNCTION_NAME')
+        assert Settings().deletion_queue_backend == 'thread'
+
+    @pytest.mark.unit
+    def test_piece_url_cache_size_from_settings(self):
+        """署名キャッシュのパズル数がSettingsから設定されること"""
+        reset_services()
+        with patch.object(settings, 'piece_url_cache_max_entries', 4):
+            assert get_piece_url_signer().cache.max_entries == 4
+        reset_services()
+
+    @pytest.mark.unit
+    def test_reset_services(self):
+        """reset_services後は新しいインスタンスが生成されること"""
+        first = get_puzzle_service()
+        reset_services()
+
+        assert get_puzzle_service() is not first
@@ -0,0 +1,66 @@
+"""
+グリッド計算の単体テスト
+
+任意のピース数・縦横比で、ピースが正方形に近くピース数の誤差が小さいグリッドを返すことを検証します。
+"""
+
+import math
+
+import pytest
+
+from app.core.grid import MAX_PIECE_COUNT, MIN_PIECE_COUNT, _solve, solve_grid
+
+
+class TestSolveGrid:
+    """solve_grid のテスト"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('piece_count, size, expected', [
+        (100, (1000, 1000), (10, 10)),
+        (300, (4000, 3000), (15, 20)),
+        (300, (3000, 4000), (20, 15)),
+        (500, (4000, 3200), (20, 25)),
+        (2000, (4000, 3200), (40, 50)),
+    ])
+    def test_exact_grids(self, piece_count, size, expected):
+        """縦横比がぴったり合う場合は正方形のピースでちょうどのピース数"""
+        assert solve_grid(piece_count, *size) == expected
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('piece_count', [100, 137, 300, 500, 999, 1000, 1234, 2000])
+    @pytest.mark.parametrize('size', [(1, 1), (4, 3), (3, 4), (16, 9), (9, 16), (3, 1), (1, 5)])
+    def test_close_to_square_pieces_and_count(self, piece_count, size):
+        """ピース数の誤差は数%以内、ピースの縦横比は正方形から大きく外れない"""
+        rows, cols = solve_grid(piece_count, *size)
+        aspect = size[0] / size[1]
+
+        assert abs(rows * cols - piece_count) / piece_count <= 0.05
+        assert abs(math.log(aspect * rows / cols)) < 0.35
+
+    @pytest.mark.unit
+    def test_wide_image_has_more_columns(self):
+        rows, cols = solve_grid(1000, 3000, 1000)
+        assert cols > rows * 2
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('piece_count', [MIN_PIECE_COUNT - 1, 0, MAX_PIECE_COUNT + 1])
+    def test_out_of_range(self, piece_count):
+        with pytest.raises(ValueError, match="Unsupported piece count"):
+            solve_grid(piece_count, 100, 100)
+
+    @pytest.mark.unit
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            solve_grid(100, 0, 100)
+
+    @pytest.mark.unit
+    def test_memoized_per_quantized_aspect(self):
+        """ほぼ同じ縦横比の画像は同じキャッシュエントリを使う"""
+        _solve.cache_clear()
+
+        first = solve_grid(777, 4032, 3024)
+        second = solve_grid(777, 4000, 3000)
+
+        assert first == second
+        info = _solve.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
@@ -0,0 +1,179 @@
+"""
+画像ヘッダー解析の単体テスト
+
+画像全体を読まずに形式・縦横サイズを取得できること、
+不正な画像やデコンプレッションボムを拒否できることを検証します。
+"""
+
+import struct
+import zlib
+
+import pytest
+
+from app.core.image_header import (
+    ImageHeader,
+    InvalidImageError,
+    inspect_image,
+    read_image_header,
+    validate_image_header,
+)
+
+
+def _png(width, height):
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    chunk = struct.pack('>I', len(ihdr)) + b'IHDR' + ihdr
+    return b'\x89PNG\r\n\x1a\n' + chunk + struct.pack('>I', zlib.crc32(b'IHDR' + ihdr))
+
+
+def _segment(code, payload):
+    return bytes([0xFF, code]) + struct.pack('>H', len(payload) + 2) + payload
+
+
+def _jpeg(width, height, app_size=0, sof=0xC0):
+    """EXIF相当（APP1）のあとにSOFを持つJPEGヘッダー"""
+    data = b'\xff\xd8'
+    if app_size:
+        data += _segment(0xE1, b'Exif\x00\x00' + b'\x00' * (app_size - 6))
+    data += _segment(0xDB, b'\x00' * 65)  # DQT
+    data += _segment(sof, struct.pack('>BHHB', 8, height, width, 3) + b'\x00' * 9)
+    data += _segment(0xDA, b'\x00' * 10) + b'\x00' * 1000  # SOS + 画像データ
+    return data
+
+
+class RecordingReader:
+    """Range GETの呼び出しを記録する read(start, end)"""
+
+    def __init__(self, data):
+        self.data = data
+        self.calls = []
+
+    def __call__(self, start, end):
+        self.calls.append((start, end))
+        return self.data[start:end + 1]
+
+    @property
+    def bytes_read(self):
+        return sum(min(end + 1, len(self.data)) - start for start, end in self.calls)
+
+
+class TestReadImageHeader:
+    """read_image_header のテスト"""
+
+    @pytest.mark.unit
+    def test_png(self):
+        reader = RecordingReader(_png(640, 480) + b'\x00' * 100000)
+
+        assert read_image_header(reader) == ImageHeader('PNG', 640, 480)
+        assert len(reader.calls) == 1
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('sof', [0xC0, 0xC2])
+    def test_jpeg_baseline_and_progressive(self, sof):
+        assert read_image_header(RecordingReader(_jpeg(4032, 3024, sof=sof))) == ImageHeader('JPEG', 4032, 3024)
+
+    @pytest.mark.unit
+    def test_jpeg_skips_large_segments(self):
+        """チャンクより大きいEXIFセグメントは読まずに次の位置から再取得する"""
+        data = _jpeg(1200, 800, app_size=60000) + b'\x00' * 5_000_000
+        reader = RecordingReader(data)
+
+        header = read_image_header(reader, chunk_size=4096)
+
+        assert header == ImageHeader('JPEG', 1200, 800)
+        assert len(reader.calls) == 2
+        assert reader.bytes_read <= 2 * 4096
+
+    @pytest.mark.unit
+    def test_matches_pillow(self):
+        """Pillowが生成した画像でもPillowと同じサイズになること"""
+        import io
+
+        Image = pytest.importorskip("PIL.Image")
+        for fmt in ('JPEG', 'PNG'):
+            buffer = io.BytesIO()
+            Image.new('RGB', (321, 123)).save(buffer, format=fmt)
+            header = read_image_header(RecordingReader(buffer.getvalue()))
+            assert header == ImageHeader(fmt, 321, 123)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('data', [
+        b'GIF89a' + b'\x00' * 100,
+        b'RIFF\x00\x00\x00\x00WEBPVP8 ',
+        b'',
+    ])
+    def test_unsupported_format(self, data):
+        with pytest.raises(InvalidImageError, match="Unsupported"):
+            read_image_header(RecordingReader(data))
+
+    @pytest.mark.unit
+    def test_truncated_jpeg(self):
+        with pytest.raises(InvalidImageError):
+            read_image_header(RecordingReader(_jpeg(100, 100)[:30]))
+
+    @pytest.mark.unit
+    def test_jpeg_without_frame_header(self):
+        data = b'\xff\xd8' + _segment(0xDB, b'\x00' * 65) + _segment(0xDA, b'\x00' * 10)
+        with pytest.raises(InvalidImageError, match="not found"):
+            read_image_header(RecordingReader(data))
+
+    @pytest.mark.unit
+    def test_gives_up_after_max_bytes(self):
+        """SOFが見つからないまま上限に達したら打ち切る"""
+        data = b'\xff\xd8' + _segment(0xE1, b'\x00' * 65000) * 4 + _jpeg(10, 10)[2:]
+        reader = RecordingReader(data)
+
+        with pytest.raises(InvalidImageError, match="not found"):
+            read_image_header(reader, chunk_size=1024, max_bytes=128 * 1024)
+
+        assert reader.bytes_read < 8 * 1024
+
+
+class TestValidateImageHeader:
+    """validate_image_header / inspect_image のテスト"""
+
+    @pytest.mark.unit
+    def test_decompression_bomb(self):
+        """ファイルは小さくても展開後のピクセル数が上限を超えれば拒否"""
+        with pytest.raises(InvalidImageError, match="too large"):
+            inspect_image(RecordingReader(_png(60000, 60000)))
+
+    @pytest.mark.unit
+    def test_too_small(self):
+        with pytest.raises(InvalidImageError, match="too small"):
+            validate_image_header(ImageHeader('PNG', 0, 10))
+
+    @pytest.mark.unit
+    def test_within_limits(self):
+        assert inspect_image(RecordingReader(_png(4000, 3000))) == ImageHeader('PNG', 4000, 3000)
+
+
+class TestExifOrientation:
+    """EXIF Orientation の読み取り"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('orientation', [1, 3, 6, 8])
+    def test_reads_orientation_from_pillow_jpeg(self, orientation):
+        """Pillowが書き込んだEXIFのOrientationを読み、表示サイズを入れ替えること"""
+        import io
+
+        Image = pytest.importorskip("PIL.Image")
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        buffer = io.BytesIO()
+        Image.new('RGB', (64, 32)).save(buffer, format='JPEG', exif=exif)
+
+        header = read_image_header(RecordingReader(buffer.getvalue()))
+
+        assert header.orientation == orientation
+        assert header.display_size == ((32, 64) if orientation in (6, 8) else (64, 32))
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('exif', [
+        b'',
+        b'Exif\x00\x00XX\x00\x2a\x00\x00\x00\x08',
+        b'Exif\x00\x00II\x2a\x00\xff\x00\x00\x00',
+    ])
+    def test_invalid_exif_defaults_to_no_rotation(self, exif):
+        from app.core.image_header import parse_exif_orientation
+
+        assert parse_exif_orientation(exif) == 1
@@ -0,0 +1,92 @@
+"""
+ImageProcessorの画像正規化の単体テスト
+
+EXIFの回転とICCプロファイルを、画像全体のコピーを作らずにピース単位で適用できることを検証します。
+"""
+
+import io
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+ImageOps = pytest.importorskip("PIL.ImageOps")
+
+from app.services.image_processor import ORIENTATION_TRANSPOSE, ImageProcessor, source_box  # noqa: E402
+
+
+@pytest.fixture
+def processor():
+    return ImageProcessor(
+        s3_bucket_name='test-bucket',
+        pieces_table_name='test-pieces',
+        puzzles_table_name='test-puzzles'
+    )
+
+
+def _gradient(width, height):
+    """位置ごとに色が異なる画像（回転・反転の取り違えを検出できる）"""
+    image = Image.new('RGB', (width, height))
+    image.putdata([(x * 255 // width, y * 255 // height, (x + y) % 256) for y in range(height) for x in range(width)])
+    return image
+
+
+class TestSourceBox:
+    """表示座標 → 元画像座標の変換"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('orientation', range(1, 9))
+    def test_matches_exif_transpose(self, processor, orientation):
+        """元画像から切り出して回転したピースが、全体を回転してから切り出した結果と一致すること"""
+        raw = _gradient(40, 24)
+        raw.getexif()[0x0112] = orientation
+        expected_image = ImageOps.exif_transpose(raw)
+
+        transpose = (
+            getattr(Image.Transpose, ORIENTATION_TRANSPOSE[orientation]) if orientation != 1 else None
+        )
+        width, height = expected_image.size
+        for box in [(0, 0, width // 3, height // 2), (width // 3, height // 2, width, height), (5, 3, 11, 19)]:
+            piece = processor._extract_piece(raw, source_box(box, orientation, raw.size), transpose, None)
+            assert piece.tobytes() == expected_image.crop(box).tobytes()
+
+
+class TestColorHandling:
+    """色空間の扱い"""
+
+    @pytest.mark.unit
+    def test_srgb_profile_is_not_converted(self, processor):
+        ImageCms = pytest.importorskip("PIL.ImageCms")
+        image = Image.new('RGB', (8, 8))
+        image.info['icc_profile'] = ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB')).tobytes()
+
+        assert processor._color_transform(image, 'p-1') is None
+
+    @pytest.mark.unit
+    def test_broken_profile_is_ignored(self, processor):
+        image = Image.new('RGB', (8, 8))
+        image.info['icc_profile'] = b'not a profile'
+
+        assert processor._color_transform(image, 'p-1') is None
+
+    @pytest.mark.unit
+    def test_applies_transform_per_piece(self, processor):
+        """変換はピースの大きさで適用され、出力はRGBになること"""
+        ImageCms = pytest.importorskip("PIL.ImageCms")
+        lab = ImageCms.createProfile('LAB')
+        transform = ImageCms.buildTransform(
+            ImageCms.createProfile('sRGB'), lab, 'RGB', 'LAB'
+        )
+        image = _gradient(20, 20)
+
+        piece = processor._extract_piece(image, (0, 0, 5, 5), None, transform)
+
+        assert piece.size == (5, 5)
+        assert piece.mode == 'LAB'
+
+    @pytest.mark.unit
+    def test_cmyk_and_alpha_become_rgb(self, processor):
+        """JPEGで保存できないモードのピースはRGBに変換されること"""
+        for mode in ('CMYK', 'RGBA', 'P'):
+            piece = processor._extract_piece(Image.new(mode, (10, 10)), (0, 0, 4, 4), None, None)
+            assert piece.mode == 'RGB'
+            piece.save(io.BytesIO(), format='JPEG')
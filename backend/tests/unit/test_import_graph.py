@@ -0,0 +1,76 @@
+"""
+Lambdaバンドルのインポート経路チェックの単体テスト
+
+scripts/check_import_graph.py を実際に実行し、APIの経路にPillow等が、
+ワーカーの経路にFastAPIが入っていないことを検証します。
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parents[3] / "scripts" / "check_import_graph.py"
+
+
+BACKEND_DIR = str(SCRIPT.parents[1] / "backend")
+
+
+def _run_check(target, *args):
+    return subprocess.run(
+        [sys.executable, str(SCRIPT), target, *args],
+        capture_output=True,
+        text=True
+    )
+
+
+def _load_script():
+    sys.path.insert(0, str(SCRIPT.parent))
+    try:
+        import check_import_graph
+    finally:
+        sys.path.remove(str(SCRIPT.parent))
+    return check_import_graph
+
+
+class TestImportGraph:
+    """インポート経路チェックのテスト"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("target", ["api", "worker"])
+    def test_no_forbidden_imports(self, target):
+        """各エントリーポイントに禁止モジュールが含まれないこと"""
+        result = _run_check(target)
+
+        assert result.returncode == 0, result.stdout + result.stderr
+
+    @pytest.mark.unit
+    def test_api_path_does_not_load_pillow(self):
+        """APIの経路ではPillowと画像処理モジュールが読み込まれないこと"""
+        check_import_graph = _load_script()
+
+        modules = check_import_graph.imported_modules(
+            BACKEND_DIR,
+            check_import_graph.TARGETS['api']['entry']
+        )
+
+        assert 'app.api.main' in modules
+        assert check_import_graph.find_violations(modules, ['PIL', 'app.services.image_processor']) == []
+
+    @pytest.mark.unit
+    def test_import_failure_is_reported_cleanly(self):
+        """エントリーポイントをインポートできない場合はトレースバックではなく1行のエラーになること"""
+        check_import_graph = _load_script()
+
+        with pytest.raises(check_import_graph.ImportProbeError, match="no_such_module"):
+            check_import_graph.imported_modules(BACKEND_DIR, ['no_such_module'])
+
+    @pytest.mark.unit
+    def test_package_dir_excludes_site_packages(self, tmp_path):
+        """--package-dir 指定時はバンドルに無い依存関係（FastAPI）をインポートできず失敗すること"""
+        result = _run_check("api", "--package-dir", str(tmp_path))
+
+        assert result.returncode == 2
+        assert "failed to import entry point" in result.stdout
+        assert "Traceback" not in result.stdout + result.stderr
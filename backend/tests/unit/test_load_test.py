@@ -0,0 +1,95 @@
+"""
+APIロードテストの単体テスト
+
+パーセンタイルの集計、API Gatewayイベントの組み立て、テスト用のmotoリソースでの計測を検証します。
+"""
+
+import pytest
+
+from benchmarks.load_test import (
+    ENDPOINTS,
+    Request,
+    api_gateway_event,
+    percentile,
+    run_server,
+    summarize,
+)
+
+
+class TestPercentile:
+    """percentile / summarize のテスト"""
+
+    @pytest.mark.unit
+    def test_nearest_rank(self):
+        values = [float(value) for value in range(1, 101)]
+
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 95) == 95.0
+        assert percentile(values, 99) == 99.0
+        assert percentile(values, 100) == 100.0
+
+    @pytest.mark.unit
+    def test_single_and_empty(self):
+        assert percentile([7.0], 99) == 7.0
+        assert percentile([], 50) == 0.0
+
+    @pytest.mark.unit
+    def test_summarize(self):
+        # 秒で渡してミリ秒で集計、順不同でも並べ替える
+        summary = summarize([0.003, 0.001, 0.002, 0.004], errors=1, elapsed=0.5)
+
+        assert summary['requests'] == 4
+        assert summary['errors'] == 1
+        assert summary['p50Ms'] == 2.0
+        assert summary['p99Ms'] == 4.0
+        assert summary['maxMs'] == 4.0
+        assert summary['meanMs'] == 2.5
+        assert summary['rps'] == 8.0
+
+    @pytest.mark.unit
+    def test_cold_summary_has_no_rps(self):
+        assert summarize([0.01], errors=0, elapsed=None)['rps'] is None
+
+
+class TestApiGatewayEvent:
+    """api_gateway_event のテスト"""
+
+    @pytest.mark.unit
+    def test_get_with_query(self):
+        event = api_gateway_event(Request('GET', '/puzzles/p-1', {'user_id': 'u-1'}, None))
+
+        assert event['httpMethod'] == 'GET'
+        assert event['path'] == '/puzzles/p-1'
+        assert event['queryStringParameters'] == {'user_id': 'u-1'}
+        assert event['multiValueQueryStringParameters'] == {'user_id': ['u-1']}
+        assert event['body'] is None
+
+    @pytest.mark.unit
+    def test_post_with_json_body(self):
+        event = api_gateway_event(Request('POST', '/puzzles', {}, {'pieceCount': 300}))
+
+        assert event['queryStringParameters'] is None
+        assert event['headers']['Content-Type'] == 'application/json'
+        assert event['body'] == '{"pieceCount": 300}'
+
+
+class TestRunServer:
+    """run_server のテスト（テスト用のmotoリソースで実行）"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('server, concurrency', [('mangum', 1), ('uvicorn', 2)])
+    def test_reports_cold_and_warm_cases(self, server, concurrency):
+        pytest.importorskip('mangum' if server == 'mangum' else 'uvicorn')
+
+        cases = run_server(server, ENDPOINTS, requests=4, concurrency=concurrency, warmup=1)
+
+        assert cases[0]['endpoint'] == 'import'
+        cold = {case['endpoint']: case for case in cases if case['phase'] == 'cold'}
+        warm = {case['endpoint']: case for case in cases if case['phase'] == 'warm'}
+        assert set(warm) == set(ENDPOINTS)
+        assert set(cold) == set(ENDPOINTS) | {'import'}
+        for case in warm.values():
+            assert case['requests'] == 4
+            assert case['errors'] == 0
+            assert case['rps'] > 0
+            assert case['p50Ms'] <= case['p95Ms'] <= case['p99Ms']
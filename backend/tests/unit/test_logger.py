@@ -0,0 +1,243 @@
+"""
+構造化ログの単体テスト
+
+JSONFormatter の出力と、QueueHandler / QueueListener による非同期・バッチ出力を検証します。
+"""
+
+import io
+import json
+import logging
+import sys
+import uuid
+
+import pytest
+
+from app.core import logger as logger_module
+from app.core.logger import (
+    JSONFormatter,
+    SamplingFilter,
+    _AsyncLogging,
+    flush_logs,
+    parse_log_sampling,
+    setup_logger,
+)
+
+
+def _record(message="hello %s", args=("world",), exc_info=None, **extra):
+    record = logging.LogRecord('app.test', logging.INFO, __file__, 1, message, args, exc_info)
+    record.__dict__.update(extra)
+    return record
+
+
+class _CountingStream(io.StringIO):
+    """write の呼び出し回数を数えるストリーム"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+@pytest.fixture
+def async_logging(monkeypatch):
+    """StringIO に出力する非同期ロギングに差し替える"""
+    stream = _CountingStream()
+    state = _AsyncLogging(logging.Formatter("%(levelname)s %(message)s"), stream)
+    monkeypatch.setattr(logger_module, '_async_logging', state)
+    monkeypatch.setenv('LOG_ASYNC', 'true')
+    yield state, stream
+    state.stop()
+
+
+class TestJSONFormatter:
+    """JSONFormatter のテスト"""
+
+    @pytest.mark.unit
+    def test_fields(self):
+        formatter = JSONFormatter('prod')
+        record = _record(puzzle_id='p-1', request_id='r-1', extra_data={'pieces': 100})
+
+        data = json.loads(formatter.format(record))
+
+        assert data['level'] == 'INFO'
+        assert data['logger'] == 'app.test'
+        assert data['environment'] == 'prod'
+        assert data['message'] == 'hello world'
+        assert data['puzzle_id'] == 'p-1'
+        assert data['request_id'] == 'r-1'
+        assert data['extra'] == {'pieces': 100}
+        assert 'user_id' not in data
+
+    @pytest.mark.unit
+    def test_all_extra_fields_are_included(self):
+        formatter = JSONFormatter('prod')
+        record = _record(puzzle_id='p-1', rows=10, cols=12, s3_key='puzzles/p-1.jpg')
+
+        data = json.loads(formatter.format(record))
+
+        assert data['rows'] == 10
+        assert data['cols'] == 12
+        assert data['s3_key'] == 'puzzles/p-1.jpg'
+        # LogRecord の標準属性は出力しない
+        for key in ('args', 'msg', 'lineno', 'thread', 'processName'):
+            assert key not in data
+
+    @pytest.mark.unit
+    def test_extra_fields_from_logger_call(self, async_logging):
+        state, stream = async_logging
+        state.output.setFormatter(JSONFormatter('prod'))
+        log = setup_logger(f"test-extra-{uuid.uuid4()}")
+
+        log.info("Image loaded", extra={"puzzle_id": "p-1", "width": 640, "level": "shadowed"})
+        flush_logs()
+
+        data = json.loads(stream.getvalue())
+        assert data['width'] == 640
+        assert data['puzzle_id'] == 'p-1'
+        # 標準の項目は上書きされない
+        assert data['level'] == 'INFO'
+
+    @pytest.mark.unit
+    def test_timestamp_uses_record_time(self):
+        formatter = JSONFormatter('prod')
+        record = _record()
+        record.created = 1700000000.123456
+
+        assert json.loads(formatter.format(record))['timestamp'] == '2023-11-14T22:13:20.123456Z'
+        record.created = 1700000001.5
+        assert json.loads(formatter.format(record))['timestamp'] == '2023-11-14T22:13:21.500000Z'
+
+    @pytest.mark.unit
+    def test_exception(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = _record(exc_info=sys.exc_info())
+
+        data = json.loads(JSONFormatter('prod').format(record))
+
+        assert 'ValueError: boom' in data['exception']
+
+
+class TestAsyncLogging:
+    """非同期・バッチ出力のテスト"""
+
+    @pytest.mark.unit
+    def test_prepare_only_renders_message(self, async_logging):
+        state, stream = async_logging
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = _record(exc_info=sys.exc_info())
+
+        # メッセージだけを確定し、例外の整形はリスナーに任せる
+        assert state.handler.prepare(record) is record
+        assert record.msg == 'hello world'
+        assert record.args is None
+        assert record.exc_text is None
+
+    @pytest.mark.unit
+    def test_args_mutated_after_call_are_not_logged(self, async_logging):
+        state, stream = async_logging
+        log = setup_logger(f"test-async-{uuid.uuid4()}")
+        payload = {'status': 'pending'}
+
+        log.info("payload %s", payload)
+        payload['status'] = 'completed'
+        flush_logs()
+
+        assert stream.getvalue() == "INFO payload {'status': 'pending'}\n"
+
+    @pytest.mark.unit
+    def test_flush_writes_all_lines_in_batches(self, async_logging):
+        state, stream = async_logging
+        log = setup_logger(f"test-async-{uuid.uuid4()}")
+
+        assert log.handlers == [state.handler]
+        for i in range(1000):
+            log.info("line %d", i)
+        flush_logs()
+
+        lines = stream.getvalue().splitlines()
+        assert lines == [f"INFO line {i}" for i in range(1000)]
+        # 1行ずつではなくまとめて書き込まれる
+        assert stream.writes < len(lines)
+
+    @pytest.mark.unit
+    def test_stop_flushes_remaining_lines(self, async_logging):
+        state, stream = async_logging
+        log = setup_logger(f"test-async-{uuid.uuid4()}")
+
+        log.warning("last words")
+        state.stop()
+        # 停止後の flush は待たずに戻る
+        flush_logs()
+
+        assert stream.getvalue() == "WARNING last words\n"
+
+    @pytest.mark.unit
+    def test_write_errors_do_not_stop_listener(self, async_logging, monkeypatch):
+        state, stream = async_logging
+        log = setup_logger(f"test-async-{uuid.uuid4()}")
+        monkeypatch.setattr(logging, 'raiseExceptions', False)
+
+        stream.close()
+        log.info("lost")
+        flush_logs()
+
+        state.output.setStream(_CountingStream())
+        log.info("kept")
+        flush_logs()
+
+        assert state.output.stream.getvalue() == "INFO kept\n"
+
+    @pytest.mark.unit
+    def test_sync_mode(self, monkeypatch):
+        monkeypatch.setenv('LOG_ASYNC', 'false')
+
+        log = setup_logger(f"test-sync-{uuid.uuid4()}")
+
+        assert len(log.handlers) == 1
+        assert type(log.handlers[0]) is logging.StreamHandler
+
+
+class TestSampling:
+    """SamplingFilter / LOG_SAMPLING のテスト"""
+
+    @pytest.mark.unit
+    def test_parse(self):
+        assert parse_log_sampling("app.a=0.5, app.b=2,broken,app.c=x,=1") == {'app.a': 0.5, 'app.b': 1.0}
+        assert parse_log_sampling("") == {}
+
+    @pytest.mark.unit
+    def test_debug_records_are_sampled(self):
+        keep = SamplingFilter(0.1, rng=lambda: 0.05)
+        drop = SamplingFilter(0.1, rng=lambda: 0.5)
+        record = _record()
+        record.levelno = logging.DEBUG
+
+        assert drop.filter(record) is False
+        assert keep.filter(record) is True
+        assert record.sample_rate == 0.1
+
+    @pytest.mark.unit
+    def test_higher_levels_always_pass(self):
+        record = _record()
+
+        assert SamplingFilter(0.0).filter(record) is True
+        assert not hasattr(record, 'sample_rate')
+
+    @pytest.mark.unit
+    def test_configured_per_logger(self, monkeypatch):
+        monkeypatch.setenv('LOG_SAMPLING', 'test-sampling.services=0.25')
+        monkeypatch.setenv('LOG_ASYNC', 'false')
+        suffix = uuid.uuid4()
+
+        sampled = setup_logger(f"test-sampling.services.{suffix}")
+        other = setup_logger(f"test-sampling.api.{suffix}")
+
+        assert [f.rate for f in sampled.filters] == [0.25]
+        assert other.filters == []
@@ -0,0 +1,119 @@
+"""
+列指向ピースマニフェストの単体テスト
+
+各形式（json / msgpack / binary）の往復と、ピースごとのJSONに対するサイズ削減を検証します。
+"""
+
+import json
+import uuid
+
+import pytest
+
+from app.core.manifest import (
+    build_manifest,
+    decode_binary_manifest,
+    decode_manifest_json,
+    encode_manifest,
+    manifest_key,
+    piece_keys,
+)
+
+
+def _pieces(rows, cols, width=100, height=80):
+    return [
+        {
+            'pieceId': str(uuid.uuid4()),
+            'row': row,
+            'col': col,
+            'x': col * width,
+            'y': row * height,
+            'width': width,
+            'height': height,
+        }
+        for row in range(rows)
+        for col in range(cols)
+    ]
+
+
+@pytest.fixture
+def manifest():
+    return build_manifest('puzzle-1', 4, 5, 500, 320, _pieces(4, 5))
+
+
+class TestBuildManifest:
+    """マニフェスト作成のテスト"""
+
+    @pytest.mark.unit
+    def test_columns(self, manifest):
+        """各列がピース数と同じ長さの配列になること"""
+        assert manifest['count'] == 20
+        assert set(manifest['columns']) == {'pieceId', 'row', 'col', 'x', 'y', 'width', 'height'}
+        assert all(len(values) == 20 for values in manifest['columns'].values())
+        assert manifest['columns']['x'][:3] == [0, 100, 200]
+
+    @pytest.mark.unit
+    def test_piece_keys(self, manifest):
+        """S3キーがプレフィックス + pieceId + 拡張子で復元できること"""
+        first = manifest['columns']['pieceId'][0]
+
+        assert piece_keys(manifest)[0] == f"pieces/puzzle-1/{first}.jpg"
+
+    @pytest.mark.unit
+    def test_manifest_key_under_piece_prefix(self):
+        """ピース削除時に一緒に消えるよう pieces/ 配下に置かれること"""
+        assert manifest_key('puzzle-1') == "pieces/puzzle-1/manifest.json"
+
+
+class TestEncodeManifest:
+    """各形式へのエンコードのテスト"""
+
+    @pytest.mark.unit
+    def test_json_round_trip(self, manifest):
+        body, media_type = encode_manifest(manifest, 'json')
+
+        assert media_type == 'application/json'
+        assert decode_manifest_json(body) == manifest
+
+    @pytest.mark.unit
+    def test_msgpack_round_trip(self, manifest):
+        msgpack = pytest.importorskip("msgpack")
+
+        body, media_type = encode_manifest(manifest, 'msgpack')
+
+        assert media_type == 'application/msgpack'
+        assert msgpack.unpackb(body) == manifest
+
+    @pytest.mark.unit
+    def test_binary_round_trip(self, manifest):
+        body, media_type = encode_manifest(manifest, 'binary')
+
+        assert media_type == 'application/octet-stream'
+        assert decode_binary_manifest(body) == manifest
+
+    @pytest.mark.unit
+    def test_binary_is_fraction_of_item_json(self):
+        """2000ピースでピースごとのJSONオブジェクト配列より大幅に小さいこと"""
+        pieces = _pieces(40, 50)
+        item_json = json.dumps([
+            {**p, 'puzzleId': 'puzzle-1', 'userId': 'user-1', 'correctRow': p['row'],
+             'correctCol': p['col'], 's3Key': f"pieces/puzzle-1/{p['pieceId']}.jpg",
+             'createdAt': '2026-01-01T00:00:00.000000', 'updatedAt': '2026-01-01T00:00:00.000000'}
+            for p in pieces
+        ]).encode()
+        manifest = build_manifest('puzzle-1', 40, 50, 5000, 3200, pieces)
+
+        columnar_json, _ = encode_manifest(manifest, 'json')
+        binary, _ = encode_manifest(manifest, 'binary')
+
+        assert len(columnar_json) < len(item_json) / 3
+        assert len(binary) < len(item_json) / 8
+
+    @pytest.mark.unit
+    def test_unknown_format(self, manifest):
+        with pytest.raises(ValueError):
+            encode_manifest(manifest, 'xml')
+
+    @pytest.mark.unit
+    def test_decode_rejects_other_data(self):
+        with pytest.raises(ValueError):
+            decode_binary_manifest(b'NOPE' + b'\x00' * 40)
@@ -0,0 +1,253 @@
+"""
+サンプリングプロファイラの単体テスト
+
+スタックのサンプリングと collapsed stack 形式、プロファイルを取る条件、
+リクエスト・分割ジョブのプロファイルがS3に保存されることを検証します。
+"""
+
+import asyncio
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.profiling import ProfilingMiddleware
+from app.core.aws import create_client
+from app.core.profiling import (
+    ProfilingPolicy,
+    SamplingProfiler,
+    activate_profiler,
+    create_profiling_policy,
+    current_profiler,
+    deactivate_profiler,
+    profile_key,
+)
+from app.core.request_metrics import bind_metrics
+
+
+def _busy_wait(seconds):
+    """サンプリングされる間CPUを使い続ける関数"""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _settings(**overrides):
+    values = {
+        'profiling_always': False,
+        'profiling_sample_rate': 0.0,
+        'profiling_token': '',
+        'profiling_interval_ms': 10.0,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+class TestSamplingProfiler:
+    """SamplingProfiler のテスト"""
+
+    @pytest.mark.unit
+    def test_collapsed_stacks_include_running_function(self):
+        with SamplingProfiler(interval=0.001) as profiler:
+            _busy_wait(0.1)
+
+        assert profiler.samples > 0
+        assert profiler.duration >= 0.1
+        lines = profiler.collapsed().splitlines()
+        busy = [line for line in lines if '_busy_wait@' in line]
+        assert busy
+        # "スレッド名;呼び出し元;...;関数 回数"
+        stack, count = busy[0].rsplit(' ', 1)
+        assert stack.startswith('MainThread;')
+        assert int(count) > 0
+        assert 'sampling-profiler' not in profiler.collapsed()
+
+    @pytest.mark.unit
+    def test_only_target_thread_is_sampled(self):
+        """同時に動いている別スレッド（別リクエストなど）のスタックを含めないこと"""
+        stop = threading.Event()
+
+        def other_request():
+            while not stop.is_set():
+                _busy_wait(0.001)
+
+        other = threading.Thread(target=other_request, name='other-request')
+        other.start()
+        try:
+            with SamplingProfiler(interval=0.001) as profiler:
+                _busy_wait(0.05)
+        finally:
+            stop.set()
+            other.join()
+
+        assert profiler.samples > 0
+        assert all(stack.startswith('MainThread;') for stack in profiler.stacks)
+
+    @pytest.mark.unit
+    def test_bound_executor_work_is_sampled(self):
+        """bind_metrics で委譲したスレッドは実行中だけサンプリング対象になること"""
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='aws-io') as executor:
+            with SamplingProfiler(interval=0.001) as profiler:
+                token = activate_profiler(profiler)
+                try:
+                    executor.submit(bind_metrics(_busy_wait), 0.05).result()
+                finally:
+                    deactivate_profiler(token)
+                # 登録が外れた後の同じスレッドの処理は記録しない
+                executor.submit(_busy_wait, 0.05).result()
+
+        executor_stacks = [stack for stack in profiler.stacks if stack.startswith('aws-io')]
+        assert any('_busy_wait@' in stack for stack in executor_stacks)
+        assert sum(profiler.stacks[stack] for stack in executor_stacks) < profiler.samples
+        assert profiler._threads == {}
+        assert current_profiler() is None
+
+    @pytest.mark.unit
+    def test_manual_sample_counts_every_thread(self):
+        profiler = SamplingProfiler()
+        profiler.sample()
+
+        assert profiler.samples == 1
+        assert any(stack.startswith('MainThread;') for stack in profiler.stacks)
+        assert all(' ' not in stack for stack in profiler.stacks)
+
+
+class TestProfilingPolicy:
+    """ProfilingPolicy / create_profiling_policy のテスト"""
+
+    @pytest.mark.unit
+    def test_disabled_by_default(self):
+        assert create_profiling_policy(_settings()) is None
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('overrides', [
+        {'profiling_always': True},
+        {'profiling_sample_rate': 0.01},
+        {'profiling_token': 'secret'},
+    ])
+    def test_enabled_by_any_setting(self, overrides):
+        policy = create_profiling_policy(_settings(**overrides))
+        assert policy is not None
+        assert policy.interval == pytest.approx(0.01)
+
+    @pytest.mark.unit
+    def test_token_header(self):
+        policy = ProfilingPolicy(token='secret')
+
+        assert policy.should_profile('secret') is True
+        assert policy.should_profile('wrong') is False
+        assert policy.should_profile(None) is False
+
+    @pytest.mark.unit
+    def test_requested_jobs_need_token(self):
+        assert ProfilingPolicy(token='secret').should_profile(requested=True) is True
+        assert ProfilingPolicy(sample_rate=0.0001, rng=lambda: 0.5).should_profile(requested=True) is False
+
+    @pytest.mark.unit
+    def test_sample_rate(self):
+        assert ProfilingPolicy(sample_rate=0.1, rng=lambda: 0.05).should_profile() is True
+        assert ProfilingPolicy(sample_rate=0.1, rng=lambda: 0.5).should_profile() is False
+
+    @pytest.mark.unit
+    def test_profile_key(self):
+        assert profile_key('puzzle-1', 'split').startswith('profiles/puzzle-1/split-')
+        assert profile_key(None, 'request-get').startswith('profiles/requests/request-get-')
+        assert profile_key('puzzle-1', 'split').endswith('.collapsed')
+
+
+class TestProfilingMiddleware:
+    """ProfilingMiddleware のテスト"""
+
+    @staticmethod
+    def _client():
+        app = FastAPI()
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='aws-io')
+
+        # ルートの処理は AsyncPuzzleService と同じく bind_metrics で包んでexecutorに委譲する
+        @app.get("/puzzles/{puzzle_id}")
+        async def get_puzzle(puzzle_id: str):
+            await asyncio.get_running_loop().run_in_executor(executor, bind_metrics(_busy_wait), 0.05)
+            return {"puzzleId": puzzle_id}
+
+        s3_client = create_client('s3')
+        app.add_middleware(
+            ProfilingMiddleware,
+            policy=ProfilingPolicy(token='secret', interval=0.001),
+            s3_client_factory=lambda: s3_client,
+            bucket='test-bucket'
+        )
+        return TestClient(app), s3_client
+
+    @pytest.mark.unit
+    def test_profiles_request_with_token(self):
+        client, s3_client = self._client()
+
+        response = client.get("/puzzles/puzzle-1", headers={"X-Profile": "secret"})
+
+        assert response.status_code == 200
+        key = response.headers['x-profile-key']
+        assert key.startswith('profiles/puzzle-1/request-get-')
+        stored = s3_client.get_object(Bucket='test-bucket', Key=key)
+        assert stored['Metadata']['route'] == '/puzzles/{puzzle_id}'
+        assert int(stored['Metadata']['samples']) > 0
+        body = stored['Body'].read().decode()
+        assert any(
+            line.startswith('aws-io') and '_busy_wait@' in line for line in body.splitlines()
+        )
+
+    @pytest.mark.unit
+    def test_other_requests_are_not_profiled(self):
+        client, s3_client = self._client()
+
+        response = client.get("/puzzles/puzzle-1", headers={"X-Profile": "wrong"})
+
+        assert response.status_code == 200
+        assert 'x-profile-key' not in response.headers
+        assert s3_client.list_objects_v2(Bucket='test-bucket', Prefix='profiles/').get('KeyCount') == 0
+
+
+class TestSplitProfiling:
+    """分割ジョブのプロファイルのテスト"""
+
+    @pytest.mark.unit
+    def test_requested_split_job_stores_profile(self, sample_user_id):
+        Image = pytest.importorskip("PIL.Image")
+        from app.services.image_processor import ImageProcessor
+        from app.services.puzzle_service import PuzzleService
+
+        service = PuzzleService(
+            s3_bucket_name='test-bucket',
+            puzzles_table_name='test-puzzles',
+            pieces_table_name='test-pieces'
+        )
+        puzzle_id = service.create_puzzle(piece_count=100, puzzle_name="Profile", user_id=sample_user_id)['puzzleId']
+        service.generate_upload_post(puzzle_id, 'photo.jpg', sample_user_id)
+        s3_key = f"puzzles/{puzzle_id}.jpg"
+        buffer = io.BytesIO()
+        Image.new('RGB', (200, 200), color='red').save(buffer, format='JPEG')
+        service.s3_client.put_object(Bucket='test-bucket', Key=s3_key, Body=buffer.getvalue())
+
+        processor = ImageProcessor(
+            s3_bucket_name='test-bucket',
+            pieces_table_name='test-pieces',
+            puzzles_table_name='test-puzzles',
+            profiling=ProfilingPolicy(token='secret', interval=0.001)
+        )
+
+        processor.split_image(puzzle_id, sample_user_id, s3_key, 100)
+        assert service.s3_client.list_objects_v2(Bucket='test-bucket', Prefix='profiles/').get('KeyCount') == 0
+
+        result = processor.split_image(puzzle_id, sample_user_id, s3_key, 100, profile=True)
+
+        assert result['status'] == 'completed'
+        listed = service.s3_client.list_objects_v2(Bucket='test-bucket', Prefix=f"profiles/{puzzle_id}/split-")
+        assert listed['KeyCount'] == 1
+        stored = service.s3_client.get_object(Bucket='test-bucket', Key=listed['Contents'][0]['Key'])
+        assert stored['Metadata']['piece-count'] == '100'
+        assert b'_split_image@' in stored['Body'].read()
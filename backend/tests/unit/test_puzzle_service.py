@@ -5,7 +5,7 @@ AWS依存（S3, DynamoDB）をモックして、ビジネスロジックの正
 
 テスト対象:
 1. create_puzzle() - パズル作成
-2. generate_upload_url() - Pre-signed URL生成
+2. generate_upload_post() - 署名付きPOST生成
 3. get_puzzle() - パズル取得
 4. list_puzzles() - パズル一覧取得
 
@@ -21,7 +21,8 @@ from unittest.mock import MagicMock, patch, ANY
 from datetime import datetime
 from botocore.exceptions import ClientError
 
-from app.services.puzzle_service import PuzzleService
+from app.core.cache import TTLCache, puzzle_cache_key
+from app.services.puzzle_service import PuzzleNotFoundError, PuzzleService, UploadNotFoundError
 
 
 # ===================================================================
@@ -145,9 +146,9 @@ class TestCreatePuzzle:
         """
         異常系: 無効なpieceCountを拒否
 
-        検証: 有効なリストに無い値はValueErrorになる
+        検証: 範囲外の値はValueErrorになる
         """
-        invalid_counts = [50, 150, 250, 999, 2001, 3000]
+        invalid_counts = [0, 50, 99, 2001, 3000]
 
         for count in invalid_counts:
             with pytest.raises(ValueError) as exc_info:
@@ -156,7 +157,7 @@ class TestCreatePuzzle:
                     puzzle_name="Test",
                     user_id="test-user"
                 )
-            assert "pieceCount must be one of" in str(exc_info.value), \
+            assert "pieceCount must be between" in str(exc_info.value), \
                 f"pieceCount={count} should raise ValueError"
 
     @pytest.mark.unit
@@ -221,15 +222,15 @@ class TestCreatePuzzle:
 
 
 # ===================================================================
-# generate_upload_url() のテスト
+# generate_upload_post() のテスト（モック）
 # ===================================================================
 
-class TestGenerateUploadUrl:
+class TestGenerateUploadPostMocked:
     """
-    Pre-signed URL生成のテスト
+    署名付きPOST（アップロード用ポリシー）生成のテスト
 
     検証項目:
-    - 正常なURL生成
+    - 正常なポリシー生成
     - パズルの存在確認
     - DynamoDB更新
     - 拡張子とMIME typeのマッピング
@@ -237,12 +238,12 @@ class TestGenerateUploadUrl:
     """
 
     @pytest.mark.unit
-    def test_generate_upload_url_success(self, puzzle_service, sample_puzzle_id, sample_user_id):
+    def test_generate_upload_post_success(self, puzzle_service, sample_puzzle_id, sample_user_id):
         """
-        正常系: Pre-signed URLが正しく生成される
+        正常系: 署名付きPOSTが正しく生成される
 
         検証:
-        - S3 generate_presigned_url が呼ばれる
+        - S3 generate_presigned_post が呼ばれる
         - DynamoDB update_item が呼ばれる
         - 正しいレスポンスが返る
         """
@@ -257,22 +258,22 @@ class TestGenerateUploadUrl:
             }
         }
 
-        # モックの設定: Pre-signed URL生成
+        # モックの設定: 署名付きPOST生成
         test_url = f"https://test-bucket.s3.amazonaws.com/puzzles/{sample_puzzle_id}.jpg"
-        puzzle_service._mock_s3.generate_presigned_url.return_value = test_url
+        puzzle_service._mock_s3.generate_presigned_post.return_value = {'url': test_url, 'fields': {'key': 'k'}}
 
         # モックの設定: DynamoDB更新成功
         puzzle_service._mock_table.update_item.return_value = {}
 
         # URL生成
-        result = puzzle_service.generate_upload_url(
+        result = puzzle_service.generate_upload_post(
             puzzle_id=sample_puzzle_id,
             file_name="test.jpg",
             user_id=sample_user_id
         )
 
         # 検証: S3が呼ばれた
-        puzzle_service._mock_s3.generate_presigned_url.assert_called_once()
+        puzzle_service._mock_s3.generate_presigned_post.assert_called_once()
 
         # 検証: DynamoDBが更新された
         puzzle_service._mock_table.update_item.assert_called_once()
@@ -280,11 +281,12 @@ class TestGenerateUploadUrl:
         # 検証: レスポンスが正しい
         assert result['puzzleId'] == sample_puzzle_id
         assert result['uploadUrl'] == test_url
+        assert result['fields'] == {'key': 'k'}
         assert result['expiresIn'] == 900  # 15分
         assert 'message' in result
 
     @pytest.mark.unit
-    def test_generate_upload_url_jpg_mime_type(self, puzzle_service, sample_puzzle_id, sample_user_id):
+    def test_generate_upload_post_jpg_mime_type(self, puzzle_service, sample_puzzle_id, sample_user_id):
         """
         正常系: .jpg拡張子で正しいMIME typeが設定される
 
@@ -293,23 +295,24 @@ class TestGenerateUploadUrl:
         puzzle_service._mock_table.get_item.return_value = {
             'Item': {'userId': sample_user_id, 'puzzleId': sample_puzzle_id}
         }
-        puzzle_service._mock_s3.generate_presigned_url.return_value = "https://test.com/upload"
+        puzzle_service._mock_s3.generate_presigned_post.return_value = {'url': 'https://test.com/upload', 'fields': {}}
         puzzle_service._mock_table.update_item.return_value = {}
 
-        puzzle_service.generate_upload_url(
+        puzzle_service.generate_upload_post(
             puzzle_id=sample_puzzle_id,
             file_name="photo.jpg",
             user_id=sample_user_id
         )
 
         # S3呼び出しの引数を確認
-        call_args = puzzle_service._mock_s3.generate_presigned_url.call_args
-        params = call_args[1]['Params']
+        call_args = puzzle_service._mock_s3.generate_presigned_post.call_args
+        conditions = call_args[1]['Conditions']
 
-        assert params['ContentType'] == 'image/jpeg'
+        assert call_args[1]['Fields']['Content-Type'] == conditions[0]['Content-Type']
+        assert conditions[0]['Content-Type'] == 'image/jpeg'
 
     @pytest.mark.unit
-    def test_generate_upload_url_jpeg_mime_type(self, puzzle_service, sample_puzzle_id, sample_user_id):
+    def test_generate_upload_post_jpeg_mime_type(self, puzzle_service, sample_puzzle_id, sample_user_id):
         """
         正常系: .jpeg拡張子で正しいMIME typeが設定される
 
@@ -318,22 +321,23 @@ class TestGenerateUploadUrl:
         puzzle_service._mock_table.get_item.return_value = {
             'Item': {'userId': sample_user_id, 'puzzleId': sample_puzzle_id}
         }
-        puzzle_service._mock_s3.generate_presigned_url.return_value = "https://test.com/upload"
+        puzzle_service._mock_s3.generate_presigned_post.return_value = {'url': 'https://test.com/upload', 'fields': {}}
         puzzle_service._mock_table.update_item.return_value = {}
 
-        puzzle_service.generate_upload_url(
+        puzzle_service.generate_upload_post(
             puzzle_id=sample_puzzle_id,
             file_name="image.jpeg",
             user_id=sample_user_id
         )
 
-        call_args = puzzle_service._mock_s3.generate_presigned_url.call_args
-        params = call_args[1]['Params']
+        call_args = puzzle_service._mock_s3.generate_presigned_post.call_args
+        conditions = call_args[1]['Conditions']
 
-        assert params['ContentType'] == 'image/jpeg'
+        assert call_args[1]['Fields']['Content-Type'] == conditions[0]['Content-Type']
+        assert conditions[0]['Content-Type'] == 'image/jpeg'
 
     @pytest.mark.unit
-    def test_generate_upload_url_png_mime_type(self, puzzle_service, sample_puzzle_id, sample_user_id):
+    def test_generate_upload_post_png_mime_type(self, puzzle_service, sample_puzzle_id, sample_user_id):
         """
         正常系: .png拡張子で正しいMIME typeが設定される
 
@@ -342,64 +346,73 @@ class TestGenerateUploadUrl:
         puzzle_service._mock_table.get_item.return_value = {
             'Item': {'userId': sample_user_id, 'puzzleId': sample_puzzle_id}
         }
-        puzzle_service._mock_s3.generate_presigned_url.return_value = "https://test.com/upload"
+        puzzle_service._mock_s3.generate_presigned_post.return_value = {'url': 'https://test.com/upload', 'fields': {}}
         puzzle_service._mock_table.update_item.return_value = {}
 
-        puzzle_service.generate_upload_url(
+        puzzle_service.generate_upload_post(
             puzzle_id=sample_puzzle_id,
             file_name="screenshot.png",
             user_id=sample_user_id
         )
 
-        call_args = puzzle_service._mock_s3.generate_presigned_url.call_args
-        params = call_args[1]['Params']
+        call_args = puzzle_service._mock_s3.generate_presigned_post.call_args
+        conditions = call_args[1]['Conditions']
 
-        assert params['ContentType'] == 'image/png'
+        assert call_args[1]['Fields']['Content-Type'] == conditions[0]['Content-Type']
+        assert conditions[0]['Content-Type'] == 'image/png'
 
     @pytest.mark.unit
-    def test_generate_upload_url_expires_in_900_seconds(self, puzzle_service, sample_puzzle_id, sample_user_id):
+    def test_generate_upload_post_expires_in_900_seconds(self, puzzle_service, sample_puzzle_id, sample_user_id):
         """
-        正常系: URLの有効期限が900秒（15分）
+        正常系: ポリシーの有効期限が900秒（15分）
 
         検証: ExpiresIn=900 が設定される
         """
         puzzle_service._mock_table.get_item.return_value = {
             'Item': {'userId': sample_user_id, 'puzzleId': sample_puzzle_id}
         }
-        puzzle_service._mock_s3.generate_presigned_url.return_value = "https://test.com/upload"
+        puzzle_service._mock_s3.generate_presigned_post.return_value = {'url': 'https://test.com/upload', 'fields': {}}
         puzzle_service._mock_table.update_item.return_value = {}
 
-        puzzle_service.generate_upload_url(
+        puzzle_service.generate_upload_post(
             puzzle_id=sample_puzzle_id,
             file_name="test.jpg",
             user_id=sample_user_id
         )
 
-        call_args = puzzle_service._mock_s3.generate_presigned_url.call_args
+        call_args = puzzle_service._mock_s3.generate_presigned_post.call_args
 
         assert call_args[1]['ExpiresIn'] == 900
 
     @pytest.mark.unit
-    def test_generate_upload_url_puzzle_not_found(self, puzzle_service, sample_puzzle_id, sample_user_id):
+    def test_generate_upload_post_puzzle_not_found(self, puzzle_service, sample_puzzle_id, sample_user_id):
         """
         異常系: パズルが存在しない
 
-        検証: ValueError が発生する
+        検証:
+        - 条件付き更新の失敗が ValueError に変換される
+        - 事前の get_item は行わない（1リクエストで確認と更新）
         """
-        # パズルが見つからない
-        puzzle_service._mock_table.get_item.return_value = {}
+        # パズルが見つからない（attribute_exists 条件を満たさない）
+        puzzle_service._mock_table.update_item.side_effect = ClientError(
+            {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'The conditional request failed'}},
+            'update_item'
+        )
 
-        with pytest.raises(ValueError) as exc_info:
-            puzzle_service.generate_upload_url(
+        with pytest.raises(PuzzleNotFoundError) as exc_info:
+            puzzle_service.generate_upload_post(
                 puzzle_id=sample_puzzle_id,
                 file_name="test.jpg",
                 user_id=sample_user_id
             )
 
         assert "Puzzle not found" in str(exc_info.value)
+        puzzle_service._mock_table.get_item.assert_not_called()
+        call_args = puzzle_service._mock_table.update_item.call_args[1]
+        assert call_args['ConditionExpression'] == 'attribute_exists(puzzleId)'
 
     @pytest.mark.unit
-    def test_generate_upload_url_s3_error(self, puzzle_service, sample_puzzle_id, sample_user_id):
+    def test_generate_upload_post_s3_error(self, puzzle_service, sample_puzzle_id, sample_user_id):
         """
         異常系: S3エラー
 
@@ -410,20 +423,20 @@ class TestGenerateUploadUrl:
         }
 
         # S3エラーをシミュレート
-        puzzle_service._mock_s3.generate_presigned_url.side_effect = ClientError(
+        puzzle_service._mock_s3.generate_presigned_post.side_effect = ClientError(
             {'Error': {'Code': 'AccessDenied', 'Message': 'S3 error'}},
-            'generate_presigned_url'
+            'generate_presigned_post'
         )
 
         with pytest.raises(ClientError):
-            puzzle_service.generate_upload_url(
+            puzzle_service.generate_upload_post(
                 puzzle_id=sample_puzzle_id,
                 file_name="test.jpg",
                 user_id=sample_user_id
             )
 
     @pytest.mark.unit
-    def test_generate_upload_url_dynamodb_update_error(self, puzzle_service, sample_puzzle_id, sample_user_id):
+    def test_generate_upload_post_dynamodb_update_error(self, puzzle_service, sample_puzzle_id, sample_user_id):
         """
         異常系: DynamoDB更新エラー
 
@@ -432,7 +445,7 @@ class TestGenerateUploadUrl:
         puzzle_service._mock_table.get_item.return_value = {
             'Item': {'userId': sample_user_id, 'puzzleId': sample_puzzle_id}
         }
-        puzzle_service._mock_s3.generate_presigned_url.return_value = "https://test.com/upload"
+        puzzle_service._mock_s3.generate_presigned_post.return_value = {'url': 'https://test.com/upload', 'fields': {}}
 
         # DynamoDB更新エラーをシミュレート
         puzzle_service._mock_table.update_item.side_effect = ClientError(
@@ -441,14 +454,14 @@ class TestGenerateUploadUrl:
         )
 
         with pytest.raises(ClientError):
-            puzzle_service.generate_upload_url(
+            puzzle_service.generate_upload_post(
                 puzzle_id=sample_puzzle_id,
                 file_name="test.jpg",
                 user_id=sample_user_id
             )
 
     @pytest.mark.unit
-    def test_generate_upload_url_updates_status_to_uploaded(self, puzzle_service, sample_puzzle_id, sample_user_id):
+    def test_generate_upload_post_updates_status_to_uploaded(self, puzzle_service, sample_puzzle_id, sample_user_id):
         """
         正常系: パズルステータスが 'uploaded' に更新される
 
@@ -457,10 +470,10 @@ class TestGenerateUploadUrl:
         puzzle_service._mock_table.get_item.return_value = {
             'Item': {'userId': sample_user_id, 'puzzleId': sample_puzzle_id}
         }
-        puzzle_service._mock_s3.generate_presigned_url.return_value = "https://test.com/upload"
+        puzzle_service._mock_s3.generate_presigned_post.return_value = {'url': 'https://test.com/upload', 'fields': {}}
         puzzle_service._mock_table.update_item.return_value = {}
 
-        puzzle_service.generate_upload_url(
+        puzzle_service.generate_upload_post(
             puzzle_id=sample_puzzle_id,
             file_name="test.jpg",
             user_id=sample_user_id
@@ -550,6 +563,93 @@ class TestGetPuzzle:
         assert result is None
 
 
+# ===================================================================
+# get_puzzle() のキャッシュのテスト
+# ===================================================================
+
+@pytest.fixture
+def cached_puzzle_service(puzzle_service):
+    """TTLキャッシュを有効にしたPuzzleService"""
+    puzzle_service.cache = TTLCache(ttl_seconds=60, max_entries=100)
+    return puzzle_service
+
+
+class TestGetPuzzleCache:
+    """
+    get_puzzle の読み取りキャッシュのテスト
+
+    検証項目:
+    - 2回目以降はDynamoDBを呼ばない
+    - 見つからない結果はキャッシュしない
+    - 書き込み（作成・アップロードURL発行・削除）で無効化される
+    """
+
+    @pytest.mark.unit
+    def test_second_read_is_served_from_cache(self, cached_puzzle_service, sample_puzzle_id, sample_user_id):
+        """正常系: 2回目はキャッシュヒット"""
+        cached_puzzle_service._mock_table.get_item.return_value = {
+            'Item': {'userId': sample_user_id, 'puzzleId': sample_puzzle_id, 'status': 'pending'}
+        }
+
+        first = cached_puzzle_service.get_puzzle(sample_user_id, sample_puzzle_id)
+        second = cached_puzzle_service.get_puzzle(sample_user_id, sample_puzzle_id)
+
+        assert first == second
+        cached_puzzle_service._mock_table.get_item.assert_called_once()
+        assert cached_puzzle_service.cache.stats()['hits'] == 1
+
+    @pytest.mark.unit
+    def test_not_found_is_not_cached(self, cached_puzzle_service, sample_puzzle_id, sample_user_id):
+        """正常系: 存在しないパズルは毎回DynamoDBに問い合わせる"""
+        cached_puzzle_service._mock_table.get_item.return_value = {}
+
+        cached_puzzle_service.get_puzzle(sample_user_id, sample_puzzle_id)
+        cached_puzzle_service.get_puzzle(sample_user_id, sample_puzzle_id)
+
+        assert cached_puzzle_service._mock_table.get_item.call_count == 2
+
+    @pytest.mark.unit
+    def test_upload_url_invalidates(self, cached_puzzle_service, sample_puzzle_id, sample_user_id):
+        """正常系: アップロードURL発行でステータスが変わるため無効化される"""
+        cached_puzzle_service._mock_table.get_item.return_value = {
+            'Item': {'userId': sample_user_id, 'puzzleId': sample_puzzle_id, 'status': 'pending'}
+        }
+        cached_puzzle_service._mock_s3.generate_presigned_post.return_value = {'url': 'https://example', 'fields': {}}
+        cached_puzzle_service.get_puzzle(sample_user_id, sample_puzzle_id)
+
+        cached_puzzle_service.generate_upload_post(sample_puzzle_id, 'a.jpg', sample_user_id)
+        cached_puzzle_service._mock_table.get_item.reset_mock()
+        cached_puzzle_service.get_puzzle(sample_user_id, sample_puzzle_id)
+
+        cached_puzzle_service._mock_table.get_item.assert_called_once()
+
+    @pytest.mark.unit
+    def test_delete_invalidates(self, cached_puzzle_service, sample_puzzle_id, sample_user_id):
+        """正常系: 削除後はキャッシュから消える"""
+        cached_puzzle_service._mock_table.get_item.return_value = {
+            'Item': {'userId': sample_user_id, 'puzzleId': sample_puzzle_id}
+        }
+        cached_puzzle_service.get_puzzle(sample_user_id, sample_puzzle_id)
+
+        cached_puzzle_service.delete_puzzle(sample_user_id, sample_puzzle_id)
+
+        key = puzzle_cache_key(sample_user_id, sample_puzzle_id)
+        assert len(cached_puzzle_service.cache) == 0
+        assert cached_puzzle_service.cache.get(key) is None
+
+    @pytest.mark.unit
+    def test_create_invalidates(self, cached_puzzle_service, sample_user_id):
+        """正常系: 作成時に該当キーが無効化される"""
+        result = cached_puzzle_service.create_puzzle(
+            piece_count=100,
+            puzzle_name="New",
+            user_id=sample_user_id
+        )
+
+        assert result['status'] == 'pending'
+        assert cached_puzzle_service.cache.stats()['invalidations'] == 1
+
+
 # ===================================================================
 # list_puzzles() のテスト
 # ===================================================================
@@ -647,6 +747,138 @@ class TestListPuzzles:
         assert call_args['ExpressionAttributeValues'][':uid'] == sample_user_id
 
 
+    @pytest.mark.unit
+    def test_list_puzzles_follows_last_evaluated_key(self, puzzle_service, sample_user_id):
+        """
+        正常系: 複数ページにまたがる結果を全件取得する
+
+        検証: LastEvaluatedKey がある限り ExclusiveStartKey を付けて再クエリする
+        """
+        last_key = {'userId': sample_user_id, 'puzzleId': 'puzzle-1'}
+        puzzle_service._mock_table.query.side_effect = [
+            {'Items': [{'puzzleId': 'puzzle-1'}], 'LastEvaluatedKey': last_key},
+            {'Items': [{'puzzleId': 'puzzle-2'}]}
+        ]
+
+        result = puzzle_service.list_puzzles(user_id=sample_user_id)
+
+        assert [p['puzzleId'] for p in result] == ['puzzle-1', 'puzzle-2']
+        second_call = puzzle_service._mock_table.query.call_args_list[1][1]
+        assert second_call['ExclusiveStartKey'] == last_key
+
+
+# ===================================================================
+# list_puzzles_page() のテスト
+# ===================================================================
+
+class TestListPuzzlesPage:
+    """
+    ページング付き一覧取得のテスト
+
+    検証項目:
+    - CreatedAtIndex を使った作成日時順のクエリ
+    - 継続トークンの往復
+    - ProjectionExpression の指定
+    - 不正な入力の拒否
+    """
+
+    @pytest.mark.unit
+    def test_page_queries_created_at_index(self, puzzle_service, sample_user_id):
+        """
+        正常系: GSIを新しい順にクエリする
+
+        検証: IndexName, ScanIndexForward, Limit が設定される
+        """
+        puzzle_service._mock_table.query.return_value = {'Items': []}
+
+        result = puzzle_service.list_puzzles_page(user_id=sample_user_id, limit=20)
+
+        call_args = puzzle_service._mock_table.query.call_args[1]
+        assert call_args['IndexName'] == 'CreatedAtIndex'
+        assert call_args['ScanIndexForward'] is False
+        assert call_args['Limit'] == 20
+        assert 'ProjectionExpression' not in call_args
+        assert result == {'items': [], 'nextToken': None}
+
+    @pytest.mark.unit
+    def test_page_token_round_trip(self, puzzle_service, sample_user_id):
+        """
+        正常系: LastEvaluatedKey が継続トークンとして返り、次ページで復元される
+        """
+        last_key = {
+            'userId': sample_user_id,
+            'puzzleId': 'puzzle-9',
+            'createdAt': '2025-10-20T00:00:00'
+        }
+        puzzle_service._mock_table.query.return_value = {
+            'Items': [{'puzzleId': 'puzzle-9'}],
+            'LastEvaluatedKey': last_key
+        }
+
+        first_page = puzzle_service.list_puzzles_page(user_id=sample_user_id, limit=1)
+        token = first_page['nextToken']
+
+        # トークンは不透明な文字列（内部キーがそのまま見えない）
+        assert token and 'puzzle-9' not in token
+
+        puzzle_service._mock_table.query.return_value = {'Items': []}
+        puzzle_service.list_puzzles_page(user_id=sample_user_id, limit=1, next_token=token)
+
+        call_args = puzzle_service._mock_table.query.call_args[1]
+        assert call_args['ExclusiveStartKey'] == last_key
+
+    @pytest.mark.unit
+    def test_page_projection(self, puzzle_service, sample_user_id):
+        """
+        正常系: fields指定時はプレースホルダー付きのProjectionExpressionになる
+        """
+        puzzle_service._mock_table.query.return_value = {'Items': []}
+
+        puzzle_service.list_puzzles_page(
+            user_id=sample_user_id,
+            fields=['puzzleId', 'status']
+        )
+
+        call_args = puzzle_service._mock_table.query.call_args[1]
+        assert call_args['ProjectionExpression'] == '#f0, #f1'
+        assert call_args['ExpressionAttributeNames'] == {'#f0': 'puzzleId', '#f1': 'status'}
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("token", ["not-base64!!", "e30", "eyJ1c2VySWQiOiAib3RoZXIifQ"])
+    def test_page_invalid_token(self, puzzle_service, sample_user_id, token):
+        """
+        異常系: 壊れたトークン・他ユーザーのトークンは ValueError
+        """
+        with pytest.raises(ValueError, match="Invalid nextToken"):
+            puzzle_service.list_puzzles_page(user_id=sample_user_id, next_token=token)
+
+        puzzle_service._mock_table.query.assert_not_called()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("limit", [0, 101])
+    def test_page_invalid_limit(self, puzzle_service, sample_user_id, limit):
+        """異常系: ページサイズが範囲外"""
+        with pytest.raises(ValueError):
+            puzzle_service.list_puzzles_page(user_id=sample_user_id, limit=limit)
+
+    @pytest.mark.unit
+    def test_page_unknown_field(self, puzzle_service, sample_user_id):
+        """異常系: 一覧用に許可されていない属性"""
+        with pytest.raises(ValueError, match="Unsupported fields"):
+            puzzle_service.list_puzzles_page(user_id=sample_user_id, fields=['s3Key'])
+
+    @pytest.mark.unit
+    def test_page_dynamodb_error(self, puzzle_service, sample_user_id):
+        """異常系: DynamoDBエラーはそのまま送出される"""
+        puzzle_service._mock_table.query.side_effect = ClientError(
+            {'Error': {'Code': 'InternalServerError', 'Message': 'Query error'}},
+            'query'
+        )
+
+        with pytest.raises(ClientError):
+            puzzle_service.list_puzzles_page(user_id=sample_user_id)
+
+
 # ===================================================================
 # delete_puzzle() のテスト
 # ===================================================================
@@ -674,16 +906,16 @@ class TestDeletePuzzle:
         - 成功レスポンスが返される
         """
         s3_key = f"puzzles/{sample_puzzle_id}.jpg"
-        puzzle_service._mock_table.get_item.return_value = {
-            'Item': {
+        puzzle_service._mock_s3.delete_object.return_value = {}
+        # ReturnValues='ALL_OLD' で削除前の属性が返る
+        puzzle_service._mock_table.delete_item.return_value = {
+            'Attributes': {
                 'userId': sample_user_id,
                 'puzzleId': sample_puzzle_id,
                 'puzzleName': 'Test Puzzle',
                 's3Key': s3_key
             }
         }
-        puzzle_service._mock_s3.delete_object.return_value = {}
-        puzzle_service._mock_table.delete_item.return_value = {}
 
         result = puzzle_service.delete_puzzle(
             user_id=sample_user_id,
@@ -696,13 +928,16 @@ class TestDeletePuzzle:
             Key=s3_key
         )
 
-        # DynamoDB削除が呼ばれた
+        # DynamoDB削除が条件付きで1回だけ呼ばれた（事前のget_itemなし）
         puzzle_service._mock_table.delete_item.assert_called_once_with(
             Key={
                 'userId': sample_user_id,
                 'puzzleId': sample_puzzle_id
-            }
+            },
+            ConditionExpression='attribute_exists(puzzleId)',
+            ReturnValues='ALL_OLD'
         )
+        puzzle_service._mock_table.get_item.assert_not_called()
 
         # レスポンス確認
         assert result['puzzleId'] == sample_puzzle_id
@@ -718,8 +953,8 @@ class TestDeletePuzzle:
         - S3削除は呼ばれない
         - DynamoDBレコードは削除される
         """
-        puzzle_service._mock_table.get_item.return_value = {
-            'Item': {
+        puzzle_service._mock_table.delete_item.return_value = {
+            'Attributes': {
                 'userId': sample_user_id,
                 'puzzleId': sample_puzzle_id,
                 'puzzleName': 'Test Puzzle',
@@ -727,7 +962,6 @@ class TestDeletePuzzle:
                 # s3Key なし
             }
         }
-        puzzle_service._mock_table.delete_item.return_value = {}
 
         result = puzzle_service.delete_puzzle(
             user_id=sample_user_id,
@@ -748,9 +982,12 @@ class TestDeletePuzzle:
         """
         異常系: パズルが存在しない
 
-        検証: ValueError が発生する
+        検証: 条件付き削除の失敗が ValueError に変換される
         """
-        puzzle_service._mock_table.get_item.return_value = {}
+        puzzle_service._mock_table.delete_item.side_effect = ClientError(
+            {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'The conditional request failed'}},
+            'delete_item'
+        )
 
         with pytest.raises(ValueError) as exc_info:
             puzzle_service.delete_puzzle(
@@ -760,9 +997,8 @@ class TestDeletePuzzle:
 
         assert "Puzzle not found" in str(exc_info.value)
 
-        # 削除処理は呼ばれない
+        # S3削除は呼ばれない
         puzzle_service._mock_s3.delete_object.assert_not_called()
-        puzzle_service._mock_table.delete_item.assert_not_called()
 
     @pytest.mark.unit
     def test_delete_puzzle_s3_error_continues(self, puzzle_service, sample_puzzle_id, sample_user_id):
@@ -774,8 +1010,8 @@ class TestDeletePuzzle:
         - 最終的に削除成功として扱われる
         """
         s3_key = f"puzzles/{sample_puzzle_id}.jpg"
-        puzzle_service._mock_table.get_item.return_value = {
-            'Item': {
+        puzzle_service._mock_table.delete_item.return_value = {
+            'Attributes': {
                 'userId': sample_user_id,
                 'puzzleId': sample_puzzle_id,
                 's3Key': s3_key
@@ -787,7 +1023,6 @@ class TestDeletePuzzle:
             {'Error': {'Code': 'NoSuchKey', 'Message': 'Object not found'}},
             'delete_object'
         )
-        puzzle_service._mock_table.delete_item.return_value = {}
 
         # エラーが発生しない（S3エラーは握りつぶされる）
         result = puzzle_service.delete_puzzle(
@@ -795,8 +1030,9 @@ class TestDeletePuzzle:
             puzzle_id=sample_puzzle_id
         )
 
-        # DynamoDB削除は実行される
+        # DynamoDB削除は実行され、S3削除も試行される
         puzzle_service._mock_table.delete_item.assert_called_once()
+        puzzle_service._mock_s3.delete_object.assert_called_once()
 
         # 成功レスポンス
         assert result['puzzleId'] == sample_puzzle_id
@@ -808,13 +1044,6 @@ class TestDeletePuzzle:
 
         検証: DynamoDBエラー時にClientErrorが発生する
         """
-        puzzle_service._mock_table.get_item.return_value = {
-            'Item': {
-                'userId': sample_user_id,
-                'puzzleId': sample_puzzle_id
-            }
-        }
-
         # DynamoDB削除エラーをシミュレート
         puzzle_service._mock_table.delete_item.side_effect = ClientError(
             {'Error': {'Code': 'InternalServerError', 'Message': 'Delete error'}},
@@ -826,3 +1055,400 @@ class TestDeletePuzzle:
                 user_id=sample_user_id,
                 puzzle_id=sample_puzzle_id
             )
+
+
+# ===================================================================
+# 一括削除・ピース削除のテスト（motoでS3/DynamoDBを再現）
+# ===================================================================
+
+@pytest.fixture
+def moto_puzzle_service():
+    """
+    moto上のテーブル・バケットを使うPuzzleService
+
+    conftest.py の aws_credentials_mock で作成されたリソースを使用
+    """
+    return PuzzleService(
+        s3_bucket_name='test-bucket',
+        puzzles_table_name='test-puzzles',
+        pieces_table_name='test-pieces',
+        environment='test'
+    )
+
+
+def _seed_puzzle_with_pieces(service, user_id, piece_count):
+    """画像・ピースオブジェクト・ピースアイテムを持つパズルを作成"""
+    puzzle_id = service.create_puzzle(piece_count=100, puzzle_name="Seed", user_id=user_id)['puzzleId']
+    service.generate_upload_post(puzzle_id, 'seed.png', user_id)
+    service.s3_client.put_object(Bucket='test-bucket', Key=f"puzzles/{puzzle_id}.png", Body=b'img')
+
+    with service.pieces_table.batch_writer() as batch:
+        for i in range(piece_count):
+            piece_id = f"piece-{i:04d}"
+            service.s3_client.put_object(
+                Bucket='test-bucket',
+                Key=f"pieces/{puzzle_id}/{piece_id}.jpg",
+                Body=b'piece'
+            )
+            batch.put_item(Item={'puzzleId': puzzle_id, 'pieceId': piece_id, 'userId': user_id})
+    return puzzle_id
+
+
+class TestBulkDelete:
+    """
+    一括削除機能のテスト
+
+    検証項目:
+    - ピースのS3オブジェクトとDynamoDBアイテムが削除される
+    - delete_objects が1000件（テストでは縮小）単位で呼ばれる
+    - 存在しないIDは notFound として報告される
+    """
+
+    @pytest.mark.unit
+    def test_purge_piece_assets_batches(self, moto_puzzle_service, sample_user_id):
+        """正常系: ピースが全件削除され、S3削除がバッチ単位になる"""
+        puzzle_id = _seed_puzzle_with_pieces(moto_puzzle_service, sample_user_id, 25)
+
+        with patch.object(PuzzleService, 'S3_DELETE_BATCH_SIZE', 10), \
+             patch.object(moto_puzzle_service.s3_client, 'delete_objects',
+                          wraps=moto_puzzle_service.s3_client.delete_objects) as delete_objects:
+            result = moto_puzzle_service.purge_piece_assets(puzzle_id)
+
+        assert result == {'deletedObjects': 25, 'deletedItems': 25}
+        assert delete_objects.call_count == 3
+
+        remaining = moto_puzzle_service.s3_client.list_objects_v2(
+            Bucket='test-bucket', Prefix=f"pieces/{puzzle_id}/"
+        )
+        assert remaining.get('KeyCount', 0) == 0
+
+    @pytest.mark.unit
+    def test_purge_removes_profiles(self, moto_puzzle_service, sample_user_id):
+        """正常系: パズルのプロファイル（profiles/{puzzle_id}/）も削除される"""
+        puzzle_id = _seed_puzzle_with_pieces(moto_puzzle_service, sample_user_id, 2)
+        moto_puzzle_service.s3_client.put_object(
+            Bucket='test-bucket', Key=f"profiles/{puzzle_id}/split-1.collapsed", Body=b'main 1\n'
+        )
+
+        result = moto_puzzle_service.purge_piece_assets(puzzle_id)
+
+        assert result['deletedObjects'] == 3
+        remaining = moto_puzzle_service.s3_client.list_objects_v2(
+            Bucket='test-bucket', Prefix=f"profiles/{puzzle_id}/"
+        )
+        assert remaining.get('KeyCount', 0) == 0
+
+    @pytest.mark.unit
+    def test_purge_is_idempotent(self, moto_puzzle_service, sample_user_id):
+        """正常系: 2回目の実行は何も削除せず成功する"""
+        puzzle_id = _seed_puzzle_with_pieces(moto_puzzle_service, sample_user_id, 3)
+        moto_puzzle_service.purge_piece_assets(puzzle_id)
+
+        assert moto_puzzle_service.purge_piece_assets(puzzle_id) == {
+            'deletedObjects': 0,
+            'deletedItems': 0
+        }
+
+    @pytest.mark.unit
+    def test_delete_puzzle_removes_pieces(self, moto_puzzle_service, sample_user_id):
+        """正常系: 単体削除でもピースが削除される"""
+        puzzle_id = _seed_puzzle_with_pieces(moto_puzzle_service, sample_user_id, 5)
+
+        result = moto_puzzle_service.delete_puzzle(sample_user_id, puzzle_id)
+
+        assert result['deletedObjects'] == 5
+        assert result['deletedItems'] == 5
+        assert moto_puzzle_service.get_puzzle(sample_user_id, puzzle_id) is None
+
+    @pytest.mark.unit
+    def test_delete_puzzles(self, moto_puzzle_service, sample_user_id):
+        """正常系: 複数パズルをまとめて削除し、件数を報告する"""
+        first = _seed_puzzle_with_pieces(moto_puzzle_service, sample_user_id, 4)
+        second = _seed_puzzle_with_pieces(moto_puzzle_service, sample_user_id, 6)
+
+        result = moto_puzzle_service.delete_puzzles(
+            sample_user_id,
+            [first, second, 'missing-id', first]
+        )
+
+        assert sorted(result['deleted']) == sorted([first, second])
+        assert result['notFound'] == ['missing-id']
+        assert result['purgeFailed'] == []
+        # ピース10件 + 元画像2件
+        assert result['deletedObjects'] == 12
+        assert result['deletedItems'] == 10
+        assert moto_puzzle_service.get_puzzle(sample_user_id, first) is None
+        assert moto_puzzle_service.get_puzzle(sample_user_id, second) is None
+
+    @pytest.mark.unit
+    def test_delete_puzzles_reports_purge_failures(self, moto_puzzle_service, sample_user_id):
+        """異常系: 1件のピース削除の失敗で全体を失敗にせず、purgeFailed で報告する"""
+        first = _seed_puzzle_with_pieces(moto_puzzle_service, sample_user_id, 4)
+        second = _seed_puzzle_with_pieces(moto_puzzle_service, sample_user_id, 6)
+        delete_items = moto_puzzle_service._delete_piece_items
+
+        def flaky_delete_items(puzzle_id):
+            if puzzle_id == first:
+                raise ClientError(
+                    {'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': 'slow down'}},
+                    'BatchWriteItem'
+                )
+            return delete_items(puzzle_id)
+
+        with patch.object(moto_puzzle_service, '_delete_piece_items', side_effect=flaky_delete_items):
+            result = moto_puzzle_service.delete_puzzles(sample_user_id, [first, second])
+
+        assert sorted(result['deleted']) == sorted([first, second])
+        assert result['purgeFailed'] == [first]
+        # 失敗したパズルのピースは数えない（secondのピース6件 + 元画像2件）
+        assert result['deletedObjects'] == 8
+        assert result['deletedItems'] == 6
+        assert moto_puzzle_service.get_puzzle(sample_user_id, first) is None
+
+    @pytest.mark.unit
+    def test_delete_puzzles_too_many(self, moto_puzzle_service, sample_user_id):
+        """異常系: 上限を超えるIDは ValueError"""
+        with pytest.raises(ValueError):
+            moto_puzzle_service.delete_puzzles(sample_user_id, [f"id-{i}" for i in range(101)])
+
+    @pytest.mark.unit
+    def test_s3_batch_errors_are_counted(self, puzzle_service):
+        """異常系: delete_objects の部分失敗は削除件数から除外される"""
+        puzzle_service._mock_s3.delete_objects.return_value = {
+            'Errors': [{'Key': 'pieces/p/a.jpg', 'Code': 'AccessDenied'}]
+        }
+
+        assert puzzle_service._delete_s3_keys(['pieces/p/a.jpg', 'pieces/p/b.jpg']) == 1
+
+    @pytest.mark.unit
+    def test_s3_batch_client_error(self, puzzle_service):
+        """異常系: delete_objects 自体の失敗は0件として継続する"""
+        puzzle_service._mock_s3.delete_objects.side_effect = ClientError(
+            {'Error': {'Code': 'InternalError', 'Message': 'S3 error'}},
+            'delete_objects'
+        )
+
+        assert puzzle_service._delete_s3_keys(['pieces/p/a.jpg']) == 0
+
+
+class TestGetPieceManifest:
+    """ピースマニフェスト取得のテスト"""
+
+    @pytest.mark.unit
+    def test_returns_stored_bytes(self, moto_puzzle_service):
+        """manifestKey のオブジェクトがそのまま返ること"""
+        moto_puzzle_service.s3_client.put_object(
+            Bucket='test-bucket', Key='pieces/p-1/manifest.json', Body=b'{"count":0}'
+        )
+
+        body = moto_puzzle_service.get_piece_manifest(
+            {'puzzleId': 'p-1', 'manifestKey': 'pieces/p-1/manifest.json'}
+        )
+
+        assert body == b'{"count":0}'
+
+    @pytest.mark.unit
+    def test_not_split_yet(self, moto_puzzle_service):
+        """manifestKey がないパズルはNone"""
+        assert moto_puzzle_service.get_piece_manifest({'puzzleId': 'p-1'}) is None
+
+    @pytest.mark.unit
+    def test_missing_object(self, moto_puzzle_service):
+        """オブジェクトが削除済みならNone"""
+        assert moto_puzzle_service.get_piece_manifest(
+            {'puzzleId': 'p-1', 'manifestKey': 'pieces/p-1/manifest.json'}
+        ) is None
+
+    @pytest.mark.unit
+    def test_other_errors_raise(self, moto_puzzle_service):
+        """NoSuchKey 以外のエラーは再送出"""
+        error = ClientError({'Error': {'Code': 'AccessDenied', 'Message': 'denied'}}, 'GetObject')
+        with patch.object(moto_puzzle_service.s3_client, 'get_object', side_effect=error):
+            with pytest.raises(ClientError):
+                moto_puzzle_service.get_piece_manifest(
+                    {'puzzleId': 'p-1', 'manifestKey': 'pieces/p-1/manifest.json'}
+                )
+
+
+# ===================================================================
+# 署名付きPOST・マルチパートアップロードのテスト
+# ===================================================================
+
+def _upload_parts(service, puzzle_id, upload_id, sizes, ext='jpg'):
+    """パートをアップロードして完了リクエスト用の一覧を返す"""
+    parts = []
+    for number, size in enumerate(sizes, start=1):
+        response = service.s3_client.upload_part(
+            Bucket='test-bucket',
+            Key=f"puzzles/{puzzle_id}.{ext}",
+            UploadId=upload_id,
+            PartNumber=number,
+            Body=b'x' * size
+        )
+        parts.append({'partNumber': number, 'etag': response['ETag']})
+    return parts
+
+
+class TestGenerateUploadPost:
+    """署名付きPOSTのテスト"""
+
+    @pytest.mark.unit
+    def test_policy_limits_size_and_type(self, moto_puzzle_service):
+        """ポリシーにContent-Typeとcontent-length-rangeが含まれること"""
+        import base64
+        import json
+
+        puzzle_id = moto_puzzle_service.create_puzzle(100, "Post", "user-1")['puzzleId']
+
+        result = moto_puzzle_service.generate_upload_post(puzzle_id, 'photo.png', 'user-1')
+
+        assert result['fields']['key'] == f"puzzles/{puzzle_id}.png"
+        assert result['fields']['Content-Type'] == 'image/png'
+        assert result['maxBytes'] == PuzzleService.MULTIPART_THRESHOLD_BYTES
+        policy = json.loads(base64.b64decode(result['fields']['policy']))
+        assert {'Content-Type': 'image/png'} in policy['conditions']
+        assert ['content-length-range', 1, PuzzleService.MULTIPART_THRESHOLD_BYTES] in policy['conditions']
+
+    @pytest.mark.unit
+    def test_records_upload(self, moto_puzzle_service):
+        """パズルレコードがuploadedになること"""
+        puzzle_id = moto_puzzle_service.create_puzzle(100, "Post", "user-1")['puzzleId']
+
+        moto_puzzle_service.generate_upload_post(puzzle_id, 'photo.jpg', 'user-1')
+
+        puzzle = moto_puzzle_service.get_puzzle('user-1', puzzle_id)
+        assert puzzle['status'] == 'uploaded'
+        assert puzzle['s3Key'] == f"puzzles/{puzzle_id}.jpg"
+
+    @pytest.mark.unit
+    def test_puzzle_not_found(self, moto_puzzle_service):
+        """存在しないパズルはValueError"""
+        with pytest.raises(ValueError, match="Puzzle not found"):
+            moto_puzzle_service.generate_upload_post('missing', 'photo.jpg', 'user-1')
+
+
+class TestMultipartUpload:
+    """マルチパートアップロードのテスト"""
+
+    @pytest.mark.unit
+    def test_initiate_presigns_every_part(self, moto_puzzle_service):
+        """ファイルサイズに応じたパート数のURLが返ること"""
+        puzzle_id = moto_puzzle_service.create_puzzle(100, "Big", "user-1")['puzzleId']
+        size = PuzzleService.MULTIPART_PART_SIZE * 2 + 1
+
+        result = moto_puzzle_service.initiate_multipart_upload(puzzle_id, size, 'big.jpg', 'user-1')
+
+        assert result['uploadId']
+        assert result['partSize'] == PuzzleService.MULTIPART_PART_SIZE
+        assert [part['partNumber'] for part in result['parts']] == [1, 2, 3]
+        assert all(result['uploadId'] in part['url'] for part in result['parts'])
+
+    @pytest.mark.unit
+    def test_initiate_rejects_oversized_file(self, moto_puzzle_service):
+        """上限を超えるサイズはアップロードを開始しない"""
+        puzzle_id = moto_puzzle_service.create_puzzle(100, "Big", "user-1")['puzzleId']
+
+        with pytest.raises(ValueError, match="too large"):
+            moto_puzzle_service.initiate_multipart_upload(
+                puzzle_id, PuzzleService.MAX_UPLOAD_BYTES + 1, 'big.jpg', 'user-1'
+            )
+
+        assert moto_puzzle_service.get_puzzle('user-1', puzzle_id)['status'] == 'pending'
+
+    @pytest.mark.unit
+    def test_initiate_puzzle_not_found(self, moto_puzzle_service):
+        """存在しないパズルはValueError"""
+        with pytest.raises(ValueError, match="Puzzle not found"):
+            moto_puzzle_service.initiate_multipart_upload('missing', 1024, 'big.jpg', 'user-1')
+
+    @pytest.mark.unit
+    def test_resume_reports_uploaded_parts(self, moto_puzzle_service):
+        """再開時にアップロード済みのパートと新しいURLが返ること"""
+        puzzle_id = moto_puzzle_service.create_puzzle(100, "Big", "user-1")['puzzleId']
+        upload_id = moto_puzzle_service.initiate_multipart_upload(
+            puzzle_id, 12 * 1024 * 1024, 'big.jpg', 'user-1'
+        )['uploadId']
+        uploaded = _upload_parts(moto_puzzle_service, puzzle_id, upload_id, [5 * 1024 * 1024])
+
+        result = moto_puzzle_service.get_multipart_upload_parts(puzzle_id, upload_id, [2], 'user-1')
+
+        assert result['uploadedParts'] == [
+            {'partNumber': 1, 'etag': uploaded[0]['etag'], 'size': 5 * 1024 * 1024}
+        ]
+        assert [part['partNumber'] for part in result['parts']] == [2]
+
+    @pytest.mark.unit
+    def test_complete(self, moto_puzzle_service):
+        """パートが結合されて画像オブジェクトになること"""
+        puzzle_id = moto_puzzle_service.create_puzzle(100, "Big", "user-1")['puzzleId']
+        upload_id = moto_puzzle_service.initiate_multipart_upload(
+            puzzle_id, 6 * 1024 * 1024, 'big.jpg', 'user-1'
+        )['uploadId']
+        parts = _upload_parts(moto_puzzle_service, puzzle_id, upload_id, [5 * 1024 * 1024, 1024])
+
+        # 順不同で送られても結合できること
+        result = moto_puzzle_service.complete_multipart_upload(
+            puzzle_id, upload_id, list(reversed(parts)), 'user-1'
+        )
+
+        assert result['size'] == 5 * 1024 * 1024 + 1024
+        head = moto_puzzle_service.s3_client.head_object(
+            Bucket='test-bucket', Key=f"puzzles/{puzzle_id}.jpg"
+        )
+        assert head['ContentLength'] == result['size']
+        assert head['ContentType'] == 'image/jpeg'
+
+    @pytest.mark.unit
+    def test_complete_aborts_oversized_upload(self, moto_puzzle_service):
+        """合計サイズが上限を超えると中止され、画像は作成されない"""
+        puzzle_id = moto_puzzle_service.create_puzzle(100, "Big", "user-1")['puzzleId']
+        upload_id = moto_puzzle_service.initiate_multipart_upload(
+            puzzle_id, 1024, 'big.jpg', 'user-1'
+        )['uploadId']
+        parts = _upload_parts(moto_puzzle_service, puzzle_id, upload_id, [5 * 1024 * 1024, 1024])
+
+        with patch.object(PuzzleService, 'MAX_UPLOAD_BYTES', 5 * 1024 * 1024):
+            with pytest.raises(ValueError, match="too large"):
+                moto_puzzle_service.complete_multipart_upload(puzzle_id, upload_id, parts, 'user-1')
+
+        uploads = moto_puzzle_service.s3_client.list_multipart_uploads(Bucket='test-bucket')
+        assert not uploads.get('Uploads')
+        with pytest.raises(ClientError):
+            moto_puzzle_service.s3_client.head_object(Bucket='test-bucket', Key=f"puzzles/{puzzle_id}.jpg")
+
+    @pytest.mark.unit
+    def test_unknown_upload_id(self, moto_puzzle_service):
+        """存在しないアップロードIDはValueError"""
+        puzzle_id = moto_puzzle_service.create_puzzle(100, "Big", "user-1")['puzzleId']
+        moto_puzzle_service.generate_upload_post(puzzle_id, 'big.jpg', 'user-1')
+
+        with pytest.raises(UploadNotFoundError, match="Upload not found"):
+            moto_puzzle_service.complete_multipart_upload(
+                puzzle_id, 'no-such-upload', [{'partNumber': 1, 'etag': '"x"'}], 'user-1'
+            )
+
+    @pytest.mark.unit
+    def test_other_user_cannot_complete(self, moto_puzzle_service):
+        """別ユーザーのパズルは見つからない扱い"""
+        puzzle_id = moto_puzzle_service.create_puzzle(100, "Big", "user-1")['puzzleId']
+        upload_id = moto_puzzle_service.initiate_multipart_upload(
+            puzzle_id, 1024, 'big.jpg', 'user-1'
+        )['uploadId']
+
+        with pytest.raises(PuzzleNotFoundError, match="Puzzle not found"):
+            moto_puzzle_service.complete_multipart_upload(
+                puzzle_id, upload_id, [{'partNumber': 1, 'etag': '"x"'}], 'user-2'
+            )
+
+    @pytest.mark.unit
+    def test_abort(self, moto_puzzle_service):
+        """中止後はアップロードが残らないこと"""
+        puzzle_id = moto_puzzle_service.create_puzzle(100, "Big", "user-1")['puzzleId']
+        upload_id = moto_puzzle_service.initiate_multipart_upload(
+            puzzle_id, 1024, 'big.jpg', 'user-1'
+        )['uploadId']
+
+        moto_puzzle_service.abort_multipart_upload(puzzle_id, upload_id, 'user-1')
+
+        uploads = moto_puzzle_service.s3_client.list_multipart_uploads(Bucket='test-bucket')
+        assert not uploads.get('Uploads')
@@ -0,0 +1,167 @@
+"""
+リクエストメトリクスの単体テスト
+
+botocoreのフックによるAWS呼び出しの集計と、リクエストごとに1件出力されるメトリクスを検証します。
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import metrics as metrics_module
+from app.api.main import app
+from app.api.metrics import RequestMetricsMiddleware
+from app.core.aws import create_client, create_resource
+from app.core.request_metrics import bind_metrics, current_metrics, finish_request, start_request
+
+
+@pytest.fixture
+def s3_client():
+    return create_client('s3')
+
+
+class TestAwsCallHooks:
+    """instrument_client / bind_metrics のテスト"""
+
+    @pytest.mark.unit
+    def test_calls_are_attributed_to_current_request(self, s3_client):
+        metrics, token = start_request()
+        try:
+            s3_client.put_object(Bucket='test-bucket', Key='a.txt', Body=b'a')
+            s3_client.get_object(Bucket='test-bucket', Key='a.txt')
+            s3_client.get_object(Bucket='test-bucket', Key='a.txt')
+        finally:
+            finish_request(token)
+
+        summary = metrics.aws_summary()
+        assert summary['awsCalls'] == 3
+        assert summary['aws']['S3.GetObject']['calls'] == 2
+        assert summary['aws']['S3.PutObject']['calls'] == 1
+        assert summary['awsMs'] > 0
+
+    @pytest.mark.unit
+    def test_failed_calls_are_recorded(self, s3_client):
+        metrics, token = start_request()
+        try:
+            with pytest.raises(Exception):
+                s3_client.get_object(Bucket='test-bucket', Key='missing.txt')
+        finally:
+            finish_request(token)
+
+        assert metrics.aws_summary()['aws']['S3.GetObject']['calls'] == 1
+
+    @pytest.mark.unit
+    def test_resource_calls_are_recorded(self):
+        table = create_resource('dynamodb').Table('test-puzzles')
+
+        metrics, token = start_request()
+        try:
+            table.get_item(Key={'userId': 'u', 'puzzleId': 'p'})
+        finally:
+            finish_request(token)
+
+        assert metrics.aws_summary()['aws'].keys() == {'DynamoDB.GetItem'}
+        assert metrics.aws_summary()['awsCalls'] == 1
+
+    @pytest.mark.unit
+    def test_calls_outside_requests_are_ignored(self, s3_client):
+        assert current_metrics() is None
+        s3_client.list_objects_v2(Bucket='test-bucket')
+
+    @pytest.mark.unit
+    def test_bind_metrics_carries_request_into_threads(self, s3_client):
+        metrics, token = start_request()
+        try:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                list(executor.map(
+                    bind_metrics(lambda key: s3_client.put_object(Bucket='test-bucket', Key=key, Body=b'x')),
+                    ['a', 'b', 'c']
+                ))
+                # 包まずに投入した呼び出しは集計されない
+                executor.submit(s3_client.list_objects_v2, Bucket='test-bucket').result()
+        finally:
+            finish_request(token)
+
+        assert metrics.aws_summary()['aws'].keys() == {'S3.PutObject'}
+        assert metrics.aws_summary()['awsCalls'] == 3
+
+
+class TestRequestMetricsMiddleware:
+    """RequestMetricsMiddleware のテスト"""
+
+    @pytest.mark.unit
+    def test_logs_one_record_per_request(self, sample_user_id):
+        client = TestClient(app)
+        puzzle_id = client.post(
+            "/puzzles", json={"puzzleName": "Metrics", "pieceCount": 100, "userId": sample_user_id}
+        ).json()['puzzleId']
+
+        with patch.object(metrics_module, '_cold_start', False), \
+                patch.object(metrics_module.logger, 'info') as info:
+            response = client.get(f"/puzzles/{puzzle_id}", params={"user_id": sample_user_id})
+
+        assert response.status_code == 200
+        info.assert_called_once()
+        record = info.call_args.kwargs['extra']['extra_data']
+        assert record['method'] == 'GET'
+        assert record['route'] == '/puzzles/{puzzle_id}'
+        assert record['status'] == 200
+        assert record['coldStart'] is False
+        assert record['durationMs'] >= record['awsMs']
+        assert set(record['aws']) <= {'DynamoDB.GetItem'}
+
+    @pytest.mark.unit
+    def test_unmatched_route(self):
+        with patch.object(metrics_module.logger, 'info') as info:
+            response = TestClient(app).get("/no-such-route")
+
+        assert response.status_code == 404
+        record = info.call_args.kwargs['extra']['extra_data']
+        assert record['route'] == 'unmatched'
+        assert record['status'] == 404
+        assert record['awsCalls'] == 0
+
+    @pytest.mark.unit
+    def test_cold_start_and_lambda_request_id(self):
+        """最初のリクエストだけがコールドスタート、Lambdaのリクエストはrequest_idを付ける"""
+        async def endpoint(scope, receive, send):
+            await send({'type': 'http.response.start', 'status': 204, 'headers': []})
+            await send({'type': 'http.response.body', 'body': b''})
+
+        async def noop_send(message):
+            pass
+
+        middleware = RequestMetricsMiddleware(endpoint)
+        scope = {
+            'type': 'http',
+            'method': 'GET',
+            'aws.context': SimpleNamespace(aws_request_id='lambda-request-1'),
+        }
+
+        with patch.object(metrics_module, '_cold_start', True), \
+                patch.object(metrics_module.logger, 'info') as info:
+            asyncio.run(middleware(scope, None, noop_send))
+            asyncio.run(middleware(scope, None, noop_send))
+
+        first, second = (call.kwargs['extra'] for call in info.call_args_list)
+        assert first['extra_data']['coldStart'] is True
+        assert second['extra_data']['coldStart'] is False
+        assert first['request_id'] == 'lambda-request-1'
+        assert first['extra_data']['status'] == 204
+
+    @pytest.mark.unit
+    def test_exception_is_recorded_as_500(self):
+        async def failing(scope, receive, send):
+            raise RuntimeError("boom")
+
+        middleware = RequestMetricsMiddleware(failing)
+
+        with patch.object(metrics_module.logger, 'info') as info:
+            with pytest.raises(RuntimeError):
+                asyncio.run(middleware({'type': 'http', 'method': 'POST'}, None, None))
+
+        assert info.call_args.kwargs['extra']['extra_data']['status'] == 500
@@ -0,0 +1,97 @@
+"""
+高速JSONエンコーダーの単体テスト
+
+orjson がある場合とない場合（標準jsonへのフォールバック）で同じ結果になることを検証します。
+"""
+
+import json
+import logging
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from app.api.responses import FastJSONResponse
+from app.core import serialization
+from app.core.logger import JSONFormatter
+from app.core.serialization import dumps, dumps_str
+
+ITEM = {
+    "puzzleId": "p-1",
+    "puzzleName": "富士山",
+    "pieceCount": Decimal("300"),
+    "ratio": Decimal("1.5"),
+    "tags": {"landscape"},
+    "createdAt": datetime(2026, 1, 2, 3, 4, 5),
+}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request):
+    """orjson・標準jsonの両方で実行"""
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+        yield request.param
+    else:
+        with patch.object(serialization, "orjson", None):
+            yield request.param
+
+
+class TestDumps:
+    """dumps / dumps_str のテスト"""
+
+    @pytest.mark.unit
+    def test_dynamodb_item(self, backend):
+        """DecimalやセットなどDynamoDBの値がJSONに変換されること"""
+        data = json.loads(dumps(ITEM))
+
+        assert data["pieceCount"] == 300
+        assert isinstance(data["pieceCount"], int)
+        assert data["ratio"] == 1.5
+        assert data["tags"] == ["landscape"]
+        assert data["createdAt"].startswith("2026-01-02T03:04:05")
+        assert data["puzzleName"] == "富士山"
+
+    @pytest.mark.unit
+    def test_non_ascii_is_not_escaped(self, backend):
+        """日本語はエスケープせずUTF-8で出力されること"""
+        assert dumps_str({"name": "富士山"}) == '{"name":"富士山"}'
+
+    @pytest.mark.unit
+    def test_unserializable_raises(self, backend):
+        """変換できない値はTypeError"""
+        with pytest.raises(TypeError):
+            dumps({"bad": object()})
+
+    @pytest.mark.unit
+    def test_fallback(self, backend):
+        """fallback を指定すると変換できない値も出力されること"""
+        assert json.loads(dumps({"error": ValueError("boom")}, fallback=str)) == {"error": "boom"}
+
+
+class TestFastJSONResponse:
+    """FastJSONResponse のテスト"""
+
+    @pytest.mark.unit
+    def test_renders_decimal(self):
+        response = FastJSONResponse({"count": Decimal("2")}, headers={"ETag": 'W/"x"'})
+
+        assert response.body == b'{"count":2}'
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["etag"] == 'W/"x"'
+
+
+class TestJSONFormatter:
+    """ログフォーマッターが共通エンコーダーを使うことのテスト"""
+
+    @pytest.mark.unit
+    def test_extra_data_with_decimal(self):
+        """extra_data の Decimal や任意オブジェクトでもJSONを出力できること"""
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "done", None, None)
+        record.extra_data = {"pieceCount": Decimal("300"), "error": ValueError("boom")}
+
+        data = json.loads(JSONFormatter().format(record))
+
+        assert data["message"] == "done"
+        assert data["extra"] == {"pieceCount": 300, "error": "boom"}
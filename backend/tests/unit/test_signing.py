@@ -0,0 +1,112 @@
+"""
+一括署名ヘルパーの単体テスト
+
+SigV4の一括署名が botocore の generate_presigned_url と同じ署名を生成すること、
+CloudFrontのカスタムポリシー署名が公開鍵で検証できることを確認します。
+"""
+
+import base64
+import json
+from datetime import datetime
+from unittest.mock import patch
+
+import boto3
+import pytest
+from botocore.config import Config
+
+from app.core.aws import get_frozen_credentials
+from app.core.signing import (
+    SigV4QueryPresigner,
+    cloudfront_policy,
+    sign_cloudfront_policy,
+    template_signature,
+)
+
+KEYS = ["pieces/p-1/a.jpg", "pieces/p-1/b c.jpg", "pieces/p-1/ピース~+.jpg"]
+
+
+def _presign(client, bucket, key):
+    return client.generate_presigned_url(
+        'get_object', Params={'Bucket': bucket, 'Key': key}, ExpiresIn=900
+    )
+
+
+def _cloudfront_b64decode(value):
+    return base64.b64decode(value.translate(str.maketrans('-_~', '+=/')))
+
+
+class TestSigV4QueryPresigner:
+    """S3署名付きURLの一括生成のテスト"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("bucket", ["test-bucket", "my.dotted.bucket"])
+    def test_matches_botocore(self, bucket):
+        """全キーの署名が botocore と一致すること（仮想ホスト形式・パス形式）"""
+        client = boto3.client('s3', region_name='ap-northeast-1', config=Config(signature_version='s3v4'))
+        # botocore 側の署名日時を固定して比較する
+        with patch('botocore.auth.get_current_datetime', return_value=datetime(2026, 1, 2, 3, 4, 5)):
+            template = _presign(client, bucket, KEYS[0])
+            expected = {key: _presign(client, bucket, key) for key in KEYS}
+
+        presigner = SigV4QueryPresigner.from_template(
+            template, KEYS[0], get_frozen_credentials().secret_key
+        )
+
+        assert presigner is not None
+        assert presigner.amz_date == "20260102T030405Z"
+        for key in KEYS:
+            assert presigner.signature(key) == template_signature(expected[key])
+            assert presigner.presign(key).split('?')[0] == expected[key].split('?')[0]
+
+    @pytest.mark.unit
+    def test_rejects_non_sigv4_url(self):
+        """SigV2形式のURLからは署名器を作らないこと"""
+        url = "https://b.s3.amazonaws.com/pieces/a.jpg?AWSAccessKeyId=x&Signature=y&Expires=1"
+
+        assert SigV4QueryPresigner.from_template(url, "pieces/a.jpg", "secret") is None
+
+    @pytest.mark.unit
+    def test_rejects_mismatched_key(self):
+        """テンプレートのキーと一致しない場合はNone"""
+        client = boto3.client('s3', region_name='ap-northeast-1', config=Config(signature_version='s3v4'))
+        template = _presign(client, 'test-bucket', KEYS[0])
+
+        assert SigV4QueryPresigner.from_template(template, "other.jpg", "secret") is None
+
+
+class TestCloudFrontPolicy:
+    """CloudFrontカスタムポリシーのテスト"""
+
+    @pytest.mark.unit
+    def test_policy_is_compact(self):
+        policy = cloudfront_policy("https://d.example/pieces/p-1/*", 1700000000)
+
+        assert " " not in policy
+        assert json.loads(policy)["Statement"][0]["Condition"]["DateLessThan"]["AWS:EpochTime"] == 1700000000
+
+    @pytest.mark.unit
+    def test_signature_verifies(self):
+        """署名が公開鍵で検証でき、値がCloudFront用Base64であること"""
+        pytest.importorskip("cryptography")
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ).decode()
+        policy = cloudfront_policy("https://d.example/pieces/p-1/*", 1700000000)
+
+        signed = sign_cloudfront_policy(policy, pem, "K123")
+
+        assert signed["Key-Pair-Id"] == "K123"
+        assert not set("+=/") & set(signed["Signature"] + signed["Policy"])
+        assert _cloudfront_b64decode(signed["Policy"]).decode() == policy
+        private_key.public_key().verify(
+            _cloudfront_b64decode(signed["Signature"]),
+            policy.encode(),
+            padding.PKCS1v15(),
+            hashes.SHA1()
+        )
@@ -0,0 +1,82 @@
+"""
+コールドスタート計測（インポートプロファイラ）の単体テスト
+"""
+
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from app.core.startup import ImportProfiler, log_import_profile, profile_imports
+
+
+def _forget(module_name: str) -> None:
+    """計測のため、インポート済みモジュールを一度取り除く"""
+    sys.modules.pop(module_name, None)
+
+
+class TestProfileImports:
+    """profile_imports のテスト"""
+
+    @pytest.mark.unit
+    def test_records_module_import_time(self):
+        """ブロック内でインポートしたモジュールの時間が記録されること"""
+        _forget('colorsys')
+
+        with profile_imports(enabled=True) as profiler:
+            import colorsys  # noqa: F401
+
+        assert profiler is not None
+        assert 'colorsys' in profiler.timings
+        assert profiler.summary()["moduleCount"] >= 1
+        assert profiler.top(1)[0][1] >= 0
+
+    @pytest.mark.unit
+    def test_hook_removed_after_block(self):
+        """ブロックを抜けるとmeta_pathからフックが外れること"""
+        with profile_imports(enabled=True) as profiler:
+            assert sys.meta_path[0] is profiler
+
+        assert not any(isinstance(finder, ImportProfiler) for finder in sys.meta_path)
+
+    @pytest.mark.unit
+    def test_original_loader_restored(self):
+        """読み込み後のモジュールは元のローダーを参照すること"""
+        _forget('colorsys')
+
+        with profile_imports(enabled=True):
+            import colorsys
+
+        assert type(colorsys.__loader__).__name__ != '_TimingLoader'
+        assert colorsys.__spec__.loader is colorsys.__loader__
+
+    @pytest.mark.unit
+    def test_disabled_by_default(self, monkeypatch):
+        """COLD_START_PROFILE が未設定なら計測しないこと"""
+        monkeypatch.delenv('COLD_START_PROFILE', raising=False)
+        before = list(sys.meta_path)
+
+        with profile_imports() as profiler:
+            assert profiler is None
+            assert sys.meta_path == before
+
+    @pytest.mark.unit
+    def test_enabled_by_env(self, monkeypatch):
+        """COLD_START_PROFILE=true で計測が有効になること"""
+        monkeypatch.setenv('COLD_START_PROFILE', 'true')
+
+        with profile_imports() as profiler:
+            assert isinstance(profiler, ImportProfiler)
+
+    @pytest.mark.unit
+    def test_log_import_profile(self):
+        """計測結果がextra_dataとしてログ出力されること"""
+        with profile_imports(enabled=True) as profiler:
+            pass
+
+        with patch('logging.Logger.info') as mock_info:
+            log_import_profile(profiler)
+            log_import_profile(None)
+
+        assert mock_info.call_count == 1
+        assert "totalMs" in mock_info.call_args.kwargs["extra"]["extra_data"]
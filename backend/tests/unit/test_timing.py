@@ -0,0 +1,142 @@
+"""
+ジョブの処理時間集計の単体テスト
+
+段階ごとのヒストグラム、span の計測、CloudWatch EMFレコードの形式を検証します。
+"""
+
+import io
+import json
+
+import pytest
+
+from app.core.timing import Histogram, JobTimer, build_emf, emit_emf
+
+
+class FakeClock:
+    """呼び出しのたびに指定した時刻を返す時計"""
+
+    def __init__(self, *times):
+        self._times = list(times)
+
+    def __call__(self):
+        return self._times.pop(0)
+
+
+class TestHistogram:
+    """Histogram のテスト"""
+
+    @pytest.mark.unit
+    def test_exact_count_sum_min_max(self):
+        histogram = Histogram()
+        for value in (1.0, 2.0, 3.0, 10.0):
+            histogram.add(value)
+
+        assert histogram.count == 4
+        assert histogram.total == 16.0
+        assert (histogram.minimum, histogram.maximum) == (1.0, 10.0)
+
+    @pytest.mark.unit
+    def test_percentiles_are_within_bucket_error(self):
+        histogram = Histogram()
+        for value in range(1, 1001):
+            histogram.add(float(value))
+
+        # バケットの代表値の誤差は約±9%
+        assert histogram.percentile(50) == pytest.approx(500, rel=0.1)
+        assert histogram.percentile(95) == pytest.approx(950, rel=0.1)
+        assert histogram.percentile(100) <= 1000.0
+
+    @pytest.mark.unit
+    def test_memory_is_bounded_by_buckets(self):
+        histogram = Histogram()
+        for _ in range(10000):
+            histogram.add(5.0)
+
+        assert histogram.buckets == {next(iter(histogram.buckets)): 10000}
+
+    @pytest.mark.unit
+    def test_zero_and_empty(self):
+        histogram = Histogram()
+        assert histogram.percentile(50) == 0.0
+
+        histogram.add(0.0)
+        assert histogram.percentile(50) == 0.0
+        assert histogram.to_dict()['count'] == 1
+
+
+class TestJobTimer:
+    """JobTimer のテスト"""
+
+    @pytest.mark.unit
+    def test_span_records_elapsed_ms(self):
+        # 開始, download 開始/終了, crop×2 の開始/終了
+        timer = JobTimer(clock=FakeClock(0.0, 1.0, 1.5, 2.0, 2.01, 3.0, 3.03))
+
+        with timer.span('download'):
+            pass
+        for _ in range(2):
+            with timer.span('crop'):
+                pass
+
+        summary = timer.summary()
+        assert summary['download']['sumMs'] == pytest.approx(500.0)
+        assert summary['crop']['count'] == 2
+        assert summary['crop']['sumMs'] == pytest.approx(40.0)
+
+    @pytest.mark.unit
+    def test_span_records_on_exception(self):
+        timer = JobTimer(clock=FakeClock(0.0, 1.0, 2.0))
+
+        with pytest.raises(RuntimeError):
+            with timer.span('download'):
+                raise RuntimeError("boom")
+
+        assert timer.histograms['download'].count == 1
+
+
+class TestEmf:
+    """build_emf / emit_emf のテスト"""
+
+    @staticmethod
+    def _timer():
+        timer = JobTimer(clock=FakeClock(0.0, 0.0, 0.1, 0.1, 0.102, 0.102, 0.106, 0.2))
+        with timer.span('download'):
+            pass
+        for _ in range(2):
+            with timer.span('upload'):
+                pass
+        return timer
+
+    @pytest.mark.unit
+    def test_record_structure(self):
+        record = build_emf(
+            'JigsawPuzzle',
+            self._timer(),
+            dimensions={'Operation': 'split'},
+            properties={'puzzle_id': 'p-1'},
+            timestamp_ms=1700000000000
+        )
+
+        directive = record['_aws']['CloudWatchMetrics'][0]
+        assert record['_aws']['Timestamp'] == 1700000000000
+        assert directive['Namespace'] == 'JigsawPuzzle'
+        assert directive['Dimensions'] == [[], ['Operation']]
+        names = [metric['Name'] for metric in directive['Metrics']]
+        # 1回だけの段階は合計のみ、繰り返す段階は分布も出力
+        assert names == ['total_ms', 'download_ms', 'upload_ms', 'upload_p50_ms', 'upload_p95_ms', 'upload_max_ms']
+        for name in names:
+            assert isinstance(record[name], float)
+        assert record['total_ms'] == pytest.approx(200.0)
+        assert record['Operation'] == 'split'
+        assert record['puzzle_id'] == 'p-1'
+        assert record['timings']['upload']['count'] == 2
+
+    @pytest.mark.unit
+    def test_emit_writes_one_json_line(self):
+        stream = io.StringIO()
+
+        emit_emf(build_emf('JigsawPuzzle', self._timer(), dimensions={}), stream=stream)
+
+        lines = stream.getvalue().splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])['_aws']['CloudWatchMetrics'][0]['Dimensions'] == [[]]
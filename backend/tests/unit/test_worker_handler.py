@@ -0,0 +1,312 @@
+"""
+ワーカーLambdaハンドラーの単体テスト
+
+SQS/直接呼び出しイベントの振り分けと、部分失敗（batchItemFailures）の扱いを検証します。
+"""
+
+import io
+import json
+
+from unittest.mock import patch
+
+import pytest
+
+from app.core.cache import RedisCache
+from app.core.config import settings
+from app.services.deletion_queue import build_deletion_job
+from app.worker.handler import (
+    build_split_job,
+    get_image_processor,
+    get_puzzle_service,
+    handler,
+    reset_workers,
+    run_job,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_workers():
+    """motoのモック環境ごとにクライアントを作り直す"""
+    reset_workers()
+    yield
+    reset_workers()
+
+
+def _sqs_event(*bodies):
+    return {
+        'Records': [
+            {'messageId': f"m-{i}", 'eventSource': 'aws:sqs', 'body': json.dumps(body)}
+            for i, body in enumerate(bodies)
+        ]
+    }
+
+
+def _create_uploaded_puzzle(user_id):
+    """画像アップロード済みのパズルを作成し、(puzzleId, s3Key) を返す"""
+    service = get_puzzle_service()
+    puzzle_id = service.create_puzzle(piece_count=100, puzzle_name="Worker", user_id=user_id)['puzzleId']
+    service.generate_upload_post(puzzle_id, 'photo.jpg', user_id)
+    return puzzle_id, f"puzzles/{puzzle_id}.jpg"
+
+
+class TestWorkerHandler:
+    """ワーカーハンドラーのテスト"""
+
+    @pytest.mark.unit
+    def test_sqs_deletion_message(self, sample_user_id):
+        """削除ジョブのSQSメッセージでパズルが削除されること"""
+        puzzle_id, s3_key = _create_uploaded_puzzle(sample_user_id)
+
+        result = handler(_sqs_event(build_deletion_job(sample_user_id, puzzle_id, s3_key)), None)
+
+        assert result == {'batchItemFailures': []}
+        assert get_puzzle_service().get_puzzle(sample_user_id, puzzle_id) is None
+
+    @pytest.mark.unit
+    def test_partial_batch_failure(self, sample_user_id):
+        """失敗したメッセージだけが batchItemFailures に含まれること"""
+        puzzle_id, s3_key = _create_uploaded_puzzle(sample_user_id)
+
+        result = handler(
+            _sqs_event(
+                {'type': 'unknown'},
+                build_deletion_job(sample_user_id, puzzle_id, s3_key)
+            ),
+            None
+        )
+
+        assert result == {'batchItemFailures': [{'itemIdentifier': 'm-0'}]}
+
+    @pytest.mark.unit
+    def test_processor_skips_process_local_cache(self):
+        """プロセス内キャッシュはAPIと共有できないため、ワーカーには渡さないこと"""
+        with patch.object(settings, 'puzzle_cache_backend', 'memory'):
+            assert get_image_processor().cache is None
+
+    @pytest.mark.unit
+    def test_processor_uses_shared_redis_cache(self):
+        """共有キャッシュ（redis）の場合はワーカーからも無効化すること"""
+        pytest.importorskip("redis")
+        with patch.object(settings, 'puzzle_cache_backend', 'redis'):
+            assert isinstance(get_image_processor().cache, RedisCache)
+
+    @pytest.mark.unit
+    def test_unknown_job_type(self):
+        """未対応のジョブ種別はValueError"""
+        with pytest.raises(ValueError):
+            run_job({'type': 'resize'})
+
+    @pytest.mark.unit
+    def test_direct_split_invocation(self, sample_user_id):
+        """直接呼び出しの分割ジョブでピースが作成されること"""
+        Image = pytest.importorskip("PIL.Image")
+        puzzle_id, s3_key = _create_uploaded_puzzle(sample_user_id)
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (200, 200), color='red').save(buffer, format='JPEG')
+        service = get_puzzle_service()
+        service.s3_client.put_object(Bucket='test-bucket', Key=s3_key, Body=buffer.getvalue())
+
+        result = handler(build_split_job(sample_user_id, puzzle_id, s3_key, 100), None)
+
+        assert result['status'] == 'completed'
+        assert result['totalPieces'] == 100
+        assert service.get_puzzle(sample_user_id, puzzle_id)['status'] == 'completed'
+
+    @pytest.mark.unit
+    def test_split_after_delete_is_dropped(self, sample_user_id):
+        """削除済みのパズルの分割ジョブは破棄され、レコードを作り直さないこと"""
+        Image = pytest.importorskip("PIL.Image")
+        puzzle_id, s3_key = _create_uploaded_puzzle(sample_user_id)
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (200, 200)).save(buffer, format='JPEG')
+        service = get_puzzle_service()
+        service.s3_client.put_object(Bucket='test-bucket', Key=s3_key, Body=buffer.getvalue())
+        service.puzzles_table.delete_item(Key={'userId': sample_user_id, 'puzzleId': puzzle_id})
+
+        result = handler(_sqs_event(build_split_job(sample_user_id, puzzle_id, s3_key, 100)), None)
+
+        assert result == {'batchItemFailures': []}
+        assert service.get_puzzle(sample_user_id, puzzle_id) is None
+
+    @pytest.mark.unit
+    def test_delete_during_split_discards_pieces(self, sample_user_id):
+        """分割中に削除された場合、作成済みのピースを片付けること"""
+        Image = pytest.importorskip("PIL.Image")
+        from app.services.image_processor import ImageProcessor
+
+        puzzle_id, s3_key = _create_uploaded_puzzle(sample_user_id)
+        buffer = io.BytesIO()
+        Image.new('RGB', (200, 200)).save(buffer, format='JPEG')
+        service = get_puzzle_service()
+        service.s3_client.put_object(Bucket='test-bucket', Key=s3_key, Body=buffer.getvalue())
+
+        original = ImageProcessor._update_puzzle_status
+
+        def delete_before_completing(self, user_id, puzzle_id, status, **kwargs):
+            if status == 'completed':
+                service.puzzles_table.delete_item(Key={'userId': user_id, 'puzzleId': puzzle_id})
+            return original(self, user_id, puzzle_id, status, **kwargs)
+
+        with patch.object(ImageProcessor, '_update_puzzle_status', delete_before_completing):
+            result = run_job(build_split_job(sample_user_id, puzzle_id, s3_key, 100))
+
+        assert result == {'puzzleId': puzzle_id, 'status': 'dropped'}
+        assert service.get_puzzle(sample_user_id, puzzle_id) is None
+        listed = service.s3_client.list_objects_v2(Bucket='test-bucket', Prefix=f"pieces/{puzzle_id}/")
+        assert listed.get('KeyCount', 0) == 0
+        assert service.pieces_table.query(
+            KeyConditionExpression='puzzleId = :pid',
+            ExpressionAttributeValues={':pid': puzzle_id}
+        )['Items'] == []
+
+    @pytest.mark.unit
+    def test_split_finishing_during_async_delete_keeps_deleting(self, sample_user_id):
+        """非同期削除中（deleting）のパズルを completed で上書きせず、作成済みのピースを片付けること"""
+        Image = pytest.importorskip("PIL.Image")
+        from app.services.image_processor import ImageProcessor
+
+        puzzle_id, s3_key = _create_uploaded_puzzle(sample_user_id)
+        buffer = io.BytesIO()
+        Image.new('RGB', (200, 200)).save(buffer, format='JPEG')
+        service = get_puzzle_service()
+        service.s3_client.put_object(Bucket='test-bucket', Key=s3_key, Body=buffer.getvalue())
+
+        original = ImageProcessor._update_puzzle_status
+
+        def mark_deleting_before_completing(self, user_id, puzzle_id, status, **kwargs):
+            if status == 'completed':
+                service.mark_puzzle_deleting(user_id, puzzle_id)
+            return original(self, user_id, puzzle_id, status, **kwargs)
+
+        with patch.object(ImageProcessor, '_update_puzzle_status', mark_deleting_before_completing):
+            result = run_job(build_split_job(sample_user_id, puzzle_id, s3_key, 100))
+
+        assert result == {'puzzleId': puzzle_id, 'status': 'dropped'}
+        assert service.get_puzzle(sample_user_id, puzzle_id)['status'] == 'deleting'
+        listed = service.s3_client.list_objects_v2(Bucket='test-bucket', Prefix=f"pieces/{puzzle_id}/")
+        assert listed.get('KeyCount', 0) == 0
+
+    @pytest.mark.unit
+    def test_max_pixels_from_settings(self):
+        """分割する画像の最大ピクセル数がSettingsから設定されること"""
+        with patch.object(settings, 'image_max_pixels', 1234):
+            assert get_image_processor().max_pixels == 1234
+
+    @pytest.mark.unit
+    def test_split_rejects_oversized_image(self, sample_user_id):
+        """上限を超える画像は読み込まずに failed になること"""
+        Image = pytest.importorskip("PIL.Image")
+        from unittest.mock import patch
+
+        from app.services.image_processor import ImageProcessor
+
+        puzzle_id, s3_key = _create_uploaded_puzzle(sample_user_id)
+        buffer = io.BytesIO()
+        Image.new('RGB', (200, 200)).save(buffer, format='JPEG')
+        service = get_puzzle_service()
+        service.s3_client.put_object(Bucket='test-bucket', Key=s3_key, Body=buffer.getvalue())
+
+        with patch.object(ImageProcessor, 'MAX_IMAGE_BYTES', len(buffer.getvalue()) - 1):
+            with pytest.raises(ValueError, match="too large"):
+                handler(build_split_job(sample_user_id, puzzle_id, s3_key, 100), None)
+
+        assert service.get_puzzle(sample_user_id, puzzle_id)['status'] == 'failed'
+
+    @pytest.mark.unit
+    def test_split_rejects_unsupported_file_without_download(self, sample_user_id):
+        """未対応のファイルはヘッダーの読み込みだけで failed になること"""
+        pytest.importorskip("PIL.Image")
+        from unittest.mock import patch
+
+        puzzle_id, s3_key = _create_uploaded_puzzle(sample_user_id)
+        service = get_puzzle_service()
+        service.s3_client.put_object(Bucket='test-bucket', Key=s3_key, Body=b'GIF89a' + b'\x00' * 100000)
+
+        processor = get_image_processor()
+        with patch.object(processor.s3_client, 'get_object', wraps=processor.s3_client.get_object) as get_object:
+            with pytest.raises(ValueError, match="Unsupported"):
+                handler(build_split_job(sample_user_id, puzzle_id, s3_key, 100), None)
+
+        # Range指定のない（全体の）ダウンロードは行われない
+        assert all('Range' in call.kwargs for call in get_object.call_args_list)
+        assert service.get_puzzle(sample_user_id, puzzle_id)['status'] == 'failed'
+
+    @pytest.mark.unit
+    def test_split_applies_exif_orientation(self, sample_user_id):
+        """EXIFで90度回転している写真は表示の向きで分割されること"""
+        Image = pytest.importorskip("PIL.Image")
+        from app.core.manifest import decode_manifest_json
+
+        puzzle_id, s3_key = _create_uploaded_puzzle(sample_user_id)
+        exif = Image.Exif()
+        exif[0x0112] = 6  # 時計回りに90度回転して表示
+        buffer = io.BytesIO()
+        Image.new('RGB', (300, 200), color='green').save(buffer, format='JPEG', exif=exif)
+        service = get_puzzle_service()
+        service.s3_client.put_object(Bucket='test-bucket', Key=s3_key, Body=buffer.getvalue())
+
+        handler(build_split_job(sample_user_id, puzzle_id, s3_key, 100), None)
+
+        puzzle = service.get_puzzle(sample_user_id, puzzle_id)
+        assert (puzzle['imageWidth'], puzzle['imageHeight'], puzzle['imageOrientation']) == (200, 300, 6)
+        manifest = decode_manifest_json(service.get_piece_manifest(puzzle))
+        assert (manifest['imageWidth'], manifest['imageHeight']) == (200, 300)
+        # ピースは表示の向き（200x300）の座標で配置される
+        columns = manifest['columns']
+        assert max(x + w for x, w in zip(columns['x'], columns['width'])) == 200
+        assert max(y + h for y, h in zip(columns['y'], columns['height'])) == 300
+
+    @pytest.mark.unit
+    def test_split_emits_one_metrics_record(self, sample_user_id, capsys):
+        """分割ジョブごとに段階別の処理時間がEMFで1行だけ出力されること"""
+        Image = pytest.importorskip("PIL.Image")
+        puzzle_id, s3_key = _create_uploaded_puzzle(sample_user_id)
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (200, 200), color='red').save(buffer, format='JPEG')
+        service = get_puzzle_service()
+        service.s3_client.put_object(Bucket='test-bucket', Key=s3_key, Body=buffer.getvalue())
+        capsys.readouterr()
+
+        handler(build_split_job(sample_user_id, puzzle_id, s3_key, 100), None)
+
+        records = [json.loads(line) for line in capsys.readouterr().out.splitlines() if '"_aws"' in line]
+        assert len(records) == 1
+        record = records[0]
+        assert record['puzzle_id'] == puzzle_id
+        assert record['status'] == 'completed'
+        assert record['PieceClass'] == '100'
+        # ピースごとの段階はヒストグラムに集約される
+        for stage in ('crop', 'encode', 'upload', 'db_write'):
+            assert record['timings'][stage]['count'] == 100
+            assert f"{stage}_p95_ms" in record
+        for stage in ('header', 'grid', 'download', 'decode', 'manifest'):
+            assert record['timings'][stage]['count'] == 1
+        assert record['timings']['status_update']['count'] == 2
+        metric_names = {metric['Name'] for metric in record['_aws']['CloudWatchMetrics'][0]['Metrics']}
+        assert {'total_ms', 'download_ms', 'decode_ms', 'db_write_p95_ms'} <= metric_names
+
+    @pytest.mark.unit
+    def test_failed_split_emits_metrics(self, sample_user_id, capsys):
+        """失敗したジョブもそこまでの段階の時間を status=failed で出力すること"""
+        puzzle_id, s3_key = _create_uploaded_puzzle(sample_user_id)
+        service = get_puzzle_service()
+        service.s3_client.put_object(Bucket='test-bucket', Key=s3_key, Body=b'GIF89a' + b'\x00' * 1000)
+        capsys.readouterr()
+
+        with pytest.raises(ValueError):
+            handler(build_split_job(sample_user_id, puzzle_id, s3_key, 100), None)
+
+        records = [json.loads(line) for line in capsys.readouterr().out.splitlines() if '"_aws"' in line]
+        assert len(records) == 1
+        assert records[0]['status'] == 'failed'
+        assert records[0]['total_pieces'] == 0
+        assert 'download' not in records[0]['timings']
+
+    @pytest.mark.unit
+    def test_split_job_profile_flag(self, sample_user_id):
+        """profile=True のときだけジョブに "profile" が含まれること"""
+        assert 'profile' not in build_split_job(sample_user_id, 'p-1', 'puzzles/p-1.jpg', 100)
+        assert build_split_job(sample_user_id, 'p-1', 'puzzles/p-1.jpg', 100, profile=True)['profile'] is True
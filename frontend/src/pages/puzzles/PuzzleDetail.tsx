@@ -76,13 +76,14 @@ const PuzzleDetail = () => {
 
       const urlData: UploadUrlResponse = await urlResponse.json()
 
-      // Step 2: S3に画像をアップロード
+      // Step 2: S3に画像をアップロード（署名付きPOST。サイズ・形式はS3が検証する）
+      const form = new FormData()
+      Object.entries(urlData.fields).forEach(([name, value]) => form.append(name, value))
+      // file はポリシーのフィールドより後に置く必要がある
+      form.append('file', file)
       const uploadResponse = await fetch(urlData.uploadUrl, {
-        method: 'PUT',
-        headers: {
-          'Content-Type': file.type
-        },
-        body: file
+        method: 'POST',
+        body: form
       })
 
       if (!uploadResponse.ok) {
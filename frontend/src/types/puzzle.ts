@@ -37,6 +37,8 @@ export interface UploadUrlRequest {
 export interface UploadUrlResponse {
   puzzleId: string
   uploadUrl: string
+  fields: Record<string, string>
+  maxBytes: number
   expiresIn: number
   message: string
 }
@@ -11,9 +11,24 @@ import os
 # appパッケージをインポートするためbackend/を追加
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 
-from mangum import Mangum
-from app.api.main import app
+from app.core.startup import log_import_profile, profile_imports
+
+# COLD_START_PROFILE=true のときはアプリのインポート時間をモジュール別にログ出力
+with profile_imports() as import_profile:
+    from mangum import Mangum
+    from app.api.main import app
+    from app.core.logger import flush_logs
+
+log_import_profile(import_profile)
 
 # MangumでFastAPIアプリケーションをラップ
 # lifespan="off": Lambda環境ではlifespanイベントを無効化
-handler = Mangum(app, lifespan="off")
+asgi_handler = Mangum(app, lifespan="off")
+
+
+def handler(event, context):
+    try:
+        return asgi_handler(event, context)
+    finally:
+        # 応答を返すと実行環境が凍結されるため、キューに残ったログをここで書き出す
+        flush_logs()
@@ -0,0 +1,20 @@
+"""
+Lambda wrapper for the image worker
+
+Image splitting and background deletion run here, separate from the API function.
+Only this package bundles Pillow; the API package stays small for fast cold starts.
+"""
+
+import sys
+import os
+
+# appパッケージをインポートするためbackend/を追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from app.core.startup import log_import_profile, profile_imports
+
+# COLD_START_PROFILE=true のときはワーカーのインポート時間をモジュール別にログ出力
+with profile_imports() as import_profile:
+    from app.worker.handler import handler
+
+log_import_profile(import_profile)
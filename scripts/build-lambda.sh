@@ -0,0 +1,116 @@
+#!/bin/bash
+
+# Lambda package build script
+# Usage: ./scripts/build-lambda.sh <api|worker>
+#   api:    lambda/puzzle-register/function.zip (FastAPI + Mangum, Pillowなし)
+#   worker: lambda/puzzle-worker/function.zip   (画像分割・削除ワーカー, Pillowあり, FastAPIなし)
+#
+# バンドルごとに必要なコードと依存関係だけを含め、APIのコールドスタートを軽く保つ
+
+set -e  # Exit on error
+
+TARGET=${1:-api}
+PROJECT_ROOT="$(cd "$(dirname "$0")/.." && pwd)"
+
+case "$TARGET" in
+    api)
+        LAMBDA_DIR="lambda/puzzle-register"
+        # APIバンドルには画像処理・ワーカーのコードを含めない
+        EXCLUDE_PATHS="app/services/image_processor.py app/worker"
+        UV_EXPORT_ARGS="--extra api"
+        ;;
+    worker)
+        LAMBDA_DIR="lambda/puzzle-worker"
+        # ワーカーバンドルにはAPI（FastAPI）のコードを含めない
+        EXCLUDE_PATHS="app/api"
+        UV_EXPORT_ARGS="--extra worker"
+        ;;
+    *)
+        echo "Error: unknown target '$TARGET' (expected api or worker)"
+        exit 1
+        ;;
+esac
+
+echo "==================================="
+echo "Lambda Build Script"
+echo "==================================="
+echo "Target: $TARGET"
+echo "Lambda Dir: $LAMBDA_DIR"
+echo ""
+
+cd "$PROJECT_ROOT"
+
+# Check if backend/app directory exists
+if [ ! -d "backend/app" ]; then
+    echo "Error: backend/app/ directory not found"
+    exit 1
+fi
+
+cd "$LAMBDA_DIR"
+
+echo "Step 1: Cleaning up old files..."
+rm -rf backend package function.zip requirements.txt
+
+echo "Step 2: Copying backend/app directory..."
+mkdir -p backend
+cp -r "$PROJECT_ROOT/backend/app" ./backend/
+for path in $EXCLUDE_PATHS; do
+    rm -rf "./backend/$path"
+done
+
+echo "Step 2.5: Removing sensitive files from copied backend..."
+# .env ファイルや機密情報を含むファイルを削除（念のため）
+find ./backend -name ".env*" -type f -delete
+find ./backend -name "__pycache__" -type d -exec rm -rf {} + 2>/dev/null || true
+find ./backend -name "*.pyc" -type f -delete
+
+echo "Step 3: Exporting dependencies from uv..."
+# uvからrequirements.txtを生成（Lambda用、開発用依存関係を除外）
+(cd "$PROJECT_ROOT" && uv export --no-hashes --no-dev $UV_EXPORT_ARGS --format requirements-txt) \
+    > requirements-full.txt
+
+# プロジェクト自身（jigsaw-puzzle）を除外してrequirements.txtを作成
+grep -v "jigsaw-puzzle" requirements-full.txt | \
+  grep -v "^-e " | \
+  grep -v "file://" > requirements.txt
+
+rm requirements-full.txt
+
+echo "Step 4: Installing dependencies for Linux (Lambda runtime)..."
+mkdir -p package
+
+# Linux互換の依存関係をインストール
+# legacy-resolverを使用して依存関係の競合を回避
+python3 -m pip install \
+  --platform manylinux2014_x86_64 \
+  --target=./package \
+  --implementation cp \
+  --python-version 3.12 \
+  --only-binary=:all: \
+  --upgrade \
+  --use-deprecated=legacy-resolver \
+  -r requirements.txt
+
+echo "Step 5: Checking import graph..."
+# インストール済みのバンドル（backend/ + package/）だけでエントリーポイントをインポートし、
+# 重いモジュールがインポート経路に入っていないことを確認
+python3 "$PROJECT_ROOT/scripts/check_import_graph.py" "$TARGET" \
+    --backend-dir ./backend --package-dir ./package
+
+echo "Step 6: Packaging Lambda function..."
+# packageディレクトリの内容をzipに追加（依存関係）
+cd package
+zip -r ../function.zip . -q
+cd ..
+
+# index.pyとbackendディレクトリを追加（アプリケーションコード）
+zip -ur function.zip index.py backend/ \
+    -x "*.env*" "*/__pycache__/*" "*.pyc" "*.pyo" ".DS_Store" \
+    -q
+
+echo "Step 7: Cleaning up temporary files..."
+rm -rf backend requirements.txt package
+
+FILE_SIZE=$(du -h function.zip | cut -f1)
+echo ""
+echo "Build Complete! ✅ $LAMBDA_DIR/function.zip ($FILE_SIZE)"
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Import graph check for the Lambda bundles
+
+Lambdaのエントリーポイントをインポートし、重いモジュールが混入していないかを検査します。
+- api:    Pillow/NumPy や画像処理モジュールがAPIのインポート経路に入っていないこと
+- worker: FastAPI/Starlette/Mangum がワーカーのインポート経路に入っていないこと
+
+使い方:
+    python scripts/check_import_graph.py api
+    python scripts/check_import_graph.py worker \
+        --backend-dir lambda/puzzle-worker/backend --package-dir lambda/puzzle-worker/package
+
+エントリーポイントごとに新しいインタープリタで実行するため、検査結果は他のインポートに影響されません。
+--package-dir を指定すると site-packages を読み込まず（python -S）、バンドルに入る依存関係だけで
+インポートします。違反があれば終了コード1、エントリーポイントをインポートできなければ終了コード2で終了します。
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# バンドルごとのエントリーポイントと、インポートしてはいけないモジュール
+TARGETS: Dict[str, Dict[str, List[str]]] = {
+    'api': {
+        'entry': ['mangum', 'app.api.main'],
+        'forbidden': ['PIL', 'numpy', 'app.services.image_processor', 'app.worker'],
+    },
+    'worker': {
+        'entry': ['app.worker.handler'],
+        'forbidden': ['fastapi', 'starlette', 'mangum', 'app.api'],
+    },
+}
+
+# 子プロセスで実行するスクリプト（インポート後の sys.modules を出力する）
+_PROBE = """
+import importlib, json, os, sys
+sys.path[:0] = sys.argv[1].split(os.pathsep)
+for name in sys.argv[2:]:
+    try:
+        importlib.import_module(name)
+    except Exception as e:
+        print(f"{name}: {type(e).__name__}: {e}", file=sys.stderr)
+        sys.exit(2)
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+class ImportProbeError(RuntimeError):
+    """エントリーポイントのインポートに失敗した場合の例外"""
+
+
+def imported_modules(
+    backend_dir: str,
+    entry: List[str],
+    package_dir: Optional[str] = None
+) -> List[str]:
+    """
+    新しいインタープリタでエントリーポイントをインポートし、読み込まれたモジュール一覧を返す
+
+    Args:
+        backend_dir: app パッケージを含むディレクトリ
+        entry: インポートするモジュール名
+        package_dir: バンドルの依存関係ディレクトリ（指定時は site-packages を使わない）
+
+    Raises:
+        ImportProbeError: エントリーポイントをインポートできない場合
+    """
+    # Lambda上と同じく .env を読み込まないようにする
+    env = dict(os.environ, AWS_LAMBDA_FUNCTION_NAME='import-graph-check')
+    env.pop('PYTHONPATH', None)
+    command = [sys.executable]
+    if package_dir:
+        # 開発環境の site-packages を混ぜず、バンドルの中身だけで検査する
+        command.append('-S')
+    search_path = os.pathsep.join(filter(None, [backend_dir, package_dir]))
+    result = subprocess.run(
+        [*command, '-c', _PROBE, search_path, *entry],
+        capture_output=True,
+        text=True,
+        env=env
+    )
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        raise ImportProbeError(lines[-1] if lines else f"exit status {result.returncode}")
+    return json.loads(result.stdout)
+
+
+def find_violations(modules: List[str], forbidden: List[str]) -> List[str]:
+    """禁止モジュール（およびそのサブモジュール）を返す"""
+    return sorted(
+        name for name in modules
+        if any(name == prefix or name.startswith(prefix + '.') for prefix in forbidden)
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('target', choices=sorted(TARGETS))
+    parser.add_argument(
+        '--backend-dir',
+        default=os.path.join(PROJECT_ROOT, 'backend'),
+        help='Directory containing the app package (default: backend/)'
+    )
+    parser.add_argument(
+        '--package-dir',
+        help='Directory the bundle dependencies were installed into (pip --target)'
+    )
+    args = parser.parse_args()
+
+    target = TARGETS[args.target]
+    try:
+        modules = imported_modules(args.backend_dir, target['entry'], args.package_dir)
+    except ImportProbeError as e:
+        print(f"❌ {args.target}: failed to import entry point: {e}")
+        return 2
+    violations = find_violations(modules, target['forbidden'])
+
+    if violations:
+        print(f"❌ {args.target}: forbidden modules imported: {', '.join(violations)}")
+        return 1
+
+    print(f"✅ {args.target}: {len(modules)} modules imported, no forbidden modules")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())